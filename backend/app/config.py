@@ -42,6 +42,18 @@ class Settings(BaseSettings):
     host: str = os.getenv("HOST", "0.0.0.0")
     port: int = int(os.getenv("PORT", "8000"))
     
+    # ============================================
+    # HTTP Responses
+    # ============================================
+    # Compress responses (brotli when installed, else gzip) for clients that accept it
+    compression_enabled: bool = os.getenv("COMPRESSION_ENABLED", "True").lower() == "true"
+    # Smaller responses are sent as-is (compression wouldn't pay off)
+    compression_min_bytes: int = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    compression_gzip_level: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    compression_brotli_quality: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    # Cache-Control max-age (seconds) of GET /api/video/{video_id}
+    video_cache_max_age: int = int(os.getenv("VIDEO_CACHE_MAX_AGE", "300"))
+    
     # ============================================
     # Frontend Configuration
     # ============================================
@@ -49,6 +61,160 @@ class Settings(BaseSettings):
         "FRONTEND_URL", "http://localhost:5173"
     )
     
+    # ============================================
+    # AI Generation
+    # ============================================
+    # Run summary, key points and quiz generation at the same time
+    ai_concurrent_generation: bool = os.getenv(
+        "AI_CONCURRENT_GENERATION", "True"
+    ).lower() == "true"
+    # Upper bound on generation calls running at once (shared by all requests)
+    ai_max_workers: int = int(os.getenv("AI_MAX_WORKERS", "8"))
+    # Size of the shared HTTP connection pool used by the async OpenAI client
+    openai_max_connections: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "50"))
+    # Long transcripts: model context window, map chunk size and overlap (tokens)
+    ai_context_tokens: int = int(os.getenv("AI_CONTEXT_TOKENS", "16385"))
+    ai_chunk_tokens: int = int(os.getenv("AI_CHUNK_TOKENS", "3000"))
+    ai_chunk_overlap_tokens: int = int(os.getenv("AI_CHUNK_OVERLAP_TOKENS", "200"))
+    # Chunks condensed in parallel per transcript
+    ai_map_concurrency: int = int(os.getenv("AI_MAP_CONCURRENCY", "6"))
+    # "separate": one call per component; "combined": one JSON call for all
+    # three, falling back to separate calls if its output is invalid
+    ai_generation_mode: str = os.getenv("AI_GENERATION_MODE", "separate").lower()
+    # Follow-up calls that request only the missing/invalid quiz questions
+    ai_quiz_repair_attempts: int = int(os.getenv("AI_QUIZ_REPAIR_ATTEMPTS", "2"))
+    # Components whose prompt gets only the most salient transcript sentences
+    # (comma-separated: summary, key_points, quiz; empty = whole transcript).
+    # The combined prompt is reduced only when all three are listed
+    ai_extractive_components: str = os.getenv("AI_EXTRACTIVE_COMPONENTS", "")
+    # Sentence ranking: "textrank" or "tfidf"
+    ai_extractive_method: str = os.getenv("AI_EXTRACTIVE_METHOD", "textrank").lower()
+    # Transcript tokens kept for those components
+    ai_extractive_token_budget: int = int(os.getenv("AI_EXTRACTIVE_TOKEN_BUDGET", "2000"))
+    # OpenAI quota enforced client-side, per process (0 = unlimited)
+    openai_tpm_limit: int = int(os.getenv("OPENAI_TPM_LIMIT", "90000"))
+    openai_rpm_limit: int = int(os.getenv("OPENAI_RPM_LIMIT", "3500"))
+    # Longest a call may queue for quota before failing with 503 (seconds)
+    openai_queue_timeout: float = float(os.getenv("OPENAI_QUEUE_TIMEOUT", "120"))
+    # OpenAI-compatible endpoint (empty = api.openai.com); the benchmarks
+    # point this at a local fake server
+    openai_base_url: str = os.getenv("OPENAI_BASE_URL", "")
+    
+    # ============================================
+    # Transcript Extraction
+    # ============================================
+    # Threads dedicated to (blocking) YouTube transcript fetches
+    transcript_max_workers: int = int(os.getenv("TRANSCRIPT_MAX_WORKERS", "16"))
+    # Persistent on-disk archive consulted before fetching from YouTube
+    transcript_archive_enabled: bool = os.getenv(
+        "TRANSCRIPT_ARCHIVE_ENABLED", "True"
+    ).lower() == "true"
+    transcript_archive_dir: str = os.getenv("TRANSCRIPT_ARCHIVE_DIR", "transcript_archive")
+    # Fetch transcripts from this HTTP provider instead of YouTube (empty = YouTube)
+    transcript_provider_url: str = os.getenv("TRANSCRIPT_PROVIDER_URL", "")
+    # Clean captions (fillers, [Music] markers, rolling repeats) before prompting
+    transcript_normalize: bool = os.getenv("TRANSCRIPT_NORMALIZE", "True").lower() == "true"
+    # Also drop content-free ("Okay.") and verbatim repeated sentences
+    transcript_drop_low_information: bool = os.getenv(
+        "TRANSCRIPT_DROP_LOW_INFORMATION", "False"
+    ).lower() == "true"
+    
+    # ============================================
+    # Semantic Search
+    # ============================================
+    # Index transcript chunks of processed videos and serve /api/search
+    search_enabled: bool = os.getenv("SEARCH_ENABLED", "True").lower() == "true"
+    search_index_dir: str = os.getenv("SEARCH_INDEX_DIR", "search_index")
+    # Embedding model (OpenAI-compatible /embeddings, same endpoint as chat)
+    embedding_model: str = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    # Texts embedded per API call
+    embedding_batch_size: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    # Seconds of video per indexed chunk
+    search_chunk_seconds: float = float(os.getenv("SEARCH_CHUNK_SECONDS", "60"))
+    # Rows from which searches use IVF clusters instead of brute force (0 = never)
+    search_ivf_min_rows: int = int(os.getenv("SEARCH_IVF_MIN_ROWS", "50000"))
+    # Clusters scored per IVF query (more = better recall, slower)
+    search_ivf_probes: int = int(os.getenv("SEARCH_IVF_PROBES", "8"))
+    
+    # ============================================
+    # Caching (transcripts and learning packages)
+    # ============================================
+    # Backend: none | memory | sqlite | redis (persistent ones sit behind memory)
+    cache_backend: str = os.getenv("CACHE_BACKEND", "memory")
+    cache_ttl_seconds: int = int(os.getenv("CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    cache_max_entries: int = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    cache_max_bytes: int = int(os.getenv("CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+    cache_sqlite_path: str = os.getenv("CACHE_SQLITE_PATH", "cache.sqlite3")
+    cache_redis_url: str = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    
+    # ============================================
+    # Batch Processing
+    # ============================================
+    # Videos processed at the same time within one batch request
+    batch_max_concurrency: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+    
+    # ============================================
+    # Background Jobs
+    # ============================================
+    job_db_path: str = os.getenv("JOB_DB_PATH", "jobs.sqlite3")
+    # Videos processed at the same time by the job workers (per process)
+    job_workers: int = int(os.getenv("JOB_WORKERS", "2"))
+    job_poll_interval: float = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+    job_webhook_timeout: float = float(os.getenv("JOB_WEBHOOK_TIMEOUT", "10"))
+    # Running jobs older than this are assumed lost and requeued on startup
+    job_stale_seconds: float = float(os.getenv("JOB_STALE_SECONDS", "1800"))
+    
+    # ============================================
+    # Resilience (OpenAI and YouTube calls)
+    # ============================================
+    # Attempts per call (including the first) for transient failures
+    retry_max_attempts: int = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+    # Jittered exponential backoff: first step and longest wait (seconds)
+    retry_base_delay: float = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+    retry_max_delay: float = float(os.getenv("RETRY_MAX_DELAY", "20"))
+    # Consecutive failures that open a circuit, and how long it stays open
+    breaker_failure_threshold: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+    breaker_recovery_seconds: float = float(os.getenv("BREAKER_RECOVERY_SECONDS", "30"))
+    
+    # ============================================
+    # Rate Limiting (per client IP / API key)
+    # ============================================
+    rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    # Backend: memory | sqlite | redis (shared ones for multi-worker deployments)
+    rate_limit_backend: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    rate_limit_window_seconds: float = float(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "60"))
+    # Cost units per window for each IP address / each known API key
+    rate_limit_per_minute: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "120"))
+    rate_limit_api_key_per_minute: int = int(os.getenv("RATE_LIMIT_API_KEY_PER_MINUTE", "1200"))
+    # Known API keys (X-API-Key header): "key" or "key:limit", comma separated
+    rate_limit_api_keys: str = os.getenv("RATE_LIMIT_API_KEYS", "")
+    # Route cost overrides: "/path=cost", comma separated
+    rate_limit_route_costs: str = os.getenv("RATE_LIMIT_ROUTE_COSTS", "")
+    # Identify clients by X-Forwarded-For (only behind a trusted proxy)
+    rate_limit_trust_proxy: bool = os.getenv("RATE_LIMIT_TRUST_PROXY", "False").lower() == "true"
+    # Peers whose X-Forwarded-For is believed: IPs/CIDRs, comma separated
+    rate_limit_trusted_proxies: str = os.getenv(
+        "RATE_LIMIT_TRUSTED_PROXIES", "127.0.0.1,::1,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16"
+    )
+    # Proxies in front of the app that append to X-Forwarded-For
+    rate_limit_proxy_hops: int = int(os.getenv("RATE_LIMIT_PROXY_HOPS", "1"))
+    rate_limit_sqlite_path: str = os.getenv("RATE_LIMIT_SQLITE_PATH", "ratelimit.sqlite3")
+    rate_limit_redis_url: str = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+    
+    # ============================================
+    # Monitoring
+    # ============================================
+    # Prometheus metrics on GET /metrics (per process)
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    # One JSON log line per request (request id, status, per-stage timings)
+    request_log_enabled: bool = os.getenv("REQUEST_LOG_ENABLED", "True").lower() == "true"
+    log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    # Requests at least this slow keep their full span breakdown
+    slow_request_threshold_ms: float = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "2000"))
+    slow_request_log_size: int = int(os.getenv("SLOW_REQUEST_LOG_SIZE", "50"))
+    # Token for /api/admin endpoints (X-Admin-Token header); empty disables them
+    admin_token: str = os.getenv("ADMIN_TOKEN", "")
+
     # ============================================
     # Application Metadata
     # ============================================
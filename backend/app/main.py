@@ -11,6 +11,11 @@ Purpose:
 Features:
 - Health check endpoint: GET /
 - CORS properly configured for development and production
+- Per-IP / per-API-key rate limiting (429 with Retry-After)
+- Prometheus metrics: GET /metrics
+- Request tracing: X-Request-ID, JSON request log, GET /api/admin/slow-requests
+- Semantic search over processed videos: GET /api/search
+- gzip/brotli response compression; ETags and 304s for learning packages
 - Environment-aware configuration
 - Uvicorn-ready for deployment
 """
@@ -20,9 +25,19 @@ from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
 
+from app.config import settings
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.tracing import TracingMiddleware, REQUEST_ID_HEADER
+
 # Import route modules
 from app.routes.transcript_routes import router as transcript_router
 from app.routes.video_routes import router as video_router
+from app.routes.job_routes import router as job_router, job_service
+from app.routes.search_routes import router as search_router
+from app.routes.metrics_routes import router as metrics_router
+from app.routes.admin_routes import router as admin_router
 
 # Load environment variables from .env file
 load_dotenv()
@@ -62,6 +77,31 @@ else:
     ]
     print(f"✓ Development CORS: Allowing localhost variants")
 
+# ============================================
+# Response Compression
+# ============================================
+
+# Innermost layer: compresses what the routes return (learning packages
+# carry whole transcripts); the other middleware only add headers
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware)
+
+# ============================================
+# Rate Limiting
+# ============================================
+
+# Added before CORS so CORS stays the outermost layer and 429 responses
+# still carry CORS headers the browser can read
+if settings.rate_limit_enabled:
+    app.add_middleware(RateLimitMiddleware)
+
+# Outside the rate limiter, so rejected requests are measured too
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+# Every request gets a request id and a trace; rate-limited requests too
+app.add_middleware(TracingMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -69,6 +109,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let the frontend read the id to quote in bug reports, and the ETag
+    # of learning packages for If-None-Match
+    expose_headers=[REQUEST_ID_HEADER.decode(), "ETag"],
 )
 
 
@@ -112,6 +155,39 @@ app.include_router(transcript_router, prefix="/api")
 # Prefix "/api" makes the endpoint: POST /api/video/process
 app.include_router(video_router, prefix="/api")
 
+# Include background job routes
+# Prefix "/api" makes the endpoints: POST /api/jobs, GET /api/jobs/{job_id}
+app.include_router(job_router, prefix="/api")
+
+# Include semantic search routes
+# Prefix "/api" makes the endpoints: GET /api/search, GET /api/search/related/{video_id}
+if settings.search_enabled:
+    app.include_router(search_router, prefix="/api")
+
+# Prometheus scrape endpoint (no prefix): GET /metrics
+if settings.metrics_enabled:
+    app.include_router(metrics_router)
+
+# Include admin routes (require X-Admin-Token)
+# Prefix "/api" makes the endpoint: GET /api/admin/slow-requests
+app.include_router(admin_router, prefix="/api")
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    """
+    Start the background job workers with the application.
+    """
+    await job_service.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    """
+    Stop the background job workers; unfinished jobs are requeued on next start.
+    """
+    await job_service.stop()
+
 # Routes available in next phases:
 # from app.routes import summary_routes, quiz_routes
 # app.include_router(summary_routes.router, prefix="/api")
@@ -120,8 +196,6 @@ app.include_router(video_router, prefix="/api")
 # TODO:
 # - Add advanced features for Phase 5+
 # - Setup error handling middleware
-# - Add request logging for monitoring
-# - Add rate limiting for production
 
 
 if __name__ == "__main__":
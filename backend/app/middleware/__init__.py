@@ -0,0 +1,13 @@
+"""
+middleware/__init__.py - ASGI Middleware Package
+
+Purpose:
+- Cross-cutting request handling that runs before the routes
+- Each file provides one middleware class, added to the app in main.py
+
+Current structure:
+- rate_limit.py - Per-IP and per-API-key rate limiting (429 + Retry-After)
+- metrics.py - HTTP latency histogram and in-flight gauge for /metrics
+- tracing.py - Request IDs, per-stage spans, JSON request log, slow requests
+- compression.py - gzip/brotli response bodies (Accept-Encoding, streamed chunks)
+"""
@@ -0,0 +1,260 @@
+"""
+Compression Middleware - gzip/brotli Response Bodies
+
+Learning packages carry the whole transcript: a long lecture is hundreds
+of KB of JSON, which compresses 4-8x. Compressing it is a few
+milliseconds of CPU against a much faster download on a phone.
+
+Behaviour:
+- Encoding follows the client's Accept-Encoding: brotli ("br") if the
+  optional `brotli` package is installed, otherwise gzip
+- Only text-like types are compressed (JSON, NDJSON, text); responses
+  under COMPRESSION_MIN_BYTES are sent as they are
+- Streamed responses (batch NDJSON) are compressed chunk by chunk and
+  flushed after each one, so results still arrive as they finish.
+  Server-sent events are never compressed: each event is a few bytes and
+  proxies buffer compressed streams.
+- Compressible responses get "Vary: Accept-Encoding", and strong ETags
+  become weak once the body is re-encoded
+- Bytes before/after compression are counted in
+  svlt_http_compression_bytes_total
+"""
+
+import asyncio
+import zlib
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+
+from ..config import settings
+from ..utils.metrics import HTTP_COMPRESSION_BYTES
+
+# Content types worth compressing (prefix match, parameters ignored)
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+# Never compressed, see the module docstring
+EXCLUDED_TYPES = ("text/event-stream",)
+
+# Bodies larger than this are compressed in a worker thread, off the event loop
+THREAD_THRESHOLD_BYTES = 256 * 1024
+
+
+@lru_cache(maxsize=None)
+def _brotli() -> Any:
+    """
+    The brotli module, or None if it isn't installed.
+    """
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the response encoding from an Accept-Encoding header.
+    
+    Args:
+        accept_encoding (str): Header value, e.g. "gzip, deflate, br;q=0.9"
+    
+    Returns:
+        str: "br", "gzip", or None to send the body as it is
+    
+    Example:
+        >>> choose_encoding("gzip, deflate")
+        'gzip'
+        >>> choose_encoding("identity")
+    """
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    
+    def acceptable(encoding: str) -> bool:
+        return accepted.get(encoding, accepted.get("*", 0.0)) > 0
+    
+    if _brotli() is not None and acceptable("br"):
+        return "br"
+    if acceptable("gzip"):
+        return "gzip"
+    return None
+
+
+def _is_compressible(content_type: str) -> bool:
+    content_type = content_type.split(";", 1)[0].strip().lower()
+    if content_type.startswith(EXCLUDED_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class _Compressor:
+    """
+    Incremental gzip or brotli compressor.
+    """
+    
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = _brotli().Compressor(quality=brotli_quality)
+        else:
+            # wbits=31: zlib stream with a gzip header and trailer
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+    
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """
+        Compress a chunk; the last one (final) ends the stream, others are
+        flushed so the client can decode everything sent so far.
+        """
+        if self.encoding == "br":
+            output = self._brotli.process(data)
+            return output + (self._brotli.finish() if final else self._brotli.flush())
+        output = self._zlib.compress(data)
+        return output + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing response bodies.
+    
+    Usage (main.py):
+        app.add_middleware(CompressionMiddleware)
+    """
+    
+    def __init__(self, app, minimum_size: Optional[int] = None, gzip_level: Optional[int] = None,
+                 brotli_quality: Optional[int] = None):
+        """
+        Args:
+            app: The ASGI application to wrap
+            minimum_size (int, optional): Smallest body compressed (defaults to settings)
+            gzip_level (int, optional): zlib level 1-9 (defaults to settings)
+            brotli_quality (int, optional): brotli quality 0-11 (defaults to settings)
+        """
+        self.app = app
+        self.minimum_size = settings.compression_min_bytes if minimum_size is None else minimum_size
+        self.gzip_level = settings.compression_gzip_level if gzip_level is None else gzip_level
+        self.brotli_quality = settings.compression_brotli_quality if brotli_quality is None else brotli_quality
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding)
+        
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        # None until the first body message decides how the response is sent
+        passthrough: Optional[bool] = None
+        
+        async def compressing_send(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk: headers depend on it
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            
+            if passthrough is None:
+                headers = _Headers(start_message["headers"])
+                compressible = (
+                    start_message["status"] not in (204, 304)
+                    and not headers.get(b"content-encoding")
+                    and _is_compressible(headers.get(b"content-type") or "")
+                )
+                if compressible:
+                    headers.add_vary()
+                if not compressible or encoding is None or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    start_message["headers"] = headers.raw
+                    await send(start_message)
+                    await send(message)
+                    return
+                
+                passthrough = False
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers.set(b"content-encoding", encoding.encode())
+                headers.weaken_etag()
+                headers.remove(b"content-length")
+                if not more_body:
+                    compressed = await self._compress(compressor, body, final=True)
+                    headers.set(b"content-length", str(len(compressed)).encode())
+                    start_message["headers"] = headers.raw
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                start_message["headers"] = headers.raw
+                await send(start_message)
+            
+            compressed = await self._compress(compressor, body, final=not more_body)
+            await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+        
+        await self.app(scope, receive, compressing_send)
+    
+    @staticmethod
+    async def _compress(compressor: _Compressor, body: bytes, final: bool) -> bytes:
+        if len(body) > THREAD_THRESHOLD_BYTES:
+            compressed = await asyncio.to_thread(compressor.compress, body, final)
+        else:
+            compressed = compressor.compress(body, final)
+        HTTP_COMPRESSION_BYTES.labels(encoding=compressor.encoding, kind="uncompressed").inc(len(body))
+        HTTP_COMPRESSION_BYTES.labels(encoding=compressor.encoding, kind="compressed").inc(len(compressed))
+        return compressed
+
+
+class _Headers:
+    """
+    Minimal editor for raw ASGI header lists.
+    """
+    
+    def __init__(self, raw: List[Tuple[bytes, bytes]]):
+        self.raw = list(raw)
+    
+    def get(self, name: bytes) -> Optional[str]:
+        for key, value in self.raw:
+            if key.lower() == name:
+                return value.decode("latin-1")
+        return None
+    
+    def remove(self, name: bytes) -> None:
+        self.raw = [(key, value) for key, value in self.raw if key.lower() != name]
+    
+    def set(self, name: bytes, value: bytes) -> None:
+        self.remove(name)
+        self.raw.append((name, value))
+    
+    def add_vary(self) -> None:
+        vary = self.get(b"vary")
+        if not vary:
+            self.set(b"vary", b"Accept-Encoding")
+        elif "accept-encoding" not in vary.lower() and vary.strip() != "*":
+            self.set(b"vary", f"{vary}, Accept-Encoding".encode("latin-1"))
+    
+    def weaken_etag(self) -> None:
+        # The compressed bytes differ from the identity ones, so a strong
+        # validator no longer applies to them
+        etag = self.get(b"etag")
+        if etag and not etag.startswith("W/"):
+            self.set(b"etag", f"W/{etag}".encode("latin-1"))
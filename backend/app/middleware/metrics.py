@@ -0,0 +1,55 @@
+"""
+Metrics Middleware - HTTP Request Instrumentation
+
+Records every HTTP request in the /metrics histograms:
+- svlt_http_request_duration_seconds by handler, method and status
+- svlt_http_requests_in_flight
+
+The handler label is the route function's name (e.g. "process_video"),
+not the raw path, so IDs in URLs don't create unbounded label values.
+Streaming responses are measured until their last byte is sent.
+"""
+
+import time
+
+from ..utils.metrics import HTTP_IN_FLIGHT, HTTP_REQUEST_SECONDS
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each HTTP request.
+    
+    Usage (main.py):
+        app.add_middleware(MetricsMiddleware)
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status = 500  # If the app raises before responding
+        started = time.perf_counter()
+        
+        async def send_and_record_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        in_flight = HTTP_IN_FLIGHT.labels()
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_and_record_status)
+        finally:
+            in_flight.dec()
+            # The router stores the matched endpoint in the (shared) scope
+            endpoint = scope.get("endpoint")
+            HTTP_REQUEST_SECONDS.labels(
+                handler=getattr(endpoint, "__name__", "unmatched"),
+                method=scope["method"],
+                status=status
+            ).observe(time.perf_counter() - started)
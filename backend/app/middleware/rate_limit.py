@@ -0,0 +1,582 @@
+"""
+Rate Limit Middleware - Per-Client Request Budgets
+
+This module limits how much work a single client can ask of the API.
+
+Purpose:
+- Stop one client from flooding /api/video/process, where every request
+  fans out to several paid OpenAI calls
+- Protect latency for everyone else when a client misbehaves
+- Give well-behaved clients a clear signal: 429 with a Retry-After header
+
+How It Works:
+Each client has a budget of "cost units" per window (RATE_LIMIT_WINDOW_SECONDS).
+Routes have cost weights: processing a video costs more than extracting a
+transcript, and health checks are free. Usage is counted with a sliding
+window counter: the current window's count plus the previous window's
+count weighted by how much of it still overlaps the sliding window. This
+needs two counters per client instead of a log of every request.
+
+Requests doing work per item (a batch of videos) are charged the route
+cost per item: once when they arrive, and for the other items when the
+route calls charge_items() after validating the body.
+
+Clients:
+- Requests with a known X-API-Key header are limited per key, with the
+  key's own budget (RATE_LIMIT_API_KEYS)
+- Everything else is limited per IP address (RATE_LIMIT_PER_MINUTE).
+  Behind a proxy (RATE_LIMIT_TRUST_PROXY), the address comes from
+  X-Forwarded-For, but only on connections from RATE_LIMIT_TRUSTED_PROXIES
+  and only from the entries those proxies appended (RATE_LIMIT_PROXY_HOPS,
+  counted from the right): the leftmost entries are whatever the client sent.
+
+Backends:
+- memory: counters in this process (default, single worker)
+- sqlite: counters in a SQLite file shared by workers on one machine
+- redis: counters on a Redis-compatible server shared by every instance
+  (needs the `redis` package)
+
+If a shared backend fails, requests are let through (fail open): the
+limiter protects the service, it shouldn't take it down.
+"""
+
+import asyncio
+import hashlib
+import ipaddress
+import json
+import math
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from ..config import settings
+
+
+# Cost of one request to each route, in budget units. Other routes cost
+# DEFAULT_ROUTE_COST. Overridden/extended by RATE_LIMIT_ROUTE_COSTS.
+ROUTE_COSTS = {
+    "/api/video/process": 10,
+    "/api/video/process/stream": 10,
+    # Per video: charged once on arrival, the rest once the route has
+    # counted the batch's videos (see charge_items)
+    "/api/video/process/batch": 10,
+    "/api/jobs": 10,
+    "/api/transcript/extract": 1,
+    # Indexing extracts a transcript and embeds every chunk; an uncached
+    # search embeds the query. Related-video lookups use stored embeddings.
+    "/api/search/index": 10,
+    "/api/search": 3,
+    # Health checks and metrics are free so monitoring never gets limited
+    "/": 0,
+    "/health": 0,
+    "/metrics": 0,
+    "/api/video/health": 0,
+    "/api/transcript/health": 0,
+}
+DEFAULT_ROUTE_COST = 1
+
+API_KEY_HEADER = b"x-api-key"
+
+
+def parse_route_costs(value: str) -> Dict[str, int]:
+    """
+    Parse RATE_LIMIT_ROUTE_COSTS ("/path=cost,/other=cost") on top of ROUTE_COSTS.
+    
+    Example:
+        >>> parse_route_costs("/api/video/process=20")["/api/video/process"]
+        20
+    """
+    costs = dict(ROUTE_COSTS)
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        path, _, cost = item.rpartition("=")
+        if not path:
+            raise ValueError(f"Invalid RATE_LIMIT_ROUTE_COSTS entry {item!r}; expected /path=cost")
+        costs[path.strip()] = int(cost)
+    return costs
+
+
+def _rate_limit_detail(retry_seconds: int) -> Dict[str, Any]:
+    return {
+        "error": "Rate Limit Exceeded",
+        "detail": f"Too many requests; retry in {retry_seconds} seconds",
+        "retry_after": retry_seconds
+    }
+
+
+async def charge_items(request: Request, items: int) -> None:
+    """
+    Charge a request for the items after the first one (e.g. the videos
+    of a batch), at its route cost per item.
+    
+    The middleware charged one item when the request arrived; it is given
+    back if the request is rejected here. Does nothing when rate limiting
+    is off.
+    
+    Args:
+        request (Request): The request being handled
+        items (int): Items the request will process
+    
+    Raises:
+        HTTPException: 429 with Retry-After if the client's budget can't cover them
+    
+    Example:
+        >>> await charge_items(http_request, len(video_ids))
+    """
+    charge = getattr(request.state, "rate_limit_charge", None)
+    if charge is None or items <= 1:
+        return
+    
+    if charge.cost * items > charge.limit:
+        # Would never fit, however long the client waits
+        await charge.refund()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={
+                "error": "Rate Limit Exceeded",
+                "detail": f"{items} items cost {charge.cost * items} units, more than the budget of "
+                          f"{charge.limit} per window; send at most {charge.limit // charge.cost}"
+            }
+        )
+    
+    allowed, retry_after = await charge(items - 1)
+    if not allowed:
+        await charge.refund()
+        retry_seconds = max(1, math.ceil(retry_after))
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=_rate_limit_detail(retry_seconds),
+            headers={"Retry-After": str(retry_seconds)}
+        )
+
+
+def parse_api_keys(value: str, default_limit: int) -> Dict[str, int]:
+    """
+    Parse RATE_LIMIT_API_KEYS ("key" or "key:limit", comma separated).
+    
+    Returns:
+        Dict[str, int]: API key -> budget per window
+    """
+    keys = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        key, _, limit = item.partition(":")
+        keys[key] = int(limit) if limit else default_limit
+    return keys
+
+
+def parse_trusted_proxies(value: str) -> List[Any]:
+    """
+    Parse RATE_LIMIT_TRUSTED_PROXIES (IPs or CIDRs, comma separated).
+    
+    Returns:
+        List[IPv4Network | IPv6Network]: Networks of trusted proxies
+    """
+    return [
+        ipaddress.ip_network(item, strict=False)
+        for item in filter(None, (part.strip() for part in value.split(",")))
+    ]
+
+
+# =====================================================
+# COUNTER STORES
+# =====================================================
+
+class RateLimitStore:
+    """
+    Per-client counters for consecutive fixed windows.
+    
+    Methods:
+        add(key, window, amount, ttl): Add to a window's counter; returns
+            (previous window's count, this window's new count)
+    """
+    
+    name = "base"
+    
+    # Blocking stores are called from a worker thread, not the event loop
+    blocking = False
+    
+    def add(self, key: str, window: int, amount: int, ttl: float) -> Tuple[int, int]:
+        raise NotImplementedError
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Counters in a dict; only limits the current process.
+    """
+    
+    name = "memory"
+    
+    # Drop counters of idle clients every this many updates
+    SWEEP_EVERY = 1000
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[int, int]] = {}
+        self._updates = 0
+    
+    def add(self, key: str, window: int, amount: int, ttl: float) -> Tuple[int, int]:
+        with self._lock:
+            windows = self._counts.setdefault(key, {})
+            windows[window] = windows.get(window, 0) + amount
+            for old in [w for w in windows if w < window - 1]:
+                del windows[old]
+            
+            self._updates += 1
+            if self._updates % self.SWEEP_EVERY == 0:
+                for client in [k for k, counts in self._counts.items() if max(counts) < window - 1]:
+                    del self._counts[client]
+            
+            return windows.get(window - 1, 0), windows[window]
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """
+    Counters in a SQLite file, shared by worker processes on one machine.
+    """
+    
+    name = "sqlite"
+    blocking = True
+    
+    # Delete expired windows every this many updates
+    SWEEP_EVERY = 1000
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            " key TEXT NOT NULL,"
+            " window INTEGER NOT NULL,"
+            " count INTEGER NOT NULL,"
+            " PRIMARY KEY (key, window)"
+            ")"
+        )
+        self._updates = 0
+    
+    def add(self, key: str, window: int, amount: int, ttl: float) -> Tuple[int, int]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO rate_limits (key, window, count) VALUES (?, ?, ?)"
+                    " ON CONFLICT (key, window) DO UPDATE SET count = count + excluded.count",
+                    (key, window, amount)
+                )
+                counts = dict(self._conn.execute(
+                    "SELECT window, count FROM rate_limits WHERE key = ? AND window IN (?, ?)",
+                    (key, window - 1, window)
+                ).fetchall())
+                
+                self._updates += 1
+                if self._updates % self.SWEEP_EVERY == 0:
+                    self._conn.execute("DELETE FROM rate_limits WHERE window < ?", (window - 1,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        
+        return counts.get(window - 1, 0), counts[window]
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """
+    Counters on a Redis-compatible server, shared by every instance.
+    
+    Requires the optional `redis` package.
+    """
+    
+    name = "redis"
+    blocking = True
+    
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise ValueError(
+                "RATE_LIMIT_BACKEND=redis requires the 'redis' package. "
+                "Install it with: pip install redis"
+            )
+        self._client = redis.Redis.from_url(url)
+    
+    def add(self, key: str, window: int, amount: int, ttl: float) -> Tuple[int, int]:
+        current_key = f"ratelimit:{key}:{window}"
+        pipeline = self._client.pipeline(transaction=True)
+        pipeline.incrby(current_key, amount)
+        pipeline.expire(current_key, int(math.ceil(ttl)))
+        pipeline.get(f"ratelimit:{key}:{window - 1}")
+        current, _, previous = pipeline.execute()
+        return int(previous or 0), int(current)
+
+
+def build_store() -> RateLimitStore:
+    """
+    Build the counter store selected by RATE_LIMIT_BACKEND.
+    """
+    backend = settings.rate_limit_backend.lower()
+    if backend == "memory":
+        return MemoryRateLimitStore()
+    if backend == "sqlite":
+        return SQLiteRateLimitStore(settings.rate_limit_sqlite_path)
+    if backend == "redis":
+        return RedisRateLimitStore(settings.rate_limit_redis_url)
+    
+    raise ValueError(
+        f"Unknown RATE_LIMIT_BACKEND '{settings.rate_limit_backend}'. "
+        "Use one of: memory, sqlite, redis."
+    )
+
+
+# =====================================================
+# LIMITER
+# =====================================================
+
+class RateLimiter:
+    """
+    Sliding window counter over a RateLimitStore.
+    
+    Example:
+        >>> limiter = RateLimiter(MemoryRateLimitStore(), window_seconds=60)
+        >>> limiter.hit("ip:203.0.113.7", cost=10, limit=120)
+        (True, 110, 0.0)
+    """
+    
+    def __init__(self, store: RateLimitStore, window_seconds: float = 60.0):
+        self.store = store
+        self.window_seconds = window_seconds
+    
+    def hit(self, key: str, cost: int, limit: int, now: Optional[float] = None) -> Tuple[bool, int, float]:
+        """
+        Charge `cost` units to a client if it has budget left.
+        
+        Args:
+            key (str): Client identity
+            cost (int): Units this request costs
+            limit (int): Client's budget per window
+            now (float, optional): Current time (defaults to time.time())
+        
+        Returns:
+            Tuple[bool, int, float]:
+            - allowed (bool): Whether the request may proceed
+            - remaining (int): Units left in the sliding window
+            - retry_after (float): Seconds until the request would fit (0 if allowed)
+        """
+        now = time.time() if now is None else now
+        window = int(now // self.window_seconds)
+        elapsed = (now % self.window_seconds) / self.window_seconds
+        ttl = 2 * self.window_seconds
+        
+        previous, current = self.store.add(key, window, cost, ttl)
+        used = previous * (1 - elapsed) + current
+        if used <= limit:
+            return True, int(limit - used), 0.0
+        
+        # Over budget: take the charge back and work out when it would fit
+        self.store.add(key, window, -cost, ttl)
+        return False, max(0, int(limit - used + cost)), self._retry_after(previous, current - cost, cost, limit, elapsed)
+    
+    def _retry_after(self, previous: int, current: int, cost: int, limit: int, elapsed: float) -> float:
+        """
+        Seconds until previous * (1 - elapsed) + current + cost fits in limit.
+        """
+        if cost > limit:
+            return self.window_seconds
+        
+        # Still in this window: the previous window's weight keeps shrinking
+        if previous > 0 and current + cost <= limit:
+            needed = 1 - (limit - current - cost) / previous
+            return max(0.0, needed - elapsed) * self.window_seconds
+        
+        # Next window: this window's count becomes the shrinking one
+        needed = 1 - (limit - cost) / current if current > 0 else 0.0
+        return (1 - elapsed + max(0.0, needed)) * self.window_seconds
+
+
+# =====================================================
+# MIDDLEWARE
+# =====================================================
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware enforcing per-client budgets with route cost weights.
+    
+    Responses carry X-RateLimit-Limit and X-RateLimit-Remaining headers.
+    Rejected requests get:
+        
+        HTTP 429, Retry-After: 7
+        {
+            "detail": {
+                "error": "Rate Limit Exceeded",
+                "detail": "Too many requests; retry in 7 seconds",
+                "retry_after": 7
+            }
+        }
+    
+    Usage (main.py):
+        app.add_middleware(RateLimitMiddleware)
+    """
+    
+    def __init__(self, app, limiter: Optional[RateLimiter] = None,
+                 route_costs: Optional[Dict[str, int]] = None,
+                 ip_limit: Optional[int] = None, api_keys: Optional[Dict[str, int]] = None,
+                 trust_proxy: Optional[bool] = None, trusted_proxies: Optional[List[Any]] = None,
+                 proxy_hops: Optional[int] = None):
+        """
+        Args:
+            app: The wrapped ASGI application
+            limiter (RateLimiter, optional): Defaults to the configured backend
+            route_costs (dict, optional): Path -> cost (defaults to settings)
+            ip_limit (int, optional): Budget per IP address per window
+            api_keys (dict, optional): API key -> budget per window
+            trust_proxy (bool, optional): Take the client IP from X-Forwarded-For
+            trusted_proxies (list, optional): Networks allowed to set X-Forwarded-For
+            proxy_hops (int, optional): Proxies appending to X-Forwarded-For
+        """
+        self.app = app
+        self.limiter = limiter or RateLimiter(build_store(), settings.rate_limit_window_seconds)
+        self.route_costs = route_costs if route_costs is not None else parse_route_costs(
+            settings.rate_limit_route_costs
+        )
+        self.ip_limit = ip_limit if ip_limit is not None else settings.rate_limit_per_minute
+        self.api_keys = api_keys if api_keys is not None else parse_api_keys(
+            settings.rate_limit_api_keys, settings.rate_limit_api_key_per_minute
+        )
+        self.trust_proxy = settings.rate_limit_trust_proxy if trust_proxy is None else trust_proxy
+        self.trusted_proxies = trusted_proxies if trusted_proxies is not None else parse_trusted_proxies(
+            settings.rate_limit_trusted_proxies
+        )
+        self.proxy_hops = max(1, settings.rate_limit_proxy_hops if proxy_hops is None else proxy_hops)
+    
+    def _is_trusted_proxy(self, ip: str) -> bool:
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted_proxies)
+    
+    def _forwarded_ip(self, scope: Dict[str, Any], peer: str) -> str:
+        """
+        Client IP reported by the trusted proxies, or the peer's own address.
+        
+        Each proxy appends the address it received the request from, so the
+        client is proxy_hops entries from the right. Anything further left
+        was sent by the client and can't be trusted.
+        """
+        if not self.trust_proxy or not self._is_trusted_proxy(peer):
+            return peer
+        
+        entries = []
+        for name, value in scope.get("headers") or []:
+            if name == b"x-forwarded-for":
+                entries.extend(part.strip() for part in value.decode("latin-1").split(","))
+        entries = [entry for entry in entries if entry]
+        if len(entries) < self.proxy_hops:
+            return peer
+        return entries[-self.proxy_hops]
+    
+    def _client(self, scope: Dict[str, Any]) -> Tuple[str, int]:
+        """
+        Identity and budget of the client making a request.
+        """
+        headers = dict(scope.get("headers") or [])
+        
+        api_key = headers.get(API_KEY_HEADER, b"").decode("latin-1").strip()
+        if api_key in self.api_keys:
+            # Never keep raw keys in a shared store
+            digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+            return f"key:{digest}", self.api_keys[api_key]
+        
+        ip = self._forwarded_ip(scope, (scope.get("client") or ("unknown", 0))[0])
+        return f"ip:{ip}", self.ip_limit
+    
+    async def _hit(self, key: str, cost: int, limit: int) -> Tuple[bool, int, float]:
+        try:
+            if self.limiter.store.blocking:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, self.limiter.hit, key, cost, limit)
+            return self.limiter.hit(key, cost, limit)
+        except Exception:
+            # Backend unavailable: fail open
+            return True, limit, 0.0
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        
+        cost = self.route_costs.get(scope["path"].rstrip("/") or "/", DEFAULT_ROUTE_COST)
+        if cost <= 0:
+            await self.app(scope, receive, send)
+            return
+        
+        key, limit = self._client(scope)
+        allowed, remaining, retry_after = await self._hit(key, cost, limit)
+        limit_headers: List[Tuple[bytes, bytes]] = [
+            (b"x-ratelimit-limit", str(limit).encode()),
+            (b"x-ratelimit-remaining", str(remaining).encode()),
+        ]
+        
+        if not allowed:
+            retry_seconds = max(1, math.ceil(retry_after))
+            body = json.dumps({"detail": _rate_limit_detail(retry_seconds)}).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(retry_seconds).encode()),
+                ] + limit_headers,
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        
+        # Lets the route charge for more items once it has read the body
+        item_charge = _ItemCharge(self, key, cost, limit, remaining)
+        scope.setdefault("state", {})["rate_limit_charge"] = item_charge
+        
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers") or []) + [
+                    (b"x-ratelimit-limit", str(limit).encode()),
+                    (b"x-ratelimit-remaining", str(item_charge.remaining).encode()),
+                ]
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+
+
+class _ItemCharge:
+    """
+    Extra charge for a request's items, bound to its client and route cost.
+    """
+    
+    def __init__(self, middleware: RateLimitMiddleware, key: str, cost: int, limit: int, remaining: int):
+        self.middleware = middleware
+        self.key = key
+        self.cost = cost
+        self.limit = limit
+        # Reported in X-RateLimit-Remaining
+        self.remaining = remaining
+    
+    async def __call__(self, items: int) -> Tuple[bool, float]:
+        """
+        Charge `items` more items.
+        
+        Returns:
+            Tuple[bool, float]: (allowed, retry_after)
+        """
+        allowed, remaining, retry_after = await self.middleware._hit(self.key, self.cost * items, self.limit)
+        if allowed:
+            self.remaining = remaining
+        return allowed, retry_after
+    
+    async def refund(self) -> None:
+        """
+        Give back the item charged on arrival (the request is rejected).
+        """
+        _, self.remaining, _ = await self.middleware._hit(self.key, -self.cost, self.limit)
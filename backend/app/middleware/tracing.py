@@ -0,0 +1,157 @@
+"""
+Tracing Middleware - Request IDs, Span Breakdown and Request Log
+
+Wraps every HTTP request in a trace (see utils/tracing.py):
+- Assigns a request id (a valid incoming X-Request-ID is kept, so ids
+  from a proxy or the frontend carry through) and returns it in the
+  X-Request-ID response header
+- Collects the spans recorded while the request runs: URL validation,
+  transcript fetch, each LLM call, and response serialization
+- Writes one JSON log line per request with the per-stage breakdown
+- Keeps slow requests in a ring buffer for GET /api/admin/slow-requests
+
+Response serialization is the time between the route function returning
+and the response starting: response_model validation, JSON encoding and
+rendering. Routers opt in with `APIRouter(route_class=TracedRoute)`,
+which marks the moment the route function returns.
+"""
+
+import functools
+import inspect
+import logging
+import re
+import time
+import uuid
+
+from fastapi.routing import APIRoute
+
+from ..config import settings
+from ..utils.tracing import SlowRequestLog, Trace, current_trace, end_trace, get_request_logger, start_trace
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+# Incoming ids are echoed into logs and headers, so only accept safe ones
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Polled constantly by monitoring; logged at DEBUG to keep the log readable
+QUIET_PATHS = {"/", "/health", "/metrics"}
+
+# Process-wide buffer read by the admin routes
+slow_requests = SlowRequestLog(settings.slow_request_log_size, settings.slow_request_threshold_ms)
+
+
+class TracedRoute(APIRoute):
+    """
+    APIRoute that marks when the route function returns.
+    
+    Everything after that mark until the response starts is recorded as
+    the "serialization" span by TracingMiddleware.
+    
+    Usage:
+        router = APIRouter(prefix="/video", route_class=TracedRoute)
+    """
+    
+    def get_route_handler(self):
+        call = self.dependant.call
+        if inspect.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def traced_call(**values):
+                started = time.perf_counter()
+                try:
+                    return await call(**values)
+                finally:
+                    trace = current_trace()
+                    if trace is not None:
+                        trace.add_span("handler", started, route=self.path)
+                        trace.handler_returned = time.perf_counter()
+            self.dependant.call = traced_call
+        return super().get_route_handler()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware tracing and logging each HTTP request.
+    
+    Usage (main.py):
+        app.add_middleware(TracingMiddleware)
+    """
+    
+    def __init__(self, app, slow_log: SlowRequestLog = None):
+        self.app = app
+        self.slow_log = slow_log if slow_log is not None else slow_requests
+        self.logger = get_request_logger(settings.log_level)
+    
+    @staticmethod
+    def _request_id(scope) -> str:
+        for name, value in scope.get("headers") or []:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1").strip()
+                if _VALID_REQUEST_ID.match(request_id):
+                    return request_id
+                break
+        return uuid.uuid4().hex
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        trace = Trace(self._request_id(scope), scope["method"], scope["path"])
+        request_id_header = (REQUEST_ID_HEADER, trace.request_id.encode("latin-1"))
+        status = 500  # If the app raises before responding
+        error = None
+        
+        async def send_with_request_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if trace.handler_returned is not None:
+                    trace.add_span("serialization", trace.handler_returned)
+                message = dict(message)
+                message["headers"] = list(message.get("headers") or []) + [request_id_header]
+            await send(message)
+        
+        token = start_trace(trace)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            end_trace(token)
+            self._finish(trace, scope, status, error)
+    
+    def _finish(self, trace: Trace, scope, status: int, error: str = None) -> None:
+        """
+        Log the request and keep it if it was slow.
+        """
+        duration_ms = round(trace.elapsed_ms(), 2)
+        endpoint = scope.get("endpoint")
+        fields = {
+            "status": status,
+            "duration_ms": duration_ms,
+            "handler": getattr(endpoint, "__name__", None),
+            "client": (scope.get("client") or ("unknown", 0))[0],
+        }
+        if error:
+            fields["error"] = error
+        
+        entry = trace.to_dict(**fields)
+        slow = self.slow_log.record(entry)
+        if not settings.request_log_enabled:
+            return
+        
+        if status >= 500:
+            level = logging.ERROR
+        elif slow:
+            level = logging.WARNING
+        elif trace.path in QUIET_PATHS:
+            level = logging.DEBUG
+        else:
+            level = logging.INFO
+        log_fields = {key: entry[key] for key in ("request_id", "method", "path")}
+        log_fields.update(fields)
+        log_fields["stages"] = trace.stage_totals()
+        if slow:
+            log_fields["spans"] = entry["spans"]
+        self.logger.log(level, "request", extra={"fields": log_fields})
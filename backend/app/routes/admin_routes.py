@@ -0,0 +1,94 @@
+"""
+Admin API Routes
+
+This module defines operator-only endpoints for investigating latency.
+
+Purpose:
+- Show the slowest recent requests with their full span breakdown
+  (URL validation, transcript fetch, each LLM call, serialization), so
+  "why was this request slow?" can be answered from one request id
+
+Endpoints:
+- GET /api/admin/slow-requests: Slow request buffer, slowest first
+- DELETE /api/admin/slow-requests: Empty the buffer
+
+Access:
+Every endpoint requires the X-Admin-Token header to match the ADMIN_TOKEN
+setting. With ADMIN_TOKEN unset the endpoints are disabled (403).
+"""
+
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from ..config import settings
+from ..middleware.tracing import slow_requests
+
+
+def require_admin_token(x_admin_token: str = Header(default="")) -> None:
+    """
+    Reject the request unless X-Admin-Token matches ADMIN_TOKEN.
+    """
+    if not settings.admin_token:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={
+                "error": "Admin Disabled",
+                "detail": "Set ADMIN_TOKEN to enable the admin endpoints"
+            }
+        )
+    if not hmac.compare_digest(x_admin_token.encode("utf-8"), settings.admin_token.encode("utf-8")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={
+                "error": "Unauthorized",
+                "detail": "Missing or invalid X-Admin-Token header"
+            }
+        )
+
+
+# Create router for admin endpoints
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin_token)]
+)
+
+
+@router.get(
+    "/slow-requests",
+    summary="Slowest Recent Requests",
+    description="Recent requests over SLOW_REQUEST_THRESHOLD_MS with their per-stage spans, slowest first"
+)
+async def get_slow_requests(limit: int = Query(default=20, ge=1, le=1000)):
+    """
+    Slow requests kept by the tracing middleware.
+    
+    Args:
+        limit (int): Number of requests to return (default 20)
+    
+    Returns:
+        dict: Buffer settings and the requests, each with request_id,
+            method, path, status, duration_ms and spans (name, start_ms,
+            duration_ms, plus attributes such as component and tokens)
+    
+    Example:
+        GET /api/admin/slow-requests?limit=5
+        X-Admin-Token: <ADMIN_TOKEN>
+    """
+    return {
+        **slow_requests.stats(),
+        "requests": slow_requests.slowest(limit)
+    }
+
+
+@router.delete(
+    "/slow-requests",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Clear Slow Requests",
+    description="Empty the slow request buffer (e.g. after fixing a regression)"
+)
+async def clear_slow_requests():
+    """
+    Empty the slow request buffer.
+    """
+    slow_requests.clear()
@@ -0,0 +1,183 @@
+"""
+Job API Routes
+
+This module defines the API endpoints for background video processing.
+
+Purpose:
+- Submit videos for processing without holding the connection open
+- Poll job status and fetch the finished learning package
+- Decouple HTTP latency from AI generation latency
+
+Endpoints:
+- POST /api/jobs: Submit a video, returns a job ID immediately (202)
+- GET /api/jobs/{job_id}: Job status
+- GET /api/jobs/{job_id}/result: Learning package of a finished job
+"""
+
+from fastapi import APIRouter, HTTPException, status
+from ..config import settings
+from ..middleware.tracing import TracedRoute
+from ..schemas.job_schema import CreateJobRequest, JobStatusResponse, JobResultResponse
+from ..schemas.video_schema import ErrorResponse
+from ..services.job_service import JobService, JOB_SUCCEEDED, JOB_FAILED
+from ..utils.youtube_utils import is_valid_youtube_url
+from .video_routes import video_processing_service
+
+
+# Create router for job endpoints
+router = APIRouter(
+    prefix="/jobs",
+    route_class=TracedRoute,
+    tags=["Background Jobs"],
+    responses={
+        400: {"model": ErrorResponse, "description": "Invalid request"},
+        404: {"model": ErrorResponse, "description": "Job not found"},
+        500: {"model": ErrorResponse, "description": "Server error"},
+    }
+)
+
+# Initialize job service (workers are started on application startup)
+# The job database (JOB_DB_PATH) is opened on first use, not at import
+job_service = JobService(
+    video_processing_service,
+    workers=settings.job_workers,
+    poll_interval=settings.job_poll_interval,
+    webhook_timeout=settings.job_webhook_timeout
+)
+
+
+def _status_response(job: dict) -> JobStatusResponse:
+    """
+    Build the public status view of a job.
+    """
+    return JobStatusResponse(
+        job_id=job["id"],
+        status=job["status"],
+        video_id=job["video_id"],
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        finished_at=job["finished_at"],
+        error=job["error"],
+        webhook_status=job["webhook_status"],
+        result_url=f"/api/jobs/{job['id']}/result"
+    )
+
+
+async def _get_job_or_404(job_id: str) -> dict:
+    """
+    Fetch a job or raise 404.
+    """
+    job = await job_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "Job Not Found",
+                "detail": f"No job with ID {job_id}"
+            }
+        )
+    return job
+
+
+@router.post(
+    "",
+    response_model=JobStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit Video Processing Job",
+    description="Queue a YouTube video for processing and return a job ID immediately"
+)
+async def create_job(request: CreateJobRequest):
+    """
+    Submit a video for background processing.
+    
+    The learning package is generated by the job workers. Poll
+    GET /api/jobs/{job_id} until the status is "succeeded" or "failed",
+    or pass a webhook_url to be notified.
+    
+    Request Body:
+        {
+            "youtube_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "webhook_url": "https://example.com/hooks/learning-package"
+        }
+    
+    Success Response (202):
+        {
+            "job_id": "3f2a...",
+            "status": "queued",
+            "video_id": "dQw4w9WgXcQ",
+            ...
+            "result_url": "/api/jobs/3f2a.../result"
+        }
+    
+    Raises:
+        HTTPException: If the URL is invalid
+    """
+    is_valid, video_id = is_valid_youtube_url(request.youtube_url)
+    
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "Invalid YouTube URL",
+                "detail": "Please provide a valid YouTube URL. "
+                         "Supported formats: youtube.com/watch?v=..., youtu.be/..."
+            }
+        )
+    
+    webhook_url = str(request.webhook_url) if request.webhook_url else None
+    job = await job_service.submit(video_id, request.youtube_url, webhook_url)
+    return _status_response(job)
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobStatusResponse,
+    summary="Get Job Status",
+    description="Check the status of a video processing job"
+)
+async def get_job(job_id: str):
+    """
+    Get the current status of a job.
+    
+    Raises:
+        HTTPException: 404 if the job ID is unknown
+    """
+    return _status_response(await _get_job_or_404(job_id))
+
+
+@router.get(
+    "/{job_id}/result",
+    response_model=JobResultResponse,
+    summary="Get Job Result",
+    description="Fetch the learning package produced by a finished job",
+    responses={
+        409: {"model": ErrorResponse, "description": "Job has not finished yet"},
+        422: {"model": ErrorResponse, "description": "Job failed"},
+    }
+)
+async def get_job_result(job_id: str):
+    """
+    Get the learning package of a succeeded job.
+    
+    Raises:
+        HTTPException: 404 if unknown, 409 if still queued/running,
+        422 (with the pipeline error) if the job failed
+    """
+    job = await _get_job_or_404(job_id)
+    
+    if job["status"] == JOB_FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=job["error"]
+        )
+    
+    if job["status"] != JOB_SUCCEEDED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "error": "Job Not Finished",
+                "detail": f"Job is {job['status']}. Poll /api/jobs/{job_id} until it succeeds."
+            }
+        )
+    
+    return JobResultResponse(job_id=job["id"], **job["result"])
@@ -0,0 +1,149 @@
+"""
+Metrics API Routes
+
+This module exposes the Prometheus scrape endpoint.
+
+Purpose:
+- Serve every metric of this process in the Prometheus text format
+- Turn state owned by other components (cache, circuit breakers, OpenAI
+  quota, request coalescing, jobs, transcript archive) into metrics at
+  scrape time, so they need no instrumentation of their own
+
+Endpoints:
+- GET /metrics: Prometheus text exposition (not under /api)
+
+Example scrape config:
+    scrape_configs:
+      - job_name: smart-video-learning-tool
+        static_configs:
+          - targets: ["localhost:8000"]
+"""
+
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from ..utils.cache import get_cache
+from ..utils.metrics import CONTENT_TYPE, registry
+from ..utils.rate_governor import governor_stats
+from ..utils.resilience import breaker_states
+from ..utils.transcript_archive import get_archive
+from .job_routes import job_service
+from .video_routes import video_processing_service
+
+
+router = APIRouter(tags=["Monitoring"])
+
+# Circuit breaker state as a number, for alerting on "> 0"
+BREAKER_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def _cache_layers():
+    """
+    (layer, stats) for the cache and, if tiered, its memory and persistent layers.
+    """
+    stats = get_cache().stats()
+    layers = [(stats["backend"], stats)]
+    for layer in ("memory", "persistent"):
+        if layer in stats:
+            layers.append((stats[layer]["backend"], stats[layer]))
+    return layers
+
+
+def _collect_cache():
+    layers = _cache_layers()
+    return [
+        ("svlt_cache_hits_total", "counter", "Cache lookups that found a value",
+         [({"layer": name}, stats["hits"]) for name, stats in layers]),
+        ("svlt_cache_misses_total", "counter", "Cache lookups that found nothing",
+         [({"layer": name}, stats["misses"]) for name, stats in layers]),
+        ("svlt_cache_hit_ratio", "gauge", "Hits / lookups since startup",
+         [({"layer": name}, stats["hit_ratio"]) for name, stats in layers]),
+    ]
+
+
+def _collect_archive():
+    archive = get_archive()
+    if archive is None:
+        return []
+    stats = archive.stats()
+    return [
+        ("svlt_transcript_archive_hits_total", "counter", "Transcripts served from the on-disk archive",
+         [({}, stats["hits"])]),
+        ("svlt_transcript_archive_misses_total", "counter", "Archive lookups that went to YouTube",
+         [({}, stats["misses"])]),
+        ("svlt_transcript_archive_entries", "gauge", "Transcripts stored in the archive",
+         [({}, stats["entries"])]),
+    ]
+
+
+def _collect_upstreams():
+    states = breaker_states()
+    return [
+        ("svlt_upstream_breaker_state", "gauge", "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+         [({"upstream": name}, BREAKER_STATE_VALUES[state["state"]]) for name, state in states.items()]),
+        ("svlt_upstream_rejected_calls_total", "counter", "Calls rejected by an open circuit breaker",
+         [({"upstream": name}, state["rejected_calls"]) for name, state in states.items()]),
+    ]
+
+
+def _collect_quota():
+    families = {
+        "queued": ("svlt_quota_queued_calls", "gauge", "Calls waiting for quota, by priority", []),
+        "utilization": ("svlt_quota_token_utilization", "gauge",
+                        "Tokens reserved in the last minute / tokens-per-minute quota", []),
+        "timed_out": ("svlt_quota_timeouts_total", "counter", "Calls that gave up waiting for quota", []),
+    }
+    for name, stats in governor_stats().items():
+        for priority, queued in stats["queued"].items():
+            families["queued"][3].append(({"upstream": name, "priority": priority}, queued))
+        families["utilization"][3].append(({"upstream": name}, stats["last_minute"]["token_utilization"]))
+        for priority, waits in stats["priorities"].items():
+            families["timed_out"][3].append(({"upstream": name, "priority": priority}, waits["timed_out"]))
+    return list(families.values())
+
+
+def _collect_pipeline():
+    coalescing = video_processing_service.coalescing_stats()
+    jobs = job_service.stats()["jobs"]
+    return [
+        ("svlt_pipeline_flights_in_flight", "gauge", "Distinct videos being processed right now",
+         [({}, coalescing["in_flight"])]),
+        ("svlt_pipeline_coalesced_total", "counter", "Requests that joined an in-flight run for the same video",
+         [({}, coalescing["coalesced"])]),
+        ("svlt_jobs", "gauge", "Background jobs by status",
+         [({"status": job_status}, count) for job_status, count in jobs.items()]),
+    ]
+
+
+for _collector in (_collect_cache, _collect_archive, _collect_upstreams, _collect_quota, _collect_pipeline):
+    registry.add_collector(_collector)
+
+
+@router.get(
+    "/metrics",
+    summary="Prometheus Metrics",
+    description="Stage latencies, OpenAI token usage, cache hit ratios, in-flight gauges and error counters",
+    response_class=Response
+)
+async def metrics():
+    """
+    Every metric of this process in the Prometheus text format.
+    
+    Key series:
+        svlt_stage_duration_seconds{stage}: Latency per pipeline stage
+            (validate_url, transcript, transcript_fetch, condense, summary,
+            key_points, quiz, quiz_repair, combined, generation, pipeline)
+        svlt_stage_errors_total{stage, type}: Failures by exception type
+            ("failed" for error results)
+        svlt_llm_tokens_total{component, kind}: Prompt/completion tokens
+        svlt_cache_hit_ratio{layer}: Cache hit ratio per cache layer
+        svlt_stage_in_flight{stage}, svlt_http_requests_in_flight
+        svlt_http_request_duration_seconds{handler, method, status}
+    
+    Returns:
+        Response: text/plain; version=0.0.4
+    """
+    # Collectors read SQLite (job counts, cache stats): keep them off the event loop
+    content = await asyncio.to_thread(registry.render)
+    return Response(content=content, media_type=CONTENT_TYPE)
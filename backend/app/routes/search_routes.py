@@ -0,0 +1,222 @@
+"""
+Semantic Search API Routes
+
+This module defines the API endpoints for searching processed videos.
+
+Purpose:
+- Search the transcripts of every processed video by meaning
+- Suggest videos related to one the user watched
+- Index a video explicitly (videos are indexed automatically once processed)
+
+Endpoints:
+- GET /api/search?q=...: Videos and moments matching a query
+- GET /api/search/related/{video_id}: Videos closest to an indexed video
+- POST /api/search/index: Index (or re-index) a video now
+- GET /api/search/stats: Index size and indexing counters
+
+Only mounted when SEARCH_ENABLED is true.
+"""
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, status
+from ..middleware.tracing import TracedRoute
+from ..schemas.search_schema import (
+    IndexVideoRequest, IndexVideoResponse, RelatedVideosResponse, SearchResponse
+)
+from ..schemas.video_schema import ErrorResponse
+from ..utils.resilience import UpstreamUnavailable, upstream_error
+from ..utils.youtube_utils import is_valid_youtube_url
+from .video_routes import search_service
+
+
+# Create router for search endpoints
+router = APIRouter(
+    prefix="/search",
+    route_class=TracedRoute,
+    tags=["Search"],
+    responses={
+        400: {"model": ErrorResponse, "description": "Invalid request"},
+        409: {"model": ErrorResponse, "description": "Search index built with another embedding model"},
+        503: {"model": ErrorResponse, "description": "OpenAI temporarily unavailable (see Retry-After)"},
+    }
+)
+
+
+def _upstream_to_http(error: UpstreamUnavailable) -> HTTPException:
+    """
+    503 with a Retry-After header for an upstream outage.
+    """
+    error_detail = upstream_error(error)
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=error_detail,
+        headers={"Retry-After": str(error_detail["retry_after"])}
+    )
+
+
+def _error_to_http(error: dict, default_status: int = status.HTTP_422_UNPROCESSABLE_ENTITY) -> HTTPException:
+    """
+    HTTP error for a failed search service call.
+    
+    An index built with another embedding model is a conflict with the
+    server's state (409), not a problem with the request.
+    """
+    if error["error"] == "Search Index Mismatch":
+        return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error)
+    return HTTPException(status_code=default_status, detail=error)
+
+
+@router.get(
+    "",
+    response_model=SearchResponse,
+    summary="Search Processed Videos",
+    description="Find the processed videos, and the moments in them, that best match a query"
+)
+async def search(
+    q: str = Query(..., min_length=1, max_length=500, description="What to look for, in natural language"),
+    limit: int = Query(default=10, ge=1, le=100, description="Maximum number of videos"),
+    matches: int = Query(default=3, ge=1, le=20, description="Matching moments listed per video")
+):
+    """
+    Search every processed video by meaning, not just keywords.
+    
+    The query is embedded (one small API call, cached) and compared with
+    the stored embeddings of every transcript chunk; results point to
+    where in each video the topic comes up.
+    
+    Example:
+        GET /api/search?q=how%20do%20mitochondria%20make%20ATP&limit=5
+    
+    Success Response (200):
+        {
+            "query": "how do mitochondria make ATP",
+            "results": [
+                {
+                    "video_id": "dQw4w9WgXcQ",
+                    "score": 0.61,
+                    "matches": [
+                        {"start": 720.0, "end": 780.5, "text": "The Krebs cycle ...", "score": 0.61}
+                    ]
+                }
+            ],
+            "took_ms": 3.2
+        }
+    
+    Raises:
+        HTTPException: 409 if the index was built with an embedding model
+            of another dimension, 503 if the query could not be embedded
+            (OpenAI down)
+    """
+    try:
+        success, result, error = await search_service.search_async(q.strip(), limit=limit, matches=matches)
+    except UpstreamUnavailable as e:
+        raise _upstream_to_http(e)
+    
+    if not success:
+        raise _error_to_http(error)
+    return SearchResponse(**result)
+
+
+@router.get(
+    "/related/{video_id}",
+    response_model=RelatedVideosResponse,
+    summary="Related Videos",
+    description="Indexed videos whose content is closest to a processed video",
+    responses={404: {"model": ErrorResponse, "description": "Video not indexed"}}
+)
+async def related_videos(
+    video_id: str,
+    limit: int = Query(default=5, ge=1, le=50, description="Maximum number of videos")
+):
+    """
+    Suggest what to watch next.
+    
+    Uses only stored embeddings (no API call). The video must have been
+    processed (and indexed) before.
+    
+    Raises:
+        HTTPException: 404 if the video is not indexed (with the current
+            embedding model), 409 if the index was built with a model of
+            another dimension
+    """
+    success, result, error = await search_service.related_videos_async(video_id, limit=limit)
+    if not success:
+        raise _error_to_http(error, status.HTTP_404_NOT_FOUND)
+    return RelatedVideosResponse(**result)
+
+
+@router.post(
+    "/index",
+    response_model=IndexVideoResponse,
+    summary="Index Video",
+    description="Add a video's transcript to the search index now"
+)
+async def index_video(request: IndexVideoRequest):
+    """
+    Index a video without generating its learning package.
+    
+    Processed videos are indexed automatically in the background; use
+    this to index a library up front, or with "force" after changing
+    chunking settings.
+    
+    Request Body:
+        {
+            "youtube_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "force": false
+        }
+    
+    Success Response (200):
+        {"video_id": "dQw4w9WgXcQ", "chunks": 42, "indexed": true}
+    
+    Raises:
+        HTTPException: 400 for an invalid URL, 409 if the index was built
+            with an embedding model of another dimension, 422 if the
+            transcript could not be fetched or embedded, 503 if
+            OpenAI/YouTube is unavailable
+    """
+    is_valid, video_id = is_valid_youtube_url(request.youtube_url)
+    
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "Invalid YouTube URL",
+                "detail": "Please provide a valid YouTube URL. "
+                         "Supported formats: youtube.com/watch?v=..., youtu.be/..."
+            }
+        )
+    
+    try:
+        success, result, error = await search_service.index_video_async(video_id, force=request.force)
+    except UpstreamUnavailable as e:
+        raise _upstream_to_http(e)
+    
+    if not success:
+        raise _error_to_http(error)
+    return IndexVideoResponse(**result)
+
+
+@router.get(
+    "/stats",
+    summary="Search Index Statistics",
+    description="Indexed videos and chunks, disk usage, search mode and indexing counters"
+)
+async def search_stats():
+    """
+    Size and state of the search index.
+    
+    Response (200):
+        {
+            "videos": 120,
+            "chunks": 5210,
+            "rows": 5300,
+            "dim": 1536,
+            "mode": "brute_force",
+            "disk_bytes": 33280000,
+            "indexing": {"indexed": 118, "skipped": 40, "failed": 2, "in_progress": 0, "last_error": "..."},
+            ...
+        }
+    """
+    # Opening the index reads its files: keep that off the event loop
+    return await asyncio.to_thread(search_service.stats)
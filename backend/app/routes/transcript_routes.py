@@ -13,8 +13,11 @@ Endpoints:
 """
 
 from fastapi import APIRouter, HTTPException, status
+from ..middleware.tracing import TracedRoute
 from ..schemas.transcript_schema import TranscriptRequest, TranscriptResponse, ErrorResponse
 from ..services.transcript_service import TranscriptService
+from ..utils.resilience import UpstreamUnavailable, upstream_error
+from ..utils.transcript_archive import get_archive
 from ..utils.youtube_utils import is_valid_youtube_url
 
 
@@ -22,6 +25,7 @@ from ..utils.youtube_utils import is_valid_youtube_url
 # prefix="/api" is added in main.py when including this router
 router = APIRouter(
     prefix="/transcript",
+    route_class=TracedRoute,
     tags=["Transcript Extraction"],
     responses={
         400: {"model": ErrorResponse, "description": "Invalid request"},
@@ -47,6 +51,10 @@ router = APIRouter(
         422: {
             "description": "Transcript unavailable for this video",
             "model": ErrorResponse
+        },
+        503: {
+            "description": "YouTube is temporarily unavailable (see Retry-After)",
+            "model": ErrorResponse
         }
     }
 )
@@ -60,15 +68,25 @@ async def extract_transcript(request: TranscriptRequest):
     3. Fetches the transcript using YouTube Transcript API
     4. Returns the clean transcript text
     
+    Optional fields:
+    - include_segments: also return every caption with its timestamp
+    - start_time / end_time: only return the captions in that time range
+      (seconds), e.g. the moment a quiz question refers to
+    
     Request Body:
         {
-            "youtube_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+            "youtube_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "include_segments": true
         }
     
     Success Response (200):
         {
             "video_id": "dQw4w9WgXcQ",
-            "transcript": "In this video we will learn about..."
+            "transcript": "In this video we will learn about...",
+            "segments": [
+                {"text": "In this video", "start": 0.0, "duration": 2.1, "offset": 0},
+                ...
+            ]
         }
     
     Error Response (400 - Invalid URL):
@@ -107,8 +125,17 @@ async def extract_transcript(request: TranscriptRequest):
             }
         )
     
-    # Step 2: Extract transcript using TranscriptService
-    success, transcript, error = TranscriptService.extract_transcript(video_id)
+    # Step 2: Extract transcript (with timestamps) using TranscriptService
+    try:
+        success, segments, error = await TranscriptService.extract_segments_async(video_id)
+    except UpstreamUnavailable as e:
+        # YouTube is rate limiting us or down: tell the client when to retry
+        error_detail = upstream_error(e)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=error_detail,
+            headers={"Retry-After": str(error_detail["retry_after"])}
+        )
     
     # Step 3: Handle extraction errors
     if not success:
@@ -120,10 +147,15 @@ async def extract_transcript(request: TranscriptRequest):
             }
         )
     
-    # Step 4: Return successful response
+    # Step 4: Narrow to the requested time range (a view, no copying)
+    if request.start_time is not None or request.end_time is not None:
+        segments = segments.slice(request.start_time, request.end_time)
+    
+    # Step 5: Return successful response
     return TranscriptResponse(
         video_id=video_id,
-        transcript=transcript
+        transcript=segments.text,
+        segments=list(segments) if request.include_segments else None
     )
 
 
@@ -141,16 +173,19 @@ async def transcript_service_health():
     
     Returns:
         dict: Status and service information
-        
+    
     Example Response:
         {
             "status": "healthy",
             "service": "transcript_extraction",
-            "message": "Transcript extraction service is operational"
+            "message": "Transcript extraction service is operational",
+            "archive": {"entries": 1250, "disk_bytes": 48213004, ...}
         }
     """
+    archive = get_archive()
     return {
         "status": "healthy",
         "service": "transcript_extraction",
-        "message": "Transcript extraction service is operational"
+        "message": "Transcript extraction service is operational",
+        "archive": archive.stats() if archive is not None else None
     }
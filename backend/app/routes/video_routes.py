@@ -11,18 +11,43 @@ Purpose:
 
 Endpoints:
 - POST /api/process-video: Process video and generate learning package
+- POST /api/video/process/batch: Process many videos, streaming results as NDJSON
+- POST /api/video/process/stream: Process a video, streaming content as server-sent events
+- GET /api/video/{video_id}: Read an already processed video (cacheable, conditional)
+
+HTTP Caching:
+Learning packages carry a weak ETag (see utils/http_cache.py). GET reads
+answer If-None-Match with 304 Not Modified and are cacheable by browsers
+and CDNs for VIDEO_CACHE_MAX_AGE seconds.
 """
 
-from fastapi import APIRouter, HTTPException, status
-from ..schemas.video_schema import ProcessVideoRequest, ProcessVideoResponse, ErrorResponse
+import asyncio
+import json
+from typing import Dict, List, Optional, get_args
+
+from fastapi import APIRouter, Header, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from ..config import settings
+from ..middleware.rate_limit import charge_items
+from ..middleware.tracing import TracedRoute
+from ..schemas.video_schema import (
+    ProcessVideoRequest, ProcessVideoResponse, BatchProcessRequest, BatchItemResult, ErrorResponse, PackageField
+)
 from ..services.transcript_service import TranscriptService
 from ..services.ai_service import AIService
-from ..utils.youtube_utils import is_valid_youtube_url
+from ..services.video_processing_service import VideoProcessingService
+from ..services.search_service import SearchService
+from ..utils.clients import client_states
+from ..utils.http_cache import etag_matches, not_modified, package_etag
+from ..utils.rate_governor import governor_stats, request_priority
+from ..utils.resilience import UPSTREAM_UNAVAILABLE, UpstreamUnavailable, breaker_states, upstream_error
+from ..utils.youtube_utils import is_valid_video_id, is_valid_youtube_url
 
 
 # Create router for video processing endpoints
 router = APIRouter(
     prefix="/video",
+    route_class=TracedRoute,
     tags=["Video Processing"],
     responses={
         400: {"model": ErrorResponse, "description": "Invalid request"},
@@ -31,14 +56,58 @@ router = APIRouter(
     }
 )
 
-# Initialize services
+# Initialize services (cheap: API clients are built on the first request)
 transcript_service = TranscriptService()
 ai_service = AIService()
+# Processed videos are indexed for /api/search (see search_routes.py)
+search_service = SearchService(transcript_service, ai_service) if settings.search_enabled else None
+video_processing_service = VideoProcessingService(transcript_service, ai_service, search_service)
+
+# Fields a request can select (ProcessVideoRequest.fields)
+PACKAGE_FIELDS = get_args(PackageField)
+
+
+def _selected_components(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """
+    Learning package components to generate for the requested fields
+    (None = all of them).
+    """
+    if fields is None:
+        return None
+    return [field for field in fields if field != "transcript"]
+
+
+def _package_response(result: Dict, fields: Optional[List[str]]) -> ProcessVideoResponse:
+    """
+    Response model with only the requested fields set.
+    
+    Routes declare response_model_exclude_unset, so fields that weren't
+    requested are left out of the JSON instead of sent as null.
+    
+    Raises:
+        HTTPException: 422 if a requested field is missing from the result
+    """
+    requested = [field for field in PACKAGE_FIELDS if fields is None or field in fields]
+    missing = [field for field in requested if result.get(field) is None]
+    if missing:
+        raise _error_to_http({
+            "error": "Content Generation Failed",
+            "detail": f"Not generated: {', '.join(missing)}"
+        })
+    
+    values = {
+        "video_id": result["video_id"],
+        "timings": result.get("timings"),
+        "cached": result.get("cached")
+    }
+    values.update((field, result[field]) for field in requested)
+    return ProcessVideoResponse(**values)
 
 
 @router.post(
     "/process",
     response_model=ProcessVideoResponse,
+    response_model_exclude_unset=True,
     summary="Process Video & Generate Learning Package",
     description="Extract transcript and generate summary, key points, and quiz from YouTube video",
     responses={
@@ -53,28 +122,44 @@ ai_service = AIService()
         422: {
             "description": "Processing error (transcript or AI generation failed)",
             "model": ErrorResponse
+        },
+        503: {
+            "description": "OpenAI or YouTube temporarily unavailable (see Retry-After)",
+            "model": ErrorResponse
         }
     }
 )
-async def process_video(request: ProcessVideoRequest):
+async def process_video(request: ProcessVideoRequest, response: Response):
     """
     Process a YouTube video and generate a complete learning package.
     
     This endpoint performs the following steps:
     
     1. VALIDATE URL: Check if the YouTube URL is valid
-    2. EXTRACT TRANSCRIPT: Fetch transcript from YouTube
-    3. GENERATE SUMMARY: Create concise, exam-focused summary
-    4. GENERATE KEY POINTS: Extract 5-7 core learning concepts
-    5. GENERATE QUIZ: Create exactly 10 multiple-choice questions
+    2. EXTRACT TRANSCRIPT: Fetch transcript from YouTube (or the cache)
+    3-5. GENERATE CONTENT (concurrently by default):
+       - SUMMARY: Create concise, exam-focused summary
+       - KEY POINTS: Extract 5-7 core learning concepts
+       - QUIZ: Create exactly 10 multiple-choice questions
+       Packages already generated for this video are served from the cache,
+       and concurrent requests for the same video share one run.
     6. ASSEMBLE PACKAGE: Return complete learning package
     
+    Only the fields listed in "fields" are generated and returned: a
+    quiz-only request never asks OpenAI for a summary or key points, and
+    ["transcript"] alone makes no OpenAI call at all.
+    
+    The response carries an ETag; reload it later with
+    GET /api/video/{video_id} and If-None-Match to skip the download when
+    nothing changed.
+    
     Request Body:
         {
-            "youtube_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+            "youtube_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "fields": ["summary", "quiz"]          (optional, default: all)
         }
     
-    Success Response (200):
+    Success Response (200, all fields):
         {
             "video_id": "dQw4w9WgXcQ",
             "transcript": "Complete transcript text...",
@@ -102,8 +187,17 @@ async def process_video(request: ProcessVideoRequest):
             "detail": "Transcripts are disabled for this video"
         }
     
+    Error Response (503 - OpenAI/YouTube unavailable, with Retry-After header):
+        {
+            "error": "Upstream Unavailable",
+            "detail": "openai is temporarily unavailable: ...",
+            "upstream": "openai",
+            "retry_after": 12
+        }
+    
     Args:
         request (ProcessVideoRequest): Request containing YouTube URL
+        response (Response): Outgoing response (for the ETag header)
         
     Returns:
         ProcessVideoResponse: Complete learning package
@@ -125,44 +219,270 @@ async def process_video(request: ProcessVideoRequest):
             }
         )
     
-    # ===== STEP 2: EXTRACT TRANSCRIPT =====
-    transcript_success, transcript, transcript_error = (
-        transcript_service.extract_transcript(video_id)
+    # ===== STEPS 2-5: EXTRACT TRANSCRIPT & GENERATE CONTENT =====
+    # Concurrent requests for the same video share a single pipeline run
+    success, result, error = await video_processing_service.process_video(
+        video_id, _selected_components(request.fields)
     )
     
-    if not transcript_success:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail={
-                "error": "Transcript Extraction Failed",
-                "detail": transcript_error
-            }
+    if not success:
+        raise _error_to_http(error)
+    
+    # ===== STEP 6: ASSEMBLE RESPONSE (REQUESTED FIELDS ONLY) =====
+    response.headers["ETag"] = package_etag(result, request.fields)
+    
+    return _package_response(result, request.fields)
+
+
+@router.post(
+    "/process/batch",
+    summary="Process Many Videos",
+    description="Process a list of YouTube URLs, streaming one NDJSON line per video as it finishes",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Stream of BatchItemResult lines, then a summary line",
+            "content": {"application/x-ndjson": {}}
+        }
+    }
+)
+async def process_video_batch(request: BatchProcessRequest, http_request: Request):
+    """
+    Process a whole list of YouTube videos (e.g. a course playlist) in one request.
+    
+    This endpoint:
+    1. Validates every URL; invalid ones are reported immediately
+    2. Deduplicates video IDs so each video is processed once, and charges
+       the client's rate limit budget per video
+    3. Processes videos with bounded parallelism (BATCH_MAX_CONCURRENCY)
+    4. Streams one JSON line per video as soon as it finishes
+    5. Ends with a summary line
+    
+    A failing video never aborts the batch; it is reported with its error.
+    
+    Request Body:
+        {
+            "youtube_urls": ["https://youtu.be/dQw4w9WgXcQ", "https://youtu.be/9bZkp7q19f0"]
+        }
+    
+    Response (200, application/x-ndjson):
+        {"indexes": [1], "video_id": "9bZkp7q19f0", "status": "succeeded", "result": {...}, "error": null}
+        {"indexes": [0], "video_id": "dQw4w9WgXcQ", "status": "failed", "result": null, "error": {...}}
+        {"done": true, "total": 2, "succeeded": 1, "failed": 1, "invalid": 0}
+    
+    Args:
+        request (BatchProcessRequest): Request containing the YouTube URLs
+        http_request (Request): The HTTP request (for the rate limit charge)
+        
+    Returns:
+        StreamingResponse: NDJSON stream of per-video results
+    
+    Raises:
+        HTTPException: 429 if the client's budget can't cover every video
+    """
+    
+    # ===== STEP 1: VALIDATE AND DEDUPLICATE =====
+    positions: Dict[str, List[int]] = {}
+    invalid_items = []
+    
+    for index, youtube_url in enumerate(request.youtube_urls):
+        is_valid, video_id = is_valid_youtube_url(youtube_url)
+        if is_valid:
+            positions.setdefault(video_id, []).append(index)
+        else:
+            invalid_items.append(BatchItemResult(
+                indexes=[index],
+                status="invalid",
+                error={
+                    "error": "Invalid YouTube URL",
+                    "detail": f"Could not extract a video ID from {youtube_url!r}"
+                }
+            ))
+    
+    await charge_items(http_request, len(positions))
+    
+    semaphore = asyncio.Semaphore(max(1, settings.batch_max_concurrency))
+    
+    async def process_one(video_id: str) -> BatchItemResult:
+        async with semaphore:
+            try:
+                # OpenAI quota goes to interactive requests first
+                with request_priority("batch"):
+                    success, result, error = await video_processing_service.process_video(video_id)
+            except Exception as e:
+                success, result, error = False, None, {
+                    "error": "Processing Failed",
+                    "detail": str(e)
+                }
+        
+        if not success:
+            return BatchItemResult(
+                indexes=positions[video_id], video_id=video_id, status="failed", error=error
+            )
+        return BatchItemResult(
+            indexes=positions[video_id],
+            video_id=video_id,
+            status="succeeded",
+            result=ProcessVideoResponse(**result)
         )
     
-    # ===== STEP 3: GENERATE LEARNING PACKAGE WITH AI =====
-    ai_success, learning_package, ai_error = (
-        ai_service.generate_learning_package(transcript)
+    # ===== STEP 2: PROCESS AND STREAM AS EACH VIDEO FINISHES =====
+    async def stream_results():
+        counts = {"succeeded": 0, "failed": 0, "invalid": len(invalid_items)}
+        
+        for item in invalid_items:
+            yield item.model_dump_json() + "\n"
+        
+        tasks = [asyncio.ensure_future(process_one(video_id)) for video_id in positions]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                counts[item.status] += 1
+                yield item.model_dump_json() + "\n"
+        finally:
+            # Client went away: stop processing the rest of the batch
+            for task in tasks:
+                task.cancel()
+        
+        summary = {"done": True, "total": len(request.youtube_urls)}
+        summary.update(counts)
+        yield json.dumps(summary, separators=(",", ":")) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+def _error_to_http(error: Dict) -> HTTPException:
+    """
+    HTTP error for a failed pipeline run.
+    
+    Upstream outages are 503 with a Retry-After header, so clients back
+    off instead of retrying immediately; other failures are 422.
+    """
+    if error.get("error") == UPSTREAM_UNAVAILABLE:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=error,
+            headers={"Retry-After": str(error["retry_after"])}
+        )
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=error
     )
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """
+    Format one server-sent event.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+@router.post(
+    "/process/stream",
+    summary="Process Video (Streaming)",
+    description="Process a YouTube video, streaming the learning package as server-sent events",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Server-sent event stream",
+            "content": {"text/event-stream": {}}
+        },
+        400: {
+            "description": "Invalid YouTube URL",
+            "model": ErrorResponse
+        }
+    }
+)
+async def process_video_stream(request: ProcessVideoRequest):
+    """
+    Process a YouTube video and stream the learning package as it is generated.
+    
+    Instead of waiting for the whole package, the client gets content
+    within about a second. Events are sent in this order:
+    
+    1. transcript: {"video_id": ..., "transcript": ...} as soon as it is fetched
+    2. summary_delta: {"text": ...} for each summary token from the model
+    3. summary: {"summary": ...} the complete summary
+    4. key_points: {"key_points": [...]}
+    5. quiz_question: {"index": i, "question": {...}} one per question
+    6. done: {"timings": {...}, "cached": bool}
     
-    if not ai_success:
+    An error event ({"error": ..., "detail": ...}) ends the stream early;
+    quiz questions received before a quiz error should be discarded.
+    
+    With "fields", only the events of the requested fields are sent (and
+    only those components generated); done is always sent.
+    
+    Example Stream:
+        event: transcript
+        data: {"video_id":"dQw4w9WgXcQ","transcript":"In this video..."}
+        
+        event: summary_delta
+        data: {"text":"This"}
+        
+        ...
+        
+        event: done
+        data: {"timings":{"summary":4.1,"key_points":3.2,"quiz":7.9,"total":8.0},"cached":false}
+    
+    Note: streamed requests are not coalesced with concurrent requests for
+    the same video, but they read from and populate the same cache.
+    
+    Args:
+        request (ProcessVideoRequest): Request containing YouTube URL
+        
+    Returns:
+        StreamingResponse: text/event-stream of learning package events
+        
+    Raises:
+        HTTPException: If URL is invalid (before the stream starts)
+    """
+    is_valid, video_id = is_valid_youtube_url(request.youtube_url)
+    
+    if not is_valid:
         raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            status_code=status.HTTP_400_BAD_REQUEST,
             detail={
-                "error": "Content Generation Failed",
-                "detail": ai_error
+                "error": "Invalid YouTube URL",
+                "detail": "Please provide a valid YouTube URL. "
+                         "Supported formats: youtube.com/watch?v=..., youtu.be/..."
             }
         )
     
-    # ===== STEP 4: ASSEMBLE COMPLETE RESPONSE =====
-    response = ProcessVideoResponse(
-        video_id=video_id,
-        transcript=transcript,
-        summary=learning_package["summary"],
-        key_points=learning_package["key_points"],
-        quiz=learning_package["quiz"]
-    )
+    async def event_stream():
+        try:
+            transcript_success, transcript, transcript_error = (
+                await transcript_service.extract_transcript_async(video_id)
+            )
+            
+            if not transcript_success:
+                yield _sse_event("error", {
+                    "error": "Transcript Extraction Failed",
+                    "detail": transcript_error
+                })
+                return
+            
+            if request.fields is None or "transcript" in request.fields:
+                yield _sse_event("transcript", {"video_id": video_id, "transcript": transcript})
+            
+            async for event, data in ai_service.stream_learning_package_async(
+                transcript, video_id=video_id, components=_selected_components(request.fields)
+            ):
+                yield _sse_event(event, data)
+                if event == "done" and search_service is not None:
+                    search_service.schedule_indexing(video_id)
+        
+        except UpstreamUnavailable as e:
+            yield _sse_event("error", upstream_error(e))
     
-    return response
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering (nginx, Render)
+        }
+    )
 
 
 @router.get(
@@ -186,22 +506,148 @@ async def video_service_health():
             "components": {
                 "transcript_extraction": "operational",
                 "ai_generation": "operational"
+            },
+            "coalescing": {
+                "in_flight": 0,
+                "flights": 12,
+                "coalesced": 59,
+                "max_waiters": 60,
+                "recent": [...]
+            },
+            "clients": {
+                "openai_async": {"initialized": true, "build_ms": 3.2, "last_error": null},
+                ...
+            },
+            "upstreams": {
+                "openai": {"state": "closed", "consecutive_failures": 0, ...},
+                "youtube": {"state": "open", "retry_in": 21.4, ...}
+            },
+            "quota": {
+                "openai": {
+                    "tokens_per_minute": 90000,
+                    "last_minute": {"reserved_tokens": 86120, "token_utilization": 0.957, ...},
+                    "queued": {"interactive": 0, "batch": 6},
+                    ...
+                }
             }
         }
+    
+    "status" is "degraded" while any upstream circuit breaker is open.
+    Only reads state: no client is built and no upstream is called, so
+    probes stay cheap however often they run.
     """
     
-    # Check if AI service can be initialized (checks for API key)
-    try:
-        AIService()
-        ai_status = "operational"
-    except ValueError:
-        ai_status = "not_configured"
+    ai_status = "operational" if AIService.is_configured() else "not_configured"
+    
+    upstreams = breaker_states()
+    degraded = any(breaker["state"] == "open" for breaker in upstreams.values())
     
     return {
-        "status": "healthy",
+        "status": "degraded" if degraded else "healthy",
         "service": "video_processing",
         "components": {
             "transcript_extraction": "operational",
             "ai_generation": ai_status
+        },
+        "clients": client_states(),
+        "coalescing": video_processing_service.coalescing_stats(),
+        "upstreams": upstreams,
+        "quota": governor_stats()
+    }
+
+
+@router.get(
+    "/{video_id}",
+    response_model=ProcessVideoResponse,
+    response_model_exclude_unset=True,
+    summary="Get Processed Video",
+    description="Read the learning package of an already processed video (cacheable, supports If-None-Match)",
+    responses={
+        200: {
+            "description": "Learning package, with ETag and Cache-Control headers",
+            "model": ProcessVideoResponse
+        },
+        304: {
+            "description": "Not modified: the client's copy (If-None-Match) is current"
+        },
+        400: {
+            "description": "Invalid video ID",
+            "model": ErrorResponse
+        },
+        404: {
+            "description": "The video hasn't been processed yet",
+            "model": ErrorResponse
         }
     }
+)
+async def get_video(
+    video_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """
+    Read the learning package of a video processed earlier.
+    
+    A safe, cacheable read path for results: it only reads the stored
+    transcript (cache or transcript archive) and the package cache, and
+    never calls YouTube or OpenAI (a video that hasn't been processed is
+    404; process it with POST /api/video/process or a job first). Responses carry a weak ETag
+    and "Cache-Control: public, max-age=VIDEO_CACHE_MAX_AGE", so browsers
+    and CDNs reuse them, and a request with a current If-None-Match gets
+    304 Not Modified with no body.
+    
+    Example:
+        GET /api/video/dQw4w9WgXcQ
+        -> 200, ETag: W/"5d41402abc4b2a76b9719d911017c592", body as POST /api/video/process
+        
+        GET /api/video/dQw4w9WgXcQ
+        If-None-Match: W/"5d41402abc4b2a76b9719d911017c592"
+        -> 304 Not Modified
+    
+    Args:
+        video_id (str): YouTube video ID (11 characters)
+        response (Response): Outgoing response (for the caching headers)
+        if_none_match (str, optional): ETag(s) of the client's copy
+    
+    Returns:
+        ProcessVideoResponse: The learning package (or a 304 response)
+    
+    Raises:
+        HTTPException: 400 for an invalid ID, 404 if not processed yet
+    """
+    if not is_valid_video_id(video_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "Invalid Video ID",
+                "detail": "Expected an 11-character YouTube video ID"
+            }
+        )
+    
+    # Stored transcript and cached package only: a read never reaches
+    # YouTube or OpenAI. Both lookups may read SQLite or the archive.
+    segments = await asyncio.to_thread(transcript_service.stored_segments, video_id)
+    package = None
+    if segments is not None:
+        package = await asyncio.to_thread(ai_service.get_cached_package, segments.text, video_id)
+    if package is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "Not Processed",
+                "detail": "No learning package for this video yet. "
+                          "Process it with POST /api/video/process first."
+            }
+        )
+    
+    result = {"video_id": video_id, "transcript": segments.text}
+    result.update(package)
+    etag = package_etag(result)
+    cache_control = f"public, max-age={settings.video_cache_max_age}"
+    
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_control)
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return _package_response(result, None)
@@ -0,0 +1,92 @@
+"""
+Job Schema Definitions
+
+This module contains Pydantic models for request and response validation
+related to background video processing jobs.
+
+Purpose:
+- Validate incoming job submissions
+- Describe job status for polling clients
+- Provide automatic API documentation
+"""
+
+from pydantic import BaseModel, Field, HttpUrl
+from typing import Optional
+
+from .video_schema import ProcessVideoResponse
+
+
+class CreateJobRequest(BaseModel):
+    """
+    Request schema for submitting a video processing job.
+    
+    Attributes:
+        youtube_url (str): The YouTube video URL to process
+        webhook_url (str, optional): Public http(s) URL that receives a POST when
+            the job finishes
+    
+    Example:
+        {
+            "youtube_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "webhook_url": "https://example.com/hooks/learning-package"
+        }
+    """
+    youtube_url: str = Field(
+        ...,
+        description="YouTube URL of the video to process",
+        example="https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    )
+    webhook_url: Optional[HttpUrl] = Field(
+        default=None,
+        description="Optional http(s) URL notified with a POST when the job finishes "
+                    "(hosts on private, loopback or link-local addresses are refused)",
+        example="https://example.com/hooks/learning-package"
+    )
+
+
+class JobStatusResponse(BaseModel):
+    """
+    Status of a video processing job.
+    
+    Attributes:
+        job_id (str): Unique job ID
+        status (str): queued, running, succeeded or failed
+        video_id (str): YouTube video ID being processed
+        created_at (float): Unix time the job was submitted
+        started_at (float, optional): Unix time a worker picked it up
+        finished_at (float, optional): Unix time it finished
+        error (dict, optional): Error details if the job failed
+        webhook_status (str, optional): Outcome of the completion webhook
+        result_url (str): Where to fetch the learning package once succeeded
+    
+    Example:
+        {
+            "job_id": "3f2a...",
+            "status": "running",
+            "video_id": "dQw4w9WgXcQ",
+            "created_at": 1700000000.0,
+            "started_at": 1700000001.2,
+            "finished_at": null,
+            "error": null,
+            "webhook_status": null,
+            "result_url": "/api/jobs/3f2a.../result"
+        }
+    """
+    job_id: str = Field(..., description="Unique job ID")
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    video_id: str = Field(..., description="YouTube video ID", example="dQw4w9WgXcQ")
+    created_at: float = Field(..., description="Unix time the job was submitted")
+    started_at: Optional[float] = Field(default=None, description="Unix time processing started")
+    finished_at: Optional[float] = Field(default=None, description="Unix time processing finished")
+    error: Optional[dict] = Field(default=None, description="Error details if the job failed")
+    webhook_status: Optional[str] = Field(default=None, description="Outcome of the completion webhook")
+    result_url: str = Field(..., description="URL of the learning package once the job succeeded")
+
+
+class JobResultResponse(ProcessVideoResponse):
+    """
+    Learning package produced by a succeeded job.
+    
+    Same fields as ProcessVideoResponse, plus the job ID.
+    """
+    job_id: str = Field(..., description="Unique job ID")
@@ -0,0 +1,106 @@
+"""
+Search Schema Definitions
+
+This module contains Pydantic models for request and response validation
+related to semantic search over processed videos.
+
+Purpose:
+- Validate indexing requests
+- Describe search and related-video results
+- Provide automatic API documentation
+"""
+
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class SearchMatch(BaseModel):
+    """
+    A moment of a video that matches a query.
+    
+    Attributes:
+        start (float): Seconds into the video where the chunk starts
+        end (float): Seconds into the video where the chunk ends
+        text (str): Beginning of the chunk's (cleaned) transcript text
+        score (float): Cosine similarity to the query (higher is closer)
+    """
+    start: float = Field(..., description="Chunk start (seconds)", example=720.0)
+    end: float = Field(..., description="Chunk end (seconds)", example=780.5)
+    text: str = Field(..., description="Beginning of the chunk's transcript", example="The Krebs cycle takes ...")
+    score: float = Field(..., description="Cosine similarity to the query", example=0.61)
+
+
+class SearchResult(BaseModel):
+    """
+    An indexed video matching a query, with its best moments.
+    
+    Attributes:
+        video_id (str): YouTube video ID
+        score (float): Score of the video's best matching chunk
+        matches (list): Best matching chunks of the video, best first
+    """
+    video_id: str = Field(..., description="YouTube video ID", example="dQw4w9WgXcQ")
+    score: float = Field(..., description="Score of the best matching chunk", example=0.61)
+    matches: List[SearchMatch] = Field(..., description="Best matching chunks, best first")
+
+
+class SearchResponse(BaseModel):
+    """
+    Response schema for a semantic search.
+    
+    Example:
+        {
+            "query": "krebs cycle",
+            "results": [
+                {
+                    "video_id": "dQw4w9WgXcQ",
+                    "score": 0.61,
+                    "matches": [{"start": 720.0, "end": 780.5, "text": "The Krebs cycle ...", "score": 0.61}]
+                }
+            ],
+            "took_ms": 3.2
+        }
+    """
+    query: str = Field(..., description="The query that was searched")
+    results: List[SearchResult] = Field(..., description="Matching videos, best first")
+    took_ms: float = Field(..., description="Index scoring time in milliseconds (excluding the query embedding)")
+
+
+class RelatedVideosResponse(BaseModel):
+    """
+    Response schema for related videos.
+    
+    Each result lists the one chunk closest to the source video.
+    """
+    video_id: str = Field(..., description="The video related videos were searched for")
+    results: List[SearchResult] = Field(..., description="Related videos, closest first")
+
+
+class IndexVideoRequest(BaseModel):
+    """
+    Request schema for (re)indexing a video.
+    
+    Attributes:
+        youtube_url (str): The YouTube video URL to index
+        force (bool): Re-index even if the video is already indexed
+    """
+    youtube_url: str = Field(
+        ...,
+        description="YouTube URL of the video to index",
+        example="https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    )
+    force: bool = Field(default=False, description="Re-index even if already indexed")
+
+
+class IndexVideoResponse(BaseModel):
+    """
+    Response schema for indexing a video.
+    
+    Attributes:
+        video_id (str): YouTube video ID
+        chunks (int): Chunks stored for the video
+        indexed (bool): False if the video was already indexed (nothing done)
+    """
+    video_id: str = Field(..., description="YouTube video ID", example="dQw4w9WgXcQ")
+    chunks: int = Field(..., description="Chunks stored for the video", example=42)
+    indexed: bool = Field(..., description="False if the video was already indexed")
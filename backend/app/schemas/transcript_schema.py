@@ -12,6 +12,7 @@ Purpose:
 """
 
 from pydantic import BaseModel, Field, HttpUrl
+from typing import List, Optional
 
 
 class TranscriptRequest(BaseModel):
@@ -22,10 +23,16 @@ class TranscriptRequest(BaseModel):
     
     Attributes:
         youtube_url (str): The YouTube video URL to extract transcript from
-        
+        include_segments (bool): Also return the timestamped caption segments
+        start_time (float, optional): Only return captions starting at or after this second
+        end_time (float, optional): Only return captions starting before this second
+    
     Example:
         {
-            "youtube_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+            "youtube_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "include_segments": true,
+            "start_time": 60,
+            "end_time": 120
         }
     """
     youtube_url: str = Field(
@@ -33,6 +40,44 @@ class TranscriptRequest(BaseModel):
         description="YouTube URL of the video to extract transcript from",
         example="https://www.youtube.com/watch?v=dQw4w9WgXcQ"
     )
+    include_segments: bool = Field(
+        default=False,
+        description="Also return each caption segment with its timestamp"
+    )
+    start_time: Optional[float] = Field(
+        default=None,
+        ge=0,
+        description="Only include captions starting at or after this time (seconds)"
+    )
+    end_time: Optional[float] = Field(
+        default=None,
+        ge=0,
+        description="Only include captions starting before this time (seconds)"
+    )
+
+
+class TranscriptSegment(BaseModel):
+    """
+    A single caption with its position in time and in the transcript text.
+    
+    Attributes:
+        text (str): Caption text
+        start (float): Time the caption starts (seconds)
+        duration (float): How long the caption is shown (seconds)
+        offset (int): Character offset of the caption in the returned transcript
+    
+    Example:
+        {
+            "text": "today we'll look at photosynthesis",
+            "start": 61.2,
+            "duration": 3.4,
+            "offset": 0
+        }
+    """
+    text: str = Field(..., description="Caption text")
+    start: float = Field(..., description="Start time in seconds")
+    duration: float = Field(..., description="Duration in seconds")
+    offset: int = Field(..., description="Character offset in the returned transcript")
 
 
 class TranscriptResponse(BaseModel):
@@ -44,7 +89,8 @@ class TranscriptResponse(BaseModel):
     Attributes:
         video_id (str): The unique YouTube video ID
         transcript (str): The complete transcript as plain text
-        
+        segments (list, optional): Timestamped captions, if include_segments was set
+    
     Example:
         {
             "video_id": "dQw4w9WgXcQ",
@@ -60,6 +106,10 @@ class TranscriptResponse(BaseModel):
         ...,
         description="Complete transcript text extracted from video"
     )
+    segments: Optional[List[TranscriptSegment]] = Field(
+        default=None,
+        description="Timestamped caption segments (only when include_segments is true)"
+    )
 
 
 class ErrorResponse(BaseModel):
@@ -12,7 +12,11 @@ Purpose:
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional
+
+
+# Learning package fields a request can select
+PackageField = Literal["transcript", "summary", "key_points", "quiz"]
 
 
 class ProcessVideoRequest(BaseModel):
@@ -23,10 +27,14 @@ class ProcessVideoRequest(BaseModel):
     
     Attributes:
         youtube_url (str): The YouTube video URL to process
+        fields (list, optional): Package fields to generate and return
+            (transcript, summary, key_points, quiz). Omitted means all of
+            them; components not listed are never generated.
         
     Example:
         {
-            "youtube_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+            "youtube_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "fields": ["quiz"]
         }
     """
     youtube_url: str = Field(
@@ -34,6 +42,40 @@ class ProcessVideoRequest(BaseModel):
         description="YouTube URL of the video to process",
         example="https://www.youtube.com/watch?v=dQw4w9WgXcQ"
     )
+    fields: Optional[List[PackageField]] = Field(
+        default=None,
+        min_items=1,
+        description="Package fields to generate and return (default: all). "
+                    "Unlisted components are not generated.",
+        example=["summary", "quiz"]
+    )
+
+
+class BatchProcessRequest(BaseModel):
+    """
+    Request schema for the batch video processing endpoint.
+    
+    Attributes:
+        youtube_urls (list): YouTube video URLs to process (e.g. a course playlist)
+        
+    Example:
+        {
+            "youtube_urls": [
+                "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+                "https://youtu.be/9bZkp7q19f0"
+            ]
+        }
+    """
+    youtube_urls: List[str] = Field(
+        ...,
+        min_items=1,
+        max_items=100,
+        description="YouTube URLs of the videos to process (1-100)",
+        example=[
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "https://youtu.be/9bZkp7q19f0"
+        ]
+    )
 
 
 class QuizQuestion(BaseModel):
@@ -82,12 +124,19 @@ class ProcessVideoResponse(BaseModel):
     - Key Points: 5-7 core learning concepts
     - Quiz: Exactly 10 multiple-choice questions
     
+    When the request selects fields, the others are left out of the
+    response entirely (not null).
+    
     Attributes:
         video_id (str): The YouTube video ID
         transcript (str): The extracted video transcript
         summary (str): AI-generated summary of content
         key_points (list): List of key learning points
         quiz (list): List of 10 quiz questions
+        timings (dict, optional): Seconds spent generating each component
+        normalization (dict, optional): Transcript cleanup stats, including
+            original_tokens, normalized_tokens and tokens_saved
+        cached (bool, optional): True if the package was served from cache
         
     Example:
         {
@@ -109,24 +158,60 @@ class ProcessVideoResponse(BaseModel):
         description="YouTube video ID",
         example="dQw4w9WgXcQ"
     )
-    transcript: str = Field(
-        ...,
+    transcript: Optional[str] = Field(
+        default=None,
         description="Complete transcript extracted from video"
     )
-    summary: str = Field(
-        ...,
+    summary: Optional[str] = Field(
+        default=None,
         description="Concise, exam-focused summary of video content"
     )
-    key_points: List[str] = Field(
-        ...,
+    key_points: Optional[List[str]] = Field(
+        default=None,
         description="5-7 key learning points from the transcript"
     )
-    quiz: List[QuizQuestion] = Field(
-        ...,
+    quiz: Optional[List[QuizQuestion]] = Field(
+        default=None,
         min_items=10,
         max_items=10,
         description="Exactly 10 multiple-choice questions"
     )
+    timings: Optional[Dict[str, float]] = Field(
+        default=None,
+        description="Seconds spent generating each component, plus the total"
+    )
+    normalization: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="What transcript normalization removed and the prompt tokens it saved"
+    )
+    cached: Optional[bool] = Field(
+        default=None,
+        description="True if the learning package was served from cache"
+    )
+
+
+class BatchItemResult(BaseModel):
+    """
+    One line of the batch processing stream (NDJSON).
+    
+    Emitted once per unique video as soon as it finishes. Invalid URLs are
+    reported first, and a final summary line has "done": true.
+    
+    Attributes:
+        indexes (list): Positions of this video's URL(s) in the request
+        video_id (str, optional): YouTube video ID (None for invalid URLs)
+        status (str): succeeded, failed or invalid
+        result (ProcessVideoResponse, optional): Learning package if succeeded
+        error (dict, optional): Error details if failed or invalid
+        
+    Example:
+        {"indexes": [0, 3], "video_id": "dQw4w9WgXcQ", "status": "succeeded", "result": {...}, "error": null}
+    """
+    indexes: List[int] = Field(..., description="Positions of this video in the request")
+    video_id: Optional[str] = Field(default=None, description="YouTube video ID")
+    status: str = Field(..., description="succeeded, failed or invalid")
+    result: Optional[ProcessVideoResponse] = Field(default=None, description="Learning package")
+    error: Optional[dict] = Field(default=None, description="Error details")
 
 
 class ErrorResponse(BaseModel):
@@ -0,0 +1,214 @@
+"""
+server.py - Production Server Launcher
+
+Purpose:
+- Run the ASGI app with a production topology: Gunicorn managing several
+  Uvicorn worker processes, one per available CPU
+- Preload the app in the Gunicorn master so workers fork from a fully
+  imported process (faster worker boot, copy-on-write shared memory)
+- Share state between workers where it matters (cache, rate limits)
+- Tune keep-alive, listen backlog and graceful shutdown for running
+  behind a load balancer
+
+Why Not Plain `gunicorn app.wsgi:app`:
+Gunicorn's default sync worker speaks WSGI; the app is ASGI, so requests
+fail or lose their async behaviour. And a single `uvicorn` process uses
+one CPU however many the instance has.
+
+Usage:
+    python -m app.wsgi              # Procfile / render.yaml
+    gunicorn app.wsgi:app           # Also fine: picks up gunicorn.conf.py
+
+Settings (environment, all optional):
+    WEB_CONCURRENCY: Worker processes (default: available CPUs, honouring
+        container CPU limits)
+    SERVER_PRELOAD: Import the app once in the master (default True)
+    SERVER_KEEPALIVE: Seconds to keep idle client connections open
+    SERVER_BACKLOG: Pending connections the socket queues
+    SERVER_TIMEOUT: Seconds before a silent (hung) worker is restarted
+    SERVER_GRACEFUL_TIMEOUT: Seconds workers get to finish requests on
+        shutdown/reload
+    SERVER_MAX_REQUESTS: Recycle a worker after this many requests (0 = never)
+
+Reloading:
+- `kill -HUP <master pid>` replaces workers gracefully: new workers start,
+  old ones finish their requests (up to SERVER_GRACEFUL_TIMEOUT) and exit.
+- With SERVER_PRELOAD the code is loaded by the master, so HUP does not
+  pick up new code. Deploy code by restarting (or `kill -USR2` to start a
+  new master next to the old one, then `kill -TERM` the old master), or
+  run with SERVER_PRELOAD=False to make HUP reload code too.
+"""
+
+import math
+import os
+from typing import Any, Dict
+
+from dotenv import load_dotenv
+
+APP = "app.main:app"
+WORKER_CLASS = "uvicorn.workers.UvicornWorker"
+
+# Above the idle timeout of common load balancers (60s), so the balancer
+# closes idle connections first and never reuses one we just closed
+DEFAULT_KEEPALIVE = 75
+DEFAULT_BACKLOG = 2048
+# Uvicorn workers heartbeat from their event loop, so this only fires
+# for a blocked loop, not for long (streaming) requests
+DEFAULT_TIMEOUT = 120
+DEFAULT_GRACEFUL_TIMEOUT = 30
+
+# Process-local backends that would diverge between workers, and the
+# shared backend used instead when several workers run
+SHARED_BACKENDS = {
+    # Transcripts and learning packages made by one worker serve them all
+    # (each worker keeps its in-memory LRU in front)
+    "CACHE_BACKEND": "sqlite",
+    # Otherwise each client's limit would be multiplied by the worker count
+    "RATE_LIMIT_BACKEND": "sqlite",
+}
+
+
+def available_cpus() -> int:
+    """
+    CPUs this process may use: its CPU affinity, capped by a cgroup v2
+    CPU quota (container limits) when there is one.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def worker_count() -> int:
+    """
+    Worker processes to run: WEB_CONCURRENCY, or one per available CPU.
+    
+    Each Uvicorn worker is an event loop that serves many requests at
+    once and pushes blocking work to thread pools, so one worker per core
+    uses the machine without oversubscribing it.
+    """
+    configured = os.getenv("WEB_CONCURRENCY")
+    if configured:
+        return max(1, int(configured))
+    return available_cpus()
+
+
+def share_state_between_workers(workers: int) -> Dict[str, str]:
+    """
+    Default process-local backends to shared ones when running several workers.
+    
+    Only settings that are not configured (environment or .env) are
+    changed. Must run before the app is imported, since settings are read
+    at import time.
+    
+    Returns:
+        dict: The settings that were set
+    """
+    if workers <= 1:
+        return {}
+    applied = {}
+    for name, backend in SHARED_BACKENDS.items():
+        if name not in os.environ:
+            os.environ[name] = backend
+            applied[name] = backend
+    return applied
+
+
+def gunicorn_options(workers: int) -> Dict[str, Any]:
+    """
+    Gunicorn settings for serving the app.
+    
+    Returns:
+        dict: Settings by Gunicorn name (also valid in gunicorn.conf.py)
+    """
+    max_requests = int(os.getenv("SERVER_MAX_REQUESTS", "0"))
+    return {
+        "bind": f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}",
+        "workers": workers,
+        "worker_class": WORKER_CLASS,
+        "preload_app": os.getenv("SERVER_PRELOAD", "True").lower() == "true",
+        "keepalive": int(os.getenv("SERVER_KEEPALIVE", str(DEFAULT_KEEPALIVE))),
+        "backlog": int(os.getenv("SERVER_BACKLOG", str(DEFAULT_BACKLOG))),
+        "timeout": int(os.getenv("SERVER_TIMEOUT", str(DEFAULT_TIMEOUT))),
+        "graceful_timeout": int(os.getenv("SERVER_GRACEFUL_TIMEOUT", str(DEFAULT_GRACEFUL_TIMEOUT))),
+        "max_requests": max_requests,
+        # Spread recycling out so workers don't all restart together
+        "max_requests_jitter": max_requests // 10,
+    }
+
+
+def prepare() -> Dict[str, Any]:
+    """
+    Load .env, share state between workers and build the Gunicorn settings.
+    
+    Used by run() and gunicorn.conf.py, before the app is imported.
+    """
+    load_dotenv()
+    workers = worker_count()
+    shared = share_state_between_workers(workers)
+    options = gunicorn_options(workers)
+    
+    print(
+        f"✓ Server: {workers} Uvicorn worker(s) on {options['bind']}"
+        f" (preload={options['preload_app']}, keep-alive={options['keepalive']}s)"
+    )
+    if shared:
+        print(f"✓ Shared between workers: {', '.join(f'{k}={v}' for k, v in shared.items())}")
+    return options
+
+
+def run() -> None:
+    """
+    Serve the app with Gunicorn and Uvicorn workers.
+    
+    Without Gunicorn (not installed, or Windows) falls back to Uvicorn's
+    own multi-process mode: same workers and keep-alive, but no preload
+    and no graceful HUP reload.
+    """
+    options = prepare()
+    
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        import uvicorn
+        
+        host, port = options["bind"].rsplit(":", 1)
+        uvicorn.run(
+            APP,
+            host=host,
+            port=int(port),
+            workers=options["workers"],
+            timeout_keep_alive=options["keepalive"],
+            backlog=options["backlog"],
+            timeout_graceful_shutdown=options["graceful_timeout"],
+            limit_max_requests=options["max_requests"] or None,
+        )
+        return
+    
+    class Application(BaseApplication):
+        """
+        Gunicorn application configured from a dict instead of the command line.
+        """
+        
+        def load_config(self):
+            for name, value in options.items():
+                self.cfg.set(name, value)
+        
+        def load(self):
+            from app.main import app
+            return app
+    
+    Application().run()
+
+
+if __name__ == "__main__":
+    run()
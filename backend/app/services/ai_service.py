@@ -35,8 +35,115 @@ Each prompt is optimized to:
 
 import os
 import json
-from typing import Optional, Tuple, List, Dict
-from openai import OpenAI
+import time
+import hashlib
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional, Tuple, List, Dict, Callable
+from pydantic import ValidationError
+
+from ..config import settings
+from ..schemas.video_schema import QuizQuestion
+from ..utils.cache import get_cache, make_cache_key
+from ..utils.clients import register_client
+from ..utils.text_chunking import count_tokens, split_into_chunks
+from ..utils.json_stream import JsonArrayStreamParser
+from ..utils.metrics import current_stage, record_error, record_llm_usage, timed, STAGE_SECONDS, TRANSCRIPT_TOKENS
+from ..utils.rate_governor import register_governor
+from ..utils.resilience import UpstreamUnavailable, register_upstream
+from ..utils.tracing import record_span, span
+from ..utils.transcript_normalizer import NORMALIZER_VERSION, normalize_transcript
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+
+# Shared, bounded pool for concurrent generation calls.
+# Bounding it process-wide keeps a burst of requests from opening an
+# unbounded number of simultaneous OpenAI connections.
+_generation_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.ai_max_workers),
+    thread_name_prefix="ai-generation"
+)
+
+
+def _require_api_key() -> str:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError(
+            "OPENAI_API_KEY not found in environment variables. "
+            "Please set it in your .env file."
+        )
+    return api_key
+
+
+# The OpenAI clients are built on first use, not at import: importing the
+# SDK is the slowest part of app startup, and a missing API key should
+# fail generation requests, not the whole app.
+# Retries are handled by the shared resilience layer (backoff and circuit
+# breaker), so the SDK's own retries are turned off. base_url None keeps
+# the SDK default (api.openai.com).
+def _build_openai_client() -> "OpenAI":
+    from openai import OpenAI
+    
+    return OpenAI(api_key=_require_api_key(), base_url=settings.openai_base_url or None, max_retries=0)
+
+
+def _build_async_openai_client() -> "AsyncOpenAI":
+    import httpx
+    from openai import AsyncOpenAI
+    
+    api_key = _require_api_key()
+    # Connection pool shared by every async generation call in this process.
+    # Keep-alive connections are reused across requests instead of paying a
+    # new TLS handshake per generation call.
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_connections
+        )
+    )
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=settings.openai_base_url or None,
+        http_client=http_client,
+        max_retries=0
+    )
+
+
+_openai_client = register_client("openai", _build_openai_client)
+_async_openai_client = register_client("openai_async", _build_async_openai_client)
+
+
+def is_transient_openai_error(error: BaseException) -> bool:
+    """
+    Whether an OpenAI error is worth retrying.
+    
+    Rate limits, timeouts, connection errors and 5xx are transient. An
+    exhausted quota is reported as 429 too, but retrying won't help.
+    """
+    import openai  # Already loaded: the error came from the SDK
+    
+    if isinstance(error, openai.APIConnectionError):  # Includes timeouts
+        return True
+    if isinstance(error, openai.APIStatusError):
+        if error.status_code == 429:
+            return getattr(error, "code", None) != "insufficient_quota"
+        return error.status_code in (408, 409) or error.status_code >= 500
+    return False
+
+
+# Retries with backoff and a circuit breaker for every OpenAI call
+_openai_upstream = register_upstream("openai", is_transient_openai_error)
+
+# Client-side TPM/RPM quota: calls queue by priority instead of getting 429s
+_openai_governor = register_governor(
+    "openai",
+    tokens_per_minute=settings.openai_tpm_limit,
+    requests_per_minute=settings.openai_rpm_limit,
+    queue_timeout=settings.openai_queue_timeout
+)
 
 
 class AIService:
@@ -48,29 +155,106 @@ class AIService:
     
     Methods:
         generate_learning_package: Generate complete learning package from transcript
+        generate_learning_package_async: Same, without blocking the event loop
+        condense_transcript: Map-reduce a long transcript into study notes
         generate_summary: Generate summary from transcript
         generate_key_points: Generate key learning points
         generate_quiz: Generate exactly 10 multiple-choice questions
+        generate_combined: Generate all three components in one JSON call
     """
     
     def __init__(self):
         """
-        Initialize the AI Service with OpenAI client.
+        Initialize the AI Service.
         
-        Loads API key from environment variables.
-        Raises error if OPENAI_API_KEY is not set.
+        Cheap: the OpenAI clients are shared by the whole process and built
+        on first use (see utils/clients.py). If OPENAI_API_KEY is not set,
+        generation calls raise ValueError; constructing the service does not.
         """
-        self.api_key = os.getenv("OPENAI_API_KEY")
+        self.model = "gpt-3.5-turbo"  # Cost-effective model
+        self.max_tokens = 2000  # Limit tokens to control costs
+        self.concurrent_generation = settings.ai_concurrent_generation
+        self.generation_mode = settings.ai_generation_mode
+        self.quiz_repair_attempts = max(0, settings.ai_quiz_repair_attempts)
+        self.prompt_version = self.compute_prompt_version()
+        
+        # Long transcripts: condense with map-reduce when a single prompt
+        # would not fit in the model's context window
+        self.context_tokens = settings.ai_context_tokens
+        self.chunk_tokens = settings.ai_chunk_tokens
+        self.chunk_overlap_tokens = settings.ai_chunk_overlap_tokens
+        self.chunk_notes_max_tokens = 700  # Notes are ~1/4 of a chunk
+        self.map_concurrency = max(1, settings.ai_map_concurrency)
         
-        if not self.api_key:
-            raise ValueError(
-                "OPENAI_API_KEY not found in environment variables. "
-                "Please set it in your .env file."
+        # Caption cleanup before prompting (see utils/transcript_normalizer.py)
+        self.normalize = settings.transcript_normalize
+        self.drop_low_information = settings.transcript_drop_low_information
+        self.normalization = "off"
+        if self.normalize:
+            self.normalization = f"v{NORMALIZER_VERSION}" + ("+drop" if self.drop_low_information else "")
+        
+        # Extractive pre-selection of salient sentences for some components
+        # (see utils/extractive_selection.py)
+        self.extractive_components = self._parse_extractive_components(settings.ai_extractive_components)
+        self.extractive_method = settings.ai_extractive_method
+        self.extractive_token_budget = max(1, settings.ai_extractive_token_budget)
+        self.extractive = "off"
+        if self.extractive_components:
+            # Imported only when enabled: it loads NumPy
+            from ..utils.extractive_selection import EXTRACTIVE_VERSION
+            self.extractive = (
+                f"v{EXTRACTIVE_VERSION}:{self.extractive_method}:{self.extractive_token_budget}:"
+                + "+".join(sorted(self.extractive_components))
             )
+            if self.generation_mode == "combined" and self.extractive_components != set(self.COMPONENT_LABELS):
+                print(
+                    "⚠️  WARNING: AI_GENERATION_MODE=combined sends one prompt for all components; "
+                    "AI_EXTRACTIVE_COMPONENTS applies to it only when it lists summary, key_points and quiz "
+                    "(the current selection is used for separate prompts only)"
+                )
         
-        self.client = OpenAI(api_key=self.api_key)
-        self.model = "gpt-3.5-turbo"  # Cost-effective model
-        self.max_tokens = 2000  # Limit tokens to control costs
+        # Semantic search (see services/search_service.py)
+        self.embedding_model = settings.embedding_model
+        self.embedding_batch_size = max(1, settings.embedding_batch_size)
+    
+    @classmethod
+    def _parse_extractive_components(cls, value: str) -> frozenset:
+        """
+        Component names from AI_EXTRACTIVE_COMPONENTS (unknown names are
+        reported and ignored).
+        """
+        names = {name.strip() for name in value.split(",") if name.strip()}
+        unknown = names - set(cls.COMPONENT_LABELS)
+        if unknown:
+            print(f"⚠️  WARNING: Ignoring unknown AI_EXTRACTIVE_COMPONENTS: {', '.join(sorted(unknown))}")
+        return frozenset(names - unknown)
+    
+    @staticmethod
+    def is_configured() -> bool:
+        """
+        Whether an OpenAI API key is set (checked without building a client).
+        """
+        return bool(os.getenv("OPENAI_API_KEY"))
+    
+    @property
+    def client(self) -> "OpenAI":
+        """
+        The process-wide OpenAI client, built on first use.
+        
+        Raises:
+            ValueError: If OPENAI_API_KEY is not set
+        """
+        return _openai_client.get()
+    
+    @property
+    def async_client(self) -> "AsyncOpenAI":
+        """
+        The process-wide AsyncOpenAI client, built on first use.
+        
+        Raises:
+            ValueError: If OPENAI_API_KEY is not set
+        """
+        return _async_openai_client.get()
     
     # =====================================================
     # PROMPT TEMPLATES - CAREFULLY ENGINEERED
@@ -194,10 +378,537 @@ Transcript:
 
 Quiz Questions (MUST be exactly 10):"""
     
+    @staticmethod
+    def get_chunk_notes_prompt(chunk: str, part: int, total_parts: int) -> str:
+        """
+        Get the prompt that condenses one part of a long transcript.
+        
+        Used as the "map" step for lectures too long for a single prompt.
+        The notes from every part are joined and then fed to the normal
+        summary, key points and quiz prompts (the "reduce" step).
+        
+        Why This Prompt Works:
+        - Tells the model it only sees one part, so it doesn't summarize
+          the whole lecture from a fragment
+        - Keeps definitions, facts and examples the quiz can be built on
+        - Bullet notes are dense, so the joined notes fit in one prompt
+        
+        Args:
+            chunk (str): One part of the transcript
+            part (int): 1-based index of this part
+            total_parts (int): Number of parts in the transcript
+            
+        Returns:
+            str: Complete prompt for OpenAI
+        """
+        return f"""You are an expert educator condensing a long lecture into study notes.
+
+Below is part {part} of {total_parts} of the lecture transcript.
+
+Your task: Write dense study notes for THIS PART ONLY.
+
+Requirements:
+- Keep every key concept, definition, fact, formula and worked example
+- Keep details a quiz question could be based on
+- Drop filler, repetition and small talk
+- Use short bullet points ("- ...")
+- Do not add information that is not in the transcript
+
+Transcript (part {part} of {total_parts}):
+{chunk}
+
+Study Notes:"""
+    
+    @staticmethod
+    def get_quiz_repair_prompt(transcript: str, existing_questions: List[str], count: int) -> str:
+        """
+        Get the prompt that asks for only the quiz questions still missing.
+        
+        Used when the quiz output had too few valid questions (missing,
+        malformed or duplicate ones). The valid questions are kept and
+        the model only writes the remainder.
+        
+        Why This Prompt Works:
+        - Asks for an exact, small number of questions, which the model
+          gets right far more often than "exactly 10"
+        - Lists the questions already kept, so the new ones don't repeat them
+        - Same output format and constraints as the quiz prompt
+        
+        Args:
+            transcript (str): The video transcript
+            existing_questions (list): Text of the questions already kept
+            count (int): Number of new questions needed
+        
+        Returns:
+            str: Complete prompt for OpenAI
+        """
+        existing = "\n".join(f"- {question}" for question in existing_questions) or "- (none)"
+        
+        return f"""You are an expert educator creating multiple-choice quiz questions.
+
+Your task: Create EXACTLY {count} NEW multiple-choice question(s) based on this transcript.
+
+The quiz already contains these questions. Do NOT repeat or rephrase them:
+{existing}
+
+CRITICAL CONSTRAINTS (MUST BE FOLLOWED):
+- Generate EXACTLY {count} question(s) (no more, no less)
+- Each question must be answerable from the transcript content
+- Each question must have 4 unique options (A, B, C, D)
+- Specify the correct answer clearly (must be one of: A, B, C, or D)
+- No trick questions or ambiguous answers
+
+Output format (MUST be a valid JSON array):
+[
+  {{
+    "question": "question text?",
+    "options": ["option A", "option B", "option C", "option D"],
+    "correct_answer": "A"
+  }}
+]
+
+Transcript:
+{transcript}
+
+New Quiz Questions (MUST be exactly {count}):"""
+    
+    @staticmethod
+    def get_combined_prompt(transcript: str) -> str:
+        """
+        Get the prompt that generates the whole learning package at once.
+        
+        Used when AI_GENERATION_MODE is "combined". The transcript is sent
+        once instead of three times, which saves its input tokens twice
+        and two round trips.
+        
+        Why This Prompt Works:
+        - Repeats the constraints of the three separate prompts, so the
+          output matches what the separate path produces
+        - A single JSON object with fixed keys parses without heuristics
+        - Quiz constraints are kept in CAPITAL LETTERS like the quiz prompt
+        
+        Args:
+            transcript (str): The video transcript
+            
+        Returns:
+            str: Complete prompt for OpenAI
+        """
+        return f"""You are an expert educator creating a complete study package for students.
+
+Your task: From the following video transcript, create a summary, key learning points and a quiz.
+
+Requirements:
+- "summary": a concise, exam-focused summary of 2-3 sentences in simple, clear academic language
+- "key_points": 5-7 unique key learning points, each one clear sentence about a CORE CONCEPT
+- "quiz": EXACTLY 10 multiple-choice questions (no more, no less)
+  - Each question must be answerable from the transcript content
+  - Each question must have 4 unique, plausible options (A, B, C, D)
+  - "correct_answer" must be one of: A, B, C, or D
+  - No trick questions or ambiguous answers
+
+Output format (MUST be a single valid JSON object):
+{{
+  "summary": "summary text",
+  "key_points": ["point 1", "point 2", "..."],
+  "quiz": [
+    {{
+      "question": "question text?",
+      "options": ["option A", "option B", "option C", "option D"],
+      "correct_answer": "A"
+    }},
+    ... (continue for exactly 10 questions total)
+  ]
+}}
+
+Transcript:
+{transcript}
+
+JSON:"""
+    
+    @classmethod
+    def compute_prompt_version(cls) -> str:
+        """
+        Fingerprint the prompt templates and system messages.
+        
+        Any edit to a prompt changes the fingerprint, which changes every
+        learning package cache key, so stale packages are never served
+        after prompt engineering changes.
+        
+        Returns:
+            str: Short hex digest identifying the current prompt set
+        """
+        placeholder = "{transcript}"
+        templates = [
+            cls.get_summary_prompt(placeholder),
+            cls.get_key_points_prompt(placeholder),
+            cls.get_quiz_prompt(placeholder),
+            cls.get_chunk_notes_prompt(placeholder, 1, 1),
+            cls.get_combined_prompt(placeholder),
+            cls.get_quiz_repair_prompt(placeholder, ["{question}"], 1),
+            cls.SUMMARY_SYSTEM_MESSAGE,
+            cls.KEY_POINTS_SYSTEM_MESSAGE,
+            cls.QUIZ_SYSTEM_MESSAGE,
+            cls.CHUNK_NOTES_SYSTEM_MESSAGE,
+            cls.COMBINED_SYSTEM_MESSAGE,
+            cls.QUIZ_REPAIR_SYSTEM_MESSAGE,
+        ]
+        digest = hashlib.sha256("\x00".join(templates).encode("utf-8"))
+        return digest.hexdigest()[:16]
+    
+    # =====================================================
+    # OPENAI CALLS
+    # =====================================================
+    
+    # System messages sent alongside each component prompt
+    SUMMARY_SYSTEM_MESSAGE = "You are an expert educator creating study materials."
+    KEY_POINTS_SYSTEM_MESSAGE = "You are an expert educator identifying key concepts."
+    QUIZ_SYSTEM_MESSAGE = (
+        "You are an expert educator creating quiz questions. "
+        "You MUST generate EXACTLY 10 questions in valid JSON format."
+    )
+    CHUNK_NOTES_SYSTEM_MESSAGE = "You are an expert educator condensing lectures into study notes."
+    QUIZ_REPAIR_SYSTEM_MESSAGE = (
+        "You are an expert educator creating quiz questions. "
+        "You MUST generate EXACTLY the requested number of questions in valid JSON format."
+    )
+    COMBINED_SYSTEM_MESSAGE = (
+        "You are an expert educator creating study materials. "
+        "You MUST answer with a single valid JSON object containing EXACTLY 10 quiz questions."
+    )
+    
+    # Tokens reserved for prompt instructions and system message
+    PROMPT_OVERHEAD_TOKENS = 600
+    
+    # Chat format overhead: tokens per message, and priming the reply
+    MESSAGE_OVERHEAD_TOKENS = 4
+    REPLY_OVERHEAD_TOKENS = 3
+    
+    # Every quiz has exactly this many questions
+    QUIZ_QUESTION_COUNT = 10
+    
+    # Seconds that partial results (valid questions, finished components)
+    # of a failed run are kept so a retry only pays for what is missing
+    PARTIAL_STATE_TTL = 3600
+    
+    @staticmethod
+    def _build_messages(system_message: str, prompt: str) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for a single generation call.
+        """
+        return [
+            {
+                "role": "system",
+                "content": system_message
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    @staticmethod
+    def _response_format(json_mode: bool) -> Dict:
+        """
+        Extra request arguments asking the model for a JSON object.
+        """
+        return {"response_format": {"type": "json_object"}} if json_mode else {}
+    
+    def estimate_request_tokens(self, messages: List[Dict[str, str]], max_tokens: int) -> int:
+        """
+        Tokens a chat completion counts against the TPM quota.
+        
+        OpenAI charges the prompt plus max_tokens when it accepts a
+        request, so that is what the rate governor reserves.
+        """
+        prompt_tokens = sum(
+            count_tokens(message["content"], self.model) + self.MESSAGE_OVERHEAD_TOKENS
+            for message in messages
+        )
+        return prompt_tokens + self.REPLY_OVERHEAD_TOKENS + max_tokens
+    
+    def _create(self, **request) -> Any:
+        """
+        chat.completions.create, admitted through the rate governor.
+        
+        Called once per attempt by the resilience layer, so retries are
+        charged against the quota like any other call (and traced as
+        separate llm_call spans).
+        """
+        client = self.client  # Fails before taking quota if the API key is missing
+        with span("llm_call", component=current_stage(), model=request["model"]) as attributes:
+            queued = time.perf_counter()
+            _openai_governor.acquire(self.estimate_request_tokens(request["messages"], request["max_tokens"]))
+            attributes["queued_ms"] = round((time.perf_counter() - queued) * 1000, 2)
+            response = client.chat.completions.create(**request)
+            attributes.update(self._record_usage(response))
+        return response
+    
+    async def _create_async(self, **request) -> Any:
+        """
+        Async version of _create (streams report no usage, only the
+        reservation; their span is recorded by _stream_completion_async).
+        """
+        client = self.async_client
+        started = time.perf_counter()
+        await _openai_governor.acquire_async(
+            self.estimate_request_tokens(request["messages"], request["max_tokens"])
+        )
+        queued_ms = round((time.perf_counter() - started) * 1000, 2)
+        if request.get("stream"):
+            return await client.chat.completions.create(**request)
+        
+        with span("llm_call", component=current_stage(), model=request["model"], queued_ms=queued_ms) as attributes:
+            response = await client.chat.completions.create(**request)
+            attributes.update(self._record_usage(response))
+        return response
+    
+    @staticmethod
+    def _record_usage(response: Any) -> Dict[str, Optional[int]]:
+        """
+        Report a completed call's token usage to the governor and metrics.
+        
+        Returns:
+            dict: prompt_tokens and completion_tokens (None if not reported)
+        """
+        usage = response.usage
+        tokens = {
+            "prompt_tokens": usage.prompt_tokens if usage else None,
+            "completion_tokens": usage.completion_tokens if usage else None,
+        }
+        _openai_governor.record_usage(usage.total_tokens if usage else None)
+        record_llm_usage(tokens["prompt_tokens"], tokens["completion_tokens"])
+        return tokens
+    
+    def _complete(self, system_message: str, prompt: str, temperature: float = 0.7,
+                  max_tokens: Optional[int] = None, json_mode: bool = False) -> str:
+        """
+        Run a chat completion with the synchronous client.
+        
+        Args:
+            json_mode (bool): Constrain the output to a valid JSON object
+        
+        Returns:
+            str: The stripped text of the first choice
+        """
+        response = _openai_upstream.call(
+            self._create,
+            model=self.model,
+            messages=self._build_messages(system_message, prompt),
+            temperature=temperature,  # Slightly creative but consistent
+            max_tokens=max_tokens or self.max_tokens,
+            **self._response_format(json_mode)
+        )
+        return response.choices[0].message.content.strip()
+    
+    async def _complete_async(self, system_message: str, prompt: str, temperature: float = 0.7,
+                              max_tokens: Optional[int] = None, json_mode: bool = False) -> str:
+        """
+        Run a chat completion with the shared asynchronous client.
+        
+        Returns:
+            str: The stripped text of the first choice
+        """
+        response = await _openai_upstream.call_async(
+            self._create_async,
+            model=self.model,
+            messages=self._build_messages(system_message, prompt),
+            temperature=temperature,
+            max_tokens=max_tokens or self.max_tokens,
+            **self._response_format(json_mode)
+        )
+        return response.choices[0].message.content.strip()
+    
+    async def _stream_completion_async(self, system_message: str, prompt: str,
+                                       temperature: float = 0.7,
+                                       component: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding text deltas as they arrive.
+        
+        Only opening the stream is retried; once text has been yielded a
+        failure is final. Streams don't report usage, so token metrics
+        are counted locally (labelled `component`, or the current stage).
+        The llm_call span runs from opening the stream to its last chunk.
+        """
+        messages = self._build_messages(system_message, prompt)
+        started = time.perf_counter()
+        error = None
+        stream = await _openai_upstream.call_async(
+            self._create_async,
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=self.max_tokens,
+            stream=True
+        )
+        parts = []
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            prompt_tokens = self.estimate_request_tokens(messages, 0)
+            completion_tokens = count_tokens("".join(parts), self.model)
+            record_llm_usage(prompt_tokens, completion_tokens, component=component)
+            record_span(
+                "llm_call", started, error=error,
+                component=component or current_stage(), model=self.model, stream=True,
+                prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+            )
+    
+    # =====================================================
+    # RESPONSE PARSING
+    # =====================================================
+    
+    @staticmethod
+    def _parse_key_points(response_text: str) -> List[str]:
+        """
+        Parse a numbered list (1. Point, 2. Point, etc.) into key points.
+        
+        Falls back to treating each non-empty line as a point.
+        """
+        key_points = []
+        for line in response_text.split('\n'):
+            line = line.strip()
+            if line and any(line.startswith(f"{i}.") for i in range(1, 10)):
+                # Remove the number prefix
+                point = line.split('. ', 1)[1] if '. ' in line else line
+                if point:
+                    key_points.append(point)
+        
+        if not key_points:
+            # Fallback: treat each non-empty line as a point
+            key_points = [line.strip() for line in response_text.split('\n') if line.strip()]
+        
+        return key_points
+    
+    @staticmethod
+    def _parse_quiz_questions(response_text: str) -> List[Dict]:
+        """
+        Extract the valid questions from quiz output, dropping the rest.
+        
+        Salvages whatever is usable instead of rejecting the whole response:
+        text around the JSON array is ignored, a truncated array still
+        yields its complete questions, and malformed questions are skipped.
+        Whether there are exactly 10 is checked by the repair loop.
+        
+        Returns:
+            List[Dict]: Valid, distinct questions in their original order
+        """
+        return AIService._merge_questions([], JsonArrayStreamParser().feed(response_text))
+    
+    @staticmethod
+    def _merge_questions(questions: List[Dict], new_questions: List[Any]) -> List[Dict]:
+        """
+        Append the valid new questions that aren't already in the quiz.
+        
+        Args:
+            questions (list): Valid questions kept so far
+            new_questions (list): Parsed candidate questions (may be invalid)
+        
+        Returns:
+            List[Dict]: The combined list of valid, distinct questions
+        """
+        merged = list(questions)
+        seen = {question["question"].strip().lower() for question in merged}
+        
+        for question in new_questions:
+            if AIService._question_error(question, 0) is not None:
+                continue
+            try:
+                QuizQuestion.model_validate(question)
+            except ValidationError:
+                continue
+            
+            text = question["question"].strip().lower()
+            if text in seen:
+                continue
+            seen.add(text)
+            merged.append(question)
+        
+        return merged
+    
+    @staticmethod
+    def _question_error(question: Any, index: int) -> Optional[str]:
+        """
+        Validate the structure of a single quiz question.
+        
+        Args:
+            question: Parsed question object
+            index (int): 0-based position, used in the error message
+            
+        Returns:
+            str: Error message, or None if the question is valid
+        """
+        if not isinstance(question, dict) or not all(
+            key in question for key in ['question', 'options', 'correct_answer']
+        ):
+            return f"Question {index+1} missing required fields"
+        
+        if not isinstance(question['options'], list) or len(question['options']) != 4:
+            return f"Question {index+1} doesn't have exactly 4 options"
+        
+        if question['correct_answer'] not in ['A', 'B', 'C', 'D']:
+            return f"Question {index+1} has invalid correct_answer"
+        
+        return None
+    
+    @staticmethod
+    def _parse_combined(response_text: str) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        Parse and validate the JSON object returned by the combined prompt.
+        
+        Applies the same rules as the response schema: a non-empty summary,
+        a list of key points, and questions that each validate as a
+        QuizQuestion with a correct_answer of A-D. Invalid questions are
+        dropped rather than failing the response; the quiz is brought to
+        exactly 10 questions by the repair loop afterwards.
+        
+        Returns:
+            Tuple[bool, Optional[Dict], Optional[str]]:
+            - success (bool): True if summary and key points are valid
+            - components (dict): summary, key_points and the valid quiz questions
+            - error (str): Error message if validation failed
+        """
+        json_start = response_text.find('{')
+        json_end = response_text.rfind('}') + 1
+        
+        if json_start == -1 or json_end == 0:
+            return False, None, "AI response is not in JSON format"
+        
+        try:
+            data = json.loads(response_text[json_start:json_end])
+        except json.JSONDecodeError as e:
+            return False, None, f"Failed to parse AI response as JSON: {str(e)}"
+        
+        summary = data.get("summary")
+        if not isinstance(summary, str) or not summary.strip():
+            return False, None, "Summary missing from AI response"
+        
+        key_points = data.get("key_points")
+        if not isinstance(key_points, list) or not key_points or not all(
+            isinstance(point, str) and point.strip() for point in key_points
+        ):
+            return False, None, "Key points missing from AI response"
+        
+        quiz = data.get("quiz")
+        if not isinstance(quiz, list):
+            quiz = []
+        
+        return True, {
+            "summary": summary.strip(),
+            "key_points": [point.strip() for point in key_points],
+            "quiz": AIService._merge_questions([], quiz),
+        }, None
+    
     # =====================================================
     # AI GENERATION METHODS
     # =====================================================
     
+    @timed("summary")
     def generate_summary(self, transcript: str) -> Tuple[bool, Optional[str], Optional[str]]:
         """
         Generate a concise, exam-focused summary from transcript.
@@ -212,31 +923,20 @@ Quiz Questions (MUST be exactly 10):"""
             - error (str): Error message if failed
         """
         try:
-            prompt = self.get_summary_prompt(transcript)
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert educator creating study materials."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,  # Slightly creative but consistent
-                max_tokens=self.max_tokens
+            transcript = self.component_input("summary", transcript)
+            summary = self._complete(
+                self.SUMMARY_SYSTEM_MESSAGE,
+                self.get_summary_prompt(transcript)
             )
-            
-            summary = response.choices[0].message.content.strip()
             return True, summary, None
             
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
             error_msg = f"Failed to generate summary: {str(e)}"
             return False, None, error_msg
     
+    @timed("key_points")
     def generate_key_points(self, transcript: str) -> Tuple[bool, Optional[List[str]], Optional[str]]:
         """
         Generate 5-7 key learning points from transcript.
@@ -251,52 +951,29 @@ Quiz Questions (MUST be exactly 10):"""
             - error (str): Error message if failed
         """
         try:
-            prompt = self.get_key_points_prompt(transcript)
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert educator identifying key concepts."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=self.max_tokens
+            transcript = self.component_input("key_points", transcript)
+            response_text = self._complete(
+                self.KEY_POINTS_SYSTEM_MESSAGE,
+                self.get_key_points_prompt(transcript)
             )
+            return True, self._parse_key_points(response_text), None
             
-            response_text = response.choices[0].message.content.strip()
-            
-            # Parse numbered list format (1. Point, 2. Point, etc.)
-            key_points = []
-            for line in response_text.split('\n'):
-                line = line.strip()
-                if line and any(line.startswith(f"{i}.") for i in range(1, 10)):
-                    # Remove the number prefix
-                    point = line.split('. ', 1)[1] if '. ' in line else line
-                    if point:
-                        key_points.append(point)
-            
-            if not key_points:
-                # Fallback: treat each non-empty line as a point
-                key_points = [line.strip() for line in response_text.split('\n') if line.strip()]
-            
-            return True, key_points, None
-            
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
             error_msg = f"Failed to generate key points: {str(e)}"
             return False, None, error_msg
     
+    @timed("quiz")
     def generate_quiz(self, transcript: str) -> Tuple[bool, Optional[List[Dict]], Optional[str]]:
         """
         Generate EXACTLY 10 multiple-choice questions from transcript.
         
         IMPORTANT: This method validates that exactly 10 questions are generated.
-        If AI returns more or less, it will try to fix it.
+        If AI returns more or less, it will try to fix it: valid questions
+        are kept, extra ones are dropped, and only the missing ones are
+        requested again (see _repair_quiz). Valid questions of a run that
+        still failed are cached, so a retry resumes from them.
         
         Args:
             transcript (str): The video transcript
@@ -308,101 +985,1412 @@ Quiz Questions (MUST be exactly 10):"""
             - error (str): Error message if failed
         """
         try:
-            prompt = self.get_quiz_prompt(transcript)
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert educator creating quiz questions. "
-                                 "You MUST generate EXACTLY 10 questions in valid JSON format."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=self.max_tokens
-            )
-            
-            response_text = response.choices[0].message.content.strip()
-            
-            # Extract JSON from response (AI might add text before/after JSON)
-            # Find the start and end of JSON array
-            json_start = response_text.find('[')
-            json_end = response_text.rfind(']') + 1
-            
-            if json_start == -1 or json_end == 0:
-                return False, None, "AI response is not in JSON format"
-            
-            json_str = response_text[json_start:json_end]
-            quiz_questions = json.loads(json_str)
-            
-            # ENFORCE: Must be exactly 10 questions
-            if len(quiz_questions) != 10:
-                return False, None, f"AI generated {len(quiz_questions)} questions instead of 10. Expected exactly 10."
-            
-            # Validate each question structure
-            for i, q in enumerate(quiz_questions):
-                if not all(key in q for key in ['question', 'options', 'correct_answer']):
-                    return False, None, f"Question {i+1} missing required fields"
-                
-                if len(q['options']) != 4:
-                    return False, None, f"Question {i+1} doesn't have exactly 4 options"
-                
-                if q['correct_answer'] not in ['A', 'B', 'C', 'D']:
-                    return False, None, f"Question {i+1} has invalid correct_answer"
-            
-            return True, quiz_questions, None
-            
-        except json.JSONDecodeError as e:
-            return False, None, f"Failed to parse AI response as JSON: {str(e)}"
+            transcript = self.component_input("quiz", transcript)
+            questions = get_cache().get(self.quiz_partial_key(transcript)) or []
+            if not questions:
+                response_text = self._complete(
+                    self.QUIZ_SYSTEM_MESSAGE,
+                    self.get_quiz_prompt(transcript)
+                )
+                questions = self._parse_quiz_questions(response_text)
+            return self._repair_quiz(transcript, questions)
+        
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
             return False, None, f"Failed to generate quiz: {str(e)}"
     
-    def generate_learning_package(self, transcript: str) -> Tuple[bool, Optional[Dict], Optional[str]]:
+    @timed("combined")
+    def generate_combined(self, transcript: str) -> Tuple[bool, Optional[Dict], Optional[str]]:
         """
-        Generate a complete learning package (summary + key points + quiz).
+        Generate summary, key points and quiz with a single JSON call.
         
-        This method orchestrates the three AI generation methods and returns
+        Extractive pre-selection applies only when every component is
+        listed in AI_EXTRACTIVE_COMPONENTS (see combined_input).
+        
+        Args:
+            transcript (str): The video transcript
+            
+        Returns:
+            Tuple[bool, Optional[Dict], Optional[str]]:
+            - success (bool): True if the output passed validation
+            - components (dict): summary, key_points and quiz. If only the
+              quiz could not be repaired, the valid summary and key_points
+              are still returned so the caller can keep them.
+            - error (str): Error message if failed
+        """
+        try:
+            transcript = self.combined_input(transcript)
+            response_text = self._complete(
+                self.COMBINED_SYSTEM_MESSAGE,
+                self.get_combined_prompt(transcript),
+                json_mode=True
+            )
+            success, components, error = self._parse_combined(response_text)
+            if not success:
+                return False, None, error
+            
+            quiz_success, quiz, quiz_error = self._repair_quiz(transcript, components.pop("quiz"))
+            if not quiz_success:
+                return False, components, quiz_error
+            components["quiz"] = quiz
+            return True, components, None
+        
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            return False, None, f"Failed to generate learning package: {str(e)}"
+    
+    # Async variants used by the API routes. They share prompts and parsing
+    # with the synchronous methods but never block the event loop.
+    
+    @timed("summary")
+    async def generate_summary_async(self, transcript: str) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        Async version of generate_summary.
+        """
+        try:
+            transcript = await self.component_input_async("summary", transcript)
+            summary = await self._complete_async(
+                self.SUMMARY_SYSTEM_MESSAGE,
+                self.get_summary_prompt(transcript)
+            )
+            return True, summary, None
+            
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            return False, None, f"Failed to generate summary: {str(e)}"
+    
+    @timed("key_points")
+    async def generate_key_points_async(self, transcript: str) -> Tuple[bool, Optional[List[str]], Optional[str]]:
+        """
+        Async version of generate_key_points.
+        """
+        try:
+            transcript = await self.component_input_async("key_points", transcript)
+            response_text = await self._complete_async(
+                self.KEY_POINTS_SYSTEM_MESSAGE,
+                self.get_key_points_prompt(transcript)
+            )
+            return True, self._parse_key_points(response_text), None
+            
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            return False, None, f"Failed to generate key points: {str(e)}"
+    
+    @timed("quiz")
+    async def generate_quiz_async(self, transcript: str) -> Tuple[bool, Optional[List[Dict]], Optional[str]]:
+        """
+        Async version of generate_quiz.
+        """
+        try:
+            transcript = await self.component_input_async("quiz", transcript)
+            questions = get_cache().get(self.quiz_partial_key(transcript)) or []
+            if not questions:
+                response_text = await self._complete_async(
+                    self.QUIZ_SYSTEM_MESSAGE,
+                    self.get_quiz_prompt(transcript)
+                )
+                questions = self._parse_quiz_questions(response_text)
+            return await self._repair_quiz_async(transcript, questions)
+        
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            return False, None, f"Failed to generate quiz: {str(e)}"
+    
+    @timed("combined")
+    async def generate_combined_async(self, transcript: str) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        Async version of generate_combined.
+        """
+        try:
+            transcript = await self.combined_input_async(transcript)
+            response_text = await self._complete_async(
+                self.COMBINED_SYSTEM_MESSAGE,
+                self.get_combined_prompt(transcript),
+                json_mode=True
+            )
+            success, components, error = self._parse_combined(response_text)
+            if not success:
+                return False, None, error
+            
+            quiz_success, quiz, quiz_error = await self._repair_quiz_async(transcript, components.pop("quiz"))
+            if not quiz_success:
+                return False, components, quiz_error
+            components["quiz"] = quiz
+            return True, components, None
+        
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            return False, None, f"Failed to generate learning package: {str(e)}"
+    
+    # =====================================================
+    # QUIZ REPAIR
+    # =====================================================
+    
+    def quiz_partial_key(self, transcript: str) -> str:
+        """
+        Cache key for the valid questions of an unfinished quiz.
+        """
+        return make_cache_key(
+            "quiz_partial",
+            transcript_sha256=hashlib.sha256(transcript.encode("utf-8")).hexdigest(),
+            prompt_version=self.prompt_version,
+            model=self.model
+        )
+    
+    def _finish_quiz(self, transcript: str, questions: List[Dict], attempts: int) -> Tuple[bool, Optional[List[Dict]], Optional[str]]:
+        """
+        Turn the result of the repair loop into a generate_quiz result.
+        
+        A complete quiz is truncated to exactly 10 questions and its
+        partial state is dropped; an incomplete one is kept in the cache
+        for the next attempt.
+        """
+        partial_key = self.quiz_partial_key(transcript)
+        
+        if len(questions) >= self.QUIZ_QUESTION_COUNT:
+            get_cache().delete(partial_key)
+            return True, questions[:self.QUIZ_QUESTION_COUNT], None
+        
+        get_cache().set(partial_key, questions, ttl=self.PARTIAL_STATE_TTL)
+        return False, None, (
+            f"AI generated {len(questions)} valid questions instead of 10 "
+            f"after {attempts} repair attempt(s). Expected exactly 10."
+        )
+    
+    @timed("quiz_repair")
+    def _repair_quiz(self, transcript: str, questions: List[Dict]) -> Tuple[bool, Optional[List[Dict]], Optional[str]]:
+        """
+        Bring a list of valid questions up to exactly 10.
+        
+        Each repair call asks only for the missing questions, up to
+        AI_QUIZ_REPAIR_ATTEMPTS times. Progress is cached before every
+        call, so even an exception doesn't lose the questions already
+        paid for.
+        
+        Args:
+            transcript (str): The video transcript
+            questions (list): Valid questions kept so far
+        
+        Returns:
+            Tuple[bool, Optional[List[Dict]], Optional[str]]: Same as generate_quiz
+        """
+        attempts = 0
+        while len(questions) < self.QUIZ_QUESTION_COUNT and attempts < self.quiz_repair_attempts:
+            get_cache().set(self.quiz_partial_key(transcript), questions, ttl=self.PARTIAL_STATE_TTL)
+            attempts += 1
+            
+            response_text = self._complete(
+                self.QUIZ_REPAIR_SYSTEM_MESSAGE,
+                self.get_quiz_repair_prompt(
+                    transcript,
+                    [question["question"] for question in questions],
+                    self.QUIZ_QUESTION_COUNT - len(questions)
+                )
+            )
+            questions = self._merge_questions(questions, JsonArrayStreamParser().feed(response_text))
+        
+        return self._finish_quiz(transcript, questions, attempts)
+    
+    @timed("quiz_repair")
+    async def _repair_quiz_async(self, transcript: str, questions: List[Dict]) -> Tuple[bool, Optional[List[Dict]], Optional[str]]:
+        """
+        Async version of _repair_quiz.
+        """
+        attempts = 0
+        while len(questions) < self.QUIZ_QUESTION_COUNT and attempts < self.quiz_repair_attempts:
+            get_cache().set(self.quiz_partial_key(transcript), questions, ttl=self.PARTIAL_STATE_TTL)
+            attempts += 1
+            
+            response_text = await self._complete_async(
+                self.QUIZ_REPAIR_SYSTEM_MESSAGE,
+                self.get_quiz_repair_prompt(
+                    transcript,
+                    [question["question"] for question in questions],
+                    self.QUIZ_QUESTION_COUNT - len(questions)
+                )
+            )
+            questions = self._merge_questions(questions, JsonArrayStreamParser().feed(response_text))
+        
+        return self._finish_quiz(transcript, questions, attempts)
+    
+    # =====================================================
+    # MAP-REDUCE FOR LONG TRANSCRIPTS
+    # =====================================================
+    
+    @property
+    def single_shot_token_budget(self) -> int:
+        """
+        Largest transcript (in tokens) that fits in one component prompt.
+        """
+        return self.context_tokens - self.max_tokens - self.PROMPT_OVERHEAD_TOKENS
+    
+    def needs_map_reduce(self, transcript: str) -> bool:
+        """
+        Check whether a transcript is too long for a single prompt.
+        """
+        return count_tokens(transcript, self.model) > self.single_shot_token_budget
+    
+    def _split_for_map(self, text: str) -> List[str]:
+        """
+        Split text into chunks for the map step.
+        """
+        return split_into_chunks(
+            text,
+            max_tokens=self.chunk_tokens,
+            overlap_tokens=self.chunk_overlap_tokens,
+            model=self.model
+        )
+    
+    @staticmethod
+    def _join_notes(notes: List[str]) -> str:
+        """
+        Join per-chunk notes (the reduce input) in lecture order.
+        """
+        return "\n\n".join(
+            f"Part {i}:\n{note}" for i, note in enumerate(notes, start=1)
+        )
+    
+    def _chunk_notes(self, chunk: str, part: int, total_parts: int) -> str:
+        """
+        Map step for one chunk (synchronous client).
+        """
+        return self._complete(
+            self.CHUNK_NOTES_SYSTEM_MESSAGE,
+            self.get_chunk_notes_prompt(chunk, part, total_parts),
+            temperature=0.3,  # Faithful notes, not creative writing
+            max_tokens=self.chunk_notes_max_tokens
+        )
+    
+    async def _chunk_notes_async(self, chunk: str, part: int, total_parts: int,
+                                 semaphore: asyncio.Semaphore) -> str:
+        """
+        Map step for one chunk (async client, bounded by the semaphore).
+        """
+        async with semaphore:
+            return await self._complete_async(
+                self.CHUNK_NOTES_SYSTEM_MESSAGE,
+                self.get_chunk_notes_prompt(chunk, part, total_parts),
+                temperature=0.3,
+                max_tokens=self.chunk_notes_max_tokens
+            )
+    
+    @timed("normalize")
+    def prepare_transcript(self, transcript: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Clean a transcript before it goes into the prompts.
+        
+        Removes filler words, non-speech markers and repeated rolling
+        caption fragments, and merges caption lines into sentences (see
+        utils/transcript_normalizer.py). Runs once per package, before
+        map-reduce, so every prompt gets the shorter text.
+        
+        Args:
+            transcript (str): The transcript as extracted
+            
+        Returns:
+            Tuple[str, Optional[Dict]]:
+            - text (str): The normalized transcript (the original if
+              normalization is off or would leave nothing)
+            - stats (dict): What was removed and the tokens saved, or None
+              if normalization is off
+        
+        Example:
+            >>> text, stats = ai_service.prepare_transcript(transcript)
+            >>> stats["original_tokens"], stats["normalized_tokens"]
+            (4210, 3585)
+        """
+        if not self.normalize:
+            return transcript, None
+        
+        text, stats = normalize_transcript(transcript, self.drop_low_information, self.model)
+        if not text:
+            # Nothing but markers and fillers: let the model see the original
+            return transcript, None
+        
+        TRANSCRIPT_TOKENS.labels(kind="original").inc(stats["original_tokens"])
+        TRANSCRIPT_TOKENS.labels(kind="normalized").inc(stats["normalized_tokens"])
+        return text, stats
+    
+    def component_input(self, component: str, transcript: str) -> str:
+        """
+        The transcript text a component's prompt is built from.
+        
+        Components listed in AI_EXTRACTIVE_COMPONENTS get only the most
+        salient sentences, up to AI_EXTRACTIVE_TOKEN_BUDGET tokens; the
+        others (and transcripts already within the budget) get the
+        transcript unchanged.
+        
+        Args:
+            component (str): "summary", "key_points" or "quiz"
+            transcript (str): The (normalized or condensed) transcript
+        
+        Returns:
+            str: Text for the component's prompt
+        """
+        if component not in self.extractive_components:
+            return transcript
+        return self._select_salient(transcript)
+    
+    async def component_input_async(self, component: str, transcript: str) -> str:
+        """
+        Async version of component_input (ranking runs in a thread).
+        """
+        if component not in self.extractive_components:
+            return transcript
+        return await asyncio.to_thread(self._select_salient, transcript)
+    
+    def combined_input(self, transcript: str) -> str:
+        """
+        The transcript text the combined prompt is built from.
+        
+        The combined prompt serves every component, so it gets the salient
+        sentences only when AI_EXTRACTIVE_COMPONENTS lists all three; any
+        other selection applies to separate prompts only (including the
+        fallback after invalid combined output).
+        """
+        if self.extractive_components != set(self.COMPONENT_LABELS):
+            return transcript
+        return self._select_salient(transcript)
+    
+    async def combined_input_async(self, transcript: str) -> str:
+        """
+        Async version of combined_input (ranking runs in a thread).
+        """
+        if self.extractive_components != set(self.COMPONENT_LABELS):
+            return transcript
+        return await asyncio.to_thread(self._select_salient, transcript)
+    
+    @timed("extract")
+    def _select_salient(self, transcript: str) -> str:
+        """
+        Salient sentences of a transcript within the token budget.
+        
+        Ranking is cached per transcript, so key points and quiz (and quiz
+        repairs) share one ranking.
+        """
+        from ..utils.extractive_selection import select_salient_sentences  # NumPy: kept out of app startup
+        
+        text, stats = select_salient_sentences(
+            transcript, self.extractive_token_budget, self.extractive_method, self.model
+        )
+        TRANSCRIPT_TOKENS.labels(kind="extractive_input").inc(stats["original_tokens"])
+        TRANSCRIPT_TOKENS.labels(kind="extractive_selected").inc(stats["selected_tokens"])
+        return text
+    
+    @timed("condense")
+    def condense_transcript(self, transcript: str) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        Condense a transcript until it fits in a single prompt.
+        
+        Map: split into overlapping chunks on token budgets and turn each
+        chunk into study notes, in parallel.
+        Reduce: join the notes in order. If the joined notes are still too
+        long (very long lectures), repeat on the notes.
+        
+        The result replaces the transcript in the summary, key points and
+        quiz prompts, so the expensive map step runs once per package.
+        Transcripts that already fit are returned unchanged.
+        
+        Args:
+            transcript (str): The full video transcript
+            
+        Returns:
+            Tuple[bool, Optional[str], Optional[str]]:
+            - success (bool): True if the text now fits in one prompt
+            - text (str): The transcript, or the condensed notes
+            - error (str): Error message if a map call failed
+        """
+        text = transcript
+        
+        while self.needs_map_reduce(text):
+            chunks = self._split_for_map(text)
+            futures = [
+                _generation_executor.submit(
+                    contextvars.copy_context().run, self._chunk_notes, chunk, i, len(chunks)
+                )
+                for i, chunk in enumerate(chunks, start=1)
+            ]
+            try:
+                notes = [future.result() for future in futures]
+            except Exception as e:
+                for future in futures:
+                    future.cancel()
+                if isinstance(e, UpstreamUnavailable):
+                    raise
+                return False, None, f"Failed to condense transcript: {str(e)}"
+            
+            condensed = self._join_notes(notes)
+            if count_tokens(condensed, self.model) >= count_tokens(text, self.model):
+                return False, None, "Failed to condense transcript: notes did not get shorter"
+            text = condensed
+        
+        return True, text, None
+    
+    @timed("condense")
+    async def condense_transcript_async(self, transcript: str) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        Async version of condense_transcript.
+        
+        At most AI_MAP_CONCURRENCY chunks are in flight at once; the first
+        failure cancels the remaining chunks.
+        """
+        text = transcript
+        semaphore = asyncio.Semaphore(self.map_concurrency)
+        
+        while self.needs_map_reduce(text):
+            chunks = self._split_for_map(text)
+            tasks = [
+                asyncio.ensure_future(self._chunk_notes_async(chunk, i, len(chunks), semaphore))
+                for i, chunk in enumerate(chunks, start=1)
+            ]
+            try:
+                notes = await asyncio.gather(*tasks)
+            except UpstreamUnavailable:
+                raise
+            except Exception as e:
+                return False, None, f"Failed to condense transcript: {str(e)}"
+            finally:
+                for task in tasks:
+                    task.cancel()
+            
+            condensed = self._join_notes(notes)
+            if count_tokens(condensed, self.model) >= count_tokens(text, self.model):
+                return False, None, "Failed to condense transcript: notes did not get shorter"
+            text = condensed
+        
+        return True, text, None
+    
+    # =====================================================
+    # EMBEDDINGS (SEMANTIC SEARCH)
+    # =====================================================
+    
+    # Input tokens per text counted against the TPM quota are estimated
+    # from characters: cheaper than tokenizing every chunk, and the
+    # governor is corrected with the reported usage afterwards
+    EMBEDDING_CHARS_PER_TOKEN = 4
+    
+    async def _create_embeddings_async(self, texts: List[str]) -> List[List[float]]:
+        """
+        One embeddings call, admitted through the rate governor.
+        
+        Called once per attempt by the resilience layer.
+        """
+        client = self.async_client
+        estimated_tokens = sum(len(text) for text in texts) // self.EMBEDDING_CHARS_PER_TOKEN + len(texts)
+        started = time.perf_counter()
+        await _openai_governor.acquire_async(estimated_tokens)
+        queued_ms = round((time.perf_counter() - started) * 1000, 2)
+        
+        with span("llm_call", component="embedding", model=self.embedding_model,
+                  queued_ms=queued_ms, texts=len(texts)) as attributes:
+            response = await client.embeddings.create(model=self.embedding_model, input=texts)
+            usage = response.usage
+            prompt_tokens = usage.prompt_tokens if usage else None
+            _openai_governor.record_usage(usage.total_tokens if usage else None)
+            record_llm_usage(prompt_tokens, None, component="embedding")
+            attributes["prompt_tokens"] = prompt_tokens
+        # The API may return items out of order; each carries its index
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    
+    async def _embed_batch_async(self, texts: List[str], semaphore: asyncio.Semaphore) -> List[List[float]]:
+        """
+        Embed one batch (bounded by the semaphore, with retries).
+        """
+        async with semaphore:
+            return await _openai_upstream.call_async(self._create_embeddings_async, texts)
+    
+    async def create_embeddings_async(self, texts: List[str]) -> Tuple[bool, Optional[List[List[float]]], Optional[str]]:
+        """
+        Embed texts with the OpenAI-compatible embeddings endpoint.
+        
+        Texts are sent EMBEDDING_BATCH_SIZE per call, at most
+        AI_MAP_CONCURRENCY calls at once; the first failure cancels the
+        remaining batches.
+        
+        Args:
+            texts (list): Texts to embed (e.g. transcript chunks, a query)
+        
+        Returns:
+            Tuple[bool, Optional[list], Optional[str]]:
+            - success (bool): Whether every text was embedded
+            - vectors (list): One embedding per text, in order
+            - error (str): Error message if failed
+        
+        Raises:
+            UpstreamUnavailable: If OpenAI is unavailable (circuit open or
+                retries exhausted), so routes can answer 503
+        
+        Example:
+            >>> success, vectors, error = await ai_service.create_embeddings_async(["What is mitosis?"])
+            >>> len(vectors[0])
+            1536
+        """
+        if not texts:
+            return True, [], None
+        
+        semaphore = asyncio.Semaphore(self.map_concurrency)
+        tasks = [
+            asyncio.ensure_future(self._embed_batch_async(texts[i:i + self.embedding_batch_size], semaphore))
+            for i in range(0, len(texts), self.embedding_batch_size)
+        ]
+        try:
+            batches = await asyncio.gather(*tasks)
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            return False, None, f"Failed to create embeddings: {str(e)}"
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        vectors = [vector for batch in batches for vector in batch]
+        if len(vectors) != len(texts):
+            return False, None, f"Failed to create embeddings: expected {len(texts)}, got {len(vectors)}"
+        return True, vectors, None
+    
+    # =====================================================
+    # ORCHESTRATION
+    # =====================================================
+    
+    # Component name -> label used in error messages
+    COMPONENT_LABELS = {
+        "summary": "Summary",
+        "key_points": "Key points",
+        "quiz": "Quiz",
+    }
+    
+    @classmethod
+    def requested_components(cls, components: Optional[Any] = None) -> Optional[Tuple[str, ...]]:
+        """
+        Normalize a component selection.
+        
+        Args:
+            components (iterable, optional): Component names (summary,
+                key_points, quiz); None means all of them
+        
+        Returns:
+            tuple: The selected names in package order, or None when every
+            component is selected (a complete package)
+        
+        Raises:
+            ValueError: If a name is not a component
+        
+        Example:
+            >>> AIService.requested_components(["quiz", "summary"])
+            ('summary', 'quiz')
+        """
+        if components is None:
+            return None
+        names = set(components)
+        unknown = names - set(cls.COMPONENT_LABELS)
+        if unknown:
+            raise ValueError(f"Unknown learning package components: {', '.join(sorted(unknown))}")
+        if names == set(cls.COMPONENT_LABELS):
+            return None
+        return tuple(name for name in cls.COMPONENT_LABELS if name in names)
+    
+    def _component_generators(self, components: Optional[Tuple[str, ...]] = None) -> Dict[str, Callable]:
+        """
+        Map each learning package component to its generation method.
+        
+        The order matches the order used by sequential generation.
+        
+        Args:
+            components (tuple, optional): Only these components (None = all)
+        """
+        generators = {
+            "summary": self.generate_summary,
+            "key_points": self.generate_key_points,
+            "quiz": self.generate_quiz,
+        }
+        return {name: generator for name, generator in generators.items() if components is None or name in components}
+    
+    def _component_generators_async(self, components: Optional[Tuple[str, ...]] = None) -> Dict[str, Callable]:
+        """
+        Map each learning package component to its async generation method.
+        """
+        generators = {
+            "summary": self.generate_summary_async,
+            "key_points": self.generate_key_points_async,
+            "quiz": self.generate_quiz_async,
+        }
+        return {name: generator for name, generator in generators.items() if components is None or name in components}
+    
+    @staticmethod
+    def _timed(generator: Callable, transcript: str) -> Tuple[Tuple, float]:
+        """
+        Run a generation method and measure how long it took.
+        
+        Returns:
+            Tuple[Tuple, float]: The generator result and elapsed seconds
+        """
+        started = time.perf_counter()
+        result = generator(transcript)
+        return result, time.perf_counter() - started
+    
+    @staticmethod
+    async def _timed_async(generator: Callable, transcript: str) -> Tuple[Tuple, float]:
+        """
+        Await an async generation method and measure how long it took.
+        """
+        started = time.perf_counter()
+        result = await generator(transcript)
+        return result, time.perf_counter() - started
+    
+    def _generate_sequentially(self, transcript: str, completed: Optional[Dict] = None,
+                               components: Optional[Tuple[str, ...]] = None) -> Tuple[bool, Dict, Optional[str], Dict[str, float]]:
+        """
+        Generate all components one after another.
+        
+        Stops at the first failed component.
+        
+        Args:
+            transcript (str): The (possibly condensed) transcript
+            completed (dict, optional): Components already generated, skipped here
+            components (tuple, optional): Only generate these (None = all)
+        
+        Returns:
+            Tuple of (success, components, error, timings). On failure,
+            components holds the ones that did succeed.
+        """
+        generators = self._component_generators(components)
+        results = dict(completed or {})
+        timings = {}
+        
+        for name, generator in generators.items():
+            if name in results:
+                continue
+            (success, value, error), elapsed = self._timed(generator, transcript)
+            timings[name] = elapsed
+            if not success:
+                return False, results, f"{self.COMPONENT_LABELS[name]} generation failed: {error}", timings
+            results[name] = value
+        
+        return True, results, None, timings
+    
+    def _generate_concurrently(self, transcript: str, completed: Optional[Dict] = None,
+                               components: Optional[Tuple[str, ...]] = None) -> Tuple[bool, Dict, Optional[str], Dict[str, float]]:
+        """
+        Generate all components at the same time on the shared executor.
+        
+        Each task runs in a copy of the caller's context, so the request
+        priority (see rate_governor) carries over to the worker threads.
+        
+        Fail-fast: as soon as one component fails, the remaining siblings
+        are cancelled and the error is returned without waiting for them.
+        Calls that are already talking to OpenAI cannot be interrupted;
+        they finish in the background and their results are discarded.
+        
+        Args:
+            transcript (str): The (possibly condensed) transcript
+            completed (dict, optional): Components already generated, skipped here
+            components (tuple, optional): Only generate these (None = all)
+        
+        Returns:
+            Tuple of (success, components, error, timings). On failure,
+            components holds the ones that finished successfully.
+        """
+        generators = self._component_generators(components)
+        components = dict(completed or {})
+        futures = {
+            _generation_executor.submit(contextvars.copy_context().run, self._timed, generator, transcript): name
+            for name, generator in generators.items()
+            if name not in components
+        }
+        timings = {}
+        pending = set(futures)
+        
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                name = futures[future]
+                error = None
+                try:
+                    (success, value, error), elapsed = future.result()
+                    timings[name] = elapsed
+                except UpstreamUnavailable:
+                    for sibling in pending:
+                        sibling.cancel()
+                    raise
+                except Exception as e:
+                    success = False
+                    error = str(e)
+                
+                if not success:
+                    for sibling in pending:
+                        sibling.cancel()
+                    return False, components, f"{self.COMPONENT_LABELS[name]} generation failed: {error}", timings
+                
+                components[name] = value
+        
+        return True, components, None, timings
+    
+    def components_partial_key(self, transcript: str) -> str:
+        """
+        Cache key for the components of an incomplete package: those
+        finished by a run that failed, or generated for a request that
+        asked for only some of them.
+        """
+        return make_cache_key(
+            "components_partial",
+            transcript_sha256=hashlib.sha256(transcript.encode("utf-8")).hexdigest(),
+            extractive=self.extractive,
+            prompt_version=self.prompt_version,
+            model=self.model,
+            max_tokens=self.max_tokens
+        )
+    
+    def _save_partial_components(self, transcript: str, success: bool, components: Optional[Dict]) -> None:
+        """
+        Keep the components of an incomplete package, or drop them once
+        the package is complete.
+        
+        A failed quiz no longer throws away a summary and key points that
+        were already paid for: the next attempt only generates what is
+        missing. Components generated on request (a quiz-only request,
+        say) are kept for the cache lifetime, so a later request for the
+        rest of the package only generates what is missing too.
+        """
+        partial_key = self.components_partial_key(transcript)
+        if success and components and set(self.COMPONENT_LABELS) <= set(components):
+            get_cache().delete(partial_key)
+        elif components:
+            get_cache().set(partial_key, components, ttl=None if success else self.PARTIAL_STATE_TTL)
+    
+    def _generate_components(self, transcript: str, components: Optional[Tuple[str, ...]] = None) -> Tuple[bool, Optional[Dict], Optional[str], Dict[str, float]]:
+        """
+        Generate all components using the configured generation mode.
+        
+        In "combined" mode a single JSON call is tried first. If it fails
+        or its output doesn't validate, the three separate calls run as
+        usual; timings then include both the "combined" attempt and the
+        separate components. Components finished by an earlier failed run
+        (or by a combined call whose quiz could not be repaired) are reused.
+        
+        Args:
+            transcript (str): The (possibly condensed) transcript
+            components (tuple, optional): Only generate these (None = all).
+                A selection always uses the separate prompts: the combined
+                prompt generates everything.
+        
+        Returns:
+            Tuple of (success, components, error, timings). The components
+            include any earlier ones reused from the partial cache.
+        """
+        timings = {}
+        completed = get_cache().get(self.components_partial_key(transcript)) or {}
+        
+        if self.generation_mode == "combined" and not completed and components is None:
+            (success, generated, error), timings["combined"] = self._timed(
+                self.generate_combined, transcript
+            )
+            if success:
+                return True, generated, None, timings
+            completed = generated or {}
+        
+        if self.concurrent_generation:
+            success, generated, error, component_timings = self._generate_concurrently(transcript, completed, components)
+        else:
+            success, generated, error, component_timings = self._generate_sequentially(transcript, completed, components)
+        
+        timings.update(component_timings)
+        self._save_partial_components(transcript, success, generated)
+        return success, generated, error, timings
+    
+    # =====================================================
+    # CACHING
+    # =====================================================
+    
+    def package_cache_key(self, transcript: str, video_id: Optional[str] = None) -> str:
+        """
+        Content-addressed cache key for a learning package.
+        
+        Covers everything that changes the generated output: the video,
+        the exact transcript text, the transcript normalization, extractive
+        pre-selection, the prompt templates, the generation mode, the model and the completion token
+        limit.
+        
+        Args:
+            transcript (str): The video transcript
+            video_id (str, optional): YouTube video ID the transcript belongs to
+            
+        Returns:
+            str: Cache key in the "package" namespace
+        """
+        return make_cache_key(
+            "package",
+            video_id=video_id,
+            transcript_sha256=hashlib.sha256(transcript.encode("utf-8")).hexdigest(),
+            normalization=self.normalization,
+            extractive=self.extractive,
+            prompt_version=self.prompt_version,
+            generation_mode=self.generation_mode,
+            model=self.model,
+            max_tokens=self.max_tokens
+        )
+    
+    @staticmethod
+    def content_hash(package: Dict) -> str:
+        """
+        SHA-256 of a package's generated content (per-run fields excluded).
+        
+        Stored with the cached package as content_sha256, so HTTP ETags
+        (see utils/http_cache.py) don't re-serialize the package on every
+        request.
+        """
+        content = {
+            name: value for name, value in package.items()
+            if name not in ("cached", "timings", "content_sha256")
+        }
+        payload = json.dumps(content, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    @classmethod
+    def _cached_package(cls, cache_key: str, started: float) -> Optional[Dict]:
+        """
+        Look up a learning package in the cache.
+        
+        Returns:
+            dict: The cached package marked as cached, or None on a miss
+        """
+        package = get_cache().get(cache_key)
+        if package is None:
+            return None
+        
+        if "content_sha256" not in package:
+            # Cached before content hashes were stored
+            package["content_sha256"] = cls.content_hash(package)
+        package["cached"] = True
+        package["timings"] = {"total": round(time.perf_counter() - started, 3)}
+        return package
+    
+    @classmethod
+    def _store_package(cls, cache_key: str, package: Dict) -> None:
+        """
+        Store a freshly generated package (without its per-run fields).
+        
+        Adds content_sha256 to the package (stored and returned).
+        """
+        package["content_sha256"] = cls.content_hash(package)
+        get_cache().set(cache_key, {
+            name: value for name, value in package.items()
+            if name not in ("cached", "timings")
+        })
+    
+    def get_cached_package(self, transcript: str, video_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        The cached learning package for a transcript, without generating one.
+        
+        Args:
+            transcript (str): The video transcript
+            video_id (str, optional): YouTube video ID, used in the cache key
+        
+        Returns:
+            dict: Same as generate_learning_package's package (cached is
+            True), or None if this transcript hasn't been processed with
+            the current settings
+        """
+        return self._cached_package(self.package_cache_key(transcript, video_id), time.perf_counter())
+    
+    @classmethod
+    def _select_components(cls, package: Dict, components: Optional[Tuple[str, ...]]) -> Dict:
+        """
+        A package with only the selected components (None keeps all).
+        
+        content_sha256 then covers the selection, so responses with
+        different components never share an ETag.
+        """
+        if components is None:
+            return package
+        selected = {
+            name: value for name, value in package.items()
+            if name not in cls.COMPONENT_LABELS or name in components
+        }
+        selected["content_sha256"] = cls.content_hash(selected)
+        return selected
+    
+    def _finish_package(self, cache_key: str, components: Dict, selection: Optional[Tuple[str, ...]],
+                        timings: Dict[str, float], started: float,
+                        normalization: Optional[Dict[str, Any]]) -> Dict:
+        """
+        Assemble the package of a successful run, caching it once complete.
+        
+        A selection can complete the package when the other components
+        were generated earlier (see _save_partial_components); the complete
+        package is cached, then trimmed to the selection.
+        """
+        package = self._assemble_package(components, timings, started, normalization)
+        if set(self.COMPONENT_LABELS) <= set(components):
+            self._store_package(cache_key, package)
+        return self._select_components(package, selection)
+    
+    @timed("generation")
+    def generate_learning_package(self, transcript: str, video_id: Optional[str] = None,
+                                  components: Optional[Any] = None) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        Generate a complete learning package (summary + key points + quiz).
+        
+        This method orchestrates the three AI generation methods and returns
         a complete structured learning package.
         
+        When concurrent generation is enabled (AI_CONCURRENT_GENERATION),
+        the three calls run at the same time, so latency is roughly that of
+        the slowest call instead of the sum of all three. The first failure
+        cancels the remaining calls, same as the sequential mode.
+        
+        With AI_GENERATION_MODE=combined, one JSON call generates all three
+        components and the transcript is sent only once; the separate calls
+        are the fallback if that output is invalid.
+        
+        Packages are cached by video, transcript, prompt version, model and
+        max_tokens, so repeat requests skip the OpenAI calls entirely.
+        
+        Transcripts too long for a single prompt are first condensed with
+        map-reduce (see condense_transcript); the token count decides
+        automatically.
+        
+        With `components`, only those are generated (a quiz-only request
+        makes no summary or key points calls). They are served from a
+        cached complete package when there is one, and kept for later
+        requests for the rest of the package otherwise.
+        
         Args:
             transcript (str): The video transcript
+            video_id (str, optional): YouTube video ID, used in the cache key
+            components (iterable, optional): Components to generate
+                (summary, key_points, quiz); None generates all three
             
         Returns:
             Tuple[bool, Optional[Dict], Optional[str]]:
             - success (bool): True if all components generated successfully
-            - package (dict): Complete learning package with summary, key_points, quiz
+            - package (dict): Complete learning package with summary, key_points,
+              quiz, timings (seconds per component plus "total") and cached
+              (with a selection, only the selected components)
             - error (str): Error message if any component failed
+        
+        Raises:
+            ValueError: If components names an unknown component
         """
+        selection = self.requested_components(components)
         
         # Validate transcript
         if not transcript or len(transcript.strip()) == 0:
             return False, None, "Transcript is empty"
         
-        # Step 1: Generate Summary
-        summary_success, summary, summary_error = self.generate_summary(transcript)
-        if not summary_success:
-            return False, None, f"Summary generation failed: {summary_error}"
-        
-        # Step 2: Generate Key Points
-        points_success, key_points, points_error = self.generate_key_points(transcript)
-        if not points_success:
-            return False, None, f"Key points generation failed: {points_error}"
-        
-        # Step 3: Generate Quiz (EXACTLY 10 questions)
-        quiz_success, quiz, quiz_error = self.generate_quiz(transcript)
-        if not quiz_success:
-            return False, None, f"Quiz generation failed: {quiz_error}"
-        
-        # Step 4: Assemble learning package
-        learning_package = {
-            "summary": summary,
-            "key_points": key_points,
-            "quiz": quiz
+        started = time.perf_counter()
+        
+        cache_key = self.package_cache_key(transcript, video_id)
+        cached_package = self._cached_package(cache_key, started)
+        if cached_package is not None:
+            return True, self._select_components(cached_package, selection), None
+        
+        # Clean up the captions, then condense multi-hour lectures that
+        # don't fit in a single prompt
+        transcript, normalization = self.prepare_transcript(transcript)
+        condense_started = time.perf_counter()
+        condensed, prompt_text, condense_error = self.condense_transcript(transcript)
+        if not condensed:
+            return False, None, f"Transcript condensing failed: {condense_error}"
+        condense_seconds = time.perf_counter() - condense_started
+        
+        # Generate summary, key points and quiz (EXACTLY 10 questions)
+        success, generated, error, timings = self._generate_components(prompt_text, selection)
+        
+        if not success:
+            return False, None, error
+        
+        if prompt_text is not transcript:
+            timings["map_reduce"] = condense_seconds
+        return True, self._finish_package(cache_key, generated, selection, timings, started, normalization), None
+    
+    async def _generate_sequentially_async(self, transcript: str, completed: Optional[Dict] = None,
+                                           components: Optional[Tuple[str, ...]] = None) -> Tuple[bool, Dict, Optional[str], Dict[str, float]]:
+        """
+        Async version of _generate_sequentially.
+        """
+        generators = self._component_generators_async(components)
+        components = dict(completed or {})
+        timings = {}
+        
+        for name, generator in generators.items():
+            if name in components:
+                continue
+            (success, value, error), elapsed = await self._timed_async(generator, transcript)
+            timings[name] = elapsed
+            if not success:
+                return False, components, f"{self.COMPONENT_LABELS[name]} generation failed: {error}", timings
+            components[name] = value
+        
+        return True, components, None, timings
+    
+    async def _generate_concurrently_async(self, transcript: str, completed: Optional[Dict] = None,
+                                           components: Optional[Tuple[str, ...]] = None) -> Tuple[bool, Dict, Optional[str], Dict[str, float]]:
+        """
+        Generate all components as concurrent asyncio tasks.
+        
+        Unlike the thread-based variant, the first failure (or cancellation
+        of the caller) really cancels the sibling requests, closing their
+        in-flight HTTP calls.
+        
+        Returns:
+            Tuple of (success, components, error, timings). On failure,
+            components holds the ones that finished successfully.
+        """
+        generators = self._component_generators_async(components)
+        components = dict(completed or {})
+        tasks = {
+            asyncio.ensure_future(self._timed_async(generator, transcript)): name
+            for name, generator in generators.items()
+            if name not in components
         }
+        timings = {}
+        pending = set(tasks)
+        
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in done:
+                    name = tasks[task]
+                    error = None
+                    try:
+                        (success, value, error), elapsed = task.result()
+                        timings[name] = elapsed
+                    except UpstreamUnavailable:
+                        # Siblings that failed in the same round: retrieve
+                        # their errors so asyncio doesn't log them as unhandled
+                        for sibling in done:
+                            if not sibling.cancelled():
+                                sibling.exception()
+                        raise
+                    except Exception as e:
+                        success = False
+                        error = str(e)
+                    
+                    if not success:
+                        return False, components, f"{self.COMPONENT_LABELS[name]} generation failed: {error}", timings
+                    
+                    components[name] = value
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        return True, components, None, timings
+    
+    async def _generate_components_async(self, transcript: str, components: Optional[Tuple[str, ...]] = None) -> Tuple[bool, Optional[Dict], Optional[str], Dict[str, float]]:
+        """
+        Async version of _generate_components.
+        """
+        timings = {}
+        completed = get_cache().get(self.components_partial_key(transcript)) or {}
+        
+        if self.generation_mode == "combined" and not completed and components is None:
+            (success, generated, error), timings["combined"] = await self._timed_async(
+                self.generate_combined_async, transcript
+            )
+            if success:
+                return True, generated, None, timings
+            completed = generated or {}
+        
+        if self.concurrent_generation:
+            success, generated, error, component_timings = await self._generate_concurrently_async(transcript, completed, components)
+        else:
+            success, generated, error, component_timings = await self._generate_sequentially_async(transcript, completed, components)
+        
+        timings.update(component_timings)
+        self._save_partial_components(transcript, success, generated)
+        return success, generated, error, timings
+    
+    @timed("generation")
+    async def generate_learning_package_async(self, transcript: str, video_id: Optional[str] = None,
+                                              components: Optional[Any] = None) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        Async version of generate_learning_package.
+        
+        Uses the shared AsyncOpenAI client, so the event loop stays free
+        while the three generations are in flight.
+        
+        Args:
+            transcript (str): The video transcript
+            video_id (str, optional): YouTube video ID, used in the cache key
+            components (iterable, optional): Components to generate (None = all)
+            
+        Returns:
+            Tuple[bool, Optional[Dict], Optional[str]]: Same as generate_learning_package
+        """
+        selection = self.requested_components(components)
+        
+        if not transcript or len(transcript.strip()) == 0:
+            return False, None, "Transcript is empty"
+        
+        started = time.perf_counter()
+        
+        cache_key = self.package_cache_key(transcript, video_id)
+        cached_package = self._cached_package(cache_key, started)
+        if cached_package is not None:
+            return True, self._select_components(cached_package, selection), None
+        
+        # CPU-bound: keep it off the event loop (a 3-hour transcript takes
+        # tens of milliseconds)
+        transcript, normalization = await asyncio.to_thread(self.prepare_transcript, transcript)
+        condense_started = time.perf_counter()
+        condensed, prompt_text, condense_error = await self.condense_transcript_async(transcript)
+        if not condensed:
+            return False, None, f"Transcript condensing failed: {condense_error}"
+        condense_seconds = time.perf_counter() - condense_started
+        
+        success, generated, error, timings = await self._generate_components_async(prompt_text, selection)
+        
+        if not success:
+            return False, None, error
+        
+        if prompt_text is not transcript:
+            timings["map_reduce"] = condense_seconds
+        return True, self._finish_package(cache_key, generated, selection, timings, started, normalization), None
+    
+    # =====================================================
+    # STREAMING
+    # =====================================================
+    
+    @timed("quiz")
+    async def _stream_quiz_async(self, transcript: str, questions: asyncio.Queue) -> Tuple[bool, Optional[List[Dict]], Optional[str]]:
+        """
+        Stream quiz generation, queueing each question as soon as it is parsed.
+        
+        Only valid, distinct questions are queued, at most 10. A None
+        sentinel is always queued at the end. If fewer than 10 arrive, the
+        missing ones are requested like in generate_quiz and queued once
+        the repair succeeds.
+        
+        Returns:
+            Tuple[bool, Optional[List[Dict]], Optional[str]]: Same as generate_quiz
+        """
+        parser = JsonArrayStreamParser()
+        streamed = []
+        try:
+            transcript = await self.component_input_async("quiz", transcript)
+            async for delta in self._stream_completion_async(
+                self.QUIZ_SYSTEM_MESSAGE,
+                self.get_quiz_prompt(transcript),
+                component="quiz"
+            ):
+                for question in self._merge_questions(streamed, parser.feed(delta))[len(streamed):]:
+                    if len(streamed) < self.QUIZ_QUESTION_COUNT:
+                        streamed.append(question)
+                        questions.put_nowait(question)
+            
+            success, quiz, error = await self._repair_quiz_async(transcript, streamed)
+            if success:
+                for question in quiz[len(streamed):]:
+                    questions.put_nowait(question)
+            return success, quiz, error
+            
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            return False, None, f"Failed to generate quiz: {str(e)}"
+        finally:
+            questions.put_nowait(None)
+    
+    async def stream_learning_package_async(self, transcript: str, video_id: Optional[str] = None,
+                                            components: Optional[Any] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Generate a learning package as a stream of (event, data) pairs.
+        
+        Events, in order:
+        - summary_delta: {"text": ...} for each streamed piece of the summary
+        - summary: {"summary": ...} once the summary is complete
+        - key_points: {"key_points": [...]}
+        - quiz_question: {"index": i, "question": {...}} for each question
+        - done: {"timings": {...}, "cached": bool, "normalization": {...}}
+        - error: {"error": ..., "detail": ...} ends the stream early
+        
+        UpstreamUnavailable is raised (not turned into an error event) so
+        callers can report it like the other endpoints do.
+        
+        Key points and the quiz are generated while the summary streams,
+        so they are usually ready by the time the summary finishes.
+        Cached packages are replayed immediately (without summary_delta).
+        Streaming always uses the separate prompts, whatever
+        AI_GENERATION_MODE is, since each component streams on its own.
+        
+        With `components`, only those are generated and only their events
+        are sent; they are kept for later requests like in
+        generate_learning_package.
+        
+        Args:
+            transcript (str): The video transcript
+            video_id (str, optional): YouTube video ID, used in the cache key
+            components (iterable, optional): Components to generate (None = all)
+            
+        Yields:
+            Tuple[str, Any]: Event name and JSON-serializable payload
+        
+        Raises:
+            ValueError: If components names an unknown component
+        """
+        selection = self.requested_components(components)
+        wanted = set(self.COMPONENT_LABELS) if selection is None else set(selection)
+        
+        if not transcript or len(transcript.strip()) == 0:
+            yield "error", {"error": "Content Generation Failed", "detail": "Transcript is empty"}
+            return
+        
+        started = time.perf_counter()
+        
+        if not wanted:
+            yield "done", {"timings": {"total": 0.0}, "cached": False, "normalization": None}
+            return
+        
+        cache_key = self.package_cache_key(transcript, video_id)
+        cached_package = self._cached_package(cache_key, started)
+        if cached_package is not None:
+            if "summary" in wanted:
+                yield "summary", {"summary": cached_package["summary"]}
+            if "key_points" in wanted:
+                yield "key_points", {"key_points": cached_package["key_points"]}
+            if "quiz" in wanted:
+                for index, question in enumerate(cached_package["quiz"]):
+                    yield "quiz_question", {"index": index, "question": question}
+            yield "done", {
+                "timings": cached_package["timings"],
+                "cached": True,
+                "normalization": cached_package.get("normalization")
+            }
+            return
+        
+        transcript, normalization = await asyncio.to_thread(self.prepare_transcript, transcript)
+        condense_started = time.perf_counter()
+        condensed, prompt_text, condense_error = await self.condense_transcript_async(transcript)
+        if not condensed:
+            yield "error", {
+                "error": "Content Generation Failed",
+                "detail": f"Transcript condensing failed: {condense_error}"
+            }
+            return
+        timings = {}
+        if prompt_text is not transcript:
+            timings["map_reduce"] = time.perf_counter() - condense_started
+        generated = {}
+        
+        key_points_task = None
+        if "key_points" in wanted:
+            key_points_task = asyncio.ensure_future(
+                self._timed_async(self.generate_key_points_async, prompt_text)
+            )
+        quiz_task = None
+        if "quiz" in wanted:
+            quiz_questions = asyncio.Queue()
+            quiz_started = time.perf_counter()
+            quiz_task = asyncio.ensure_future(self._stream_quiz_async(prompt_text, quiz_questions))
+        
+        try:
+            # Summary: forward tokens as they stream from the model
+            if "summary" in wanted:
+                summary_started = time.perf_counter()
+                summary_parts = []
+                try:
+                    summary_text = await self.component_input_async("summary", prompt_text)
+                    async for delta in self._stream_completion_async(
+                        self.SUMMARY_SYSTEM_MESSAGE,
+                        self.get_summary_prompt(summary_text),
+                        component="summary"
+                    ):
+                        summary_parts.append(delta)
+                        yield "summary_delta", {"text": delta}
+                except UpstreamUnavailable:
+                    raise
+                except Exception as e:
+                    record_error("summary", type(e).__name__)
+                    yield "error", {
+                        "error": "Content Generation Failed",
+                        "detail": f"Summary generation failed: Failed to generate summary: {str(e)}"
+                    }
+                    return
+                generated["summary"] = "".join(summary_parts).strip()
+                timings["summary"] = time.perf_counter() - summary_started
+                # A generator can't be wrapped in timed(); observe it directly
+                STAGE_SECONDS.labels(stage="summary").observe(timings["summary"])
+                yield "summary", {"summary": generated["summary"]}
+            
+            # Key points
+            if key_points_task is not None:
+                (points_success, key_points, points_error), timings["key_points"] = await key_points_task
+                if not points_success:
+                    yield "error", {
+                        "error": "Content Generation Failed",
+                        "detail": f"Key points generation failed: {points_error}"
+                    }
+                    return
+                generated["key_points"] = key_points
+                yield "key_points", {"key_points": key_points}
+            
+            # Quiz: one question at a time as they are parsed
+            if quiz_task is not None:
+                index = 0
+                while True:
+                    question = await quiz_questions.get()
+                    if question is None:
+                        break
+                    yield "quiz_question", {"index": index, "question": question}
+                    index += 1
+                
+                quiz_success, quiz, quiz_error = await quiz_task
+                timings["quiz"] = time.perf_counter() - quiz_started
+                if not quiz_success:
+                    yield "error", {
+                        "error": "Content Generation Failed",
+                        "detail": f"Quiz generation failed: {quiz_error}"
+                    }
+                    return
+                generated["quiz"] = quiz
+            
+            if selection is not None:
+                # Keep the selection for later requests (merged with what
+                # earlier ones generated)
+                completed = get_cache().get(self.components_partial_key(prompt_text)) or {}
+                completed.update(generated)
+                self._save_partial_components(prompt_text, True, completed)
+                generated = completed
+            package = self._finish_package(cache_key, generated, selection, timings, started, normalization)
+            yield "done", {"timings": package["timings"], "cached": False, "normalization": normalization}
+        
+        finally:
+            if key_points_task is not None:
+                key_points_task.cancel()
+            if quiz_task is not None:
+                quiz_task.cancel()
+    
+    @classmethod
+    def _assemble_package(cls, components: Dict, timings: Dict[str, float], started: float,
+                          normalization: Optional[Dict[str, Any]] = None) -> Dict:
+        """
+        Assemble the learning package returned to callers.
+        
+        Args:
+            components (dict): Generated summary, key_points and quiz (a
+                selection has only some of them)
+            timings (dict): Seconds spent on each component
+            started (float): perf_counter() value when generation began
+            normalization (dict, optional): Transcript normalization stats
+            
+        Returns:
+            dict: Learning package with summary, key_points, quiz, timings,
+            normalization and cached
+        """
+        timings["total"] = time.perf_counter() - started
         
-        return True, learning_package, None
+        package = {name: components[name] for name in cls.COMPONENT_LABELS if name in components}
+        package.update({
+            "timings": {name: round(seconds, 3) for name, seconds in timings.items()},
+            "normalization": normalization,
+            "cached": False
+        })
+        return package
@@ -0,0 +1,508 @@
+"""
+Job Service - Background Video Processing
+
+This module runs video processing as background jobs.
+
+Purpose:
+- Accept a video for processing and return a job ID immediately
+- Run the transcript + AI pipeline on a bounded pool of workers
+- Keep job status and results in a local SQLite queue
+- Optionally notify a webhook when a job finishes
+
+Webhooks:
+The webhook URL is chosen by the caller, so delivery only goes to public
+http(s) hosts: a URL whose host resolves to a loopback, private,
+link-local or otherwise non-global address (internal services, cloud
+metadata endpoints) is refused, and redirects are not followed. The POST
+connects to the address that was checked, so a second DNS answer
+(rebinding) can't redirect it.
+
+Why Separated as Service:
+Processing a video takes as long as a transcript fetch plus several LLM
+calls. Holding an HTTP connection open for all of that gets requests
+killed by proxy timeouts. With jobs, the HTTP request only enqueues work,
+and the number of concurrent pipelines is capped by JOB_WORKERS
+independently of how many HTTP requests the server accepts.
+
+Persistence:
+Jobs live in a SQLite file (JOB_DB_PATH), so no external queue service is
+needed and queued jobs survive a restart. Several worker processes on the
+same machine can share the file; a job is claimed atomically so it only
+runs once.
+"""
+
+import asyncio
+import functools
+import ipaddress
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from ..config import settings
+from ..utils.clients import register_client
+from ..utils.rate_governor import request_priority
+from .video_processing_service import VideoProcessingService
+
+
+# JobStore calls are blocking SQLite I/O (a claim can wait up to 30 s for
+# another worker's write lock), so they run on this thread, never on the
+# event loop. One thread is enough: the store serializes them anyway.
+_store_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+
+# Job lifecycle states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+async def resolve_webhook(webhook_url: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Resolve a webhook URL to the address it may be delivered to.
+    
+    Resolves the host and refuses it if any of its addresses is non-global
+    (loopback, private, link-local, carrier-grade NAT, reserved), so
+    callers can't use webhooks to reach internal services. Delivery must
+    then connect to the returned address (see utils/pinned_transport.py):
+    resolving the name again could give a different answer.
+    
+    Args:
+        webhook_url (str): URL the job was submitted with
+    
+    Returns:
+        Tuple[Optional[str], Optional[str]]:
+        - address (str): Validated IP address to connect to, or None
+        - rejection (str): Reason for refusing, or None
+    
+    Example:
+        >>> await resolve_webhook("http://169.254.169.254/latest/meta-data")
+        (None, 'non-public address 169.254.169.254')
+    """
+    parts = urlsplit(webhook_url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return None, "not an http(s) URL"
+    
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            parts.hostname, parts.port or (443 if parts.scheme == "https" else 80), type=socket.SOCK_STREAM
+        )
+    except (OSError, UnicodeError):
+        return None, "host does not resolve"
+    
+    addresses = []
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%", 1)[0])
+        if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global:
+            return None, f"non-public address {address}"
+        addresses.append(str(address))
+    if not addresses:
+        return None, "host does not resolve"
+    return addresses[0], None
+
+
+class JobStore:
+    """
+    SQLite-backed job queue.
+    
+    Methods:
+        create(video_id, youtube_url, webhook_url): Enqueue a job
+        get(job_id): Fetch a job as a dict
+        claim_next(): Atomically move the oldest queued job to running
+        finish(job_id, result, error): Record a job's outcome
+        requeue_stale(max_age): Requeue jobs abandoned by a crashed worker
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open (or create) the job database.
+        
+        Args:
+            path (str): Path of the SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " video_id TEXT NOT NULL,"
+            " youtube_url TEXT NOT NULL,"
+            " webhook_url TEXT,"
+            " result TEXT,"
+            " error TEXT,"
+            " webhook_status TEXT,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL"
+            ")"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)"
+        )
+        self._conn.commit()
+        
+        # A SQLite connection must not be used across fork(): with a
+        # preloaded app (see app/server.py) every worker opens its own
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reopen)
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    def _reopen(self) -> None:
+        """
+        Replace the connection inherited from the parent process.
+        """
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+    
+    def create(self, video_id: str, youtube_url: str, webhook_url: Optional[str] = None) -> Dict:
+        """
+        Enqueue a new job.
+        
+        Returns:
+            dict: The created job
+        """
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, video_id, youtube_url, webhook_url, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, JOB_QUEUED, video_id, youtube_url, webhook_url, time.time())
+            )
+            self._conn.commit()
+        return self.get(job_id)
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Fetch a job by ID.
+        
+        Returns:
+            dict: Job fields with result/error decoded, or None if unknown
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["error"] = json.loads(job["error"]) if job["error"] else None
+        return job
+    
+    def claim_next(self) -> Optional[Dict]:
+        """
+        Atomically claim the oldest queued job.
+        
+        Returns:
+            dict: The claimed job (now running), or None if the queue is empty
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                    (JOB_QUEUED,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+                        (JOB_RUNNING, time.time(), row["id"])
+                    )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return self.get(row["id"]) if row is not None else None
+    
+    def finish(self, job_id: str, result: Optional[Dict] = None, error: Optional[Dict] = None) -> None:
+        """
+        Record the outcome of a job.
+        
+        Args:
+            job_id (str): Job ID
+            result (dict, optional): Pipeline result on success
+            error (dict, optional): {"error": ..., "detail": ...} on failure
+        """
+        status = JOB_FAILED if error is not None else JOB_SUCCEEDED
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (
+                    status,
+                    json.dumps(result) if result is not None else None,
+                    json.dumps(error) if error is not None else None,
+                    time.time(),
+                    job_id
+                )
+            )
+            self._conn.commit()
+    
+    def set_webhook_status(self, job_id: str, webhook_status: str) -> None:
+        """
+        Record the outcome of a job's completion webhook.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET webhook_status = ? WHERE id = ?", (webhook_status, job_id)
+            )
+            self._conn.commit()
+    
+    def requeue(self, job_id: str) -> None:
+        """
+        Put a running job back in the queue (e.g. its worker is shutting down).
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE id = ? AND status = ?",
+                (JOB_QUEUED, job_id, JOB_RUNNING)
+            )
+            self._conn.commit()
+    
+    def requeue_stale(self, max_age: float) -> int:
+        """
+        Requeue running jobs whose worker disappeared (e.g. a crash).
+        
+        Args:
+            max_age (float): Seconds after which a running job is considered lost
+        
+        Returns:
+            int: Number of jobs requeued
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ? AND started_at < ?",
+                (JOB_QUEUED, JOB_RUNNING, time.time() - max_age)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+    
+    def counts(self) -> Dict[str, int]:
+        """
+        Number of jobs in each state.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"
+            ).fetchall()
+        counts = {JOB_QUEUED: 0, JOB_RUNNING: 0, JOB_SUCCEEDED: 0, JOB_FAILED: 0}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+
+def _open_job_store() -> JobStore:
+    return JobStore(settings.job_db_path)
+
+
+# Opened by the first store call (worker startup or a job request), not at
+# import: opening creates the database file and its WAL/SHM sidecars
+_job_store = register_client("job_store", _open_job_store)
+
+
+class JobService:
+    """
+    Worker pool that drains the job queue through the video pipeline.
+    
+    Methods:
+        submit(video_id, youtube_url, webhook_url): Enqueue a job (async)
+        get_job(job_id): Current state of a job (async)
+        start(): Start the workers (on application startup)
+        stop(): Stop the workers (on application shutdown)
+    """
+    
+    def __init__(self, video_processing_service: VideoProcessingService, store: Optional[JobStore] = None,
+                 workers: int = 2, poll_interval: float = 1.0, webhook_timeout: float = 10.0):
+        """
+        Initialize the job service.
+        
+        Args:
+            video_processing_service (VideoProcessingService): Pipeline to run
+            store (JobStore, optional): Job queue (defaults to the process-wide
+                store at JOB_DB_PATH, opened on first use)
+            workers (int): Number of jobs processed at the same time
+            poll_interval (float): Seconds between queue checks when idle
+            webhook_timeout (float): Seconds to wait for a webhook endpoint
+        """
+        self.video_processing_service = video_processing_service
+        self._store = store
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.webhook_timeout = webhook_timeout
+        self._tasks = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running_jobs = set()
+    
+    @property
+    def store(self) -> JobStore:
+        """
+        The job queue, opened on first use.
+        """
+        return self._store if self._store is not None else _job_store.get()
+    
+    def _call_store(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        return getattr(self.store, method)(*args, **kwargs)
+    
+    async def _store_call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a JobStore method on the store thread, off the event loop
+        (opening the store there too on the first call).
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _store_executor, functools.partial(self._call_store, method, *args, **kwargs)
+        )
+    
+    async def submit(self, video_id: str, youtube_url: str, webhook_url: Optional[str] = None) -> Dict:
+        """
+        Enqueue a video for processing and wake an idle worker.
+        
+        Returns:
+            dict: The queued job
+        """
+        job = await self._store_call("create", video_id, youtube_url, webhook_url)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+    
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        """
+        Current state of a job, or None if the ID is unknown.
+        """
+        return await self._store_call("get", job_id)
+    
+    async def start(self) -> None:
+        """
+        Requeue abandoned jobs and start the worker tasks.
+        """
+        if self._tasks:
+            return
+        
+        # A job running for much longer than any pipeline could take
+        # belonged to a worker that no longer exists
+        await self._store_call("requeue_stale", max_age=settings.job_stale_seconds)
+        
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.ensure_future(self._worker())
+            for _ in range(self.workers)
+        ]
+    
+    async def stop(self) -> None:
+        """
+        Cancel the worker tasks and requeue the jobs they were running.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        
+        for job_id in self._running_jobs:
+            await self._store_call("requeue", job_id)
+        self._running_jobs.clear()
+    
+    async def _worker(self) -> None:
+        """
+        Claim and run jobs until cancelled.
+        """
+        while True:
+            job = await self._store_call("claim_next")
+            
+            if job is None:
+                # Sleep until a job is submitted in this process, or poll
+                # again in case another process enqueued one
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            await self._run_job(job)
+    
+    async def _run_job(self, job: Dict) -> None:
+        """
+        Run the pipeline for one job and record the outcome.
+        """
+        self._running_jobs.add(job["id"])
+        try:
+            # Background work: interactive requests get OpenAI quota first
+            with request_priority("batch"):
+                success, result, error = await self.video_processing_service.process_video(job["video_id"])
+        except Exception as e:
+            success, result, error = False, None, {
+                "error": "Processing Failed",
+                "detail": str(e)
+            }
+        
+        self._running_jobs.discard(job["id"])
+        if success:
+            await self._store_call("finish", job["id"], result=result)
+        else:
+            await self._store_call("finish", job["id"], error=error)
+        
+        if job["webhook_url"]:
+            await self._notify_webhook(job["id"], job["webhook_url"])
+    
+    async def _notify_webhook(self, job_id: str, webhook_url: str) -> None:
+        """
+        POST the finished job to its webhook (best effort, no retries).
+        
+        URLs resolving to non-public addresses are refused (see
+        resolve_webhook); the reason is recorded as the webhook status.
+        """
+        # Only needed by jobs with a webhook; kept out of app startup
+        import httpx
+        from ..utils.pinned_transport import PinnedTransport
+        
+        address, rejection = await resolve_webhook(webhook_url)
+        if rejection:
+            await self._store_call("set_webhook_status", job_id, f"rejected ({rejection})")
+            return
+        
+        job = await self._store_call("get", job_id)
+        payload = {
+            "job_id": job["id"],
+            "status": job["status"],
+            "video_id": job["video_id"],
+            "result": job["result"],
+            "error": job["error"],
+        }
+        try:
+            # Connect to the validated address; redirects could point back
+            # at an internal host
+            async with httpx.AsyncClient(
+                transport=PinnedTransport(address),
+                trust_env=False,
+                timeout=self.webhook_timeout,
+                follow_redirects=False
+            ) as client:
+                response = await client.post(webhook_url, json=payload)
+            webhook_status = f"delivered ({response.status_code})"
+        except Exception as e:
+            webhook_status = f"failed ({type(e).__name__})"
+        await self._store_call("set_webhook_status", job_id, webhook_status)
+    
+    def stats(self) -> Dict:
+        """
+        Queue depth and worker information.
+        
+        Reads the store directly: call it from a worker thread, not the
+        event loop (see metrics_routes).
+        """
+        return {
+            "workers": self.workers,
+            "jobs": self.store.counts(),
+        }
@@ -0,0 +1,399 @@
+"""
+Search Service
+
+This module keeps processed videos searchable after their request ends.
+
+Purpose:
+- Index every processed video: split its transcript into time windows,
+  embed each window and store the vectors (see utils/vector_index.py)
+- Search all indexed lectures by meaning ("where was the Krebs cycle
+  explained?"), pointing to the minute of the video that matches
+- Suggest related videos (the closest chunks of other videos)
+
+Why Separated as Service:
+Indexing runs after the learning package was generated, in the
+background, for every entry point (process, batch, jobs, stream). The
+routes only read the index, so a search never waits on transcript
+fetches or generation.
+
+Cost:
+Indexing a one-hour lecture embeds ~60 chunks, usually in a single
+EMBEDDINGS call. A search embeds only the query (cached), then scores
+stored vectors locally: no chat completion, no transcript re-read.
+"""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .transcript_service import TranscriptService
+from .ai_service import AIService
+from ..config import settings
+from ..utils.cache import get_cache, make_cache_key
+from ..utils.clients import register_client
+from ..utils.metrics import timed
+from ..utils.rate_governor import request_priority
+from ..utils.resilience import UpstreamUnavailable
+from ..utils.transcript_normalizer import NORMALIZER_VERSION, TranscriptNormalizer
+
+if TYPE_CHECKING:
+    from ..utils.vector_index import VectorIndex
+
+
+# Part of each index entry: bump when chunking changes so videos indexed
+# the old way are re-indexed the next time they are processed
+CHUNKER_VERSION = 1
+
+# Characters of each chunk kept in the index (shown in search results);
+# the whole chunk is embedded
+SNIPPET_CHARS = 280
+
+# Chunks scored per result video when grouping search hits
+CANDIDATES_PER_RESULT = 8
+
+
+def _open_search_index() -> "VectorIndex":
+    from ..utils.vector_index import VectorIndex  # numpy: kept out of app startup
+    
+    return VectorIndex(settings.search_index_dir, settings.search_ivf_min_rows, settings.search_ivf_probes)
+
+
+# Opened on the first search or indexing run (reads the index lines)
+_search_index = register_client("search_index", _open_search_index)
+
+
+class SearchService:
+    """
+    Service that indexes processed videos and searches them.
+    
+    Methods:
+        schedule_indexing(video_id): Index a video in the background
+        index_video_async(video_id): Index a video now
+        search_async(query): Chunks of indexed videos matching a query
+        related_videos_async(video_id): Videos closest to an indexed video
+        stats(): Index size and indexing counters
+    """
+    
+    def __init__(self, transcript_service: TranscriptService, ai_service: AIService):
+        """
+        Initialize the search service with the services it uses.
+        
+        Args:
+            transcript_service (TranscriptService): Transcripts to index
+            ai_service (AIService): Embeddings
+        """
+        self.transcript_service = transcript_service
+        self.ai_service = ai_service
+        self.chunk_seconds = settings.search_chunk_seconds
+        # Videos being indexed in the background (video_id -> task)
+        self._indexing: Dict[str, asyncio.Task] = {}
+        self._counters = {"indexed": 0, "skipped": 0, "failed": 0}
+        self._last_error: Optional[str] = None
+    
+    @property
+    def index(self) -> "VectorIndex":
+        """
+        The process-wide vector index, opened on first use.
+        """
+        return _search_index.get()
+    
+    @property
+    def chunker(self) -> str:
+        """
+        How chunks are made; stored with each video to detect stale entries.
+        """
+        return f"v{CHUNKER_VERSION}/{self.chunk_seconds:g}s/norm{NORMALIZER_VERSION}"
+    
+    # =====================================================
+    # INDEXING
+    # =====================================================
+    
+    def _chunks(self, segments: Any) -> List[Dict[str, Any]]:
+        """
+        Split a transcript into time windows of cleaned text.
+        
+        One normalizer runs over the whole transcript, so rolling-caption
+        repeats are removed across window boundaries too. Windows with no
+        text left (music, silence) are dropped.
+        
+        Returns:
+            list: {"start", "end", "text"} per window
+        """
+        normalizer = TranscriptNormalizer()
+        chunks = []
+        for window in segments.windows(self.chunk_seconds):
+            sentences = []
+            for line in window.text.splitlines():
+                sentences.extend(normalizer.feed(line))
+            sentences.extend(normalizer.finish())
+            text = " ".join(sentences)
+            if text:
+                chunks.append({"start": round(window.start, 2), "end": round(window.end, 2), "text": text})
+        return chunks
+    
+    def _is_indexed(self, video_id: str) -> bool:
+        """
+        Whether a video is indexed with the current model and chunker.
+        """
+        entry = self.index.get(video_id)
+        return (
+            entry is not None
+            and entry["model"] == self.ai_service.embedding_model
+            and entry.get("chunker") == self.chunker
+        )
+    
+    @timed("search_index")
+    async def index_video_async(self, video_id: str, force: bool = False) -> Tuple[bool, Optional[Dict], Optional[Dict]]:
+        """
+        Embed a video's transcript chunks and add them to the index.
+        
+        The transcript normally comes from the cache or archive, since the
+        video was just processed.
+        
+        Args:
+            video_id (str): YouTube video ID (11 characters)
+            force (bool): Re-index even if the video is already indexed
+        
+        Returns:
+            Tuple[bool, Optional[Dict], Optional[Dict]]:
+            - success (bool): True if the video is indexed
+            - result (dict): video_id, chunks and indexed (False when the
+              video was already indexed and nothing was done)
+            - error (dict): {"error": ..., "detail": ...} if a stage failed
+              ("Search Index Mismatch" if the index holds vectors of
+              another dimension)
+        
+        Raises:
+            UpstreamUnavailable: If OpenAI or YouTube is unavailable
+        """
+        if not force and await asyncio.to_thread(self._is_indexed, video_id):
+            self._counters["skipped"] += 1
+            entry = await asyncio.to_thread(self.index.get, video_id)
+            return True, {"video_id": video_id, "chunks": entry["rows"], "indexed": False}, None
+        
+        success, segments, error = await self.transcript_service.extract_segments_async(video_id)
+        if not success:
+            return False, None, {"error": "Transcript Extraction Failed", "detail": error}
+        
+        chunks = await asyncio.to_thread(self._chunks, segments)
+        if not chunks:
+            return False, None, {"error": "Indexing Failed", "detail": "The transcript has no text to index"}
+        
+        success, vectors, error = await self.ai_service.create_embeddings_async([chunk["text"] for chunk in chunks])
+        if not success:
+            return False, None, {"error": "Indexing Failed", "detail": error}
+        
+        stored_chunks = [{**chunk, "text": chunk["text"][:SNIPPET_CHARS]} for chunk in chunks]
+        try:
+            await asyncio.to_thread(
+                self.index.add, video_id, stored_chunks, vectors,
+                model=self.ai_service.embedding_model, chunker=self.chunker
+            )
+        except ValueError as e:
+            return False, None, self._index_mismatch(e)
+        # Clusters are (re)trained in the background task that added the
+        # rows, not on the search path
+        if await asyncio.to_thread(self.index.needs_ivf_training):
+            await asyncio.to_thread(self.index.train_ivf)
+        
+        self._counters["indexed"] += 1
+        return True, {"video_id": video_id, "chunks": len(chunks), "indexed": True}, None
+    
+    def schedule_indexing(self, video_id: str) -> bool:
+        """
+        Index a video in the background (once, even if called repeatedly).
+        
+        Used after a video was processed; the response does not wait.
+        Indexing runs at batch priority, so its embedding calls never
+        delay interactive generation. Failures are counted in stats().
+        
+        Returns:
+            bool: True if a new indexing task was started
+        """
+        if video_id in self._indexing:
+            return False
+        task = asyncio.ensure_future(self._index_in_background(video_id))
+        self._indexing[video_id] = task
+        task.add_done_callback(lambda _: self._indexing.pop(video_id, None))
+        return True
+    
+    async def _index_in_background(self, video_id: str) -> None:
+        try:
+            with request_priority("batch"):
+                success, _, error = await self.index_video_async(video_id)
+        except Exception as e:  # Includes UpstreamUnavailable: retried next time the video is processed
+            success, error = False, {"error": type(e).__name__, "detail": str(e)}
+        
+        if not success:
+            self._counters["failed"] += 1
+            self._last_error = f"{video_id}: {error['error']}: {error['detail']}"
+    
+    # =====================================================
+    # SEARCH
+    # =====================================================
+    
+    async def _embed_query(self, query: str) -> List[float]:
+        """
+        Embedding of a search query, cached (popular queries repeat).
+        
+        Raises:
+            UpstreamUnavailable: If OpenAI is unavailable
+            RuntimeError: If the embedding call failed
+        """
+        cache_key = make_cache_key("query_embedding", model=self.ai_service.embedding_model, query=query)
+        cached = get_cache().get(cache_key)
+        if cached is not None:
+            return cached
+        
+        success, vectors, error = await self.ai_service.create_embeddings_async([query])
+        if not success:
+            raise RuntimeError(error)
+        get_cache().set(cache_key, vectors[0])
+        return vectors[0]
+    
+    def _index_mismatch(self, error: ValueError) -> Dict[str, str]:
+        """
+        Error for an index built with an embedding model of another
+        dimension (the index raises ValueError when dimensions differ).
+        """
+        return {
+            "error": "Search Index Mismatch",
+            "detail": f"The search index was built with a different embedding model than "
+                      f"{self.ai_service.embedding_model} ({error}). Point SEARCH_INDEX_DIR at a new "
+                      f"directory and re-index, or switch back to the previous EMBEDDING_MODEL."
+        }
+    
+    @staticmethod
+    def _group_by_video(hits: List[Dict[str, Any]], limit: int, matches: int) -> List[Dict[str, Any]]:
+        """
+        Group chunk hits by video, best video first.
+        
+        A video scores as its best chunk; at most `matches` chunks are
+        listed per video.
+        """
+        videos: Dict[str, Dict[str, Any]] = {}
+        for hit in hits:  # Best first
+            video = videos.get(hit["video_id"])
+            if video is None:
+                if len(videos) == limit:
+                    continue
+                video = videos[hit["video_id"]] = {
+                    "video_id": hit["video_id"],
+                    "score": round(hit["score"], 4),
+                    "matches": [],
+                }
+            if len(video["matches"]) < matches:
+                video["matches"].append({
+                    "start": hit["start"],
+                    "end": hit["end"],
+                    "text": hit["text"],
+                    "score": round(hit["score"], 4),
+                })
+        return list(videos.values())
+    
+    @timed("search")
+    async def search_async(self, query: str, limit: int = 10, matches: int = 3) -> Tuple[bool, Optional[Dict], Optional[Dict]]:
+        """
+        Find the indexed videos (and moments) that best match a query.
+        
+        Args:
+            query (str): Natural-language query
+            limit (int): Maximum number of videos
+            matches (int): Maximum matching chunks listed per video
+        
+        Returns:
+            Tuple[bool, Optional[Dict], Optional[Dict]]:
+            - success (bool): True if the search ran
+            - result (dict): query, results (see _group_by_video) and
+              took_ms (index scoring time, excluding the query embedding);
+              only videos indexed with the current embedding model are
+              scored
+            - error (dict): {"error": "Search Index Mismatch", ...} if the
+              index holds vectors of another dimension
+        
+        Raises:
+            UpstreamUnavailable: If the query could not be embedded
+        
+        Example:
+            >>> success, result, error = await search_service.search_async("krebs cycle")
+            >>> result["results"][0]["matches"][0]
+            {'start': 720.0, 'end': 780.5, 'text': 'The Krebs cycle takes ...', 'score': 0.61}
+        """
+        try:
+            vector = await self._embed_query(query)
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            return False, None, {"error": "Search Failed", "detail": str(e)}
+        
+        started = time.perf_counter()
+        candidates = limit * max(matches, CANDIDATES_PER_RESULT)
+        try:
+            hits = await asyncio.to_thread(
+                self.index.search, vector, candidates, model=self.ai_service.embedding_model
+            )
+        except ValueError as e:
+            return False, None, self._index_mismatch(e)
+        return True, {
+            "query": query,
+            "results": self._group_by_video(hits, limit, matches),
+            "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        }, None
+    
+    @timed("search")
+    async def related_videos_async(self, video_id: str, limit: int = 5) -> Tuple[bool, Optional[Dict], Optional[Dict]]:
+        """
+        Indexed videos whose content is closest to a video.
+        
+        Compares the video's mean chunk embedding with the chunks of every
+        other video; no API call is made.
+        
+        Args:
+            video_id (str): An indexed YouTube video ID
+            limit (int): Maximum number of videos
+        
+        Returns:
+            Tuple[bool, Optional[Dict], Optional[Dict]]:
+            - success (bool): False if the video is not indexed (with the
+              current embedding model)
+            - result (dict): video_id and results (each with its closest chunk)
+            - error (dict): {"error": "Video Not Indexed", ...} if not indexed,
+              {"error": "Search Index Mismatch", ...} if the index holds
+              vectors of another dimension
+        """
+        entry = await asyncio.to_thread(self.index.get, video_id)
+        if entry is not None and entry["model"] != self.ai_service.embedding_model:
+            return False, None, {
+                "error": "Video Not Indexed",
+                "detail": f"{video_id} was indexed with {entry['model']}, not the current embedding "
+                          f"model ({self.ai_service.embedding_model}); index it again"
+            }
+        vector = await asyncio.to_thread(self.index.video_vector, video_id)
+        if vector is None:
+            return False, None, {
+                "error": "Video Not Indexed",
+                "detail": f"{video_id} has not been processed (or is still being indexed)"
+            }
+        
+        hits = await asyncio.to_thread(
+            self.index.search, vector, limit * CANDIDATES_PER_RESULT,
+            exclude_video=video_id, model=self.ai_service.embedding_model
+        )
+        return True, {"video_id": video_id, "results": self._group_by_video(hits, limit, 1)}, None
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Index size plus background indexing counters.
+        
+        Opens the index if no request has yet.
+        """
+        return {
+            **self.index.stats(),
+            "embedding_model": self.ai_service.embedding_model,
+            "chunker": self.chunker,
+            "indexing": {
+                **self._counters,
+                "in_progress": len(self._indexing),
+                "last_error": self._last_error,
+            },
+        }
@@ -7,6 +7,8 @@ Purpose:
 - Fetch transcripts from YouTube using YouTube Transcript API
 - Handle errors gracefully (unavailable transcripts, private videos, etc.)
 - Convert transcript data into clean, usable format
+- Keep caption timestamps alongside the text (TranscriptSegments)
+- Archive transcripts on disk so each video is fetched from YouTube once
 - Provide reliable, production-ready transcript extraction
 
 Why Separated as Service:
@@ -26,9 +28,99 @@ By making it a single API call, teachers save hours of manual work
 for every video they want to use in their curriculum.
 """
 
-from typing import Optional, Tuple
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api.formatters import TextFormatter
+import asyncio
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..utils.cache import get_cache, make_cache_key
+from ..utils.clients import register_client
+from ..utils.metrics import timed
+from ..utils.resilience import UpstreamUnavailable, register_upstream
+from ..utils.transcript_archive import get_archive
+from ..utils.transcript_segments import TranscriptSegments
+
+
+# Dedicated, bounded pool for blocking YouTube requests.
+# Keeping it separate from the default executor means a burst of slow
+# transcript fetches cannot starve other work that uses run_in_executor.
+_transcript_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.transcript_max_workers),
+    thread_name_prefix="transcript-fetch"
+)
+
+# Languages requested from YouTube, in order of preference
+TRANSCRIPT_LANGUAGES = ['en']
+
+# Seconds to wait for a TRANSCRIPT_PROVIDER_URL response
+TRANSCRIPT_PROVIDER_TIMEOUT = 30
+
+
+# youtube_transcript_api and requests are imported on the first fetch,
+# not at app startup
+def _load_youtube_transcript_api() -> Any:
+    from youtube_transcript_api import YouTubeTranscriptApi
+    
+    return YouTubeTranscriptApi
+
+
+def _build_provider_session() -> Any:
+    import requests
+    
+    # Shared so provider requests reuse connections
+    return requests.Session()
+
+
+_youtube_transcript_api = register_client("youtube_transcript_api", _load_youtube_transcript_api)
+_provider_session = register_client("transcript_provider", _build_provider_session)
+
+
+def is_transient_youtube_error(error: BaseException) -> bool:
+    """
+    Whether a YouTube error is worth retrying.
+    
+    Rate limiting, 5xx responses and network errors are transient;
+    disabled or missing transcripts and unavailable videos are not.
+    """
+    # Already loaded: only fetches raise errors
+    import requests
+    from youtube_transcript_api import TooManyRequests, YouTubeRequestFailed
+    
+    if isinstance(error, TooManyRequests):
+        return True
+    if isinstance(error, YouTubeRequestFailed):
+        status_code = re.match(r"\s*(\d{3})", error.reason)
+        return bool(status_code) and (status_code.group(1) == "429" or status_code.group(1).startswith("5"))
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        # Transcript provider (TRANSCRIPT_PROVIDER_URL) responses
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def fetch_raw_transcript(video_id: str) -> List[Dict[str, Any]]:
+    """
+    Raw transcript segments ({"text", "start", "duration"}) for a video.
+    
+    Comes from YouTube, or from TRANSCRIPT_PROVIDER_URL when it is set
+    (e.g. the benchmark harness's fake provider). Blocking network call;
+    errors are raised for the caller to classify.
+    """
+    if not settings.transcript_provider_url:
+        return _youtube_transcript_api.get().get_transcript(video_id, languages=TRANSCRIPT_LANGUAGES)
+    
+    response = _provider_session.get().get(
+        f"{settings.transcript_provider_url.rstrip('/')}/transcripts/{video_id}",
+        params={"languages": ",".join(TRANSCRIPT_LANGUAGES)},
+        timeout=TRANSCRIPT_PROVIDER_TIMEOUT
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+# Retries with backoff and a circuit breaker for every YouTube fetch
+_youtube_upstream = register_upstream("youtube", is_transient_youtube_error)
 
 
 class TranscriptService:
@@ -40,6 +132,9 @@ class TranscriptService:
     
     Methods:
         extract_transcript(video_id): Extract transcript for a video
+        extract_transcript_async(video_id): Same, without blocking the event loop
+        extract_segments(video_id): Extract the timestamped caption segments
+        extract_segments_async(video_id): Same, without blocking the event loop
         get_available_languages(video_id): Get available transcript languages
     """
     
@@ -49,10 +144,12 @@ class TranscriptService:
         Extract transcript from a YouTube video.
         
         This method:
-        1. Attempts to fetch transcript in English
-        2. Falls back to auto-generated transcripts if manual unavailable
-        3. Formats transcript as plain text
-        4. Handles errors gracefully
+        1. Returns the cached transcript if this video was fetched before
+           (in-memory cache first, then the on-disk transcript archive)
+        2. Attempts to fetch transcript in English
+        3. Falls back to auto-generated transcripts if manual unavailable
+        4. Formats transcript as plain text
+        5. Handles errors gracefully
         
         Error Cases Handled:
         - TranscriptDisabled: Video has disabled transcripts
@@ -77,17 +174,120 @@ class TranscriptService:
             ... else:
             ...     print(f"Error: {error}")
         """
+        success, segments, error = TranscriptService.extract_segments(video_id)
+        if not success:
+            return False, None, error
+        return True, segments.text, None
+    
+    @staticmethod
+    @timed("transcript")
+    def extract_segments(video_id: str) -> Tuple[bool, Optional[TranscriptSegments], Optional[str]]:
+        """
+        Extract the caption segments of a YouTube video with their timestamps.
+        
+        Same fetching, caching and error handling as extract_transcript,
+        which returns `segments.text` from this method.
+        
+        Args:
+            video_id (str): YouTube video ID (11 characters)
+        
+        Returns:
+            Tuple[bool, Optional[TranscriptSegments], Optional[str]]:
+            - success (bool): True if transcript extracted successfully
+            - segments (TranscriptSegments): Text plus per-segment timestamps
+            - error (str): Error message if failed
+        
+        Example:
+            >>> success, segments, error = TranscriptService.extract_segments("dQw4w9WgXcQ")
+            >>> segments.slice(60, 120).text  # What is said in the second minute
+        """
+        stored_segments = TranscriptService.stored_segments(video_id)
+        if stored_segments is not None:
+            return True, stored_segments, None
+        
+        result = TranscriptService._fetch_segments(video_id)
+        if result[0]:
+            TranscriptService._store_segments(video_id, result[1])
+        return result
+    
+    @staticmethod
+    def stored_segments(video_id: str) -> Optional[TranscriptSegments]:
+        """
+        A transcript fetched earlier, without contacting YouTube.
+        
+        Looks in the cache first, then in the on-disk transcript archive
+        (archive hits are put back in the cache).
+        
+        Args:
+            video_id (str): YouTube video ID (11 characters)
+        
+        Returns:
+            TranscriptSegments: The stored transcript, or None if this video
+            hasn't been fetched (or has expired from the cache and isn't archived)
+        """
+        cache_key = TranscriptService._cache_key(video_id)
+        cached_segments = get_cache().get(cache_key)
+        if cached_segments is not None:
+            return TranscriptSegments.from_dict(cached_segments)
+        
+        archived_segments = TranscriptService._archived_segments(video_id)
+        if archived_segments is not None:
+            get_cache().set(cache_key, archived_segments.to_dict())
+        return archived_segments
+    
+    @staticmethod
+    def _archived_segments(video_id: str) -> Optional[TranscriptSegments]:
+        """
+        Look a transcript up in the on-disk archive (if enabled).
+        """
+        archive = get_archive()
+        if archive is None:
+            return None
+        return archive.get(video_id, TRANSCRIPT_LANGUAGES[0])
+    
+    @staticmethod
+    def _store_segments(video_id: str, segments: TranscriptSegments) -> None:
+        """
+        Keep a freshly fetched transcript in the cache and the archive.
+        
+        get_transcript only returns a transcript in one of
+        TRANSCRIPT_LANGUAGES, so it is archived under the preferred one.
+        """
+        get_cache().set(TranscriptService._cache_key(video_id), segments.to_dict())
+        archive = get_archive()
+        if archive is not None:
+            archive.put(video_id, TRANSCRIPT_LANGUAGES[0], segments)
+    
+    @staticmethod
+    def _cache_key(video_id: str) -> str:
+        """
+        Cache key for a video's transcript segments in the preferred languages.
+        """
+        return make_cache_key("transcript_segments", video_id=video_id, languages=TRANSCRIPT_LANGUAGES)
+    
+    @staticmethod
+    @timed("transcript_fetch")
+    def _fetch_segments(video_id: str) -> Tuple[bool, Optional[TranscriptSegments], Optional[str]]:
+        """
+        Fetch a transcript's segments from YouTube, bypassing the cache.
+        
+        Blocking network call. See extract_transcript for the error cases.
+        Transient failures are retried; if YouTube stays unavailable,
+        UpstreamUnavailable is raised instead of returning an error.
+        """
+        from youtube_transcript_api import NoTranscriptFound, TranscriptsDisabled
         
         try:
             # Try to get transcript in English first
             # prefer_manually_created=True means we try manual transcripts first
             # then fall back to auto-generated if needed
-            transcript_list = YouTubeTranscriptApi.get_transcript(
-                video_id,
-                languages=['en']
-            )
+            transcript_list = _youtube_upstream.call(fetch_raw_transcript, video_id)
+        
+        except UpstreamUnavailable:
+            # YouTube is rate limiting us or down: let the caller answer 503
+            raise
             
-        except YouTubeTranscriptApi.TranscriptsDisabled:
+        except TranscriptsDisabled:
             # Transcript feature is disabled for this video
             error_msg = (
                 "Transcripts are disabled for this video. "
@@ -95,7 +295,7 @@ class TranscriptService:
             )
             return False, None, error_msg
             
-        except YouTubeTranscriptApi.NoTranscriptFound:
+        except NoTranscriptFound:
             # No transcript available even with fallback
             error_msg = (
                 "No transcript available for this video. "
@@ -109,18 +309,68 @@ class TranscriptService:
             return False, None, error_msg
         
         try:
-            # Convert transcript list to plain text
-            # TextFormatter joins all transcript entries into a single string
-            formatter = TextFormatter()
-            transcript_text = formatter.format_transcript(transcript_list)
-            
-            return True, transcript_text, None
+            # Keep the segments with their timestamps; the joined text is
+            # the same plain text TextFormatter used to produce
+            return True, TranscriptSegments.from_segments(transcript_list), None
             
         except Exception as e:
             # Error during formatting
             error_msg = f"Failed to format transcript: {str(e)}"
             return False, None, error_msg
     
+    @staticmethod
+    async def extract_transcript_async(video_id: str) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        Async version of extract_transcript.
+        
+        The cache and archive lookup runs in a worker thread. On a miss,
+        YouTube Transcript API (a blocking library) runs on the dedicated
+        transcript thread pool while the event loop keeps serving other
+        requests.
+        
+        Args:
+            video_id (str): YouTube video ID (11 characters)
+            
+        Returns:
+            Tuple[bool, Optional[str], Optional[str]]: Same as extract_transcript
+        """
+        success, segments, error = await TranscriptService.extract_segments_async(video_id)
+        if not success:
+            return False, None, error
+        return True, segments.text, None
+    
+    @staticmethod
+    @timed("transcript")
+    async def extract_segments_async(video_id: str) -> Tuple[bool, Optional[TranscriptSegments], Optional[str]]:
+        """
+        Async version of extract_segments.
+        
+        Returns:
+            Tuple[bool, Optional[TranscriptSegments], Optional[str]]: Same as extract_segments
+        """
+        # The cache may be SQLite and archive hits are read and decompressed
+        stored_segments = await asyncio.to_thread(TranscriptService.stored_segments, video_id)
+        if stored_segments is not None:
+            return True, stored_segments, None
+        
+        loop = asyncio.get_running_loop()
+        # Run in a copy of this context so the fetch lands on the request's trace
+        result = await loop.run_in_executor(
+            _transcript_executor,
+            contextvars.copy_context().run,
+            TranscriptService._fetch_segments,
+            video_id
+        )
+        if result[0]:
+            # Appending to the archive touches the disk: keep it off the loop
+            await loop.run_in_executor(
+                _transcript_executor,
+                TranscriptService._store_segments,
+                video_id,
+                result[1]
+            )
+        return result
+    
     @staticmethod
     def get_available_languages(video_id: str) -> Tuple[bool, list, Optional[str]]:
         """
@@ -145,7 +395,7 @@ class TranscriptService:
         """
         
         try:
-            transcripts = YouTubeTranscriptApi.list_transcripts(video_id)
+            transcripts = _youtube_transcript_api.get().list_transcripts(video_id)
             
             # Get manually created transcript languages
             manual_languages = [
@@ -0,0 +1,173 @@
+"""
+Video Processing Service
+
+This module runs the complete video-to-learning-package pipeline.
+
+Purpose:
+- Combine transcript extraction and AI content generation in one place
+- Coalesce concurrent requests for the same video into a single run
+- Give every endpoint (and background worker) the same pipeline
+
+Why Separated as Service:
+The pipeline used to live inside the /video/process route. Keeping it in
+a service lets several entry points share it, and lets the single-flight
+layer see every caller for a video regardless of which endpoint they hit.
+
+Search Indexing:
+With a SearchService, every successful run schedules the video for the
+semantic search index in the background (see search_service.py); the
+response never waits for it.
+
+Request Coalescing:
+When a teacher shares one link with a whole class, dozens of identical
+requests arrive at the same moment. Requests for the same video and the
+same generation parameters join one in-flight run instead of each paying
+for their own transcript fetch and OpenAI calls.
+
+Component Selection:
+Callers can ask for only some components (e.g. just the quiz); the other
+ones are never sent to OpenAI. An empty selection fetches the transcript
+only. Runs with different selections are not coalesced.
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+from .transcript_service import TranscriptService
+from .ai_service import AIService
+from .search_service import SearchService
+from ..utils.metrics import timed
+from ..utils.resilience import UpstreamUnavailable, upstream_error
+from ..utils.singleflight import SingleFlight
+
+
+class VideoProcessingService:
+    """
+    Service that turns a YouTube video ID into a learning package.
+    
+    Methods:
+        process_video(video_id, components): Run (or join) the pipeline for a video
+        coalescing_stats(): Metrics about coalesced requests
+    """
+    
+    def __init__(self, transcript_service: TranscriptService, ai_service: AIService,
+                 search_service: Optional[SearchService] = None):
+        """
+        Initialize the pipeline with the services it orchestrates.
+        
+        Args:
+            transcript_service (TranscriptService): Transcript extraction
+            ai_service (AIService): AI content generation
+            search_service (SearchService, optional): Indexes processed
+                videos for semantic search (None disables indexing)
+        """
+        self.transcript_service = transcript_service
+        self.ai_service = ai_service
+        self.search_service = search_service
+        self.flights = SingleFlight()
+    
+    def flight_key(self, video_id: str, components: Optional[Tuple[str, ...]] = None) -> Tuple:
+        """
+        Key identifying identical pipeline runs.
+        
+        Two requests share a run only if they would produce the same
+        output: same video, selected components, transcript normalization,
+        extractive pre-selection, prompts, generation
+        mode, model and token limit.
+        """
+        return (
+            video_id,
+            components,
+            self.ai_service.normalization,
+            self.ai_service.extractive,
+            self.ai_service.prompt_version,
+            self.ai_service.generation_mode,
+            self.ai_service.model,
+            self.ai_service.max_tokens,
+        )
+    
+    async def process_video(self, video_id: str,
+                            components: Optional[Iterable[str]] = None) -> Tuple[bool, Optional[Dict], Optional[Dict]]:
+        """
+        Extract the transcript and generate the learning package.
+        
+        Concurrent calls for the same flight key share one run.
+        
+        Args:
+            video_id (str): YouTube video ID (11 characters)
+            components (iterable, optional): Components to generate (summary,
+                key_points, quiz); None generates all three, an empty
+                selection none
+        
+        Returns:
+            Tuple[bool, Optional[Dict], Optional[Dict]]:
+            - success (bool): True if the package was generated
+            - result (dict): video_id, transcript and the learning package
+              fields (shared between coalesced callers, treat as read-only);
+              with a selection, only the selected components
+            - error (dict): {"error": ..., "detail": ...} if a stage failed.
+              If OpenAI or YouTube is unavailable, error is "Upstream
+              Unavailable" and the dict also has "upstream" and "retry_after".
+        """
+        selection = self.ai_service.requested_components(components)
+        return await self.flights.do(
+            self.flight_key(video_id, selection),
+            lambda: self._run_pipeline(video_id, selection)
+        )
+    
+    @timed("pipeline")
+    async def _run_pipeline(self, video_id: str,
+                            components: Optional[Tuple[str, ...]] = None) -> Tuple[bool, Optional[Dict], Optional[Dict]]:
+        """
+        Run the pipeline once, without coalescing.
+        """
+        try:
+            return await self._run_stages(video_id, components)
+        except UpstreamUnavailable as e:
+            return False, None, upstream_error(e)
+    
+    async def _run_stages(self, video_id: str,
+                          components: Optional[Tuple[str, ...]] = None) -> Tuple[bool, Optional[Dict], Optional[Dict]]:
+        """
+        Transcript extraction followed by AI generation.
+        """
+        # ===== STEP 1: EXTRACT TRANSCRIPT =====
+        transcript_success, transcript, transcript_error = (
+            await self.transcript_service.extract_transcript_async(video_id)
+        )
+        
+        if not transcript_success:
+            return False, None, {
+                "error": "Transcript Extraction Failed",
+                "detail": transcript_error
+            }
+        
+        # ===== STEP 2: GENERATE LEARNING PACKAGE WITH AI =====
+        if components == ():
+            # Transcript only: nothing to generate
+            ai_success, learning_package, ai_error = True, {}, None
+        else:
+            ai_success, learning_package, ai_error = (
+                await self.ai_service.generate_learning_package_async(
+                    transcript, video_id=video_id, components=components
+                )
+            )
+        
+        if not ai_success:
+            return False, None, {
+                "error": "Content Generation Failed",
+                "detail": ai_error
+            }
+        
+        # ===== STEP 3: INDEX FOR SEARCH (BACKGROUND) =====
+        if self.search_service is not None:
+            self.search_service.schedule_indexing(video_id)
+        
+        result = {"video_id": video_id, "transcript": transcript}
+        result.update(learning_package)
+        return True, result, None
+    
+    def coalescing_stats(self) -> Dict:
+        """
+        Metrics about coalesced requests (see SingleFlight.stats).
+        """
+        return self.flights.stats()
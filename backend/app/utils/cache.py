@@ -0,0 +1,454 @@
+"""
+Cache Utilities
+
+This module provides the pluggable cache used in front of transcript
+extraction and AI content generation.
+
+Purpose:
+- Avoid re-fetching transcripts for videos we have already seen
+- Avoid paying for fresh completions when nothing about the request changed
+- Serve popular videos from memory in milliseconds
+
+Backends:
+- MemoryCache: In-process LRU with TTL and byte-size eviction (default)
+- SQLiteCache: On-disk cache that survives restarts
+- RedisCache: Shared cache on a Redis-compatible server (needs `redis` package)
+- TieredCache: Memory in front of one of the persistent backends
+
+Values must be JSON-serializable. They are stored serialized, so every
+`get` returns a fresh copy that callers are free to modify.
+
+Usage:
+    from app.utils.cache import get_cache, make_cache_key
+    cache = get_cache()
+    key = make_cache_key("transcript", video_id=video_id, language="en")
+    cached = cache.get(key)
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import settings
+
+# Shared by every key this app writes, so clear() can find them all on a
+# shared server without knowing the namespaces
+KEY_PREFIX = "app:"
+
+
+def make_cache_key(namespace: str, **parts: Any) -> str:
+    """
+    Build a stable, content-addressed cache key.
+    
+    The parts are serialized with sorted keys and hashed, so the same
+    inputs always produce the same key regardless of argument order.
+    
+    Args:
+        namespace (str): Key prefix, e.g. "transcript" or "package"
+        **parts: Values identifying the cached item
+    
+    Returns:
+        str: Key in the form "app:<namespace>:<sha256 hex digest>"
+    
+    Example:
+        >>> make_cache_key("transcript", video_id="dQw4w9WgXcQ", language="en")
+        'app:transcript:5c0d...'
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}{namespace}:{digest}"
+
+
+def _serialize(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def _deserialize(raw: bytes) -> Any:
+    return json.loads(raw)
+
+
+class CacheBackend:
+    """
+    Interface shared by all cache backends.
+    
+    Methods:
+        get(key): Return the cached value or None
+        get_with_ttl(key): Return the value and its remaining TTL
+        set(key, value, ttl): Store a value, optionally with a TTL in seconds
+        delete(key): Remove a value
+        clear(): Remove everything
+        stats(): Hit/miss counters and backend details
+    """
+    
+    name = "base"
+    
+    def __init__(self, default_ttl: Optional[float] = None):
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+    
+    def _expires_at(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = self.default_ttl if ttl is None else ttl
+        if not ttl or ttl <= 0:
+            return None
+        return time.time() + ttl
+    
+    def _record(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+    
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+    
+    def get_with_ttl(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        """
+        The cached value (or None) and its remaining TTL in seconds: 0 if
+        it never expires, None if the backend can't tell.
+        """
+        return self.get(key), None
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+    
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+    
+    def clear(self) -> None:
+        raise NotImplementedError
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class NullCache(CacheBackend):
+    """
+    Cache that stores nothing. Used when caching is disabled.
+    """
+    
+    name = "none"
+    
+    def get(self, key: str) -> Optional[Any]:
+        self._record(False)
+        return None
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        return None
+    
+    def delete(self, key: str) -> None:
+        return None
+    
+    def clear(self) -> None:
+        return None
+
+
+class MemoryCache(CacheBackend):
+    """
+    Thread-safe in-process LRU cache with TTL and byte-size eviction.
+    
+    Entries are evicted least-recently-used first whenever either the
+    entry count or the total serialized size goes over its limit.
+    Expired entries are dropped lazily when they are looked up.
+    
+    Args:
+        max_entries (int): Maximum number of entries kept
+        max_bytes (int): Maximum total size of serialized values
+        default_ttl (float, optional): Seconds before an entry expires
+    """
+    
+    name = "memory"
+    
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024,
+                 default_ttl: Optional[float] = None):
+        super().__init__(default_ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.evictions = 0
+        # key -> (serialized value, expires_at)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                raw, expires_at = entry
+                if expires_at is not None and expires_at <= time.time():
+                    self._remove(key)
+                    entry = None
+                else:
+                    self._entries.move_to_end(key)
+        
+        self._record(entry is not None)
+        return _deserialize(raw) if entry is not None else None
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raw = _serialize(value)
+        if len(raw) > self.max_bytes:
+            # Never let a single oversized value flush the whole cache
+            return
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (raw, self._expires_at(ttl))
+            self.current_bytes += len(raw)
+            
+            while (len(self._entries) > self.max_entries
+                   or self.current_bytes > self.max_bytes):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+    
+    def _remove(self, key: str) -> None:
+        # Caller must hold self._lock
+        raw, _ = self._entries.pop(key)
+        self.current_bytes -= len(raw)
+    
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        })
+        return stats
+
+
+class SQLiteCache(CacheBackend):
+    """
+    On-disk cache stored in a single SQLite file.
+    
+    Survives restarts and can be shared by several worker processes on the
+    same machine (SQLite handles the file locking).
+    
+    Args:
+        path (str): Path of the SQLite database file
+        default_ttl (float, optional): Seconds before an entry expires
+    """
+    
+    name = "sqlite"
+    
+    def __init__(self, path: str, default_ttl: Optional[float] = None):
+        super().__init__(default_ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " expires_at REAL"
+            ")"
+        )
+        self._conn.commit()
+    
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_with_ttl(key)[0]
+    
+    def get_with_ttl(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] is not None and row[1] <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+        
+        self._record(row is not None)
+        if row is None:
+            return None, None
+        return _deserialize(row[0]), (row[1] - now if row[1] is not None else 0)
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, _serialize(value), self._expires_at(ttl))
+            )
+            self._conn.commit()
+    
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache on a Redis-compatible server (Redis, Valkey, KeyDB, ...).
+    
+    Requires the optional `redis` package.
+    
+    Args:
+        url (str): Connection URL, e.g. redis://localhost:6379/0
+        default_ttl (float, optional): Seconds before an entry expires
+    """
+    
+    name = "redis"
+    
+    def __init__(self, url: str, default_ttl: Optional[float] = None):
+        super().__init__(default_ttl)
+        try:
+            import redis
+        except ImportError:
+            raise ValueError(
+                "CACHE_BACKEND=redis requires the 'redis' package. "
+                "Install it with: pip install redis"
+            )
+        self._client = redis.Redis.from_url(url)
+    
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(key)
+        self._record(raw is not None)
+        return _deserialize(raw) if raw is not None else None
+    
+    def get_with_ttl(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        # MULTI/EXEC: the TTL is read atomically with the value
+        pipeline = self._client.pipeline(transaction=True)
+        pipeline.get(key)
+        pipeline.pttl(key)
+        raw, pttl = pipeline.execute()
+        self._record(raw is not None)
+        if raw is None:
+            return None, None
+        # PTTL is -1 for a key without expiry
+        return _deserialize(raw), (pttl / 1000 if pttl > 0 else 0)
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        self._client.set(key, _serialize(value), ex=int(ttl) if ttl else None)
+    
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+    
+    def clear(self) -> None:
+        # Only remove our own keys, never FLUSHDB a shared server
+        for key in self._client.scan_iter(match=f"{KEY_PREFIX}*"):
+            self._client.delete(key)
+
+
+class TieredCache(CacheBackend):
+    """
+    In-process memory cache in front of a persistent backend.
+    
+    Reads try memory first; persistent hits are copied into memory, for
+    the entry's remaining TTL, so the next lookup is served without
+    touching disk or network (and never outlives the persistent entry).
+    """
+    
+    def __init__(self, memory: MemoryCache, persistent: CacheBackend):
+        super().__init__(memory.default_ttl)
+        self.memory = memory
+        self.persistent = persistent
+        self.name = f"memory+{persistent.name}"
+    
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None:
+            value, ttl = self.persistent.get_with_ttl(key)
+            if value is not None:
+                self.memory.set(key, value, ttl)
+        
+        self._record(value is not None)
+        return value
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.memory.set(key, value, ttl)
+        self.persistent.set(key, value, ttl)
+    
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        self.persistent.delete(key)
+    
+    def clear(self) -> None:
+        self.memory.clear()
+        self.persistent.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["memory"] = self.memory.stats()
+        stats["persistent"] = self.persistent.stats()
+        return stats
+
+
+def build_cache() -> CacheBackend:
+    """
+    Build the cache backend selected by the CACHE_BACKEND setting.
+    
+    Returns:
+        CacheBackend: "none", "memory", "sqlite" or "redis" backend.
+        Persistent backends are fronted by the in-memory LRU.
+    """
+    backend = settings.cache_backend.lower()
+    ttl = settings.cache_ttl_seconds
+    
+    if backend == "none":
+        return NullCache()
+    
+    memory = MemoryCache(
+        max_entries=settings.cache_max_entries,
+        max_bytes=settings.cache_max_bytes,
+        default_ttl=ttl
+    )
+    
+    if backend == "memory":
+        return memory
+    if backend == "sqlite":
+        return TieredCache(memory, SQLiteCache(settings.cache_sqlite_path, default_ttl=ttl))
+    if backend == "redis":
+        return TieredCache(memory, RedisCache(settings.cache_redis_url, default_ttl=ttl))
+    
+    raise ValueError(
+        f"Unknown CACHE_BACKEND '{settings.cache_backend}'. "
+        "Use one of: none, memory, sqlite, redis."
+    )
+
+
+_cache: Optional[CacheBackend] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> CacheBackend:
+    """
+    Get the process-wide cache, building it on first use.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = build_cache()
+    return _cache
@@ -0,0 +1,103 @@
+"""
+Client Registry - Lazily Built, Process-Wide API Clients
+
+This module builds expensive clients (OpenAI, the shared HTTP connection
+pool, the YouTube transcript library) on first use instead of at import.
+
+Purpose:
+- Fast app startup: `openai`, `httpx` and `youtube_transcript_api` are
+  imported only when the first request needs them, so a cold instance
+  answers health checks sooner
+- One client per process, shared by every service instance
+- Cheap health checks: client_states() reads what has been built without
+  building anything
+
+Registering a Client:
+    from app.utils.clients import register_client
+
+    def _build_openai_client():
+        from openai import OpenAI  # Deferred import
+        return OpenAI(api_key=...)
+
+    _openai_client = register_client("openai", _build_openai_client)
+
+    client = _openai_client.get()  # Built on the first call, then reused
+
+A factory that raises is not cached: the error is recorded for
+client_states() and the next get() tries again.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class LazyClient:
+    """
+    A client built by `factory` on first use.
+
+    Thread-safe: concurrent first calls build it once.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._instance: Any = None
+        self._build_seconds: Optional[float] = None
+        self._last_error: Optional[str] = None
+
+    def get(self) -> Any:
+        """
+        The client, building it if this is the first call.
+
+        Raises:
+            Exception: Whatever the factory raises (e.g. missing API key)
+        """
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                started = time.perf_counter()
+                try:
+                    self._instance = self.factory()
+                except Exception as e:
+                    self._last_error = str(e)
+                    raise
+                self._build_seconds = time.perf_counter() - started
+                self._last_error = None
+            return self._instance
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+
+    def state(self) -> Dict[str, Any]:
+        """
+        What is known about the client, without building it.
+        """
+        return {
+            "initialized": self.initialized,
+            "build_ms": round(self._build_seconds * 1000, 1) if self._build_seconds is not None else None,
+            "last_error": self._last_error,
+        }
+
+
+_clients: Dict[str, LazyClient] = {}
+
+
+def register_client(name: str, factory: Callable[[], Any]) -> LazyClient:
+    """
+    Create (or return) the process-wide lazy client with this name.
+    """
+    if name not in _clients:
+        _clients[name] = LazyClient(name, factory)
+    return _clients[name]
+
+
+def client_states() -> Dict[str, Dict[str, Any]]:
+    """
+    Snapshot of every registered client (never builds one).
+    """
+    return {name: client.state() for name, client in _clients.items()}
@@ -0,0 +1,253 @@
+"""
+Extractive Selection - Salient Sentences Within a Token Budget
+
+This module picks the most informative sentences of a transcript, locally,
+so a prompt can carry a fraction of the lecture instead of all of it.
+
+Purpose:
+- Key points and quiz questions are built from a lecture's central ideas;
+  the greetings, tangents and repetitions around them only cost tokens
+- Cut prompt size several times over on long videos with no API call
+- Keep the selected sentences in lecture order, so the text still reads
+  like the lecture
+
+How Sentences Are Ranked:
+1. Each sentence becomes a TF-IDF vector over the transcript's content
+   words (stop words removed, unit length)
+2. Scores (AI_EXTRACTIVE_METHOD):
+   - textrank: PageRank over the sentence similarity graph. A sentence
+     scores high when it is similar to many other high-scoring sentences,
+     i.e. it states something the lecture keeps coming back to.
+   - tfidf: similarity to the whole transcript's TF-IDF centroid. Cheaper,
+     a little less robust to long digressions.
+3. Sentences are taken best first until the budget is used, each one
+   penalized by its similarity to sentences already taken (maximal
+   marginal relevance), so the selection covers several topics instead of
+   restating the main one
+
+All scoring is vectorized with NumPy: a three-hour lecture (~2,000
+sentences) is ranked in well under a second.
+
+Example:
+    >>> text, stats = select_salient_sentences(transcript, token_budget=1500)
+    >>> stats["original_tokens"], stats["selected_tokens"]
+    (14210, 1496)
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from .text_chunking import count_tokens
+
+# Part of the learning package cache key: bump when selection changes
+EXTRACTIVE_VERSION = 1
+
+METHODS = ("textrank", "tfidf")
+
+# Sentence boundary: end punctuation (optionally closed by a quote or
+# bracket) followed by whitespace
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+_WORD = re.compile(r"[a-z0-9][a-z0-9'-]*")
+
+# Unpunctuated captions arrive as very long "sentences"; split them so a
+# single one can't take the whole budget
+MAX_SENTENCE_WORDS = 60
+# Sentences shorter than this ("Right.", "Any questions?") are never selected
+MIN_SENTENCE_WORDS = 4
+
+# TextRank: PageRank damping, and the iteration limit / convergence bound
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+# Maximal marginal relevance: share of a candidate's score given up per
+# unit of similarity to the closest sentence already selected
+REDUNDANCY_PENALTY = 0.5
+
+# Only terms in the most sentences are kept as TF-IDF dimensions, which
+# bounds memory (sentences x terms) on very long lectures: the matrix is
+# only allocated once the vocabulary has been cut down
+MAX_TERMS = 4096
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each even few for from further get gets
+getting go goes going gonna got had has have having he her here hers him his how i if in into is it its
+itself just know let like ll me more most my no nor not now of off on once one only or other our ours
+out over own really right re s said same say says see she should so some something such t than that
+thats the their theirs them then there these they thing things think this those through to too um uh
+under until up us ve very want was way we well were what when where which while who whom why will with
+would yeah yes you your yours okay ok actually basically kind sort lot
+""".split())
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences, breaking up overly long ones.
+    
+    Args:
+        text (str): Transcript text (normalized text works best)
+    
+    Returns:
+        list: Sentences in order
+    """
+    sentences = []
+    for sentence in _SENTENCE_BOUNDARY.split(text):
+        words = sentence.split()
+        for start in range(0, len(words), MAX_SENTENCE_WORDS):
+            sentences.append(" ".join(words[start:start + MAX_SENTENCE_WORDS]))
+    return sentences
+
+
+def tfidf_matrix(sentences: List[str]) -> np.ndarray:
+    """
+    Unit-length TF-IDF row per sentence (zero rows for sentences with no
+    content words).
+    
+    Returns:
+        np.ndarray: float32 matrix of shape (sentences, terms)
+    """
+    vocabulary: Dict[str, int] = {}
+    rows, columns = [], []
+    for row, sentence in enumerate(sentences):
+        for word in _WORD.findall(sentence.lower()):
+            if word in STOP_WORDS or len(word) < 3:
+                continue
+            rows.append(row)
+            columns.append(vocabulary.setdefault(word, len(vocabulary)))
+    if not vocabulary:
+        return np.zeros((len(sentences), 1), dtype=np.float32)
+    
+    terms = len(vocabulary)
+    rows_array = np.array(rows, dtype=np.int64)
+    columns_array = np.array(columns, dtype=np.int64)
+    # Document frequency from the distinct (sentence, term) pairs, so the
+    # term cap applies before any sentences x terms matrix is allocated
+    pairs = np.unique(rows_array * terms + columns_array)
+    document_frequency = np.bincount(pairs % terms, minlength=terms)
+    if terms > MAX_TERMS:
+        keep = np.argpartition(-document_frequency, MAX_TERMS - 1)[:MAX_TERMS]
+        new_column = np.full(terms, -1, dtype=np.int64)
+        new_column[keep] = np.arange(MAX_TERMS)
+        columns_array = new_column[columns_array]
+        kept = columns_array >= 0
+        rows_array, columns_array = rows_array[kept], columns_array[kept]
+        document_frequency = document_frequency[keep]
+    
+    counts = np.zeros((len(sentences), len(document_frequency)), dtype=np.float32)
+    np.add.at(counts, (rows_array, columns_array), 1.0)
+    
+    # Sublinear term frequency, smoothed inverse document frequency; in
+    # place, so the matrix is the only sentences x terms allocation
+    weights = np.log1p(counts, out=counts)
+    weights *= (np.log((1 + len(sentences)) / (1 + document_frequency)) + 1).astype(np.float32)
+    norms = np.sqrt(np.einsum("ij,ij->i", weights, weights))[:, None]
+    weights /= np.maximum(norms, 1e-12)
+    return weights
+
+
+def textrank_scores(vectors: np.ndarray) -> np.ndarray:
+    """
+    PageRank of each sentence in the cosine-similarity graph.
+    """
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # Row-stochastic transitions; isolated sentences jump uniformly
+    transitions = np.where(out_weight > 0, similarity / np.maximum(out_weight, 1e-12), 1.0 / len(vectors))
+    
+    scores = np.full(len(vectors), 1.0 / len(vectors), dtype=np.float32)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / len(vectors) + DAMPING * (scores @ transitions)
+        converged = np.abs(updated - scores).sum() < TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def centroid_scores(vectors: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity of each sentence to the transcript's centroid.
+    """
+    centroid = vectors.sum(axis=0)
+    return vectors @ (centroid / max(float(np.linalg.norm(centroid)), 1e-12))
+
+
+@lru_cache(maxsize=16)
+def select_salient_sentences(text: str, token_budget: int, method: str = "textrank",
+                             model: str = "gpt-3.5-turbo") -> Tuple[str, Dict[str, Any]]:
+    """
+    The most informative sentences of a text, in original order, within a
+    token budget.
+    
+    Results are cached per input, so components sharing a transcript (key
+    points and quiz) rank it once.
+    
+    Args:
+        text (str): Transcript text
+        token_budget (int): Maximum tokens of the selected text
+        method (str): "textrank" or "tfidf" (see the module docstring)
+        model (str): Model whose tokenizer measures the budget
+    
+    Returns:
+        Tuple[str, dict]:
+        - text (str): Selected sentences joined with spaces (the original
+          text if it already fits the budget)
+        - stats (dict): method, sentences, selected_sentences,
+          original_tokens, selected_tokens and ratio (original / selected)
+    
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown extractive method {method!r} (expected one of {', '.join(METHODS)})")
+    
+    original_tokens = count_tokens(text, model)
+    sentences = split_sentences(text)
+    stats: Dict[str, Any] = {
+        "method": method,
+        "sentences": len(sentences),
+        "selected_sentences": len(sentences),
+        "original_tokens": original_tokens,
+        "selected_tokens": original_tokens,
+        "ratio": 1.0,
+    }
+    if original_tokens <= token_budget or len(sentences) < 2:
+        return text, stats
+    
+    vectors = tfidf_matrix(sentences)
+    scores = textrank_scores(vectors) if method == "textrank" else centroid_scores(vectors)
+    # Scale to [0, 1] so the redundancy penalty means the same for both methods
+    scores = (scores - scores.min()) / max(float(scores.max() - scores.min()), 1e-12)
+    sentence_tokens = np.array([count_tokens(sentence, model) for sentence in sentences])
+    eligible = np.array([len(sentence.split()) >= MIN_SENTENCE_WORDS for sentence in sentences])
+    
+    selected = np.zeros(len(sentences), dtype=bool)
+    # Similarity of each sentence to the closest selected one
+    redundancy = np.zeros(len(sentences), dtype=np.float32)
+    remaining = token_budget
+    while True:
+        candidates = eligible & ~selected & (sentence_tokens <= remaining)
+        if not candidates.any():
+            break
+        gains = np.where(candidates, scores - REDUNDANCY_PENALTY * redundancy, -np.inf)
+        best = int(np.argmax(gains))
+        selected[best] = True
+        remaining -= int(sentence_tokens[best])
+        redundancy = np.maximum(redundancy, vectors @ vectors[best])
+    
+    if not selected.any():
+        return text, stats
+    
+    selected_text = " ".join(sentence for sentence, keep in zip(sentences, selected) if keep)
+    selected_tokens = count_tokens(selected_text, model)
+    stats.update({
+        "selected_sentences": int(selected.sum()),
+        "selected_tokens": selected_tokens,
+        "ratio": round(original_tokens / max(selected_tokens, 1), 2),
+    })
+    return selected_text, stats
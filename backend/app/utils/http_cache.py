@@ -0,0 +1,93 @@
+"""
+HTTP Caching Utilities - ETags and Conditional Requests
+
+This module lets browsers and CDNs reuse learning packages they already
+have instead of downloading them again.
+
+Purpose:
+- Give every learning package a stable ETag: the same video with the same
+  generated content always has the same tag, in every worker process
+- Answer If-None-Match with 304 Not Modified when the client's copy is
+  current, so a Dashboard reload costs a few hundred bytes instead of the
+  whole transcript and quiz
+
+ETags:
+Tags are weak (W/"..."): responses with the same tag carry the same
+transcript and learning package, but per-request fields such as timings
+and cached may differ. The tag is built from the package's content hash,
+computed once when the package is cached (see AIService._store_package),
+plus the transcript hash and the video ID.
+
+Usage:
+    etag = package_etag(result)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, cache_control)
+"""
+
+import hashlib
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Response, status
+
+
+def package_etag(result: Dict[str, Any], fields: Optional[Iterable[str]] = None) -> str:
+    """
+    Weak ETag of a processed video (pipeline result).
+    
+    Args:
+        result (dict): video_id, transcript and the learning package,
+            including its content_sha256
+        fields (iterable, optional): Fields the response was limited to
+            (None = all), so responses with different fields get different tags
+    
+    Returns:
+        str: ETag header value, e.g. 'W/"3f1c9a..."'
+    """
+    digest = hashlib.sha256()
+    digest.update(result["video_id"].encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(hashlib.sha256(result["transcript"].encode("utf-8")).digest())
+    digest.update(result.get("content_sha256", "").encode("ascii"))
+    if fields is not None:
+        digest.update(("\0" + ",".join(sorted(fields))).encode("utf-8"))
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches an ETag (weak comparison, as
+    RFC 9110 requires for If-None-Match).
+    
+    Args:
+        if_none_match (str, optional): Header value: "*", or a comma-separated
+            list of tags
+        etag (str): The current ETag
+    
+    Returns:
+        bool: True if the client's copy is current
+    
+    Example:
+        >>> etag_matches('"abc", W/"def"', 'W/"def"')
+        True
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = _opaque_tag(etag)
+    return any(_opaque_tag(tag) == current for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str, cache_control: Optional[str] = None) -> Response:
+    """
+    304 Not Modified response carrying the validator and caching headers.
+    """
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -0,0 +1,90 @@
+"""
+Incremental JSON Parsing Utilities
+
+This module parses a JSON array of objects while it is still streaming in.
+
+Purpose:
+- Emit each quiz question as soon as the model has finished writing it
+- Avoid waiting for the whole completion before showing anything
+
+Why Separated as Utility:
+Model output arrives a few characters at a time, so `json.loads` can only
+run once the whole array is complete. This parser tracks string and brace
+state across chunks and yields every top-level object the moment its
+closing brace arrives.
+"""
+
+import json
+from typing import Any, Dict, List
+
+
+class JsonArrayStreamParser:
+    """
+    Incrementally extract the objects of a top-level JSON array.
+    
+    Text before the opening "[" (e.g. "Here are your questions:") is
+    ignored, like the non-streaming quiz parser does. Objects that are not
+    valid JSON are skipped; the final validation of the full text reports
+    the error.
+    
+    Example:
+        >>> parser = JsonArrayStreamParser()
+        >>> parser.feed('[{"a": 1}, {"b"')
+        [{'a': 1}]
+        >>> parser.feed(': 2}]')
+        [{'b': 2}]
+    """
+    
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._in_array = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+    
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Add streamed text and return the objects completed by it.
+        
+        Args:
+            text (str): Next piece of model output
+        
+        Returns:
+            List[dict]: Objects whose closing brace was in this piece
+        """
+        completed = []
+        
+        for char in text:
+            if not self._in_array:
+                if char == "[":
+                    self._in_array = True
+                continue
+            
+            if self._depth > 0:
+                self._buffer.append(char)
+            
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._buffer = [char]
+                self._depth += 1
+            elif char == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        completed.append(json.loads("".join(self._buffer)))
+                    except json.JSONDecodeError:
+                        pass
+                    self._buffer = []
+        
+        return completed
@@ -0,0 +1,420 @@
+"""
+Metrics Utilities - Prometheus Instrumentation
+
+This module collects the numbers behind capacity planning and exposes
+them on GET /metrics in the Prometheus text format.
+
+Purpose:
+- Latency histograms per pipeline stage (URL validation, transcript,
+  each AI component, the whole pipeline), so a slow request can be
+  attributed to the stage that was slow
+- LLM prompt/completion token counters by component
+- Transcript tokens before and after normalization (tokens saved)
+- Cache hit ratios, in-flight gauges and error counters by type
+
+Instrumenting Code:
+    from app.utils.metrics import timed
+    
+    @timed("summary")
+    def generate_summary(self, transcript): ...
+    
+    with timed("transcript_fetch"):
+        ...
+
+`timed` works on functions, coroutine functions and as a context manager.
+It observes the duration, tracks in-flight calls, counts raised
+exceptions, and counts `(False, None, error)` results (the services'
+failure convention) as errors. While a stage runs it is the "current
+stage", which is how LLM token counts get their component label.
+Each timed stage is also recorded as a span on the current request's
+trace (see tracing.py).
+
+Why Not prometheus_client:
+The app needs three metric types and the text format; a small
+thread-safe implementation avoids a dependency and a process-global
+registry that is awkward with --reload and multiple app instances.
+Metrics are per process: scrape every worker (or run one).
+"""
+
+import functools
+import inspect
+import math
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .tracing import record_span
+
+# Latency buckets (seconds): sub-millisecond cache hits to multi-minute
+# map-reduce runs
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_current_stage: ContextVar[Optional[str]] = ContextVar("metrics_stage", default=None)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """
+    Base class: a named metric with labelled children.
+    """
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], Any] = {}
+    
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+    
+    def labels(self, **labels: Any) -> Any:
+        """
+        The child for one combination of label values.
+        """
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+        return child
+    
+    def _samples(self) -> List[Tuple[str, Tuple[str, ...], str, float]]:
+        raise NotImplementedError
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, values, extra, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, values, extra)} {_format_value(value)}")
+        return lines
+
+
+class _Value:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+    
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+    
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+    
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = value
+
+
+class Counter(Metric):
+    """
+    Monotonically increasing count (e.g. tokens used, errors).
+    
+    By convention the name ends in "_total".
+    """
+    
+    kind = "counter"
+    
+    def _new_child(self) -> _Value:
+        return _Value()
+    
+    def _samples(self):
+        with self._lock:
+            children = list(self._children.items())
+        return [("", values, "", child.value) for values, child in children]
+
+
+class Gauge(Metric):
+    """
+    Value that goes up and down (e.g. requests in flight).
+    """
+    
+    kind = "gauge"
+    
+    def _new_child(self) -> _Value:
+        return _Value()
+    
+    def _samples(self):
+        with self._lock:
+            children = list(self._children.items())
+        return [("", values, "", child.value) for values, child in children]
+
+
+class _HistogramValue:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values in cumulative buckets (e.g. latency).
+    """
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+    
+    def _samples(self):
+        with self._lock:
+            children = list(self._children.items())
+        
+        samples = []
+        for values, child in children:
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                samples.append(("_bucket", values, f'le="{_format_value(bound)}"', cumulative))
+            samples.append(("_bucket", values, 'le="+Inf"', count))
+            samples.append(("_sum", values, "", total))
+            samples.append(("_count", values, "", count))
+        return samples
+
+
+class Registry:
+    """
+    The metrics of one process, plus collectors read at scrape time.
+    
+    Collectors are callables returning (name, kind, help, [(labels, value)])
+    tuples for state that lives elsewhere (cache stats, breaker state, ...).
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], List[Tuple[str, str, str, List[Tuple[Dict[str, Any], float]]]]]] = []
+    
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+    
+    def add_collector(self, collector: Callable) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+    
+    def render(self) -> str:
+        """
+        Every metric in the Prometheus text exposition format.
+        """
+        with self._lock:
+            metrics, collectors = list(self._metrics), list(self._collectors)
+        
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                families = collector()
+            except Exception:
+                continue  # A broken collector must not break the scrape
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    names = tuple(labels)
+                    lines.append(f"{name}{_format_labels(names, tuple(labels[n] for n in names))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.register(Histogram(
+    "svlt_stage_duration_seconds",
+    "Time spent in each pipeline stage",
+    ["stage"]
+))
+STAGE_IN_FLIGHT = registry.register(Gauge(
+    "svlt_stage_in_flight",
+    "Pipeline stage calls currently running",
+    ["stage"]
+))
+STAGE_ERRORS = registry.register(Counter(
+    "svlt_stage_errors_total",
+    "Failed stage calls by error type",
+    ["stage", "type"]
+))
+LLM_TOKENS = registry.register(Counter(
+    "svlt_llm_tokens_total",
+    "OpenAI tokens used, by component and kind (prompt/completion)",
+    ["component", "kind"]
+))
+TRANSCRIPT_TOKENS = registry.register(Counter(
+    "svlt_transcript_tokens_total",
+    "Transcript tokens before and after normalization (kind: original/normalized) "
+    "and extractive pre-selection (kind: extractive_input/extractive_selected)",
+    ["kind"]
+))
+LLM_CALLS = registry.register(Counter(
+    "svlt_llm_calls_total",
+    "OpenAI chat completion calls by component",
+    ["component"]
+))
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "svlt_http_request_duration_seconds",
+    "HTTP request latency by handler, method and status",
+    ["handler", "method", "status"]
+))
+HTTP_IN_FLIGHT = registry.register(Gauge(
+    "svlt_http_requests_in_flight",
+    "HTTP requests currently being served"
+))
+HTTP_COMPRESSION_BYTES = registry.register(Counter(
+    "svlt_http_compression_bytes_total",
+    "Bytes of compressed response bodies before and after compression, by encoding "
+    "(kind: uncompressed/compressed)",
+    ["encoding", "kind"]
+))
+
+
+def current_stage() -> Optional[str]:
+    """
+    Innermost stage currently running (see timed), or None.
+    """
+    return _current_stage.get()
+
+
+def record_llm_usage(prompt_tokens: Optional[int], completion_tokens: Optional[int],
+                     component: Optional[str] = None) -> None:
+    """
+    Count one LLM call and its tokens.
+    
+    Args:
+        prompt_tokens (int, optional): Prompt tokens (None if unknown)
+        completion_tokens (int, optional): Completion tokens (None if unknown)
+        component (str, optional): Defaults to the current stage
+    """
+    component = component or current_stage() or "other"
+    LLM_CALLS.labels(component=component).inc()
+    if prompt_tokens:
+        LLM_TOKENS.labels(component=component, kind="prompt").inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels(component=component, kind="completion").inc(completion_tokens)
+
+
+def record_error(stage: str, error_type: str) -> None:
+    """
+    Count a failure that didn't go through timed (e.g. a streamed stage).
+    """
+    STAGE_ERRORS.labels(stage=stage, type=error_type).inc()
+
+
+class timed:
+    """
+    Time a pipeline stage: decorator (sync or async) or context manager.
+    
+    Example:
+        >>> @timed("quiz")
+        ... async def generate_quiz_async(self, transcript): ...
+        
+        >>> with timed("validate_url"):
+        ...     is_valid, video_id = is_valid_youtube_url(url)
+    """
+    
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._tokens: List[Any] = []
+        self._starts: List[float] = []
+    
+    # ----- context manager -----
+    
+    def _enter(self) -> Tuple[Any, float]:
+        STAGE_IN_FLIGHT.labels(stage=self.stage).inc()
+        return _current_stage.set(self.stage), time.perf_counter()
+    
+    def _exit(self, token: Any, started: float, error: Optional[BaseException], result: Any = None) -> None:
+        _current_stage.reset(token)
+        STAGE_IN_FLIGHT.labels(stage=self.stage).dec()
+        STAGE_SECONDS.labels(stage=self.stage).observe(time.perf_counter() - started)
+        error_type = None
+        if error is not None:
+            error_type = type(error).__name__
+        elif isinstance(result, tuple) and result and result[0] is False:
+            error_type = "failed"
+        if error_type:
+            STAGE_ERRORS.labels(stage=self.stage, type=error_type).inc()
+        record_span(self.stage, started, error=error_type)
+    
+    def __enter__(self) -> "timed":
+        token, started = self._enter()
+        self._tokens.append(token)
+        self._starts.append(started)
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        self._exit(self._tokens.pop(), self._starts.pop(), exc)
+        return False
+    
+    # ----- decorator -----
+    
+    def __call__(self, function: Callable) -> Callable:
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                token, started = self._enter()
+                try:
+                    result = await function(*args, **kwargs)
+                except BaseException as e:
+                    self._exit(token, started, e)
+                    raise
+                self._exit(token, started, None, result)
+                return result
+            return async_wrapper
+        
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            token, started = self._enter()
+            try:
+                result = function(*args, **kwargs)
+            except BaseException as e:
+                self._exit(token, started, e)
+                raise
+            self._exit(token, started, None, result)
+            return result
+        return wrapper
@@ -0,0 +1,72 @@
+"""
+Pinned HTTP Transport - Connect to a Pre-Validated IP Address
+
+This module provides an httpx transport that sends every request to one
+IP address chosen in advance, whatever the URL's host name resolves to
+by the time the connection is opened.
+
+Purpose:
+- Close the gap between checking where a URL points and connecting to
+  it: a host name with a short DNS TTL can resolve to a public address
+  for the check and to 127.0.0.1 or 169.254.169.254 for the request
+  (DNS rebinding). Connecting to the checked address removes the second
+  lookup entirely.
+- Keep the request otherwise unchanged: the Host header and the TLS
+  server name (SNI, certificate check) still use the URL's host name
+
+Usage:
+    transport = PinnedTransport("93.184.216.34")
+    async with httpx.AsyncClient(transport=transport, trust_env=False) as client:
+        await client.post("https://example.com/hook", json=payload)
+
+Imports httpx/httpcore at import time; import this module lazily from
+code paths that must stay out of app startup.
+"""
+
+from typing import Any, Optional
+
+import httpcore
+import httpx
+
+
+class _PinnedNetworkBackend(httpcore.AsyncNetworkBackend):
+    """
+    Network backend whose TCP connections all go to one address.
+    
+    httpcore passes the URL's host name to connect_tcp() and, separately,
+    to the TLS handshake; only the former is replaced.
+    """
+    
+    def __init__(self, address: str, backend: httpcore.AsyncNetworkBackend):
+        self.address = address
+        self._backend = backend
+    
+    async def connect_tcp(self, host: str, port: int, timeout: Optional[float] = None,
+                          local_address: Optional[str] = None, socket_options: Any = None):
+        return await self._backend.connect_tcp(
+            self.address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+        )
+    
+    async def connect_unix_socket(self, path: str, timeout: Optional[float] = None, socket_options: Any = None):
+        raise httpcore.ConnectError("Unix sockets are not allowed through a pinned transport")
+    
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class PinnedTransport(httpx.AsyncHTTPTransport):
+    """
+    httpx transport connecting to `address` instead of resolving the host.
+    
+    Use it with AsyncClient(trust_env=False): a proxy from the environment
+    would bypass the transport and look the host name up itself.
+    
+    Args:
+        address (str): IP address to connect to (already validated)
+        **kwargs: Passed to httpx.AsyncHTTPTransport
+    """
+    
+    def __init__(self, address: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        pool = self._pool
+        pool._network_backend = _PinnedNetworkBackend(address, pool._network_backend)
@@ -0,0 +1,411 @@
+"""
+Rate Governor - Client-Side Quota Enforcement
+
+This module keeps our OpenAI usage inside the account's quotas
+(tokens per minute and requests per minute) before OpenAI has to.
+
+Purpose:
+- Estimate what each call will cost and admit it through token buckets
+  sized to the configured TPM/RPM, so bursts are smoothed out locally
+  instead of being answered with 429s
+- Queue excess calls by priority: interactive requests (a student
+  waiting on the page) go before batch work (batch endpoint, jobs)
+- Measure throughput against the quota for the health endpoint
+
+How It Works:
+Two token buckets refill continuously at quota/60 per second and hold
+at most one minute of quota. A call reserves its estimated tokens and
+one request; if either bucket is short, the call waits in a priority
+queue (FIFO within a priority) until the buckets have refilled. Calls
+that would wait longer than the queue timeout fail with
+UpstreamUnavailable, which the routes report as 503 with Retry-After.
+
+Limits apply per process. With several server workers, divide the
+account quota between them.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from .resilience import UpstreamUnavailable
+
+
+# Priority classes, most urgent first
+PRIORITIES = ("interactive", "batch")
+DEFAULT_PRIORITY = "interactive"
+
+_current_priority: ContextVar[str] = ContextVar("request_priority", default=DEFAULT_PRIORITY)
+
+
+@contextmanager
+def request_priority(priority: str) -> Iterator[None]:
+    """
+    Run the enclosed calls (and the tasks they start) at a priority class.
+    
+    Example:
+        >>> with request_priority("batch"):
+        ...     await video_processing_service.process_video(video_id)
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority {priority!r}; expected one of {PRIORITIES}")
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> str:
+    """
+    Priority class of the current request (interactive unless set).
+    """
+    return _current_priority.get()
+
+
+class TokenBucket:
+    """
+    Continuously refilling bucket holding at most `capacity` units.
+    
+    Not thread-safe on its own; RateGovernor guards it with its lock.
+    """
+    
+    def __init__(self, capacity: float, refill_per_second: float):
+        """
+        Args:
+            capacity (float): Most units the bucket holds (the burst size)
+            refill_per_second (float): Units added back per second
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.level = capacity
+        self._updated = time.monotonic()
+    
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self.level = min(self.capacity, self.level + elapsed * self.refill_per_second)
+        self._updated = now
+    
+    def wait_time(self, amount: float, now: float) -> float:
+        """
+        Seconds until `amount` units are available (0 if they are now).
+        """
+        self._refill(now)
+        deficit = amount - self.level
+        return max(0.0, deficit / self.refill_per_second)
+    
+    def take(self, amount: float, now: float) -> None:
+        """
+        Remove `amount` units (call after wait_time returned 0).
+        """
+        self._refill(now)
+        self.level -= amount
+
+
+class RateGovernor:
+    """
+    Priority-queued admission control for one rate-limited upstream.
+    
+    Methods:
+        acquire(tokens): Block the calling thread until the call is admitted
+        acquire_async(tokens): Same, without blocking the event loop
+        record_usage(tokens): Report what an admitted call actually used
+        stats(): Quota utilization and queue state
+    
+    Example:
+        >>> governor = RateGovernor("openai", tokens_per_minute=90000, requests_per_minute=3500)
+        >>> await governor.acquire_async(estimated_tokens)
+        >>> response = await client.chat.completions.create(**request)
+        >>> governor.record_usage(response.usage.total_tokens)
+    """
+    
+    # How often queued calls that aren't first in line re-check the queue
+    POLL_INTERVAL = 0.05
+    
+    # Window (seconds) of the throughput figures in stats()
+    WINDOW_SECONDS = 60.0
+    
+    def __init__(self, name: str, tokens_per_minute: int = 0, requests_per_minute: int = 0,
+                 queue_timeout: float = 120.0):
+        """
+        Args:
+            name (str): Upstream name, used in errors and stats
+            tokens_per_minute (int): Token quota (0 = unlimited)
+            requests_per_minute (int): Request quota (0 = unlimited)
+            queue_timeout (float): Longest a call may wait to be admitted
+        """
+        self.name = name
+        self.tokens_per_minute = max(0, tokens_per_minute)
+        self.requests_per_minute = max(0, requests_per_minute)
+        self.queue_timeout = queue_timeout
+        
+        self._tokens = (
+            TokenBucket(self.tokens_per_minute, self.tokens_per_minute / 60)
+            if self.tokens_per_minute else None
+        )
+        self._requests = (
+            TokenBucket(self.requests_per_minute, self.requests_per_minute / 60)
+            if self.requests_per_minute else None
+        )
+        
+        self._lock = threading.Lock()
+        self._queue: List[Tuple[int, int]] = []  # Heap of (priority rank, arrival)
+        self._arrivals = itertools.count()
+        self._reserved: Deque[Tuple[float, int]] = deque()  # (admitted at, tokens)
+        self._used: Deque[Tuple[float, int]] = deque()  # (finished at, tokens)
+        self._priority_stats = {
+            priority: {"admitted": 0, "timed_out": 0, "total_wait": 0.0, "max_wait": 0.0}
+            for priority in PRIORITIES
+        }
+    
+    @property
+    def enabled(self) -> bool:
+        return self._tokens is not None or self._requests is not None
+    
+    # =====================================================
+    # ADMISSION
+    # =====================================================
+    
+    def _enqueue(self, priority: str) -> Tuple[int, int]:
+        ticket = (PRIORITIES.index(priority), next(self._arrivals))
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+        return ticket
+    
+    def _evict(self, now: float) -> None:
+        """
+        Drop stats entries older than the window (caller holds the lock), so
+        the deques stay bounded even if stats() is never called.
+        """
+        cutoff = now - self.WINDOW_SECONDS
+        for window in (self._reserved, self._used):
+            while window and window[0][0] < cutoff:
+                window.popleft()
+    
+    def _try_admit(self, ticket: Tuple[int, int], tokens: int) -> float:
+        """
+        Admit the call if it is first in line and both buckets allow it.
+        
+        Returns:
+            float: 0 if admitted, otherwise seconds to wait before retrying
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._evict(now)
+            if self._queue[0] != ticket:
+                return self.POLL_INTERVAL
+            
+            wait = max(
+                self._tokens.wait_time(tokens, now) if self._tokens else 0.0,
+                self._requests.wait_time(1, now) if self._requests else 0.0
+            )
+            if wait > 0:
+                return wait
+            
+            if self._tokens:
+                self._tokens.take(tokens, now)
+            if self._requests:
+                self._requests.take(1, now)
+            heapq.heappop(self._queue)
+            self._reserved.append((now, tokens))
+            return 0.0
+    
+    def _leave_queue(self, ticket: Tuple[int, int]) -> None:
+        """
+        Remove a call that gave up (timed out or was cancelled) from the queue.
+        """
+        with self._lock:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+    
+    def _record_wait(self, priority: str, waited: float, admitted: bool) -> None:
+        with self._lock:
+            stats = self._priority_stats[priority]
+            if admitted:
+                stats["admitted"] += 1
+                stats["total_wait"] += waited
+                stats["max_wait"] = max(stats["max_wait"], waited)
+            else:
+                stats["timed_out"] += 1
+    
+    def _clamp(self, tokens: int) -> int:
+        # A call larger than the bucket could never be admitted; let it
+        # through once the bucket is full and let OpenAI be the judge
+        if self._tokens:
+            return max(1, min(int(tokens), self.tokens_per_minute))
+        return max(1, int(tokens))
+    
+    def _timeout_error(self, delay: float) -> UpstreamUnavailable:
+        with self._lock:
+            queued = len(self._queue)
+        return UpstreamUnavailable(
+            self.name,
+            f"{self.name} quota is saturated ({queued} calls queued); retry later",
+            retry_after=max(delay, self.POLL_INTERVAL)
+        )
+    
+    def acquire(self, tokens: int, priority: Optional[str] = None) -> None:
+        """
+        Wait (blocking the thread) until a call of `tokens` tokens may start.
+        
+        Args:
+            tokens (int): Estimated tokens (prompt plus max completion)
+            priority (str, optional): Priority class; defaults to current_priority()
+        
+        Raises:
+            UpstreamUnavailable: If the call would wait longer than queue_timeout
+        """
+        if not self.enabled:
+            return
+        
+        priority = priority or current_priority()
+        tokens = self._clamp(tokens)
+        started = time.monotonic()
+        ticket = self._enqueue(priority)
+        admitted = False
+        try:
+            while True:
+                delay = self._try_admit(ticket, tokens)
+                if delay == 0:
+                    admitted = True
+                    return
+                if time.monotonic() + delay - started > self.queue_timeout:
+                    raise self._timeout_error(delay)
+                time.sleep(delay)
+        finally:
+            if not admitted:
+                self._leave_queue(ticket)
+            self._record_wait(priority, time.monotonic() - started, admitted)
+    
+    async def acquire_async(self, tokens: int, priority: Optional[str] = None) -> None:
+        """
+        Async version of acquire: waits without blocking the event loop.
+        
+        A cancelled caller leaves the queue without using any quota.
+        """
+        if not self.enabled:
+            return
+        
+        priority = priority or current_priority()
+        tokens = self._clamp(tokens)
+        started = time.monotonic()
+        ticket = self._enqueue(priority)
+        admitted = False
+        try:
+            while True:
+                delay = self._try_admit(ticket, tokens)
+                if delay == 0:
+                    admitted = True
+                    return
+                if time.monotonic() + delay - started > self.queue_timeout:
+                    raise self._timeout_error(delay)
+                await asyncio.sleep(delay)
+        finally:
+            if not admitted:
+                self._leave_queue(ticket)
+            self._record_wait(priority, time.monotonic() - started, admitted)
+    
+    def record_usage(self, tokens: Optional[int]) -> None:
+        """
+        Report the tokens an admitted call actually used (for stats).
+        
+        The reservation itself isn't refunded: OpenAI's own limiter also
+        counts max_tokens when a request is accepted.
+        """
+        if tokens is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._evict(now)
+            self._used.append((now, int(tokens)))
+    
+    # =====================================================
+    # STATS
+    # =====================================================
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Throughput over the last minute compared to the quota, and queue state.
+        
+        Example:
+            {
+                "enabled": True,
+                "tokens_per_minute": 90000,
+                "requests_per_minute": 3500,
+                "last_minute": {
+                    "requests": 41,
+                    "reserved_tokens": 86120,
+                    "used_tokens": 51877,
+                    "token_utilization": 0.957,
+                    "request_utilization": 0.012
+                },
+                "queued": {"interactive": 0, "batch": 6},
+                "priorities": {
+                    "interactive": {"admitted": 35, "timed_out": 0, "avg_wait": 0.21, "max_wait": 1.9},
+                    "batch": {"admitted": 6, "timed_out": 0, "avg_wait": 14.7, "max_wait": 31.2}
+                }
+            }
+        """
+        with self._lock:
+            self._evict(time.monotonic())
+            requests = len(self._reserved)
+            reserved_tokens = sum(tokens for _, tokens in self._reserved)
+            used_tokens = sum(tokens for _, tokens in self._used)
+            queued = {priority: 0 for priority in PRIORITIES}
+            for rank, _ in self._queue:
+                queued[PRIORITIES[rank]] += 1
+            priorities = {
+                priority: {
+                    "admitted": stats["admitted"],
+                    "timed_out": stats["timed_out"],
+                    "avg_wait": round(stats["total_wait"] / stats["admitted"], 3) if stats["admitted"] else 0.0,
+                    "max_wait": round(stats["max_wait"], 3),
+                }
+                for priority, stats in self._priority_stats.items()
+            }
+        
+        return {
+            "enabled": self.enabled,
+            "tokens_per_minute": self.tokens_per_minute or None,
+            "requests_per_minute": self.requests_per_minute or None,
+            "last_minute": {
+                "requests": requests,
+                "reserved_tokens": reserved_tokens,
+                "used_tokens": used_tokens,
+                "token_utilization": (
+                    round(reserved_tokens / self.tokens_per_minute, 3) if self.tokens_per_minute else None
+                ),
+                "request_utilization": (
+                    round(requests / self.requests_per_minute, 3) if self.requests_per_minute else None
+                ),
+            },
+            "queued": queued,
+            "priorities": priorities,
+        }
+
+
+_governors: Dict[str, RateGovernor] = {}
+
+
+def register_governor(name: str, tokens_per_minute: int, requests_per_minute: int,
+                      queue_timeout: float) -> RateGovernor:
+    """
+    Create (or return) the process-wide RateGovernor with this name.
+    """
+    if name not in _governors:
+        _governors[name] = RateGovernor(name, tokens_per_minute, requests_per_minute, queue_timeout)
+    return _governors[name]
+
+
+def governor_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Stats of every registered governor.
+    """
+    return {name: governor.stats() for name, governor in _governors.items()}
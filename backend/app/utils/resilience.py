@@ -0,0 +1,384 @@
+"""
+Resilience Utilities - Retries and Circuit Breakers
+
+This module protects the app from transient failures of the services it
+depends on (OpenAI and YouTube).
+
+Purpose:
+- Retry transient failures (rate limits, 5xx, timeouts) with jittered
+  exponential backoff, honoring the upstream's Retry-After header
+- Stop calling an upstream that keeps failing (circuit breaker), so a
+  degraded dependency fails fast instead of being hammered
+- Expose breaker state for the health endpoints
+
+Why Separated as Utility:
+Both the AI service and the transcript service call flaky third-party
+APIs. The retry and breaker logic is the same for both; only the rule for
+"is this error worth retrying?" differs, so each service registers its
+upstream with its own classifier.
+
+How Failures Surface:
+When retries are exhausted, the breaker is open, or the upstream asks us
+to wait longer than RETRY_MAX_DELAY, an UpstreamUnavailable error is
+raised. The routes turn it into 503 Service Unavailable with a
+Retry-After header, instead of a generic processing failure.
+"""
+
+import asyncio
+import math
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..config import settings
+
+
+# Value of "error" in error responses caused by UpstreamUnavailable
+UPSTREAM_UNAVAILABLE = "Upstream Unavailable"
+
+
+class UpstreamUnavailable(Exception):
+    """
+    An upstream service can't be used right now; the caller should retry later.
+    
+    Attributes:
+        upstream (str): Name of the upstream, e.g. "openai"
+        retry_after (float, optional): Suggested seconds to wait before retrying
+    """
+    
+    def __init__(self, upstream: str, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+def upstream_error(error: UpstreamUnavailable) -> Dict[str, Any]:
+    """
+    Error dict for an UpstreamUnavailable, in the shape the routes return.
+    
+    Example:
+        {
+            "error": "Upstream Unavailable",
+            "detail": "openai is temporarily unavailable: Rate limit reached...",
+            "upstream": "openai",
+            "retry_after": 12
+        }
+    """
+    return {
+        "error": UPSTREAM_UNAVAILABLE,
+        "detail": str(error),
+        "upstream": error.upstream,
+        "retry_after": max(1, math.ceil(error.retry_after or 1)),
+    }
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Read the Retry-After hint from an HTTP error, if it carries one.
+    
+    Supports "retry-after-ms" (OpenAI), and "retry-after" as seconds or
+    as an HTTP date.
+    
+    Returns:
+        float: Seconds to wait, or None if the error has no hint
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    
+    try:
+        if headers.get("retry-after-ms"):
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        if re.fullmatch(r"\s*\d+(\.\d+)?\s*", value):
+            return max(0.0, float(value))
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff.
+    
+    Attempt n (0-based) waits a random time between 0 and
+    base_delay * 2**n, capped at max_delay ("full jitter"), so clients
+    that failed together don't retry together. A Retry-After hint from
+    the upstream replaces the exponential delay.
+    """
+    
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 20.0):
+        """
+        Args:
+            max_attempts (int): Total attempts, including the first call
+            base_delay (float): Seconds of the first backoff step
+            max_delay (float): Longest wait between attempts
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+    
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Seconds to wait before the next attempt.
+        
+        Args:
+            attempt (int): 0-based index of the attempt that just failed
+            retry_after (float, optional): Upstream's Retry-After hint
+        
+        Returns:
+            float: Delay in seconds, or None if the upstream asked for a
+            longer wait than max_delay (better to fail fast and let the
+            client come back later)
+        """
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                return None
+            return retry_after + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Per-upstream circuit breaker.
+    
+    States:
+    - closed: calls go through; consecutive transient failures are counted
+    - open: after `failure_threshold` failures in a row, calls fail
+      immediately for `recovery_timeout` seconds
+    - half_open: after the timeout, one trial call is let through; success
+      closes the breaker, failure opens it again
+    
+    Thread-safe: used from the event loop and from worker threads.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """
+        Args:
+            name (str): Upstream name, used in errors and health output
+            failure_threshold (int): Consecutive failures that open the breaker
+            recovery_timeout (float): Seconds to stay open before a trial call
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._times_opened = 0
+        self._rejected = 0
+    
+    def before_call(self) -> None:
+        """
+        Check that a call may go through.
+        
+        Raises:
+            UpstreamUnavailable: If the breaker is open (or a half-open
+            trial call is already running)
+        """
+        with self._lock:
+            if self._state == self.OPEN:
+                remaining = self._opened_at + self.recovery_timeout - time.monotonic()
+                if remaining > 0:
+                    self._rejected += 1
+                    raise UpstreamUnavailable(
+                        self.name,
+                        f"{self.name} is unavailable (circuit open after repeated failures)",
+                        retry_after=remaining
+                    )
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            
+            if self._state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    self._rejected += 1
+                    raise UpstreamUnavailable(
+                        self.name,
+                        f"{self.name} is recovering; retry shortly",
+                        retry_after=1.0
+                    )
+                self._trial_in_flight = True
+    
+    def record_success(self) -> None:
+        """
+        The upstream answered (even with a non-retryable error): close the breaker.
+        """
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+    
+    def release_trial(self) -> None:
+        """
+        A call ended without an answer either way (e.g. it was cancelled).
+        """
+        with self._lock:
+            self._trial_in_flight = False
+    
+    def record_failure(self) -> None:
+        """
+        A transient failure: count it, and open the breaker at the threshold.
+        """
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current state for health checks.
+        """
+        with self._lock:
+            state = self._state
+            retry_in = None
+            if state == self.OPEN:
+                retry_in = max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+                if retry_in == 0:
+                    state = self.HALF_OPEN
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "times_opened": self._times_opened,
+                "rejected_calls": self._rejected,
+                "retry_in": round(retry_in, 1) if retry_in is not None else None,
+            }
+
+
+class Upstream:
+    """
+    A dependency called through a retry policy and a circuit breaker.
+    
+    Example:
+        >>> openai_upstream = register_upstream("openai", is_transient_openai_error)
+        >>> response = openai_upstream.call(client.chat.completions.create, **request)
+    """
+    
+    def __init__(self, name: str, is_transient: Callable[[BaseException], bool],
+                 policy: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            name (str): Upstream name
+            is_transient (callable): Returns True for errors worth retrying
+            policy (RetryPolicy, optional): Defaults to the configured policy
+            breaker (CircuitBreaker, optional): Defaults to a configured breaker
+        """
+        self.name = name
+        self.is_transient = is_transient
+        self.policy = policy or RetryPolicy(
+            max_attempts=settings.retry_max_attempts,
+            base_delay=settings.retry_base_delay,
+            max_delay=settings.retry_max_delay
+        )
+        self.breaker = breaker or CircuitBreaker(
+            name,
+            failure_threshold=settings.breaker_failure_threshold,
+            recovery_timeout=settings.breaker_recovery_seconds
+        )
+    
+    def _after_failure(self, error: Exception, attempt: int) -> float:
+        """
+        Classify a failed attempt and decide how long to wait.
+        
+        Returns:
+            float: Seconds to sleep before the next attempt
+        
+        Raises:
+            The original error if it isn't transient, or UpstreamUnavailable
+            if no further attempt should be made
+        """
+        if not self.is_transient(error):
+            # The upstream is up; the request itself was bad
+            self.breaker.record_success()
+            raise error
+        
+        self.breaker.record_failure()
+        retry_after = retry_after_seconds(error)
+        delay = None
+        if attempt + 1 < self.policy.max_attempts:
+            delay = self.policy.backoff(attempt, retry_after)
+        
+        if delay is None:
+            raise UpstreamUnavailable(
+                self.name,
+                f"{self.name} is temporarily unavailable: {error}",
+                retry_after=retry_after if retry_after is not None else self.policy.max_delay
+            ) from error
+        return delay
+    
+    def call(self, function: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call a blocking function with retries (sleeps the calling thread).
+        
+        Raises:
+            UpstreamUnavailable: Breaker open or retries exhausted
+            Exception: Non-transient errors from `function`, unchanged
+        """
+        for attempt in range(self.policy.max_attempts):
+            self.breaker.before_call()
+            try:
+                result = function(*args, **kwargs)
+            except UpstreamUnavailable:
+                # Raised before reaching the upstream (e.g. quota queue timeout)
+                self.breaker.release_trial()
+                raise
+            except Exception as e:
+                time.sleep(self._after_failure(e, attempt))
+                continue
+            self.breaker.record_success()
+            return result
+    
+    async def call_async(self, function: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Await a coroutine function with retries (without blocking the loop).
+        
+        Raises:
+            UpstreamUnavailable: Breaker open or retries exhausted
+            Exception: Non-transient errors from `function`, unchanged
+        """
+        for attempt in range(self.policy.max_attempts):
+            self.breaker.before_call()
+            try:
+                result = await function(*args, **kwargs)
+            except (asyncio.CancelledError, UpstreamUnavailable):
+                self.breaker.release_trial()
+                raise
+            except Exception as e:
+                await asyncio.sleep(self._after_failure(e, attempt))
+                continue
+            self.breaker.record_success()
+            return result
+
+
+_upstreams: Dict[str, Upstream] = {}
+
+
+def register_upstream(name: str, is_transient: Callable[[BaseException], bool]) -> Upstream:
+    """
+    Create (or return) the process-wide Upstream with this name.
+    """
+    if name not in _upstreams:
+        _upstreams[name] = Upstream(name, is_transient)
+    return _upstreams[name]
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """
+    Snapshot of every registered upstream's circuit breaker.
+    """
+    return {name: upstream.breaker.snapshot() for name, upstream in _upstreams.items()}
@@ -0,0 +1,112 @@
+"""
+Single-Flight Request Coalescing
+
+This module collapses concurrent calls for the same work into one.
+
+Purpose:
+- When many requests ask for the same thing at the same time, run the
+  underlying computation once and hand every caller the same result
+- Protect YouTube and OpenAI from thundering-herd load (e.g. a class of
+  60 students opening the same video link at once)
+- Record how many callers joined each flight
+
+How It Works:
+The first caller for a key starts the computation as its own asyncio task
+(the "flight"). Callers that arrive while the flight is running await the
+same task instead of starting another one. The flight is shielded, so a
+caller that disconnects does not cancel the work for everyone else.
+Once the flight finishes, the key is released; later callers start a new
+flight (results are reused across time by the cache, not by this layer).
+
+Usage:
+    flights = SingleFlight()
+    result = await flights.do(key, lambda: compute(video_id))
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent async computations by key.
+    
+    Results are shared between all callers of a flight, so callers must
+    treat them as read-only.
+    
+    Args:
+        history_size (int): Number of finished flights kept for stats()
+    """
+    
+    def __init__(self, history_size: int = 50):
+        # key -> running flight, and key -> number of callers sharing it
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self.total_flights = 0
+        self.total_coalesced = 0
+        self.max_waiters = 0
+        self._recent = deque(maxlen=history_size)
+    
+    async def do(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `work()` for `key`, or join the flight already running for it.
+        
+        Args:
+            key: Identifies the computation (must be hashable)
+            work: Zero-argument callable returning an awaitable
+        
+        Returns:
+            Any: The flight's result (shared by every caller)
+        
+        Raises:
+            Exception: Whatever the flight raised, re-raised in every caller
+        """
+        task = self._flights.get(key)
+        
+        if task is None:
+            task = asyncio.ensure_future(self._run(key, work))
+            self._flights[key] = task
+            self._waiters[key] = 1
+            self.total_flights += 1
+        else:
+            self._waiters[key] += 1
+            self.total_coalesced += 1
+        
+        # Shield so one caller going away does not cancel the shared work
+        return await asyncio.shield(task)
+    
+    async def _run(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        try:
+            return await work()
+        finally:
+            waiters = self._waiters.pop(key, 1)
+            self._flights.pop(key, None)
+            self.max_waiters = max(self.max_waiters, waiters)
+            self._recent.append({
+                "key": str(key),
+                "waiters": waiters,
+                "duration_seconds": round(time.perf_counter() - started, 3),
+            })
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Coalescing metrics.
+        
+        Returns:
+            dict:
+            - in_flight: Flights currently running
+            - flights: Flights started since startup
+            - coalesced: Callers that joined an existing flight
+            - max_waiters: Largest number of callers sharing one flight
+            - recent: Most recent finished flights with their waiter counts
+        """
+        return {
+            "in_flight": len(self._flights),
+            "flights": self.total_flights,
+            "coalesced": self.total_coalesced,
+            "max_waiters": self.max_waiters,
+            "recent": list(self._recent),
+        }
@@ -0,0 +1,139 @@
+"""
+Text Chunking Utilities
+
+This module measures and splits long texts to fit model context limits.
+
+Purpose:
+- Estimate how many tokens a transcript will cost in a prompt
+- Split long transcripts into overlapping chunks on natural boundaries
+- Support map-reduce generation for multi-hour lectures
+
+Token Counting:
+If the optional `tiktoken` package is installed, counts are exact for the
+configured model. Otherwise a fast heuristic (about 4 characters per
+English token) is used, which is close enough for budgeting.
+"""
+
+import re
+from typing import List
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency
+    tiktoken = None
+
+
+# Average characters per token for English text (OpenAI's rule of thumb)
+CHARS_PER_TOKEN = 4.0
+
+# Sentence ends followed by whitespace: preferred places to cut a chunk
+_SENTENCE_BOUNDARY = re.compile(r'[.!?]\s+')
+
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """
+    Count (or estimate) the number of tokens in a text.
+    
+    Args:
+        text (str): Text to measure
+        model (str): OpenAI model the text will be sent to
+    
+    Returns:
+        int: Token count
+    
+    Example:
+        >>> count_tokens("Photosynthesis converts light into energy.")
+        7
+    """
+    if not text:
+        return 0
+    
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        return len(encoding.encode(text))
+    
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def _cut_position(text: str, start: int, end: int) -> int:
+    """
+    Find where to end a chunk that should stop near `end`.
+    
+    Prefers the last sentence boundary in the final fifth of the window,
+    then the last whitespace, and only cuts mid-word as a last resort.
+    """
+    if end >= len(text):
+        return len(text)
+    
+    window_start = start + int((end - start) * 0.8)
+    
+    last_sentence_end = None
+    for match in _SENTENCE_BOUNDARY.finditer(text, window_start, end):
+        last_sentence_end = match.end()
+    if last_sentence_end is not None:
+        return last_sentence_end
+    
+    last_space = text.rfind(" ", window_start, end)
+    if last_space == -1:
+        last_space = text.rfind("\n", window_start, end)
+    if last_space > start:
+        return last_space + 1
+    
+    return end
+
+
+def split_into_chunks(text: str, max_tokens: int, overlap_tokens: int = 0,
+                      model: str = "gpt-3.5-turbo") -> List[str]:
+    """
+    Split a text into chunks of at most roughly `max_tokens` tokens.
+    
+    Consecutive chunks share about `overlap_tokens` tokens, so ideas that
+    straddle a boundary are seen whole by at least one chunk. Chunks end
+    on sentence or word boundaries where possible.
+    
+    Args:
+        text (str): Text to split
+        max_tokens (int): Token budget per chunk
+        overlap_tokens (int): Tokens repeated between neighbouring chunks
+        model (str): OpenAI model used for token counting
+    
+    Returns:
+        List[str]: Chunks in their original order (one chunk if the text fits)
+    
+    Example:
+        >>> chunks = split_into_chunks(long_transcript, max_tokens=3000, overlap_tokens=200)
+        >>> len(chunks)
+        12
+    """
+    total_tokens = count_tokens(text, model)
+    if total_tokens <= max_tokens:
+        return [text]
+    
+    # Work in characters using the text's own chars-per-token ratio,
+    # which avoids tokenizing every candidate chunk.
+    chars_per_token = len(text) / total_tokens
+    chunk_chars = max(1, int(max_tokens * chars_per_token))
+    overlap_chars = min(int(overlap_tokens * chars_per_token), chunk_chars // 2)
+    
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = _cut_position(text, start, start + chunk_chars)
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        
+        # Step back for the overlap, but always make progress
+        next_start = end - overlap_chars
+        if overlap_chars:
+            space = text.find(" ", next_start, end)
+            if space != -1:
+                next_start = space + 1
+        start = max(next_start, start + 1)
+    
+    return chunks
@@ -0,0 +1,271 @@
+"""
+Tracing Utilities - Per-Request Spans and Structured Logs
+
+This module records where each HTTP request spent its time, so a slow
+request can be explained after the fact instead of only counted.
+
+Purpose:
+- Give every request a trace: a request id plus a list of spans (URL
+  validation, transcript fetch, each LLM call, response serialization)
+- Write one structured JSON log line per request with the span breakdown
+- Keep the slowest recent requests in memory for the admin endpoint
+
+How Spans Get Recorded:
+- Every stage wrapped in metrics.timed() is also a span, so the existing
+  stage instrumentation doubles as the trace (no second set of decorators)
+- Other code can open a span directly:
+    
+    from app.utils.tracing import span
+    
+    with span("llm_call", model="gpt-3.5-turbo") as attributes:
+        response = client.chat.completions.create(...)
+        attributes["completion_tokens"] = response.usage.completion_tokens
+
+- Outside a request (background jobs, scripts) there is no trace and
+  spans cost nothing
+
+The trace lives in a ContextVar, so it follows the request into
+asyncio tasks and (via contextvars.copy_context) into worker threads.
+
+Log Line Example:
+    {"ts": "2024-05-01T12:00:00.123Z", "level": "INFO", "logger": "svlt.requests",
+     "event": "request", "request_id": "3f2a...", "method": "POST",
+     "path": "/api/video/process", "status": 200, "duration_ms": 5234.1,
+     "stages": {"validate_url": 0.1, "transcript": 812.4, "llm_call": 4301.9, ...}}
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+
+# Logger for the one-line-per-request log
+REQUEST_LOGGER = "svlt.requests"
+
+
+class Trace:
+    """
+    Spans recorded while serving one request.
+    
+    Span times are milliseconds relative to the start of the request.
+    Spans may be added from several threads (parallel AI calls), so
+    adding is locked.
+    """
+    
+    def __init__(self, request_id: str, method: str = "", path: str = ""):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.handler_returned: Optional[float] = None
+        self._lock = threading.Lock()
+        self.spans: List[Dict[str, Any]] = []
+    
+    def elapsed_ms(self, at: Optional[float] = None) -> float:
+        """
+        Milliseconds from the start of the request to `at` (default: now).
+        """
+        return ((at if at is not None else time.perf_counter()) - self.started) * 1000
+    
+    def add_span(self, name: str, started: float, ended: Optional[float] = None,
+                 error: Optional[str] = None, **attributes: Any) -> None:
+        """
+        Record a finished span.
+        
+        Args:
+            name (str): Span name (usually the stage name)
+            started (float): time.perf_counter() at the start of the span
+            ended (float, optional): time.perf_counter() at its end (default: now)
+            error (str, optional): Exception type or "failed" if the span failed
+            **attributes: Extra fields (model, tokens, ...)
+        """
+        ended = ended if ended is not None else time.perf_counter()
+        span = {
+            "name": name,
+            "start_ms": round(self.elapsed_ms(started), 2),
+            "duration_ms": round((ended - started) * 1000, 2),
+        }
+        if error:
+            span["error"] = error
+        span.update(attributes)
+        with self._lock:
+            self.spans.append(span)
+    
+    def stage_totals(self) -> Dict[str, float]:
+        """
+        Total milliseconds per span name (parallel spans add up).
+        """
+        totals: Dict[str, float] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            totals[span["name"]] = round(totals.get(span["name"], 0.0) + span["duration_ms"], 2)
+        return totals
+    
+    def to_dict(self, **fields: Any) -> Dict[str, Any]:
+        """
+        The trace as a JSON-serializable dict, spans in start order.
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span["start_ms"])
+        return {
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(),
+            **fields,
+            "spans": spans,
+        }
+
+
+def current_trace() -> Optional[Trace]:
+    """
+    The trace of the request being served, or None outside a request.
+    """
+    return _current_trace.get()
+
+
+def start_trace(trace: Trace) -> Any:
+    """
+    Make `trace` current; returns a token for end_trace.
+    """
+    return _current_trace.set(trace)
+
+
+def end_trace(token: Any) -> None:
+    _current_trace.reset(token)
+
+
+def record_span(name: str, started: float, error: Optional[str] = None, **attributes: Any) -> None:
+    """
+    Add a span ending now to the current trace (no-op outside a request).
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_span(name, started, error=error, **attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Record the enclosed block as a span on the current trace.
+    
+    Yields the attribute dict, so values only known at the end (token
+    counts) can be added inside the block.
+    
+    Example:
+        >>> with span("llm_call", component="quiz") as attributes:
+        ...     attributes["retries"] = 1
+    """
+    started = time.perf_counter()
+    error = None
+    try:
+        yield attributes
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        record_span(name, started, error=error, **attributes)
+
+
+class SlowRequestLog:
+    """
+    Ring buffer of recent requests that took at least `threshold_ms`.
+    
+    Only the last `capacity` slow requests are kept, so memory stays
+    bounded and old incidents age out; `slowest()` sorts them by duration.
+    
+    Example:
+        >>> log = SlowRequestLog(capacity=50, threshold_ms=2000)
+        >>> log.record({"request_id": "abc", "duration_ms": 5234.1, "spans": [...]})
+        >>> log.slowest(10)[0]["request_id"]
+        'abc'
+    """
+    
+    def __init__(self, capacity: int = 50, threshold_ms: float = 2000):
+        self.capacity = max(1, capacity)
+        self.threshold_ms = threshold_ms
+        self._lock = threading.Lock()
+        self._entries: deque = deque(maxlen=self.capacity)
+        self._seen = 0
+    
+    def record(self, entry: Dict[str, Any]) -> bool:
+        """
+        Keep `entry` if it is slow enough; returns whether it was kept.
+        """
+        if entry.get("duration_ms", 0) < self.threshold_ms:
+            return False
+        with self._lock:
+            self._entries.append(entry)
+            self._seen += 1
+        return True
+    
+    def slowest(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Buffered requests, slowest first.
+        """
+        with self._lock:
+            entries = sorted(self._entries, key=lambda entry: entry["duration_ms"], reverse=True)
+        return entries[:limit] if limit else entries
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "threshold_ms": self.threshold_ms,
+                "buffered": len(self._entries),
+                "recorded": self._seen,
+            }
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format log records as one JSON object per line.
+    
+    Structured fields are passed with `extra={"fields": {...}}` and merged
+    into the top-level object.
+    """
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        message = record.getMessage()
+        if message:
+            entry["event"] = message
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def get_request_logger(level: str = "INFO") -> logging.Logger:
+    """
+    The request logger, writing JSON lines to stdout.
+    
+    Configured once; it doesn't propagate, so uvicorn's own (text) log
+    configuration never reformats or duplicates these lines.
+    """
+    logger = logging.getLogger(REQUEST_LOGGER)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonFormatter())
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(level.upper())
+    return logger
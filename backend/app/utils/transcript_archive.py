@@ -0,0 +1,400 @@
+"""
+Transcript Archive - Persistent On-Disk Transcript Store
+
+This module keeps every fetched transcript on local disk, keyed by video
+ID and language.
+
+Purpose:
+- Serve repeat transcripts without calling YouTube (rate limits, latency)
+- Keep a corpus of lectures to re-run AI generation over offline
+- Move transcripts between machines with bulk import/export
+
+Storage Layout (TRANSCRIPT_ARCHIVE_DIR):
+- segments-00001.dat, segments-00002.dat, ...: append-only data files.
+  Each record is one zlib-compressed TranscriptSegments (JSON). A new
+  file is started once the current one exceeds the roll size.
+- index.jsonl: append-only index, one line per record with its video ID,
+  language, data file, offset and length. A later line for the same key
+  supersedes earlier ones.
+
+Reads go through read-only memory maps of the data files, so a lookup is
+an index probe, a slice of mapped memory and a decompress: no file reads
+or seeks per request. Several worker processes can share one archive;
+appends are serialized with a file lock and each process picks up index
+lines written by the others on its next miss.
+"""
+
+import argparse
+import gzip
+import json
+import mmap
+import os
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; single process only
+    fcntl = None
+
+from ..config import settings
+from .transcript_segments import TranscriptSegments
+
+
+INDEX_FILE = "index.jsonl"
+LOCK_FILE = "archive.lock"
+DATA_FILE_TEMPLATE = "segments-{:05d}.dat"
+
+# Start a new data file once the current one is this large
+DEFAULT_ROLL_BYTES = 256 * 1024 * 1024
+
+
+class TranscriptArchive:
+    """
+    Append-only, compressed, memory-mapped transcript store.
+    
+    Methods:
+        get(video_id, language): Stored segments or None
+        put(video_id, language, segments): Store (or replace) a transcript
+        export(path): Write every transcript to a JSON Lines file
+        import_file(path): Load transcripts from an exported file
+        stats(): Entry count and disk usage
+    
+    Example:
+        >>> archive = TranscriptArchive("transcript_archive")
+        >>> archive.put("dQw4w9WgXcQ", "en", segments)
+        >>> archive.get("dQw4w9WgXcQ", "en").text[:40]
+        'In this video we will learn about...'
+    """
+    
+    def __init__(self, directory: str, roll_bytes: int = DEFAULT_ROLL_BYTES,
+                 compression_level: int = 6):
+        """
+        Open (or create) an archive directory.
+        
+        Args:
+            directory (str): Directory holding the data and index files
+            roll_bytes (int): Size after which a new data file is started
+            compression_level (int): zlib level (1 = fastest, 9 = smallest)
+        """
+        self.directory = directory
+        self.roll_bytes = roll_bytes
+        self.compression_level = compression_level
+        os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._index: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._index_position = 0
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._hits = 0
+        self._misses = 0
+        
+        with self._lock:
+            self._load_new_index_lines()
+    
+    # =====================================================
+    # INDEX
+    # =====================================================
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+    
+    def _load_new_index_lines(self) -> None:
+        """
+        Read index lines appended since the last call (by any process).
+        
+        Must be called with self._lock held.
+        """
+        index_path = self._path(INDEX_FILE)
+        if not os.path.exists(index_path):
+            return
+        
+        with open(index_path, "rb") as index_file:
+            index_file.seek(self._index_position)
+            for line in index_file:
+                if not line.endswith(b"\n"):
+                    break  # Another process is still writing this line
+                self._index_position += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._index[(entry["video_id"], entry["language"])] = entry
+    
+    # =====================================================
+    # READS
+    # =====================================================
+    
+    def _mapped(self, data_file: str, end: int) -> mmap.mmap:
+        """
+        Memory map of a data file covering at least `end` bytes.
+        
+        Data files only grow, so a map is replaced when a record lies
+        beyond its end. Must be called with self._lock held.
+        """
+        mapped = self._maps.get(data_file)
+        if mapped is None or len(mapped) < end:
+            if mapped is not None:
+                mapped.close()
+            with open(self._path(data_file), "rb") as handle:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[data_file] = mapped
+        return mapped
+    
+    def _read(self, entry: Dict[str, Any]) -> TranscriptSegments:
+        """
+        Decode the record an index entry points to.
+        
+        Must be called with self._lock held.
+        """
+        start = entry["offset"]
+        end = start + entry["length"]
+        compressed = self._mapped(entry["file"], end)[start:end]
+        return TranscriptSegments.from_dict(json.loads(zlib.decompress(compressed)))
+    
+    def get(self, video_id: str, language: str) -> Optional[TranscriptSegments]:
+        """
+        Look up a stored transcript.
+        
+        Args:
+            video_id (str): YouTube video ID
+            language (str): Language code, e.g. "en"
+        
+        Returns:
+            TranscriptSegments: The stored transcript, or None if absent
+        """
+        key = (video_id, language)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                # Another process may have archived it since we last looked
+                self._load_new_index_lines()
+                entry = self._index.get(key)
+            
+            if entry is None:
+                self._misses += 1
+                return None
+            
+            self._hits += 1
+            return self._read(entry)
+    
+    # =====================================================
+    # WRITES
+    # =====================================================
+    
+    def _current_data_file(self) -> str:
+        """
+        Name of the data file new records are appended to.
+        """
+        number = 1
+        while os.path.exists(self._path(DATA_FILE_TEMPLATE.format(number + 1))):
+            number += 1
+        
+        name = DATA_FILE_TEMPLATE.format(number)
+        path = self._path(name)
+        if os.path.exists(path) and os.path.getsize(path) >= self.roll_bytes:
+            name = DATA_FILE_TEMPLATE.format(number + 1)
+        return name
+    
+    def put(self, video_id: str, language: str, segments: TranscriptSegments) -> None:
+        """
+        Append a transcript to the archive.
+        
+        Storing a key again appends a new record that supersedes the old
+        one; nothing is rewritten in place.
+        
+        Args:
+            video_id (str): YouTube video ID
+            language (str): Language code, e.g. "en"
+            segments (TranscriptSegments): Transcript to store
+        """
+        raw = json.dumps(segments.to_dict(), separators=(",", ":")).encode("utf-8")
+        compressed = zlib.compress(raw, self.compression_level)
+        
+        with self._lock, open(self._path(LOCK_FILE), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                data_file = self._current_data_file()
+                with open(self._path(data_file), "ab") as data:
+                    offset = data.tell()
+                    data.write(compressed)
+                
+                entry = {
+                    "video_id": video_id,
+                    "language": language,
+                    "file": data_file,
+                    "offset": offset,
+                    "length": len(compressed),
+                    "raw_bytes": len(raw),
+                    "stored_at": time.time(),
+                }
+                with open(self._path(INDEX_FILE), "ab") as index_file:
+                    index_file.write(json.dumps(entry).encode("utf-8") + b"\n")
+                
+                # Pick up our own line (and any written by other processes)
+                self._load_new_index_lines()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    # =====================================================
+    # BULK IMPORT / EXPORT
+    # =====================================================
+    
+    def entries(self) -> Iterator[Tuple[str, str, TranscriptSegments]]:
+        """
+        Iterate over every stored transcript (latest version of each key).
+        
+        Yields:
+            Tuple[str, str, TranscriptSegments]: video_id, language, segments
+        """
+        with self._lock:
+            self._load_new_index_lines()
+            keys = list(self._index)
+        
+        for video_id, language in keys:
+            with self._lock:
+                segments = self._read(self._index[(video_id, language)])
+            yield video_id, language, segments
+    
+    def export(self, path: str) -> int:
+        """
+        Write every transcript to a JSON Lines file (gzipped if path ends in .gz).
+        
+        Each line is {"video_id", "language", "segments"}, where segments
+        is the TranscriptSegments dict form.
+        
+        Returns:
+            int: Number of transcripts exported
+        """
+        opener = gzip.open if path.endswith(".gz") else open
+        count = 0
+        with opener(path, "wt", encoding="utf-8") as out:
+            for video_id, language, segments in self.entries():
+                out.write(json.dumps({
+                    "video_id": video_id,
+                    "language": language,
+                    "segments": segments.to_dict(),
+                }) + "\n")
+                count += 1
+        return count
+    
+    def import_file(self, path: str, overwrite: bool = False) -> int:
+        """
+        Load transcripts from a file written by export.
+        
+        Args:
+            path (str): JSON Lines file (gzipped if it ends in .gz)
+            overwrite (bool): Replace transcripts that are already stored
+        
+        Returns:
+            int: Number of transcripts imported
+        """
+        opener = gzip.open if path.endswith(".gz") else open
+        count = 0
+        with opener(path, "rt", encoding="utf-8") as source:
+            for line in source:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                key = (record["video_id"], record["language"])
+                with self._lock:
+                    exists = key in self._index
+                if exists and not overwrite:
+                    continue
+                self.put(record["video_id"], record["language"],
+                         TranscriptSegments.from_dict(record["segments"]))
+                count += 1
+        return count
+    
+    # =====================================================
+    # MAINTENANCE
+    # =====================================================
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Number of transcripts, disk usage and hit/miss counters.
+        """
+        with self._lock:
+            entries = len(self._index)
+            live_bytes = sum(entry["length"] for entry in self._index.values())
+            hits, misses = self._hits, self._misses
+        
+        data_files = [name for name in os.listdir(self.directory) if name.endswith(".dat")]
+        disk_bytes = sum(os.path.getsize(self._path(name)) for name in data_files)
+        return {
+            "entries": entries,
+            "data_files": len(data_files),
+            "disk_bytes": disk_bytes,
+            "live_bytes": live_bytes,
+            "hits": hits,
+            "misses": misses,
+        }
+    
+    def close(self) -> None:
+        """
+        Release the memory maps.
+        """
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+
+
+_archive: Optional[TranscriptArchive] = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> Optional[TranscriptArchive]:
+    """
+    Get the process-wide transcript archive, opening it on first use.
+    
+    Returns:
+        TranscriptArchive: The archive, or None if TRANSCRIPT_ARCHIVE_ENABLED is off
+    """
+    global _archive
+    if not settings.transcript_archive_enabled:
+        return None
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = TranscriptArchive(settings.transcript_archive_dir)
+    return _archive
+
+
+def main() -> None:
+    """
+    Command line bulk import/export.
+    
+    Usage:
+        python -m app.utils.transcript_archive export transcripts.jsonl.gz
+        python -m app.utils.transcript_archive import transcripts.jsonl.gz
+        python -m app.utils.transcript_archive stats
+    """
+    parser = argparse.ArgumentParser(description="Manage the transcript archive")
+    parser.add_argument("command", choices=["export", "import", "stats"])
+    parser.add_argument("path", nargs="?", help="JSON Lines file (.gz for gzip)")
+    parser.add_argument("--dir", default=settings.transcript_archive_dir,
+                        help="Archive directory (default: TRANSCRIPT_ARCHIVE_DIR)")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="On import, replace transcripts already stored")
+    args = parser.parse_args()
+    
+    archive = TranscriptArchive(args.dir)
+    if args.command == "stats":
+        print(json.dumps(archive.stats(), indent=2))
+        return
+    if not args.path:
+        parser.error(f"{args.command} needs a file path")
+    
+    if args.command == "export":
+        print(f"Exported {archive.export(args.path)} transcripts to {args.path}")
+    else:
+        print(f"Imported {archive.import_file(args.path, overwrite=args.overwrite)} transcripts from {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Transcript Normalization
+
+This module cleans caption text before it is sent to the model.
+
+Purpose:
+- Remove what auto-generated captions add on top of the speech: filler
+  words ("um", "uh"), non-speech markers ([Music], [Applause], >>) and
+  the repeated fragments of rolling captions
+- Merge caption lines into sentences
+- Optionally drop sentences that carry no information ("Okay.", "All
+  right, so.") and sentences repeated verbatim
+- Report how many prompt tokens were saved
+
+Why Separated as Utility:
+The transcript is sent into every prompt (three times per package in
+separate mode), so every token removed here is saved several times over,
+in both cost and latency. The rules only look at caption text, so the
+same normalizer serves every pipeline.
+
+Streaming:
+TranscriptNormalizer takes caption lines one at a time and returns the
+sentences completed so far. It keeps only the current sentence and a few
+dozen words of context, so memory does not grow with the transcript.
+
+Example:
+    >>> text, stats = normalize_transcript(
+    ...     "[Music]\\num so today we're going to\\nso today we're going to talk about cells."
+    ... )
+    >>> text
+    "so today we're going to talk about cells."
+"""
+
+import html
+import re
+import string
+from collections import deque
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .text_chunking import count_tokens
+
+# Part of the learning package cache key: bump when the rules change, so
+# packages generated from differently normalized text are not reused
+NORMALIZER_VERSION = 1
+
+# Bracketed non-speech markers: [Music], [Applause], [ __ ] (censored
+# words), (laughter), ♪ and speaker-change arrows
+_MARKER = re.compile(
+    r"\[[^\]]*\]"
+    r"|\((?:music|applause|laughter|laughs|inaudible|silence|crosstalk|no audio)\)"
+    r"|[♪♫]+"
+    r"|>>+",
+    re.IGNORECASE
+)
+
+# Hesitations that never carry meaning, with a following comma
+_FILLER = re.compile(r"\b(?:u+h+|u+m+|u+hm+|e+rm+|h+m+|m+h+m+|m{2,}|uh-huh)\b,?", re.IGNORECASE)
+
+# A word that ends a sentence (closing quotes/brackets allowed)
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*$")
+
+# Characters a sentence-ending word can end with (checked before the regex)
+_SENTENCE_END_CHARS = frozenset(".!?\"')]")
+
+# Word comparison ignores case and surrounding punctuation, so
+# "going to" overlaps "Going to," in the next caption
+_WORD_EDGES = string.punctuation + "‘’“”"
+
+# Longest rolling-caption overlap looked for, in words
+MAX_OVERLAP_WORDS = 30
+# Shorter overlaps are left alone: "the cell" ending one caption and
+# starting the next is more likely real speech than a repeat
+MIN_OVERLAP_WORDS = 3
+
+# Unpunctuated auto-captions: close a "sentence" after this many words,
+# so output keeps streaming and low-information checks stay local
+MAX_SENTENCE_WORDS = 60
+
+# Sentences made only of these words say nothing about the lecture
+LOW_INFORMATION_WORDS = frozenset(
+    "okay ok so right yeah yes yep alright all well now and but um uh like "
+    "oh thank thanks you good great cool let's lets see just anyway".split()
+)
+
+
+class TranscriptNormalizer:
+    """
+    Streaming caption normalizer.
+    
+    Feed caption lines in order with feed(); each call returns the
+    sentences it completed. finish() flushes the last one. Counters in
+    `stats` describe what was removed.
+    
+    Example:
+        >>> normalizer = TranscriptNormalizer()
+        >>> normalizer.feed("[Music] um welcome back to class")
+        []
+        >>> normalizer.feed("welcome back to class everyone. Today:")
+        ['welcome back to class everyone.']
+        >>> normalizer.finish()
+        ['Today:']
+    """
+    
+    def __init__(self, drop_low_information: bool = False):
+        """
+        Args:
+            drop_low_information (bool): Also drop sentences made only of
+                conversational words, and sentences repeated verbatim
+        """
+        self.drop_low_information = drop_low_information
+        self._sentence: List[str] = []
+        # Recent output words (comparable form) for overlap detection
+        self._recent: deque = deque(maxlen=MAX_OVERLAP_WORDS)
+        self._seen_sentences: set = set()
+        self.stats = {
+            "lines": 0,
+            "markers_removed": 0,
+            "fillers_removed": 0,
+            "repeated_words_removed": 0,
+            "sentences": 0,
+            "sentences_dropped": 0,
+        }
+    
+    def _overlap(self, comparable: List[str]) -> int:
+        """
+        Number of leading words of a caption that repeat the end of the
+        output so far (rolling captions).
+        
+        Args:
+            comparable (list): The caption's words, lowercased and without
+                surrounding punctuation
+        """
+        recent = self._recent
+        longest = min(len(comparable), len(recent))
+        if longest < MIN_OVERLAP_WORDS:
+            return 0
+        
+        for size in range(longest, MIN_OVERLAP_WORDS - 1, -1):
+            if comparable[0] != recent[-size]:
+                continue
+            if all(recent[len(recent) - size + i] == comparable[i] for i in range(1, size)):
+                return size
+        return 0
+    
+    def feed(self, line: str) -> List[str]:
+        """
+        Normalize one caption line.
+        
+        Args:
+            line (str): Caption text (one segment, or one line of
+                TextFormatter output)
+        
+        Returns:
+            list: Sentences completed by this line (may be empty)
+        """
+        stats = self.stats
+        stats["lines"] += 1
+        if "&" in line:
+            line = html.unescape(line)
+        line, markers = _MARKER.subn(" ", line)
+        line, fillers = _FILLER.subn(" ", line)
+        stats["markers_removed"] += markers
+        stats["fillers_removed"] += fillers
+        
+        words = line.split()
+        comparable = [word.lower().strip(_WORD_EDGES) for word in words]
+        overlap = self._overlap(comparable)
+        if overlap:
+            stats["repeated_words_removed"] += overlap
+            words = words[overlap:]
+        self._recent.extend(comparable[overlap:])
+        
+        completed = []
+        for word in words:
+            self._sentence.append(word)
+            ends_sentence = word[-1] in _SENTENCE_END_CHARS and _SENTENCE_END.search(word)
+            if ends_sentence or len(self._sentence) >= MAX_SENTENCE_WORDS:
+                self._emit(completed)
+        return completed
+    
+    def finish(self) -> List[str]:
+        """
+        Flush the last, unterminated sentence.
+        
+        Returns:
+            list: The remaining sentence, if any
+        """
+        completed = []
+        if self._sentence:
+            self._emit(completed)
+        return completed
+    
+    def _emit(self, completed: List[str]) -> None:
+        sentence = " ".join(self._sentence)
+        self._sentence = []
+        
+        if self.drop_low_information and self._is_low_information(sentence):
+            self.stats["sentences_dropped"] += 1
+            return
+        self.stats["sentences"] += 1
+        completed.append(sentence)
+    
+    def _is_low_information(self, sentence: str) -> bool:
+        """
+        Whether a sentence is only conversational words, or repeats an
+        earlier sentence word for word.
+        """
+        words = [word.strip(_WORD_EDGES) for word in sentence.lower().split()]
+        if all(word in LOW_INFORMATION_WORDS for word in words if word):
+            return True
+        
+        key = " ".join(words)
+        # Short sentences ("Why?") repeat naturally; only track longer ones
+        if len(words) < 4:
+            return False
+        if key in self._seen_sentences:
+            return True
+        self._seen_sentences.add(key)
+        return False
+
+
+def normalize_lines(lines: Iterable[str], drop_low_information: bool = False) -> Tuple[str, Dict[str, Any]]:
+    """
+    Normalize caption lines into one text, sentences separated by spaces.
+    
+    Args:
+        lines (iterable): Caption lines in order (e.g. segment texts)
+        drop_low_information (bool): See TranscriptNormalizer
+    
+    Returns:
+        Tuple[str, dict]: The normalized text and the normalizer's counters
+    """
+    normalizer = TranscriptNormalizer(drop_low_information)
+    sentences = []
+    for line in lines:
+        sentences.extend(normalizer.feed(line))
+    sentences.extend(normalizer.finish())
+    return " ".join(sentences), normalizer.stats
+
+
+def normalize_transcript(transcript: str, drop_low_information: bool = False,
+                         model: str = "gpt-3.5-turbo") -> Tuple[str, Dict[str, Any]]:
+    """
+    Normalize a plain-text transcript (caption lines separated by newlines).
+    
+    Args:
+        transcript (str): Transcript as returned by TranscriptService
+        drop_low_information (bool): See TranscriptNormalizer
+        model (str): Model whose tokenizer measures the savings
+    
+    Returns:
+        Tuple[str, dict]:
+        - text (str): Normalized transcript
+        - stats (dict): What was removed, plus original_tokens,
+          normalized_tokens, tokens_saved and saved_ratio
+    
+    Example:
+        >>> text, stats = normalize_transcript(transcript)
+        >>> stats["tokens_saved"], stats["saved_ratio"]
+        (1840, 0.142)
+    """
+    text, stats = normalize_lines(transcript.splitlines(), drop_low_information)
+    original_tokens = count_tokens(transcript, model)
+    normalized_tokens = count_tokens(text, model)
+    stats.update({
+        "original_tokens": original_tokens,
+        "normalized_tokens": normalized_tokens,
+        "tokens_saved": original_tokens - normalized_tokens,
+        "saved_ratio": round((original_tokens - normalized_tokens) / original_tokens, 3) if original_tokens else 0.0,
+    })
+    return text, stats
@@ -0,0 +1,272 @@
+"""
+Timestamped Transcript Storage
+
+This module keeps a transcript's caption segments together with their
+timestamps in a compact, array-backed form.
+
+Purpose:
+- Preserve when each caption is spoken (TextFormatter throws this away)
+- Map a time to a position in the text, and back, in O(log n)
+- Cut a transcript by time range without copying it
+- Split long transcripts into time windows
+
+Why Separated as Utility:
+The plain-text transcript is what the prompts need, but features like
+"jump to the moment this quiz question refers to" need timestamps. Storing
+one text buffer plus parallel arrays of start times, durations and text
+offsets serves both: the text is identical to what TextFormatter produced,
+and the arrays cost 24 bytes per segment instead of a dict per caption.
+"""
+
+import bisect
+from array import array
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class TranscriptSegments:
+    """
+    Caption segments stored as one text buffer plus parallel arrays.
+    
+    Segment i covers text[offsets[i]:offsets[i] + len(segment text)] and is
+    spoken from starts[i] for durations[i] seconds. Segments are joined
+    with newlines, so `text` equals TextFormatter's output.
+    
+    Slicing (`slice`, `windows`) returns views that share the buffer and
+    arrays of the original; text is only copied when `text` is read.
+    
+    Example:
+        >>> segments = TranscriptSegments.from_segments([
+        ...     {"text": "Cells divide.", "start": 0.0, "duration": 2.0},
+        ...     {"text": "DNA is copied first.", "start": 2.0, "duration": 3.0},
+        ... ])
+        >>> segments.offset_at(2.5)
+        14
+        >>> segments.slice(2.0, 5.0).text
+        'DNA is copied first.'
+    """
+    
+    def __init__(self, text: str, starts: array, durations: array, offsets: array,
+                 first: int = 0, last: Optional[int] = None):
+        """
+        Wrap existing buffers. Use from_segments / from_dict to build one.
+        
+        Args:
+            text (str): All segment texts joined with newlines
+            starts (array): Start time of each segment in seconds
+            durations (array): Duration of each segment in seconds
+            offsets (array): Character offset of each segment in `text`
+            first (int): Index of the first segment in this view
+            last (int, optional): Index after the last segment in this view
+        """
+        self._text = text
+        self._starts = starts
+        self._durations = durations
+        self._offsets = offsets
+        self._first = first
+        self._last = len(starts) if last is None else last
+    
+    @classmethod
+    def from_segments(cls, segments: List[Dict[str, Any]]) -> "TranscriptSegments":
+        """
+        Build from the segment list returned by YouTube Transcript API.
+        
+        Args:
+            segments (list): Dicts with "text", "start" and "duration"
+        
+        Returns:
+            TranscriptSegments: Store covering every segment
+        """
+        starts = array("d")
+        durations = array("d")
+        offsets = array("q")
+        parts = []
+        position = 0
+        
+        for segment in segments:
+            starts.append(float(segment["start"]))
+            durations.append(float(segment.get("duration", 0.0)))
+            offsets.append(position)
+            parts.append(segment["text"])
+            position += len(segment["text"]) + 1  # +1 for the joining newline
+        
+        return cls("\n".join(parts), starts, durations, offsets)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TranscriptSegments":
+        """
+        Rebuild a store serialized with to_dict (e.g. read from the cache).
+        """
+        return cls(
+            data["text"],
+            array("d", data["starts"]),
+            array("d", data["durations"]),
+            array("q", data["offsets"])
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-serializable form of this view (used for caching).
+        """
+        base = self._offsets[self._first] if len(self) else 0
+        return {
+            "text": self.text,
+            "starts": self._starts[self._first:self._last].tolist(),
+            "durations": self._durations[self._first:self._last].tolist(),
+            "offsets": [offset - base for offset in self._offsets[self._first:self._last]],
+        }
+    
+    # =====================================================
+    # VIEW PROPERTIES
+    # =====================================================
+    
+    def __len__(self) -> int:
+        return self._last - self._first
+    
+    def _segment_end_offset(self, index: int) -> int:
+        """
+        Character offset just past segment `index` (excluding the newline).
+        """
+        if index + 1 < len(self._offsets):
+            return self._offsets[index + 1] - 1
+        return len(self._text)
+    
+    @property
+    def text(self) -> str:
+        """
+        Text of the segments in this view, joined with newlines.
+        """
+        if not len(self):
+            return ""
+        if self._first == 0 and self._last == len(self._starts):
+            return self._text
+        return self._text[self._offsets[self._first]:self._segment_end_offset(self._last - 1)]
+    
+    @property
+    def start(self) -> float:
+        """
+        Time (seconds) the first segment of this view starts.
+        """
+        return self._starts[self._first] if len(self) else 0.0
+    
+    @property
+    def end(self) -> float:
+        """
+        Time (seconds) the last segment of this view ends.
+        """
+        if not len(self):
+            return 0.0
+        return self._starts[self._last - 1] + self._durations[self._last - 1]
+    
+    def segment(self, index: int) -> Dict[str, Any]:
+        """
+        One segment of this view as a dict.
+        
+        Args:
+            index (int): 0-based position within this view
+        
+        Returns:
+            dict: {"text", "start", "duration", "offset"}
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        
+        i = self._first + index
+        return {
+            "text": self._text[self._offsets[i]:self._segment_end_offset(i)],
+            "start": self._starts[i],
+            "duration": self._durations[i],
+            "offset": self._offsets[i] - self._offsets[self._first],
+        }
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self)):
+            yield self.segment(index)
+    
+    # =====================================================
+    # LOOKUPS
+    # =====================================================
+    
+    def index_at(self, seconds: float) -> int:
+        """
+        Position (within this view) of the segment being spoken at a time.
+        
+        Times before the first segment map to 0, times after the last
+        segment to the last one. O(log n).
+        """
+        if not len(self):
+            raise IndexError("transcript has no segments")
+        
+        i = bisect.bisect_right(self._starts, seconds, self._first, self._last) - 1
+        return max(i, self._first) - self._first
+    
+    def offset_at(self, seconds: float) -> int:
+        """
+        Character offset in `text` of the segment spoken at a time.
+        
+        Example:
+            >>> transcript_text[segments.offset_at(754.0):][:80]
+            'so the mitochondria is where respiration happens...'
+        """
+        i = self._first + self.index_at(seconds)
+        return self._offsets[i] - self._offsets[self._first]
+    
+    def time_at(self, offset: int) -> float:
+        """
+        Start time of the segment containing a character offset of `text`.
+        
+        The reverse of offset_at: find a phrase with str.find, then jump
+        to the moment it is said. O(log n).
+        """
+        if not len(self):
+            raise IndexError("transcript has no segments")
+        
+        absolute = self._offsets[self._first] + offset
+        i = bisect.bisect_right(self._offsets, absolute, self._first, self._last) - 1
+        return self._starts[max(i, self._first)]
+    
+    # =====================================================
+    # SLICING
+    # =====================================================
+    
+    def slice(self, start: Optional[float] = None, end: Optional[float] = None) -> "TranscriptSegments":
+        """
+        Segments that start within [start, end), as a view.
+        
+        The view shares this store's buffers; nothing is copied until its
+        text is read.
+        
+        Args:
+            start (float, optional): Seconds; None means the beginning
+            end (float, optional): Seconds; None means the end
+        
+        Returns:
+            TranscriptSegments: View over the matching segments (may be empty)
+        """
+        first = self._first
+        last = self._last
+        if start is not None:
+            first = bisect.bisect_left(self._starts, start, self._first, self._last)
+        if end is not None:
+            last = bisect.bisect_left(self._starts, end, first, self._last)
+        
+        return TranscriptSegments(self._text, self._starts, self._durations, self._offsets, first, last)
+    
+    def windows(self, seconds: float) -> Iterator["TranscriptSegments"]:
+        """
+        Split this view into consecutive time windows.
+        
+        Args:
+            seconds (float): Window length in seconds
+        
+        Yields:
+            TranscriptSegments: Non-empty views, in order
+        """
+        if seconds <= 0:
+            raise ValueError("window length must be positive")
+        
+        position = self._first
+        while position < self._last:
+            window_end = self._starts[position] + seconds
+            last = bisect.bisect_left(self._starts, window_end, position + 1, self._last)
+            yield TranscriptSegments(self._text, self._starts, self._durations, self._offsets, position, last)
+            position = last
@@ -0,0 +1,588 @@
+"""
+Vector Index - Memory-Mapped Embedding Search
+
+This module stores embeddings of transcript chunks on local disk and
+finds the chunks closest to a query embedding.
+
+Purpose:
+- Answer "which lecture covered X?" from stored embeddings instead of an
+  LLM pass over every transcript
+- Find related videos (videos whose chunks are closest to another's)
+- Survive restarts, and serve every worker process from one copy on disk
+
+Storage Layout (SEARCH_INDEX_DIR):
+- embeddings.f32: append-only float32 matrix, one unit-length row per chunk
+- videos.jsonl: append-only index, one line per indexed video with its
+  first row, row count, embedding model and the time range and text of
+  each chunk. A later line for the same video supersedes earlier ones;
+  the old rows stay in the matrix but are never returned.
+- ivf.npz: IVF clusters (only once the index is large, see below)
+
+Search:
+Rows are normalized when stored, so cosine similarity is a dot product.
+The matrix is read through a read-only numpy memory map: the page cache
+holds it once for all worker processes, and nothing is read until a
+search touches it.
+- Brute force (default): score every live row, a block at a time. Exact,
+  and fast enough for tens of thousands of chunks.
+- IVF, from SEARCH_IVF_MIN_ROWS rows: rows are clustered with k-means
+  around ~sqrt(rows) centroids, and a query only scores the rows of its
+  SEARCH_IVF_PROBES nearest clusters. Approximate, much faster for large
+  indexes. Rows added later join their nearest cluster; the clusters are
+  retrained when the index has doubled since training.
+
+Several worker processes can share one index: appends are serialized with
+a file lock, and each process picks up lines written by the others before
+its next search.
+"""
+
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; single process only
+    fcntl = None
+
+
+EMBEDDINGS_FILE = "embeddings.f32"
+INDEX_FILE = "videos.jsonl"
+IVF_FILE = "ivf.npz"
+LOCK_FILE = "index.lock"
+
+# Rows scored per matrix product in brute-force search, to bound the
+# temporary memory of a search on a large index
+BLOCK_ROWS = 65536
+
+DEFAULT_IVF_MIN_ROWS = 50000
+DEFAULT_IVF_PROBES = 8
+# k-means settings: enough to give useful clusters in well under a
+# minute for a million rows
+IVF_TRAIN_SAMPLE = 100000
+IVF_TRAIN_ITERATIONS = 10
+IVF_MAX_CLUSTERS = 4096
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scale each row to unit length (zero rows stay zero).
+    """
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(rows: np.ndarray, scores: np.ndarray, limit: int) -> List[tuple]:
+    """
+    The `limit` best (row, score) pairs, best first.
+    """
+    if not len(scores) or limit <= 0:
+        return []
+    if len(scores) > limit:
+        best = np.argpartition(-scores, limit - 1)[:limit]
+        rows, scores = rows[best], scores[best]
+    order = np.argsort(-scores, kind="stable")
+    return [(int(rows[i]), float(scores[i])) for i in order if np.isfinite(scores[i])]
+
+
+class VectorIndex:
+    """
+    Append-only, memory-mapped index of chunk embeddings.
+    
+    Methods:
+        add(video_id, chunks, vectors, model): Store (or replace) a video
+        search(vector, limit, exclude_video): Closest chunks to a vector
+        video_vector(video_id): Mean embedding of a video's chunks
+        get(video_id): Index entry of a video, or None
+        train_ivf(): (Re)build the IVF clusters
+        stats(): Size, disk usage and search mode
+    
+    Example:
+        >>> index = VectorIndex("search_index")
+        >>> index.add("dQw4w9WgXcQ", [{"start": 0.0, "end": 60.0, "text": "..."}],
+        ...           [[0.1, 0.3, ...]], model="text-embedding-3-small")
+        >>> index.search(query_vector, limit=5)[0]["video_id"]
+        'dQw4w9WgXcQ'
+    """
+    
+    def __init__(self, directory: str, ivf_min_rows: int = DEFAULT_IVF_MIN_ROWS,
+                 ivf_probes: int = DEFAULT_IVF_PROBES):
+        """
+        Open (or create) an index directory.
+        
+        Args:
+            directory (str): Directory holding the matrix and index files
+            ivf_min_rows (int): Rows from which search uses IVF (0 = never)
+            ivf_probes (int): Clusters scored per IVF query
+        """
+        self.directory = directory
+        self.ivf_min_rows = ivf_min_rows
+        self.ivf_probes = max(1, ivf_probes)
+        os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._videos: Dict[str, Dict[str, Any]] = {}
+        self._index_position = 0
+        self.dim: Optional[int] = None
+        self._rows = 0
+        # Per-row state, grown by doubling: live flag and owning video
+        self._live = np.zeros(0, dtype=bool)
+        self._row_video = np.zeros(0, dtype=np.int32)
+        self._video_ids: List[str] = []
+        self._video_numbers: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._ivf: Optional[Dict[str, np.ndarray]] = None
+        self._ivf_modified: Optional[int] = None
+        self._searches = 0
+        
+        with self._lock:
+            self._load_new_index_lines()
+            self._load_ivf()
+    
+    # =====================================================
+    # INDEX
+    # =====================================================
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+    
+    def _ensure_capacity(self, rows: int) -> None:
+        """
+        Grow the per-row arrays to hold at least `rows` rows.
+        """
+        capacity = len(self._live)
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2, 1024)
+        live = np.zeros(capacity, dtype=bool)
+        live[:len(self._live)] = self._live
+        row_video = np.zeros(capacity, dtype=np.int32)
+        row_video[:len(self._row_video)] = self._row_video
+        self._live, self._row_video = live, row_video
+    
+    def _load_new_index_lines(self) -> None:
+        """
+        Read index lines appended since the last call (by any process).
+        
+        Must be called with self._lock held.
+        """
+        index_path = self._path(INDEX_FILE)
+        if not os.path.exists(index_path) or os.path.getsize(index_path) == self._index_position:
+            return
+        
+        with open(index_path, "rb") as index_file:
+            index_file.seek(self._index_position)
+            for line in index_file:
+                if not line.endswith(b"\n"):
+                    break  # Another process is still writing this line
+                self._index_position += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._apply(entry)
+    
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        """
+        Make an index entry the current one for its video.
+        """
+        video_id = entry["video_id"]
+        self.dim = self.dim or entry["dim"]
+        
+        previous = self._videos.get(video_id)
+        if previous is not None:
+            self._live[previous["first_row"]:previous["first_row"] + previous["rows"]] = False
+        
+        number = self._video_numbers.get(video_id)
+        if number is None:
+            number = self._video_numbers[video_id] = len(self._video_ids)
+            self._video_ids.append(video_id)
+        
+        first, last = entry["first_row"], entry["first_row"] + entry["rows"]
+        self._ensure_capacity(last)
+        self._live[first:last] = True
+        self._row_video[first:last] = number
+        self._rows = max(self._rows, last)
+        self._videos[video_id] = entry
+    
+    def _mapped_matrix(self) -> np.ndarray:
+        """
+        Read-only memory map of the embedding matrix covering every row.
+        
+        The file only grows, so the map is replaced when rows were added.
+        Must be called with self._lock held.
+        """
+        if self._matrix is None or self._matrix.shape[0] < self._rows:
+            self._matrix = np.memmap(
+                self._path(EMBEDDINGS_FILE), dtype=np.float32, mode="r", shape=(self._rows, self.dim)
+            )
+        return self._matrix
+    
+    # =====================================================
+    # WRITES
+    # =====================================================
+    
+    def add(self, video_id: str, chunks: Sequence[Dict[str, Any]], vectors: Sequence[Sequence[float]],
+            model: str, **fields: Any) -> Dict[str, Any]:
+        """
+        Store a video's chunk embeddings.
+        
+        Adding a video again supersedes its previous rows; nothing is
+        rewritten in place.
+        
+        Args:
+            video_id (str): YouTube video ID
+            chunks (list): One dict per chunk, e.g. {"start", "end", "text"}
+            vectors (list): One embedding per chunk
+            model (str): Embedding model (searches must use the same one)
+            **fields: Extra values stored in the index entry
+        
+        Returns:
+            dict: The index entry
+        
+        Raises:
+            ValueError: If the vectors don't match the chunks or the
+                index's dimension
+        """
+        matrix = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        if matrix.ndim != 2 or matrix.shape[0] != len(chunks) or not len(chunks):
+            raise ValueError("expected one embedding per chunk")
+        row_bytes = matrix.shape[1] * 4
+        
+        with self._lock, open(self._path(LOCK_FILE), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._load_new_index_lines()
+                if self.dim is not None and matrix.shape[1] != self.dim:
+                    raise ValueError(
+                        f"embedding dimension {matrix.shape[1]} does not match the index ({self.dim}); "
+                        f"use the same embedding model or start a new index directory"
+                    )
+                
+                with open(self._path(EMBEDDINGS_FILE), "ab") as data:
+                    offset = data.tell()
+                    if offset % row_bytes:
+                        # An interrupted write left a partial row: skip to the next row
+                        data.write(b"\0" * (row_bytes - offset % row_bytes))
+                        offset += row_bytes - offset % row_bytes
+                    data.write(matrix.tobytes())
+                
+                entry = {
+                    "video_id": video_id,
+                    "first_row": offset // row_bytes,
+                    "rows": len(chunks),
+                    "dim": matrix.shape[1],
+                    "model": model,
+                    "indexed_at": time.time(),
+                    **fields,
+                    "chunks": list(chunks),
+                }
+                with open(self._path(INDEX_FILE), "ab") as index_file:
+                    index_file.write(json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n")
+                
+                # Pick up our own line (and any written by other processes)
+                self._load_new_index_lines()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return entry
+    
+    # =====================================================
+    # SEARCH
+    # =====================================================
+    
+    def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Current index entry of a video, or None if it is not indexed.
+        """
+        with self._lock:
+            self._load_new_index_lines()
+            return self._videos.get(video_id)
+    
+    def video_vector(self, video_id: str) -> Optional[np.ndarray]:
+        """
+        Unit-length mean of a video's chunk embeddings (for related videos).
+        """
+        with self._lock:
+            self._load_new_index_lines()
+            entry = self._videos.get(video_id)
+            if entry is None:
+                return None
+            rows = self._mapped_matrix()[entry["first_row"]:entry["first_row"] + entry["rows"]]
+            return normalize_rows(rows.mean(axis=0, keepdims=True))[0]
+    
+    def search(self, vector: Sequence[float], limit: int = 10,
+               exclude_video: Optional[str] = None, model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Chunks most similar to a vector, best first.
+        
+        Args:
+            vector (list): Query embedding (any length scale)
+            limit (int): Maximum number of chunks
+            exclude_video (str, optional): Leave this video's chunks out
+            model (str, optional): Only score videos embedded with this
+                model (the query's): vectors of different models aren't
+                comparable, even when their dimensions match
+        
+        Returns:
+            list: Dicts with video_id, chunk (position in the video),
+            score (cosine similarity) and the chunk's stored fields
+        
+        Raises:
+            ValueError: If the query's dimension differs from the index's
+        """
+        query = normalize_rows(np.asarray(vector, dtype=np.float32).reshape(1, -1))[0]
+        
+        with self._lock:
+            self._load_new_index_lines()
+            self._load_ivf()
+            self._searches += 1
+            if not self._rows:
+                return []
+            if query.shape[0] != self.dim:
+                raise ValueError(f"query dimension {query.shape[0]} does not match the index ({self.dim})")
+            # Arrays are replaced, not resized, when the index grows, so
+            # these references stay valid while scoring without the lock
+            rows = self._rows
+            matrix = self._mapped_matrix()
+            live = self._live[:rows].copy()
+            if exclude_video in self._video_numbers:
+                live &= self._row_video[:rows] != self._video_numbers[exclude_video]
+            if model is not None:
+                # Per video number: was it (last) embedded with this model?
+                same_model = np.array(
+                    [self._videos[video_id]["model"] == model for video_id in self._video_ids], dtype=bool
+                )
+                live &= same_model[self._row_video[:rows]]
+            ivf = self._ivf if self._uses_ivf() else None
+        
+        if ivf is not None:
+            best = self._search_ivf(query, matrix, live, ivf, limit)
+        else:
+            best = self._search_brute_force(query, matrix, live, limit)
+        
+        hits = []
+        with self._lock:
+            for row, score in best:
+                video_id = self._video_ids[self._row_video[row]]
+                entry = self._videos[video_id]
+                if not entry["first_row"] <= row < entry["first_row"] + entry["rows"]:
+                    continue  # Superseded while we were scoring
+                chunk_number = row - entry["first_row"]
+                hits.append({
+                    "video_id": video_id,
+                    "chunk": chunk_number,
+                    "score": score,
+                    **entry["chunks"][chunk_number],
+                })
+        return hits
+    
+    @staticmethod
+    def _search_brute_force(query: np.ndarray, matrix: np.ndarray, live: np.ndarray, limit: int) -> List[tuple]:
+        """
+        Score every live row, a block at a time.
+        """
+        candidate_rows, candidate_scores = [], []
+        for start in range(0, len(live), BLOCK_ROWS):
+            scores = matrix[start:start + BLOCK_ROWS] @ query
+            scores[~live[start:start + BLOCK_ROWS]] = -np.inf
+            rows = np.arange(start, start + len(scores))
+            if len(scores) > limit:
+                best = np.argpartition(-scores, limit - 1)[:limit]
+                rows, scores = rows[best], scores[best]
+            candidate_rows.append(rows)
+            candidate_scores.append(scores)
+        return _top_k(np.concatenate(candidate_rows), np.concatenate(candidate_scores), limit)
+    
+    def _search_ivf(self, query: np.ndarray, matrix: np.ndarray, live: np.ndarray,
+                    ivf: Dict[str, np.ndarray], limit: int) -> List[tuple]:
+        """
+        Score only the rows of the clusters nearest to the query.
+        """
+        assignments = self._assignments(ivf, matrix, len(live))
+        probes = min(self.ivf_probes, len(ivf["centroids"]))
+        nearest = np.argpartition(-(ivf["centroids"] @ query), probes - 1)[:probes]
+        rows = np.flatnonzero(np.isin(assignments, nearest) & live)
+        if not len(rows):
+            return []
+        return _top_k(rows, matrix[rows] @ query, limit)
+    
+    def _assignments(self, ivf: Dict[str, np.ndarray], matrix: np.ndarray, rows: int) -> np.ndarray:
+        """
+        Cluster of every row, assigning rows added since training.
+        """
+        assignments = ivf["assignments"]
+        if len(assignments) < rows:
+            added = self._nearest_centroids(ivf["centroids"], matrix[len(assignments):rows])
+            assignments = np.concatenate([assignments, added])
+            with self._lock:
+                if self._ivf is ivf:
+                    self._ivf = {**ivf, "assignments": assignments}
+        return assignments[:rows]
+    
+    @staticmethod
+    def _nearest_centroids(centroids: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        assignments = np.empty(len(rows), dtype=np.int32)
+        for start in range(0, len(rows), BLOCK_ROWS):
+            block = np.asarray(rows[start:start + BLOCK_ROWS])
+            assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return assignments
+    
+    # =====================================================
+    # IVF
+    # =====================================================
+    
+    def _load_ivf(self) -> None:
+        """
+        Load saved IVF clusters that match this index, if they changed
+        since the last call (another process may have retrained them).
+        
+        Must be called with self._lock held.
+        """
+        try:
+            modified = os.stat(self._path(IVF_FILE)).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if modified == self._ivf_modified or self.dim is None:
+            return
+        self._ivf_modified = modified
+        with np.load(self._path(IVF_FILE)) as saved:
+            if saved["centroids"].shape[1] == self.dim:
+                self._ivf = {name: saved[name] for name in ("centroids", "assignments", "trained_rows")}
+    
+    def _uses_ivf(self) -> bool:
+        """
+        Whether searches use the IVF clusters (trained, and the index is
+        at least SEARCH_IVF_MIN_ROWS rows).
+        """
+        return self._ivf is not None and bool(self.ivf_min_rows) and self._rows >= self.ivf_min_rows
+    
+    def needs_ivf_training(self) -> bool:
+        """
+        Whether the index is large enough for IVF and has no clusters yet,
+        or has doubled since they were trained.
+        """
+        with self._lock:
+            self._load_new_index_lines()
+            if not self.ivf_min_rows or self._rows < self.ivf_min_rows:
+                return False
+            return self._ivf is None or self._rows >= 2 * int(self._ivf["trained_rows"])
+    
+    def train_ivf(self, seed: int = 0) -> Dict[str, Any]:
+        """
+        Cluster the live rows with spherical k-means and save the clusters.
+        
+        Searches keep using the previous clusters (or brute force) until
+        training finishes.
+        
+        Returns:
+            dict: clusters and trained_rows
+        """
+        with self._lock:
+            self._load_new_index_lines()
+            rows = self._rows
+            if not rows:
+                return {"clusters": 0, "trained_rows": 0}
+            matrix = self._mapped_matrix()
+            live_rows = np.flatnonzero(self._live[:rows])
+        
+        rng = np.random.default_rng(seed)
+        sample_rows = live_rows
+        if len(sample_rows) > IVF_TRAIN_SAMPLE:
+            sample_rows = np.sort(rng.choice(live_rows, IVF_TRAIN_SAMPLE, replace=False))
+        sample = np.asarray(matrix[sample_rows])
+        clusters = int(min(IVF_MAX_CLUSTERS, max(1, math.sqrt(len(live_rows))), len(sample)))
+        
+        centroids = sample[rng.choice(len(sample), clusters, replace=False)]
+        for _ in range(IVF_TRAIN_ITERATIONS):
+            assignments = self._nearest_centroids(centroids, sample)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            empty = np.flatnonzero(~sums.any(axis=1))
+            # Re-seed empty clusters with random rows
+            sums[empty] = sample[rng.choice(len(sample), len(empty))]
+            centroids = normalize_rows(sums)
+        
+        ivf = {
+            "centroids": centroids,
+            "assignments": self._nearest_centroids(centroids, matrix[:rows]),
+            "trained_rows": np.array(rows),
+        }
+        temporary = self._path(IVF_FILE + ".tmp.npz")
+        np.savez(temporary, **ivf)
+        os.replace(temporary, self._path(IVF_FILE))
+        with self._lock:
+            self._ivf = ivf
+            self._ivf_modified = os.stat(self._path(IVF_FILE)).st_mtime_ns
+        return {"clusters": clusters, "trained_rows": rows}
+    
+    # =====================================================
+    # MAINTENANCE
+    # =====================================================
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Videos, rows, disk usage and search mode.
+        """
+        with self._lock:
+            self._load_new_index_lines()
+            live_rows = int(self._live[:self._rows].sum())
+            models = sorted({entry["model"] for entry in self._videos.values()})
+            ivf = self._ivf if self._uses_ivf() else None
+            stats = {
+                "videos": len(self._videos),
+                "chunks": live_rows,
+                "rows": self._rows,
+                "dim": self.dim,
+                "models": models,
+                "searches": self._searches,
+            }
+        
+        embeddings_path = self._path(EMBEDDINGS_FILE)
+        stats["disk_bytes"] = sum(
+            os.path.getsize(self._path(name))
+            for name in (EMBEDDINGS_FILE, INDEX_FILE, IVF_FILE)
+            if os.path.exists(self._path(name))
+        )
+        stats["matrix_bytes"] = os.path.getsize(embeddings_path) if os.path.exists(embeddings_path) else 0
+        stats["mode"] = "ivf" if ivf is not None else "brute_force"
+        if ivf is not None:
+            stats["ivf"] = {
+                "clusters": len(ivf["centroids"]),
+                "trained_rows": int(ivf["trained_rows"]),
+                "probes": self.ivf_probes,
+            }
+        return stats
+
+
+def main() -> None:
+    """
+    Command line maintenance.
+    
+    Usage:
+        python -m app.utils.vector_index stats
+        python -m app.utils.vector_index train-ivf
+    """
+    from ..config import settings
+    
+    parser = argparse.ArgumentParser(description="Semantic search index maintenance")
+    parser.add_argument("command", choices=["stats", "train-ivf"])
+    parser.add_argument("--dir", default=settings.search_index_dir, help="Index directory")
+    args = parser.parse_args()
+    
+    index = VectorIndex(args.dir, settings.search_ivf_min_rows, settings.search_ivf_probes)
+    if args.command == "train-ivf":
+        print(json.dumps(index.train_ivf(), indent=2))
+    else:
+        print(json.dumps(index.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ This module provides utility functions for handling YouTube URLs.
 Purpose:
 - Validate YouTube URLs
 - Extract video IDs from various YouTube URL formats
+- Validate bare video IDs (e.g. from URL paths)
 - Provide clean, reusable utilities for URL operations
 
 Why Separated as Utility:
@@ -17,6 +18,8 @@ application (routes, services, background tasks, etc.).
 import re
 from typing import Optional, Tuple
 
+from .metrics import timed
+
 
 def extract_video_id(youtube_url: str) -> Optional[str]:
     """
@@ -67,6 +70,7 @@ def extract_video_id(youtube_url: str) -> Optional[str]:
     return None
 
 
+@timed("validate_url")
 def is_valid_youtube_url(youtube_url: str) -> Tuple[bool, Optional[str]]:
     """
     Validate if a URL is a valid YouTube URL and extract video ID.
@@ -102,3 +106,22 @@ def is_valid_youtube_url(youtube_url: str) -> Tuple[bool, Optional[str]]:
         return True, video_id
     else:
         return False, None
+
+
+def is_valid_video_id(video_id: str) -> bool:
+    """
+    Check that a string is a bare YouTube video ID (e.g. from a URL path).
+    
+    Args:
+        video_id (str): Candidate video ID
+    
+    Returns:
+        bool: True for 11 characters of letters, digits, "-" and "_"
+    
+    Example:
+        >>> is_valid_video_id("dQw4w9WgXcQ")
+        True
+        >>> is_valid_video_id("health")
+        False
+    """
+    return re.fullmatch(r'[a-zA-Z0-9_-]{11}', video_id) is not None
@@ -1,24 +1,24 @@
 """
-wsgi.py - WSGI Entry Point for Production Deployment
+wsgi.py - Production Entry Point
 
 Purpose:
-- Provides WSGI application for deployment platforms (Render, Railway, Heroku)
-- Used by production ASGI servers (Gunicorn, Uvicorn)
+- Provides the application for deployment platforms (Render, Railway, Heroku)
+- `python -m app.wsgi` starts the production server (app/server.py):
+  Gunicorn with one Uvicorn worker per CPU, preloaded app
 - Separate from main.py for cleaner deployment
 
 Usage:
-- Platform deployment: gunicorn app.wsgi:app
-- Or: uvicorn app.wsgi:app --host 0.0.0.0 --port 8000
+- Platform deployment: python -m app.wsgi
+- Or: gunicorn app.wsgi:app (settings come from gunicorn.conf.py)
+- Or (single process): uvicorn app.wsgi:app --host 0.0.0.0 --port 8000
 """
 
-from app.main import app
-
-# WSGI/ASGI application - used by deployment servers
 if __name__ == "__main__":
-    import uvicorn
+    # The launcher adjusts settings for multiple workers before the app
+    # is imported, so don't import it here
+    from app.server import run
     
-    uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=8000,
-    )
+    run()
+else:
+    # ASGI application - used by deployment servers
+    from app.main import app
@@ -0,0 +1,25 @@
+"""
+benchmarks/__init__.py - Offline Benchmark Suite
+
+Purpose:
+- Measure the API end to end without OpenAI or YouTube, so performance
+  changes can be compared before they are deployed
+- Results are deterministic enough to compare runs on the same machine
+
+Current structure:
+- fake_openai.py - OpenAI-compatible chat completions server with
+  configurable latency, streaming and failure injection
+- fake_transcripts.py - Transcript provider serving canned transcripts
+  of different lengths (TRANSCRIPT_PROVIDER_URL protocol)
+- run.py - Starts the fakes and the app, drives the endpoints at a fixed
+  concurrency and reports latency percentiles, throughput and tokens
+- startup.py - Times a cold start: app import, time until /health
+  answers, and the slowest imports
+- extractive.py - Token savings of extractive pre-selection, and quiz
+  validity on full vs selected transcripts
+
+Usage (from backend/):
+    python -m benchmarks.run --scenario process --concurrency 8 --requests 64
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.extractive --fake
+"""
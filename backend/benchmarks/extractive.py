@@ -0,0 +1,248 @@
+"""
+Extractive Pre-Selection Benchmark
+
+Compares prompts built from the whole transcript with prompts built from
+its most salient sentences (AI_EXTRACTIVE_COMPONENTS, see
+app/utils/extractive_selection.py):
+- Selection: transcript tokens before/after and ranking time, per method
+- Quiz quality: the quiz prompt is run on the full and on the selected
+  text, and the answers are scored:
+  - valid: share of runs whose first answer had 10 valid, distinct
+    questions (no repair call needed)
+  - questions: mean valid questions per first answer
+  - grounded: share of valid questions whose correct option uses words
+    from the lecture (a cheap check that questions are about the video)
+  - prompt tokens and latency per call
+
+Quiz calls go to the configured OpenAI-compatible endpoint
+(OPENAI_API_KEY, OPENAI_BASE_URL), so run it against the real model to
+measure quality. --fake starts benchmarks/fake_openai.py instead, which
+checks the harness and the token savings but always answers validly.
+
+Transcripts are the fake provider's canned lectures (--canned) and/or
+plain-text files (--transcript), normalized like the app does.
+
+Usage (from backend/):
+    # Token savings and ranking time only (no API calls)
+    python -m benchmarks.extractive --quiz-runs 0
+    
+    # Quiz validity, full vs selected, on your own lecture transcripts
+    python -m benchmarks.extractive --transcript lecture1.txt --transcript lecture2.txt --quiz-runs 5
+    
+    # Offline smoke run
+    python -m benchmarks.extractive --fake --canned l
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from .fake_transcripts import canned_transcript
+from .run import BACKEND_DIR, STARTUP_TIMEOUT, free_port
+
+# A correct option counts as grounded when at least this share of its
+# content words occur in the lecture
+GROUNDED_WORD_SHARE = 0.5
+
+WORD = re.compile(r"[a-z0-9][a-z0-9'-]{2,}")
+
+
+def load_transcripts(args: argparse.Namespace) -> List[Tuple[str, str]]:
+    """
+    (name, raw transcript) pairs from --canned sizes and --transcript files.
+    """
+    transcripts = []
+    for size in args.canned:
+        segments = canned_transcript(f"{size}{0:010d}")
+        transcripts.append((f"canned-{size}", "\n".join(segment["text"] for segment in segments)))
+    for path in args.transcript:
+        with open(path, encoding="utf-8") as f:
+            transcripts.append((os.path.basename(path), f.read()))
+    return transcripts
+
+
+def start_fake_openai(log_dir: str) -> Tuple[subprocess.Popen, str]:
+    url = f"http://127.0.0.1:{free_port()}"
+    log = open(os.path.join(log_dir, "fake_openai.log"), "w")
+    process = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.fake_openai",
+        "--port", url.rsplit(":", 1)[1],
+        "--latency-ms", "100",
+        "--ms-per-token", "0.5",
+    ], cwd=BACKEND_DIR, stdout=log, stderr=subprocess.STDOUT)
+    
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline and process.poll() is None:
+        try:
+            if httpx.get(f"{url}/stats", timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"The fake OpenAI server did not come up; see {log.name}")
+
+
+def measure_selection(text: str, method: str, budget: int, model: str, repeats: int) -> Dict[str, Any]:
+    """
+    Selected text, its stats and the median ranking time (uncached).
+    """
+    from app.utils.extractive_selection import select_salient_sentences
+    
+    timings = []
+    for _ in range(repeats):
+        select_salient_sentences.cache_clear()
+        started = time.perf_counter()
+        selected, stats = select_salient_sentences(text, budget, method, model)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"text": selected, **stats, "ranking_ms": round(statistics.median(timings), 1)}
+
+
+def run_quiz(ai_service: Any, text: str, lecture_words: set) -> Dict[str, Any]:
+    """
+    One first-pass quiz call, scored.
+    """
+    from app.utils.text_chunking import count_tokens
+    
+    prompt = ai_service.get_quiz_prompt(text)
+    started = time.perf_counter()
+    try:
+        response_text = ai_service._complete(ai_service.QUIZ_SYSTEM_MESSAGE, prompt)
+        questions = ai_service._parse_quiz_questions(response_text)
+    except Exception as e:
+        return {"error": type(e).__name__, "latency_ms": (time.perf_counter() - started) * 1000}
+    latency_ms = (time.perf_counter() - started) * 1000
+    
+    grounded = 0
+    for question in questions:
+        answer = question["options"]["ABCD".index(question["correct_answer"])]
+        words = set(WORD.findall(answer.lower()))
+        if words and len(words & lecture_words) / len(words) >= GROUNDED_WORD_SHARE:
+            grounded += 1
+    return {
+        "valid": len(questions) == ai_service.QUIZ_QUESTION_COUNT,
+        "questions": len(questions),
+        "grounded": grounded,
+        "prompt_tokens": count_tokens(prompt, ai_service.model),
+        "latency_ms": latency_ms,
+    }
+
+
+def summarize_quiz(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    completed = [run for run in runs if "error" not in run]
+    questions = sum(run["questions"] for run in completed)
+    return {
+        "runs": len(runs),
+        "errors": len(runs) - len(completed),
+        "valid_rate": round(sum(run["valid"] for run in completed) / len(runs), 3) if runs else None,
+        "mean_questions": round(questions / len(completed), 2) if completed else None,
+        "grounded_rate": round(sum(run["grounded"] for run in completed) / questions, 3) if questions else None,
+        "prompt_tokens": round(statistics.mean(run["prompt_tokens"] for run in completed)) if completed else None,
+        "latency_ms": round(statistics.median(run["latency_ms"] for run in completed)) if completed else None,
+    }
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    print()
+    print(f"{'transcript':<22}{'input':<10}{'tokens':>9}{'ratio':>8}{'rank ms':>9}"
+          f"{'valid':>8}{'questions':>11}{'grounded':>10}{'latency ms':>12}")
+    for result in results:
+        for variant in result["variants"]:
+            quiz = variant.get("quiz") or {}
+            
+            def cell(value: Any, width: int, spec: str = "") -> str:
+                return f"{'-' if value is None else format(value, spec):>{width}}"
+            
+            print(
+                f"{result['transcript']:<22}{variant['input']:<10}"
+                f"{cell(variant['tokens'], 9, ',')}{cell(variant.get('ratio'), 8, '.1f')}"
+                f"{cell(variant.get('ranking_ms'), 9, '.1f')}{cell(quiz.get('valid_rate'), 8, '.0%')}"
+                f"{cell(quiz.get('mean_questions'), 11, '.1f')}{cell(quiz.get('grounded_rate'), 10, '.0%')}"
+                f"{cell(quiz.get('latency_ms'), 12, ',')}"
+            )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Extractive pre-selection: token savings and quiz validity")
+    parser.add_argument("--canned", action="append", choices=["s", "m", "l", "x"],
+                        help="Canned fake-provider lecture sizes (default: m, l, x)")
+    parser.add_argument("--transcript", action="append", default=[], metavar="PATH",
+                        help="Plain-text transcript file (repeatable)")
+    parser.add_argument("--method", action="append", choices=["textrank", "tfidf"],
+                        help="Ranking methods to compare (default: both)")
+    parser.add_argument("--budget", type=int, default=2000, help="Token budget (AI_EXTRACTIVE_TOKEN_BUDGET)")
+    parser.add_argument("--quiz-runs", type=int, default=3, help="Quiz calls per transcript and input (0 = none)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Quiz calls in flight")
+    parser.add_argument("--repeats", type=int, default=3, help="Ranking runs per measurement")
+    parser.add_argument("--fake", action="store_true", help="Send quiz calls to a local fake OpenAI server")
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON")
+    args = parser.parse_args(argv)
+    if args.canned is None:
+        args.canned = [] if args.transcript else ["m", "l", "x"]
+    args.method = args.method or ["textrank", "tfidf"]
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    fake = None
+    if args.fake and args.quiz_runs:
+        fake, url = start_fake_openai(tempfile.mkdtemp(prefix="svlt-extractive-"))
+        os.environ.update({"OPENAI_BASE_URL": f"{url}/v1", "OPENAI_API_KEY": "sk-benchmark"})
+    # Settings are read at import: configure before importing the app
+    os.environ.update({"CACHE_BACKEND": "none", "OPENAI_TPM_LIMIT": "0", "OPENAI_RPM_LIMIT": "0"})
+    sys.path.insert(0, BACKEND_DIR)
+    from app.services.ai_service import AIService
+    from app.utils.transcript_normalizer import normalize_transcript
+    
+    ai_service = AIService()
+    executor = ThreadPoolExecutor(max_workers=max(1, args.concurrency))
+    results = []
+    try:
+        for name, raw in load_transcripts(args):
+            # Prompts are built from the normalized transcript, like in the app
+            text, normalization = normalize_transcript(raw, model=ai_service.model)
+            lecture_words = set(WORD.findall(text.lower()))
+            variants = [{"input": "full", "text": text, "tokens": normalization["normalized_tokens"]}]
+            for method in args.method:
+                selection = measure_selection(text, method, args.budget, ai_service.model, args.repeats)
+                variants.append({
+                    "input": method,
+                    "text": selection["text"],
+                    "tokens": selection["selected_tokens"],
+                    "ratio": selection["ratio"],
+                    "ranking_ms": selection["ranking_ms"],
+                })
+            
+            for variant in variants:
+                if args.quiz_runs:
+                    runs = list(executor.map(
+                        lambda _: run_quiz(ai_service, variant["text"], lecture_words), range(args.quiz_runs)
+                    ))
+                    variant["quiz"] = summarize_quiz(runs)
+                del variant["text"]
+            results.append({"transcript": name, "variants": variants})
+    finally:
+        executor.shutdown()
+        if fake is not None:
+            fake.terminate()
+    
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"options": vars(args), "results": results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Fake OpenAI Server
+
+An OpenAI-compatible chat completions (and embeddings) endpoint for benchmarks. Point the
+app at it with OPENAI_BASE_URL=http://127.0.0.1:9100/v1.
+
+What It Simulates:
+- Latency: a fixed time to first token plus a per-token generation time,
+  so long answers are slower than short ones, like the real API
+- Streaming: `stream: true` is answered with server-sent event chunks,
+  one word at a time
+- Failures: a configurable fraction of calls fail with 429 (with
+  Retry-After), 500 or 503, to exercise retries and circuit breakers
+- Embeddings: POST /v1/embeddings returns hashed bag-of-words vectors,
+  so texts sharing words are close and semantic search results are
+  meaningful (and repeatable) offline
+- Usage: every response reports prompt/completion tokens, and GET /stats
+  returns the totals by kind of call
+
+Answers are valid for the app: the system message decides whether the
+reply is a summary, a numbered key point list, a quiz JSON array, a
+combined JSON object or chunk notes.
+
+Usage:
+    python -m benchmarks.fake_openai --port 9100 --latency-ms 400 --ms-per-token 8
+    python -m benchmarks.fake_openai --failure-rate 0.05 --failure-status 429
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Rough OpenAI tokenization for English: ~4 characters per token
+CHARS_PER_TOKEN = 4
+
+QUIZ_QUESTIONS = 10
+
+# Dimensions of the fake embeddings
+EMBEDDING_DIMENSIONS = 256
+
+WORD = re.compile(r"[a-z0-9']+")
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def classify(system_message: str) -> str:
+    """
+    Which app call a request is, from its system message.
+    """
+    if "requested number of questions" in system_message:
+        return "quiz_repair"
+    if "single valid JSON object" in system_message:
+        return "combined"
+    if "quiz questions" in system_message:
+        return "quiz"
+    if "key concepts" in system_message:
+        return "key_points"
+    if "condensing lectures" in system_message:
+        return "chunk_notes"
+    if "study materials" in system_message:
+        return "summary"
+    return "other"
+
+
+def _questions(seed: str, count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "question": f"Which statement about concept {seed[:6]}-{i + 1} is correct?",
+            "options": [f"Option {letter} for {seed[:6]}-{i + 1}" for letter in "ABCD"],
+            "correct_answer": "ABCD"[i % 4],
+        }
+        for i in range(count)
+    ]
+
+
+def answer(kind: str, prompt: str) -> str:
+    """
+    A reply the app can parse for this kind of call.
+    """
+    seed = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    summary = (
+        "This lecture explains the core concept, how it is measured and why it matters. "
+        "It walks through a worked example and highlights the points most likely to be examined."
+    )
+    key_points = [f"Key concept {i + 1}: an important idea from the lecture ({seed[i:i + 6]})." for i in range(6)]
+    
+    if kind == "quiz_repair":
+        count = re.search(r"EXACTLY (\d+) NEW", prompt)
+        return json.dumps(_questions(seed[8:], int(count.group(1)) if count else 1))
+    if kind == "quiz":
+        return json.dumps(_questions(seed, QUIZ_QUESTIONS))
+    if kind == "combined":
+        return json.dumps({"summary": summary, "key_points": key_points, "quiz": _questions(seed, QUIZ_QUESTIONS)})
+    if kind == "key_points":
+        return "\n".join(f"{i + 1}. {point}" for i, point in enumerate(key_points))
+    if kind == "chunk_notes":
+        return "\n".join(f"- Note {i + 1}: {summary}" for i in range(8))
+    if kind == "summary":
+        return summary
+    return "OK"
+
+
+def embed(text: str) -> List[float]:
+    """
+    Unit-length hashed bag-of-words vector: each word adds +1 or -1 to a
+    dimension picked by its hash.
+    """
+    vector = [0.0] * EMBEDDING_DIMENSIONS
+    for word in WORD.findall(text.lower()):
+        digest = hashlib.md5(word.encode("utf-8")).digest()
+        vector[int.from_bytes(digest[:4], "little") % EMBEDDING_DIMENSIONS] += 1.0 if digest[4] & 1 else -1.0
+    norm = sum(value * value for value in vector) ** 0.5 or 1.0
+    return [value / norm for value in vector]
+
+
+def create_app(latency_ms: float = 400.0, ms_per_token: float = 8.0, failure_rate: float = 0.0,
+               failure_status: int = 429, seed: int = 0) -> FastAPI:
+    """
+    Build the fake server.
+    
+    Args:
+        latency_ms (float): Time to first token
+        ms_per_token (float): Generation time per completion token
+        failure_rate (float): Fraction of calls that fail (0-1)
+        failure_status (int): Status of injected failures (429, 500, 503)
+        seed (int): Seed for failure injection, for repeatable runs
+    """
+    app = FastAPI(title="Fake OpenAI")
+    rng = random.Random(seed)
+    totals = {"requests": 0, "failures": 0, "streamed": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    by_kind: Dict[str, Dict[str, int]] = {}
+    
+    def record(kind: str, prompt_tokens: int, completion_tokens: int) -> None:
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += completion_tokens
+        entry = by_kind.setdefault(kind, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+        entry["calls"] += 1
+        entry["prompt_tokens"] += prompt_tokens
+        entry["completion_tokens"] += completion_tokens
+    
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        totals["requests"] += 1
+        messages = body.get("messages", [])
+        system_message = next((m["content"] for m in messages if m["role"] == "system"), "")
+        prompt = "\n".join(m["content"] for m in messages)
+        kind = classify(system_message)
+        
+        await asyncio.sleep(latency_ms / 1000)
+        if failure_rate and rng.random() < failure_rate:
+            totals["failures"] += 1
+            headers = {"retry-after": "1"} if failure_status == 429 else {}
+            return JSONResponse(
+                status_code=failure_status,
+                headers=headers,
+                content={"error": {"message": "Injected failure", "type": "fake_error", "code": str(failure_status)}}
+            )
+        
+        content = answer(kind, prompt)
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(content)
+        record(kind, prompt_tokens, completion_tokens)
+        completion_id = f"chatcmpl-{rng.getrandbits(48):012x}"
+        created = int(time.time())
+        model = body.get("model", "gpt-3.5-turbo")
+        
+        if body.get("stream"):
+            totals["streamed"] += 1
+            words = re.findall(r"\S+\s*", content)
+            delay = ms_per_token * completion_tokens / max(1, len(words)) / 1000
+            
+            async def events():
+                for word in words:
+                    await asyncio.sleep(delay)
+                    chunk = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                final = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                }
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+            
+            return StreamingResponse(events(), media_type="text/event-stream")
+        
+        await asyncio.sleep(ms_per_token * completion_tokens / 1000)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+    
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        totals["requests"] += 1
+        texts = body.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        
+        # Embeddings are a single forward pass: much faster than a completion
+        await asyncio.sleep(latency_ms / 4000)
+        if failure_rate and rng.random() < failure_rate:
+            totals["failures"] += 1
+            return JSONResponse(
+                status_code=failure_status,
+                content={"error": {"message": "Injected failure", "type": "fake_error", "code": str(failure_status)}}
+            )
+        
+        prompt_tokens = sum(estimate_tokens(text) for text in texts)
+        record("embedding", prompt_tokens, 0)
+        return {
+            "object": "list",
+            "data": [{"object": "embedding", "index": i, "embedding": embed(text)} for i, text in enumerate(texts)],
+            "model": body.get("model", "text-embedding-3-small"),
+            "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+        }
+    
+    @app.get("/stats")
+    async def stats():
+        return {**totals, "by_kind": by_kind}
+    
+    return app
+
+
+def main() -> None:
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description="Fake OpenAI chat completions and embeddings server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="Time to first token")
+    parser.add_argument("--ms-per-token", type=float, default=8.0, help="Generation time per completion token")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of calls that fail (0-1)")
+    parser.add_argument("--failure-status", type=int, default=429, choices=[429, 500, 503])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    app = create_app(args.latency_ms, args.ms_per_token, args.failure_rate, args.failure_status, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
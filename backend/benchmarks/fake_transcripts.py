@@ -0,0 +1,150 @@
+"""
+Fake Transcript Provider
+
+Serves canned transcripts over the TRANSCRIPT_PROVIDER_URL protocol, so
+the app can be benchmarked without YouTube:
+    
+    GET /transcripts/{video_id}?languages=en
+    -> [{"text": "...", "start": 0.0, "duration": 4.0}, ...]
+
+Transcript Sizes:
+The first character of the video ID picks the length, so a benchmark
+controls its workload through the IDs it sends:
+- "s": short, ~2 minute video (300 words)
+- "m": medium, ~15 minute lecture (2,500 words)
+- "l": long, ~1 hour lecture (10,000 words, needs map-reduce)
+- "x": extra long, ~3 hour recording (30,000 words)
+- "n": no transcript (404)
+Other IDs get a medium transcript. The text is generated from the video ID,
+so the same ID always returns the same transcript.
+
+With --auto-captions the transcripts look like YouTube's auto-generated
+captions: filler words, [Music]/[Applause] markers and rolling captions
+that repeat the end of the previous line. Use it to measure transcript
+normalization.
+
+Usage:
+    python -m benchmarks.fake_transcripts --port 9200 --latency-ms 300
+    python -m benchmarks.fake_transcripts --auto-captions
+"""
+
+import argparse
+import asyncio
+import random
+from functools import lru_cache
+from typing import Dict, List
+
+from fastapi import FastAPI, HTTPException
+
+TRANSCRIPT_WORDS = {
+    "s": 300,
+    "m": 2500,
+    "l": 10000,
+    "x": 30000,
+}
+DEFAULT_SIZE = "m"
+NO_TRANSCRIPT = "n"
+
+WORDS_PER_SEGMENT = 12
+SECONDS_PER_SEGMENT = 4.0
+
+# Auto-caption noise: words of the previous line repeated at the start of
+# the next, and how often fillers and markers appear
+ROLLING_OVERLAP_WORDS = 5
+FILLER_RATE = 0.04
+MARKER_EVERY_SEGMENTS = 25
+FILLERS = ["um", "uh", "um,", "uh,"]
+MARKERS = ["[Music]", "[Applause]", "[Laughter]"]
+
+# Lecture-ish vocabulary, so tokenization behaves like real English
+VOCABULARY = (
+    "the a of and to in is that for it as with on this be are by we an can "
+    "which energy system function value process model data theory example "
+    "equation cell structure force memory network algorithm variable result "
+    "important because therefore however first second next finally students "
+    "remember exam concept definition called used when where between each "
+    "increase decrease reaction protein market demand supply history economy "
+    "graph average probability distribution sample experiment observe measure"
+).split()
+
+
+@lru_cache(maxsize=256)
+def canned_transcript(video_id: str, auto_captions: bool = False) -> List[Dict]:
+    """
+    The deterministic transcript segments for a video ID.
+    
+    Args:
+        video_id (str): Video ID (its first character picks the length)
+        auto_captions (bool): Add auto-caption noise (fillers, markers,
+            rolling repeats); the spoken words stay the same
+    """
+    words = TRANSCRIPT_WORDS.get(video_id[:1], TRANSCRIPT_WORDS[DEFAULT_SIZE])
+    rng = random.Random(video_id)
+    noise = random.Random(f"{video_id}-noise")
+    segments = []
+    previous: List[str] = []
+    for index in range(0, words, WORDS_PER_SEGMENT):
+        count = min(WORDS_PER_SEGMENT, words - index)
+        spoken = [rng.choice(VOCABULARY) for _ in range(count)]
+        text = spoken
+        if auto_captions:
+            text = previous[-ROLLING_OVERLAP_WORDS:]
+            for word in spoken:
+                if noise.random() < FILLER_RATE:
+                    text.append(noise.choice(FILLERS))
+                text.append(word)
+            if len(segments) % MARKER_EVERY_SEGMENTS == 0:
+                text = [noise.choice(MARKERS)] + text
+        previous = spoken
+        segments.append({
+            "text": " ".join(text),
+            "start": len(segments) * SECONDS_PER_SEGMENT,
+            "duration": SECONDS_PER_SEGMENT,
+        })
+    return segments
+
+
+def create_app(latency_ms: float = 0.0, auto_captions: bool = False) -> FastAPI:
+    """
+    Build the fake provider.
+    
+    Args:
+        latency_ms (float): Delay before every response (YouTube is
+            typically a few hundred milliseconds)
+        auto_captions (bool): Serve noisy, auto-generated-style captions
+    """
+    app = FastAPI(title="Fake Transcript Provider")
+    app.state.requests = 0
+    
+    @app.get("/transcripts/{video_id}")
+    async def get_transcript(video_id: str, languages: str = "en"):
+        app.state.requests += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        if video_id.startswith(NO_TRANSCRIPT):
+            raise HTTPException(status_code=404, detail="No transcript for this video")
+        return canned_transcript(video_id, auto_captions)
+    
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests}
+    
+    return app
+
+
+def main() -> None:
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description="Fake transcript provider for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--auto-captions", action="store_true",
+                        help="Add filler words, markers and rolling-caption repeats")
+    args = parser.parse_args()
+    
+    uvicorn.run(create_app(args.latency_ms, args.auto_captions), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""
+Benchmark Harness
+
+Starts the app against local stand-ins for OpenAI and YouTube, drives its
+endpoints at a fixed concurrency, and reports what a performance change
+actually did:
+- Latency p50 / p95 / p99 / max per scenario
+- Throughput (successful requests per second)
+- Errors by status code
+- OpenAI calls and prompt/completion tokens (total and per request)
+
+Nothing leaves the machine: the app runs with OPENAI_BASE_URL pointing at
+benchmarks/fake_openai.py and TRANSCRIPT_PROVIDER_URL at
+benchmarks/fake_transcripts.py, each in its own process.
+
+Scenarios:
+- extract: POST /api/transcript/extract
+- process: POST /api/video/process (transcript + summary, key points, quiz)
+
+Usage (from backend/):
+    # Cold requests (every video new), 8 at a time
+    python -m benchmarks.run --scenario process --concurrency 8 --requests 64
+    
+    # Long lectures (map-reduce), slower model, 5% rate limiting
+    python -m benchmarks.run --transcript long --latency-ms 800 --failure-rate 0.05
+    
+    # Same 4 videos over and over (cache and request coalescing)
+    python -m benchmarks.run --distinct 4
+    
+    # Tokens saved by transcript normalization on noisy auto-captions
+    python -m benchmarks.run --auto-captions --env TRANSCRIPT_NORMALIZE=False
+    python -m benchmarks.run --auto-captions
+    
+    # Before/after a change
+    python -m benchmarks.run --json before.json
+    ... apply the change ...
+    python -m benchmarks.run --json after.json --baseline before.json
+    
+    # Any app setting can be overridden for the run
+    python -m benchmarks.run --env AI_GENERATION_MODE=combined --env CACHE_BACKEND=none
+
+Compare runs made on the same machine with the same options; absolute
+numbers depend on the hardware and the fake latencies.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "extract": "/api/transcript/extract",
+    "process": "/api/video/process",
+}
+
+# First character of a video ID selects the fake transcript's length
+TRANSCRIPT_SIZES = {"short": "s", "medium": "m", "long": "l", "xlong": "x"}
+
+# App settings for a self-contained run; --env overrides them
+APP_ENV = {
+    "APP_ENV": "development",
+    "OPENAI_API_KEY": "sk-benchmark",
+    "RATE_LIMIT_ENABLED": "False",
+    "TRANSCRIPT_ARCHIVE_ENABLED": "False",
+    "CACHE_BACKEND": "memory",
+    "REQUEST_LOG_ENABLED": "False",
+    "RETRY_BASE_DELAY": "0.1",
+    # The real account quota would dominate every run; measure the app
+    # itself (pass --env OPENAI_TPM_LIMIT=90000 to include queueing)
+    "OPENAI_TPM_LIMIT": "0",
+    "OPENAI_RPM_LIMIT": "0",
+    # Background indexing would add embedding calls to the token counts;
+    # pass --env SEARCH_ENABLED=True to include it
+    "SEARCH_ENABLED": "False",
+}
+
+STARTUP_TIMEOUT = 30
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    rank = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def video_url(size: str, number: int) -> str:
+    # 11 characters, like a real video ID
+    return f"https://www.youtube.com/watch?v={TRANSCRIPT_SIZES[size]}{number:010d}"
+
+
+class Servers:
+    """
+    The fake upstreams and the app, each in its own process.
+    """
+    
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.processes: List[subprocess.Popen] = []
+        self.log_dir = tempfile.mkdtemp(prefix="svlt-bench-")
+        self.openai_url = f"http://127.0.0.1:{free_port()}"
+        self.transcripts_url = f"http://127.0.0.1:{free_port()}"
+        self.app_url = f"http://127.0.0.1:{free_port()}"
+    
+    def _spawn(self, name: str, command: List[str], env: Optional[Dict[str, str]] = None) -> None:
+        log = open(os.path.join(self.log_dir, f"{name}.log"), "w")
+        self.processes.append(subprocess.Popen(
+            command, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+        ))
+    
+    def start(self) -> None:
+        args = self.args
+        self._spawn("fake_openai", [
+            sys.executable, "-m", "benchmarks.fake_openai",
+            "--port", self.openai_url.rsplit(":", 1)[1],
+            "--latency-ms", str(args.latency_ms),
+            "--ms-per-token", str(args.ms_per_token),
+            "--failure-rate", str(args.failure_rate),
+            "--failure-status", str(args.failure_status),
+        ])
+        self._spawn("fake_transcripts", [
+            sys.executable, "-m", "benchmarks.fake_transcripts",
+            "--port", self.transcripts_url.rsplit(":", 1)[1],
+            "--latency-ms", str(args.transcript_latency_ms),
+            *(["--auto-captions"] if args.auto_captions else []),
+        ])
+        
+        env = {**os.environ, **APP_ENV}
+        env["OPENAI_BASE_URL"] = f"{self.openai_url}/v1"
+        env["TRANSCRIPT_PROVIDER_URL"] = self.transcripts_url
+        env["JOB_DB_PATH"] = os.path.join(self.log_dir, "jobs.sqlite3")
+        env["SEARCH_INDEX_DIR"] = os.path.join(self.log_dir, "search_index")
+        for override in args.env:
+            key, _, value = override.partition("=")
+            env[key] = value
+        self._spawn("app", [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1",
+            "--port", self.app_url.rsplit(":", 1)[1],
+            "--workers", str(args.app_workers),
+            "--log-level", "warning",
+        ], env=env)
+        
+        for url in (f"{self.openai_url}/stats", f"{self.transcripts_url}/stats", f"{self.app_url}/health"):
+            self._wait_ready(url)
+    
+    def _wait_ready(self, url: str) -> None:
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if any(process.poll() is not None for process in self.processes):
+                break
+            try:
+                if httpx.get(url, timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"{url} did not come up; see the logs in {self.log_dir}")
+    
+    def stop(self) -> None:
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.processes = []
+
+
+async def drive(client: httpx.AsyncClient, app_url: str, scenario: str, args: argparse.Namespace,
+                first_video: int, count: int) -> Dict[str, Any]:
+    """
+    Send `count` requests, `args.concurrency` at a time.
+    
+    Returns:
+        dict: latencies (ms, successful requests), statuses and wall time
+    """
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    next_index = 0
+    
+    async def worker():
+        nonlocal next_index
+        while next_index < count:
+            index = next_index
+            next_index += 1
+            number = first_video + (index % args.distinct if args.distinct else index)
+            started = time.perf_counter()
+            try:
+                response = await client.post(
+                    app_url + SCENARIOS[scenario],
+                    json={"youtube_url": video_url(args.transcript, number)}
+                )
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            elapsed = (time.perf_counter() - started) * 1000
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == "200":
+                latencies.append(elapsed)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return {"latencies": latencies, "statuses": statuses, "seconds": time.perf_counter() - started}
+
+
+async def run_scenario(servers: Servers, scenario: str, args: argparse.Namespace, offset: int) -> Dict[str, Any]:
+    """
+    Warm up, then measure one scenario.
+    """
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        # Warm-up videos are distinct from the measured ones
+        await drive(client, servers.app_url, scenario, argparse.Namespace(**{**vars(args), "distinct": 0}),
+                    offset, args.warmup)
+        before = (await client.get(f"{servers.openai_url}/stats")).json()
+        measured = await drive(client, servers.app_url, scenario, args, offset + args.warmup, args.requests)
+        after = (await client.get(f"{servers.openai_url}/stats")).json()
+    
+    latencies = sorted(measured["latencies"])
+    ok = len(latencies)
+    prompt_tokens = after["prompt_tokens"] - before["prompt_tokens"]
+    completion_tokens = after["completion_tokens"] - before["completion_tokens"]
+    return {
+        "scenario": scenario,
+        "endpoint": SCENARIOS[scenario],
+        "requests": args.requests,
+        "ok": ok,
+        "statuses": measured["statuses"],
+        "seconds": round(measured["seconds"], 3),
+        "throughput_rps": round(ok / measured["seconds"], 3) if measured["seconds"] else None,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "mean": sum(latencies) / ok if ok else None,
+            "max": latencies[-1] if latencies else None,
+        },
+        "llm_calls": after["requests"] - before["requests"],
+        "llm_failures": after["failures"] - before["failures"],
+        "tokens": {
+            "prompt": prompt_tokens,
+            "completion": completion_tokens,
+            "per_request": round((prompt_tokens + completion_tokens) / ok, 1) if ok else None,
+        },
+    }
+
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:,.0f}"
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    print()
+    print(f"{'scenario':<10}{'ok':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'max ms':>10}{'llm calls':>11}{'tokens/req':>12}")
+    for result in results:
+        latency = result["latency_ms"]
+        print(
+            f"{result['scenario']:<10}"
+            f"{result['ok']:>4}/{result['requests']:<3}"
+            f"{result['throughput_rps'] or 0:>9.2f}"
+            f"{_ms(latency['p50']):>10}{_ms(latency['p95']):>10}{_ms(latency['p99']):>10}{_ms(latency['max']):>10}"
+            f"{result['llm_calls']:>11}"
+            f"{result['tokens']['per_request'] or 0:>12,.0f}"
+        )
+        errors = {status: n for status, n in result["statuses"].items() if status != "200"}
+        if errors:
+            print(f"{'':<10}errors: {errors}")
+
+
+def print_comparison(results: List[Dict[str, Any]], baseline: Dict[str, Any]) -> None:
+    """
+    Percentage change of each metric against a previous --json run.
+    """
+    previous = {result["scenario"]: result for result in baseline["results"]}
+    print()
+    print("Change vs baseline (negative latency / tokens and positive rps are improvements):")
+    for result in results:
+        old = previous.get(result["scenario"])
+        if old is None:
+            continue
+        changes = []
+        for label, new_value, old_value in [
+            ("p50", result["latency_ms"]["p50"], old["latency_ms"]["p50"]),
+            ("p95", result["latency_ms"]["p95"], old["latency_ms"]["p95"]),
+            ("p99", result["latency_ms"]["p99"], old["latency_ms"]["p99"]),
+            ("rps", result["throughput_rps"], old["throughput_rps"]),
+            ("tokens/req", result["tokens"]["per_request"], old["tokens"]["per_request"]),
+        ]:
+            if new_value is None or not old_value:
+                changes.append(f"{label} n/a")
+            else:
+                changes.append(f"{label} {(new_value - old_value) / old_value * 100:+.1f}%")
+        print(f"  {result['scenario']:<10}" + "  ".join(changes))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline benchmark of the video learning API")
+    parser.add_argument("--scenario", choices=[*SCENARIOS, "all"], default="all")
+    parser.add_argument("--requests", type=int, default=32, help="Measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests before each scenario")
+    parser.add_argument("--transcript", choices=list(TRANSCRIPT_SIZES), default="medium")
+    parser.add_argument("--distinct", type=int, default=0,
+                        help="Cycle through this many videos (0: every request is a new video)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-request timeout (seconds)")
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="Fake OpenAI time to first token")
+    parser.add_argument("--ms-per-token", type=float, default=8.0, help="Fake OpenAI time per completion token")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of OpenAI calls that fail")
+    parser.add_argument("--failure-status", type=int, default=429, choices=[429, 500, 503])
+    parser.add_argument("--transcript-latency-ms", type=float, default=300.0, help="Fake YouTube latency")
+    parser.add_argument("--auto-captions", action="store_true",
+                        help="Noisy auto-generated-style captions (fillers, markers, rolling repeats)")
+    parser.add_argument("--app-workers", type=int, default=1, help="Uvicorn worker processes for the app")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="App setting for this run (repeatable)")
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against a previous --json file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    scenarios = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    
+    servers = Servers(args)
+    servers.start()
+    try:
+        results = []
+        for i, scenario in enumerate(scenarios):
+            # Each scenario gets its own range of video IDs, so it starts cold
+            results.append(asyncio.run(run_scenario(servers, scenario, args, offset=i * 1_000_000)))
+    finally:
+        servers.stop()
+    
+    print_report(results)
+    if args.baseline:
+        with open(args.baseline) as f:
+            print_comparison(results, json.load(f))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"options": vars(args), "results": results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
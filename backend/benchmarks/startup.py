@@ -0,0 +1,217 @@
+"""
+Startup Benchmark
+
+Measures how quickly a fresh app process becomes useful, which is what a
+cold start (deploy, autoscaling, a recycled worker) costs:
+- import: seconds to `import app.main` in a new interpreter
+- ready: process start until GET /health answers 200 under Uvicorn
+- health probe: latency of GET /api/video/health right after startup
+  (should stay flat: it reads state without building API clients)
+
+Every run starts a new process, so module caches never carry over. The
+app runs with the same self-contained settings as benchmarks/run.py; no
+request leaves the machine.
+
+Usage (from backend/):
+    python -m benchmarks.startup --runs 5
+    
+    # Also list the packages that are slowest to import (python -X importtime)
+    python -m benchmarks.startup --importtime 15
+    
+    # Before/after a change
+    python -m benchmarks.startup --json before.json
+    ... apply the change ...
+    python -m benchmarks.startup --json after.json --baseline before.json
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .run import APP_ENV, BACKEND_DIR, STARTUP_TIMEOUT, free_port
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - started)"
+)
+
+HEALTH_PROBES = 10
+
+# `import time: self [us] | cumulative | module` lines from -X importtime
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s+(\S+)")
+
+
+def app_env(args: argparse.Namespace, work_dir: str) -> Dict[str, str]:
+    env = {**os.environ, **APP_ENV}
+    env["JOB_DB_PATH"] = os.path.join(work_dir, "jobs.sqlite3")
+    env["SEARCH_INDEX_DIR"] = os.path.join(work_dir, "search_index")
+    for override in args.env:
+        key, _, value = override.partition("=")
+        env[key] = value
+    return env
+
+
+def measure_import(env: Dict[str, str]) -> float:
+    """
+    Milliseconds to import the app in a new interpreter.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    # The app prints setup messages; the timing is the last line
+    return float(output.strip().splitlines()[-1]) * 1000
+
+
+def measure_ready(env: Dict[str, str], work_dir: str) -> Dict[str, float]:
+    """
+    Start Uvicorn and time it until /health answers, then probe the
+    video service health endpoint.
+    
+    Returns:
+        dict: ready_ms and health_probe_ms (median of HEALTH_PROBES calls)
+    """
+    app_url = f"http://127.0.0.1:{free_port()}"
+    log = open(os.path.join(work_dir, "app.log"), "a")
+    started = time.perf_counter()
+    process = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1",
+        "--port", app_url.rsplit(":", 1)[1],
+        "--log-level", "warning",
+    ], cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    
+    try:
+        ready_ms = None
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        with httpx.Client(timeout=1) as client:
+            while ready_ms is None and time.monotonic() < deadline and process.poll() is None:
+                try:
+                    if client.get(f"{app_url}/health").status_code == 200:
+                        ready_ms = (time.perf_counter() - started) * 1000
+                        break
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.01)
+            if ready_ms is None:
+                raise RuntimeError(f"The app did not come up; see {log.name}")
+            
+            probes = []
+            for _ in range(HEALTH_PROBES):
+                probe_started = time.perf_counter()
+                client.get(f"{app_url}/api/video/health").raise_for_status()
+                probes.append((time.perf_counter() - probe_started) * 1000)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+    
+    return {"ready_ms": ready_ms, "health_probe_ms": statistics.median(probes)}
+
+
+def slowest_imports(env: Dict[str, str], limit: int) -> List[Dict[str, Any]]:
+    """
+    The packages that take longest to import (one run).
+    
+    Each module's own import time is added to its top-level package, so
+    "openai" includes openai.types.* but not httpx, which it imports.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stderr
+    packages: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            package = match.group(3).split(".")[0]
+            packages[package] = packages.get(package, 0.0) + int(match.group(1)) / 1000
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [{"package": package, "ms": round(ms, 1)} for package, ms in slowest]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "median": round(statistics.median(samples), 1),
+        "min": round(min(samples), 1),
+        "max": round(max(samples), 1),
+    }
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    print()
+    print(f"{'metric':<18}{'median ms':>12}{'min ms':>10}{'max ms':>10}")
+    for metric in ("import_ms", "ready_ms", "health_probe_ms"):
+        stats = results[metric]
+        print(f"{metric:<18}{stats['median']:>12,.1f}{stats['min']:>10,.1f}{stats['max']:>10,.1f}")
+    if results.get("slowest_imports"):
+        print()
+        print("Slowest imports (by package):")
+        for package in results["slowest_imports"]:
+            print(f"  {package['ms']:>9,.1f} ms  {package['package']}")
+
+
+def print_comparison(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """
+    Percentage change of each median against a previous --json run.
+    """
+    print()
+    print("Change vs baseline (negative is an improvement):")
+    for metric in ("import_ms", "ready_ms", "health_probe_ms"):
+        new_value = results[metric]["median"]
+        old_value = baseline["results"].get(metric, {}).get("median")
+        change = f"{(new_value - old_value) / old_value * 100:+.1f}%" if old_value else "n/a"
+        print(f"  {metric:<18}{change}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Startup time of the video learning API")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per measurement")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N",
+                        help="Also list the N packages that are slowest to import")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="App setting for this run (repeatable)")
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against a previous --json file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    work_dir = tempfile.mkdtemp(prefix="svlt-startup-")
+    env = app_env(args, work_dir)
+    
+    imports = [measure_import(env) for _ in range(args.runs)]
+    starts = [measure_ready(env, work_dir) for _ in range(args.runs)]
+    results: Dict[str, Any] = {
+        "import_ms": summarize(imports),
+        "ready_ms": summarize([start["ready_ms"] for start in starts]),
+        "health_probe_ms": summarize([start["health_probe_ms"] for start in starts]),
+    }
+    if args.importtime:
+        results["slowest_imports"] = slowest_imports(env, args.importtime)
+    
+    print_report(results)
+    if args.baseline:
+        with open(args.baseline) as f:
+            print_comparison(results, json.load(f))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"options": vars(args), "results": results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
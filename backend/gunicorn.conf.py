@@ -0,0 +1,17 @@
+"""
+gunicorn.conf.py - Gunicorn Settings
+
+Read automatically by `gunicorn app.wsgi:app` when started from backend/,
+so a bare Gunicorn command still gets Uvicorn workers, one per CPU, a
+preloaded app and the tuned keep-alive/backlog. See app/server.py for the
+settings and the environment variables that change them.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.server import prepare
+
+globals().update(prepare())
@@ -0,0 +1,116 @@
+"""
+Tests for AIService component generation (sequential and concurrent).
+
+The generation methods are stubbed, so no OpenAI calls are made.
+"""
+
+import asyncio
+import json
+import uuid
+
+import pytest
+
+from app.services.ai_service import AIService
+
+QUIZ = [
+    {"question": f"Question {i}?", "options": ["a", "b", "c", "d"], "correct_answer": "A"}
+    for i in range(10)
+]
+
+
+@pytest.fixture
+def ai_service():
+    service = AIService()
+    calls = []
+    
+    def stub(name, value):
+        def generate(transcript):
+            calls.append(name)
+            return True, value, None
+        
+        async def generate_async(transcript):
+            calls.append(name)
+            return True, value, None
+        
+        setattr(service, f"generate_{name}", generate)
+        setattr(service, f"generate_{name}_async", generate_async)
+    
+    stub("summary", "A summary.")
+    stub("key_points", ["One", "Two"])
+    stub("quiz", QUIZ)
+    service.generation_mode = "separate"
+    service.calls = calls
+    return service
+
+
+def transcript() -> str:
+    # Unique per test, so cached packages never leak between tests
+    return f"Lecture {uuid.uuid4().hex}. Photosynthesis turns light into chemical energy."
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_generates_every_component(ai_service, concurrent):
+    ai_service.concurrent_generation = concurrent
+    
+    success, package, error = ai_service.generate_learning_package(transcript(), video_id="abcdefghijk")
+    
+    assert success, error
+    assert package["summary"] == "A summary."
+    assert package["key_points"] == ["One", "Two"]
+    assert package["quiz"] == QUIZ
+    assert sorted(ai_service.calls) == ["key_points", "quiz", "summary"]
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_generates_only_selected_components(ai_service, concurrent):
+    ai_service.concurrent_generation = concurrent
+    
+    success, package, error = ai_service.generate_learning_package(
+        transcript(), video_id="abcdefghijk", components=["quiz"]
+    )
+    
+    assert success, error
+    assert package["quiz"] == QUIZ
+    assert "summary" not in package and "key_points" not in package
+    assert ai_service.calls == ["quiz"]
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_async_generates_every_component(ai_service, concurrent):
+    ai_service.concurrent_generation = concurrent
+    
+    success, package, error = asyncio.run(
+        ai_service.generate_learning_package_async(transcript(), video_id="abcdefghijk")
+    )
+    
+    assert success, error
+    assert {"summary", "key_points", "quiz"} <= set(package)
+    assert sorted(ai_service.calls) == ["key_points", "quiz", "summary"]
+
+
+@pytest.mark.parametrize("options", [None, 4, "abcd", ["a", "b"]])
+def test_merge_drops_questions_with_malformed_options(options):
+    bad = {"question": "Broken?", "options": options, "correct_answer": "A"}
+    
+    assert AIService._merge_questions([], [bad, *QUIZ[:2]]) == QUIZ[:2]
+
+
+@pytest.mark.parametrize("selected, reduced", [
+    (frozenset({"summary", "key_points", "quiz"}), True),
+    (frozenset({"quiz"}), False),
+])
+def test_combined_prompt_is_reduced_only_for_every_component(selected, reduced):
+    service = AIService()
+    service.extractive_components = selected
+    service._select_salient = lambda transcript: "Salient sentences."
+    prompts = []
+    
+    def complete(system_message, prompt, **kwargs):
+        prompts.append(prompt)
+        return json.dumps({"summary": "A summary.", "key_points": ["One"], "quiz": QUIZ})
+    
+    service._complete = complete
+    success, components, error = service.generate_combined(transcript())
+    
+    assert success, error
+    assert ("Salient sentences." in prompts[0]) is reduced
@@ -0,0 +1,36 @@
+"""
+Tests for the tiered cache (memory in front of SQLite).
+"""
+
+import time
+
+import pytest
+
+from app.utils.cache import MemoryCache, SQLiteCache, TieredCache
+
+
+@pytest.fixture
+def persistent(tmp_path):
+    return SQLiteCache(str(tmp_path / "cache.sqlite3"), default_ttl=3600)
+
+
+def test_persistent_hit_is_kept_in_memory_for_its_remaining_ttl(persistent):
+    cache = TieredCache(MemoryCache(default_ttl=3600), persistent)
+    persistent.set("app:key", {"value": 1}, ttl=0.2)
+    
+    assert cache.get("app:key") == {"value": 1}
+    assert cache.memory.get("app:key") == {"value": 1}
+    
+    time.sleep(0.3)
+    assert cache.memory.get("app:key") is None
+    assert cache.get("app:key") is None
+
+
+def test_sqlite_reports_remaining_ttl(persistent):
+    persistent.set("app:expiring", "a", ttl=60)
+    persistent.set("app:forever", "b", ttl=0)
+    
+    value, ttl = persistent.get_with_ttl("app:expiring")
+    assert value == "a" and 59 < ttl <= 60
+    assert persistent.get_with_ttl("app:forever") == ("b", 0)
+    assert persistent.get_with_ttl("app:missing") == (None, None)
@@ -0,0 +1,83 @@
+"""
+Tests for extractive pre-selection (TF-IDF vectors and sentence ranking).
+"""
+
+import random
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from app.utils import extractive_selection
+from app.utils.extractive_selection import select_salient_sentences, split_sentences, tfidf_matrix
+
+
+def test_tfidf_rows_are_unit_length_or_zero():
+    vectors = tfidf_matrix([
+        "Photosynthesis converts light energy into chemical energy.",
+        "Um, okay, right.",
+        "Chlorophyll absorbs light for photosynthesis.",
+    ])
+    
+    norms = np.linalg.norm(vectors, axis=1)
+    assert norms == pytest.approx([1.0, 0.0, 1.0], abs=1e-6)
+    # Both sentences about photosynthesis share terms
+    assert float(vectors[0] @ vectors[2]) > 0
+
+
+def test_tfidf_keeps_the_most_frequent_terms(monkeypatch):
+    monkeypatch.setattr(extractive_selection, "MAX_TERMS", 2)
+    vectors = tfidf_matrix([
+        "mitochondria produce energy",
+        "mitochondria store energy",
+        "ribosomes build proteins",
+    ])
+    
+    # Only "mitochondria" and "energy" (in two sentences each) are kept
+    assert vectors.shape == (3, 2)
+    assert not vectors[2].any()
+
+
+def test_tfidf_memory_is_bounded_by_the_kept_terms():
+    rng = random.Random(0)
+    vocabulary = [f"term{i}x" for i in range(40000)]
+    sentences = [" ".join(rng.choice(vocabulary) for _ in range(15)) for _ in range(3000)]
+    matrix_bytes = len(sentences) * extractive_selection.MAX_TERMS * 4
+    
+    tracemalloc.start()
+    try:
+        vectors = tfidf_matrix(sentences)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    
+    assert vectors.shape == (3000, extractive_selection.MAX_TERMS)
+    # The full vocabulary would need 40000 columns (~10x the kept matrix)
+    assert peak < 1.5 * matrix_bytes
+
+
+def test_split_sentences_breaks_up_unpunctuated_captions():
+    sentences = split_sentences(" ".join(["word"] * 130) + ". Next sentence here.")
+    
+    assert [len(sentence.split()) for sentence in sentences] == [60, 60, 10, 3]
+
+
+@pytest.mark.parametrize("method", ["textrank", "tfidf"])
+def test_selection_fits_the_budget_in_lecture_order(method):
+    topics = ["photosynthesis light chlorophyll", "mitochondria respiration energy", "ribosomes proteins amino"]
+    sentences = [
+        f"Sentence {i} explains {topics[i % 3]} in detail for the students." for i in range(120)
+    ]
+    text = " ".join(sentences)
+    
+    selected, stats = select_salient_sentences(text, 200, method)
+    
+    assert stats["selected_tokens"] <= 200 < stats["original_tokens"]
+    picked = [sentences.index(sentence + ".") for sentence in selected.rstrip(".").split(". ")]
+    assert picked == sorted(picked)
+
+
+def test_text_within_budget_is_returned_unchanged():
+    text = "Cells divide. DNA is copied first."
+    
+    assert select_salient_sentences(text, 1000)[0] == text
@@ -0,0 +1,127 @@
+"""
+Tests for job webhooks: address validation and delivery to the validated
+address (no DNS or network access outside 127.0.0.1).
+"""
+
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from app.services import job_service
+from app.services.job_service import JobService, JobStore, resolve_webhook
+
+
+def fake_getaddrinfo(*addresses):
+    async def getaddrinfo(host, port, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port)) for address in addresses]
+    return getaddrinfo
+
+
+@pytest.mark.parametrize("url, reason", [
+    ("http://127.0.0.1/hook", "non-public address 127.0.0.1"),
+    ("http://169.254.169.254/latest/meta-data", "non-public address 169.254.169.254"),
+    ("http://10.0.0.5/", "non-public address 10.0.0.5"),
+    ("http://100.64.0.1/", "non-public address 100.64.0.1"),
+    ("http://[::1]/", "non-public address ::1"),
+    ("http://[::ffff:192.168.1.1]/", "non-public address 192.168.1.1"),
+    ("ftp://example.com/", "not an http(s) URL"),
+])
+def test_rejects_non_public_addresses(url, reason):
+    assert asyncio.run(resolve_webhook(url)) == (None, reason)
+
+
+def test_rejects_host_with_any_private_address(monkeypatch):
+    async def check():
+        loop = asyncio.get_running_loop()
+        monkeypatch.setattr(loop, "getaddrinfo", fake_getaddrinfo("93.184.216.34", "127.0.0.1"))
+        return await resolve_webhook("https://hooks.example.com/done")
+    
+    assert asyncio.run(check()) == (None, "non-public address 127.0.0.1")
+
+
+def test_returns_validated_address(monkeypatch):
+    async def check():
+        loop = asyncio.get_running_loop()
+        monkeypatch.setattr(loop, "getaddrinfo", fake_getaddrinfo("93.184.216.34"))
+        return await resolve_webhook("https://hooks.example.com/done")
+    
+    assert asyncio.run(check()) == ("93.184.216.34", None)
+
+
+@pytest.fixture
+def webhook_server():
+    received = []
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            received.append(self.headers["Host"])
+            self.send_response(204)
+            self.end_headers()
+        
+        def log_message(self, *args):
+            pass
+    
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_port, received
+    server.shutdown()
+
+
+def test_delivers_to_the_validated_address(tmp_path, monkeypatch, webhook_server):
+    port, received = webhook_server
+    # The host name doesn't resolve at all: the POST can only arrive if it
+    # connects to the address returned by the check, without a second lookup
+    url = f"http://rebind.example.invalid:{port}/hook"
+    
+    async def resolved(webhook_url):
+        return "127.0.0.1", None
+    
+    monkeypatch.setattr(job_service, "resolve_webhook", resolved)
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job = store.create("dQw4w9WgXcQ", "https://youtu.be/dQw4w9WgXcQ", url)
+    store.finish(job["id"], result={"video_id": "dQw4w9WgXcQ"})
+    
+    service = JobService(video_processing_service=None, store=store)
+    asyncio.run(service._notify_webhook(job["id"], url))
+    
+    assert received == [f"rebind.example.invalid:{port}"]
+    assert store.get(job["id"])["webhook_status"] == "delivered (204)"
+
+
+def test_rejected_webhook_is_not_called(tmp_path, webhook_server):
+    port, received = webhook_server
+    url = f"http://127.0.0.1:{port}/hook"
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job = store.create("dQw4w9WgXcQ", "https://youtu.be/dQw4w9WgXcQ", url)
+    
+    service = JobService(video_processing_service=None, store=store)
+    asyncio.run(service._notify_webhook(job["id"], url))
+    
+    assert received == []
+    assert store.get(job["id"])["webhook_status"] == "rejected (non-public address 127.0.0.1)"
+
+
+def test_store_calls_run_off_the_event_loop(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    threads = []
+    create = store.create
+    
+    def recording_create(*args):
+        threads.append(threading.get_ident())
+        return create(*args)
+    
+    store.create = recording_create
+    service = JobService(video_processing_service=None, store=store)
+    
+    async def submit():
+        job = await service.submit("dQw4w9WgXcQ", "https://youtu.be/dQw4w9WgXcQ")
+        return job, threading.get_ident()
+    
+    job, loop_thread = asyncio.run(submit())
+    
+    assert job["status"] == "queued"
+    assert threads and threads[0] != loop_thread
@@ -0,0 +1,98 @@
+"""
+Tests for the OpenAI rate governor: token bucket refill and priority queueing.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.utils.rate_governor import RateGovernor, TokenBucket
+from app.utils.resilience import UpstreamUnavailable
+
+
+def test_bucket_refills_continuously_up_to_capacity():
+    bucket = TokenBucket(capacity=60, refill_per_second=1)
+    start = bucket._updated
+    bucket.take(60, start)
+    
+    assert bucket.wait_time(10, start) == pytest.approx(10)
+    assert bucket.wait_time(10, start + 4) == pytest.approx(6)
+    assert bucket.wait_time(10, start + 500) == 0
+    assert bucket.level == 60
+
+
+def empty_governor(**quota) -> RateGovernor:
+    """
+    A governor whose buckets were just drained.
+    """
+    governor = RateGovernor("test", queue_timeout=5, **quota)
+    for bucket in (governor._tokens, governor._requests):
+        if bucket is not None:
+            bucket.level = 0
+            bucket._updated = time.monotonic()
+    return governor
+
+
+def test_calls_wait_for_the_token_bucket():
+    governor = empty_governor(tokens_per_minute=6000)
+    started = time.monotonic()
+    
+    governor.acquire(20, priority="interactive")
+    
+    # 20 tokens at 100 tokens per second
+    assert time.monotonic() - started >= 0.19
+    assert governor.stats()["last_minute"]["reserved_tokens"] == 20
+
+
+def test_oversized_calls_are_admitted_once_the_bucket_is_full():
+    governor = RateGovernor("test", tokens_per_minute=1000)
+    
+    governor.acquire(50000, priority="interactive")
+    
+    assert governor.stats()["last_minute"]["reserved_tokens"] == 1000
+
+
+def test_interactive_calls_go_before_queued_batch_calls():
+    governor = empty_governor(requests_per_minute=600)
+    admitted = []
+    
+    async def call(name, priority):
+        await governor.acquire_async(1, priority=priority)
+        admitted.append(name)
+    
+    async def run():
+        tasks = [asyncio.create_task(call("batch-1", "batch"))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(call("batch-2", "batch")))
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(call("interactive", "interactive")))
+        await asyncio.gather(*tasks)
+    
+    asyncio.run(run())
+    
+    assert admitted == ["interactive", "batch-1", "batch-2"]
+
+
+def test_timed_out_and_cancelled_calls_leave_the_queue():
+    # One request every 10 seconds
+    governor = empty_governor(requests_per_minute=6)
+    
+    async def run():
+        governor.queue_timeout = 0.5
+        with pytest.raises(UpstreamUnavailable):
+            await governor.acquire_async(1, priority="batch")
+        
+        governor.queue_timeout = 60
+        task = asyncio.create_task(governor.acquire_async(1, priority="interactive"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    
+    asyncio.run(run())
+    
+    stats = governor.stats()
+    assert stats["queued"] == {"interactive": 0, "batch": 0}
+    assert stats["priorities"]["batch"]["timed_out"] == 1
+    assert stats["last_minute"]["requests"] == 0
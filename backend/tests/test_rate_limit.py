@@ -0,0 +1,99 @@
+"""
+Tests for the sliding window rate limiter and route costs.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.rate_limit import (
+    DEFAULT_ROUTE_COST,
+    ROUTE_COSTS,
+    MemoryRateLimitStore,
+    RateLimiter,
+    RateLimitMiddleware,
+    parse_route_costs,
+)
+
+# Window 10 of a 60-second limiter starts at 600
+WINDOW_START = 600.0
+
+
+@pytest.fixture
+def limiter():
+    return RateLimiter(MemoryRateLimitStore(), window_seconds=60)
+
+
+def test_previous_window_counts_by_its_overlap(limiter):
+    limiter.hit("ip:a", 80, 100, now=WINDOW_START - 30)
+    
+    # A quarter into the next window, 3/4 of the previous 80 units still count
+    assert limiter.hit("ip:a", 41, 100, now=WINDOW_START + 15)[0] is False
+    assert limiter.hit("ip:a", 40, 100, now=WINDOW_START + 15) == (True, 0, 0.0)
+
+
+def test_rejected_requests_are_not_charged(limiter):
+    limiter.hit("ip:a", 60, 100, now=WINDOW_START)
+    
+    assert limiter.hit("ip:a", 60, 100, now=WINDOW_START)[0] is False
+    assert limiter.hit("ip:a", 40, 100, now=WINDOW_START) == (True, 0, 0.0)
+
+
+@pytest.mark.parametrize("earlier, expected_retry", [
+    # Fits in the next window, once this window's 60 units weigh 2/3
+    (None, 80.0),
+    # Fits later in this window, once the previous window's 60 units weigh 2/3
+    (60, 20.0),
+])
+def test_retry_after_is_when_the_request_fits(limiter, earlier, expected_retry):
+    if earlier:
+        limiter.hit("ip:a", earlier, 100, now=WINDOW_START - 10)
+        limiter.hit("ip:a", 30, 100, now=WINDOW_START)
+        cost = 30
+    else:
+        limiter.hit("ip:a", 60, 100, now=WINDOW_START)
+        cost = 60
+    
+    allowed, _, retry_after = limiter.hit("ip:a", cost, 100, now=WINDOW_START)
+    
+    assert not allowed
+    assert retry_after == pytest.approx(expected_retry)
+    assert limiter.hit("ip:a", cost, 100, now=WINDOW_START + retry_after - 1)[0] is False
+    assert limiter.hit("ip:a", cost, 100, now=WINDOW_START + retry_after + 1e-6)[0] is True
+
+
+def test_cost_over_the_limit_waits_a_whole_window(limiter):
+    assert limiter.hit("ip:a", 150, 100, now=WINDOW_START) == (False, 100, 60)
+
+
+def test_route_costs_override_and_extend_the_defaults():
+    costs = parse_route_costs("/api/video/process=20, /api/custom=5")
+    
+    assert costs["/api/video/process"] == 20
+    assert costs["/api/custom"] == 5
+    assert costs["/health"] == ROUTE_COSTS["/health"]
+    with pytest.raises(ValueError):
+        parse_route_costs("20")
+
+
+def test_middleware_charges_route_costs():
+    app = FastAPI()
+    for path in ("/expensive", "/free", "/other"):
+        app.add_api_route(path, lambda: {"ok": True})
+    app.add_middleware(
+        RateLimitMiddleware, limiter=RateLimiter(MemoryRateLimitStore(), window_seconds=60),
+        route_costs={"/expensive": 10, "/free": 0}, ip_limit=15, api_keys={},
+        trust_proxy=False, trusted_proxies=[], proxy_hops=1
+    )
+    client = TestClient(app)
+    
+    response = client.get("/expensive")
+    assert response.headers["x-ratelimit-remaining"] == "5"
+    assert client.get("/other").headers["x-ratelimit-remaining"] == str(5 - DEFAULT_ROUTE_COST)
+    
+    rejected = client.get("/expensive")
+    assert rejected.status_code == 429
+    assert int(rejected.headers["retry-after"]) >= 1
+    
+    free = client.get("/free")
+    assert free.status_code == 200 and "x-ratelimit-remaining" not in free.headers
@@ -0,0 +1,150 @@
+"""
+Tests for the circuit breaker and Retry-After aware backoff.
+"""
+
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import resilience
+from app.utils.resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    Upstream,
+    UpstreamUnavailable,
+    retry_after_seconds,
+)
+
+
+class TransientError(Exception):
+    def __init__(self, headers=None):
+        super().__init__("rate limited")
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def wait_out(breaker: CircuitBreaker) -> None:
+    breaker._opened_at -= breaker.recovery_timeout
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = open_breaker()
+    
+    with pytest.raises(UpstreamUnavailable) as raised:
+        breaker.before_call()
+    assert 29 < raised.value.retry_after <= 30
+    assert breaker.snapshot()["state"] == "open"
+
+
+def test_half_open_breaker_lets_one_trial_through():
+    breaker = open_breaker()
+    wait_out(breaker)
+    
+    breaker.before_call()
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_call()
+    
+    breaker.record_success()
+    assert breaker.snapshot()["state"] == "closed"
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_the_breaker():
+    breaker = open_breaker()
+    wait_out(breaker)
+    
+    breaker.before_call()
+    breaker.record_failure()
+    
+    assert breaker.snapshot()["state"] == "open"
+    assert breaker.snapshot()["times_opened"] == 2
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_call()
+
+
+def test_released_trial_lets_the_next_call_try():
+    breaker = open_breaker()
+    wait_out(breaker)
+    
+    breaker.before_call()
+    breaker.release_trial()
+    breaker.before_call()
+    
+    assert breaker.snapshot()["state"] == "half_open"
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after": "7"}, 7.0),
+    ({"retry-after": "soon"}, None),
+    ({}, None),
+])
+def test_retry_after_header_forms(headers, expected):
+    assert retry_after_seconds(TransientError(headers)) == expected
+
+
+def test_retry_after_http_date():
+    headers = {"retry-after": formatdate(time.time() + 20, usegmt=True)}
+    
+    assert retry_after_seconds(TransientError(headers)) == pytest.approx(20, abs=1.5)
+
+
+def test_backoff_uses_retry_after_unless_it_is_too_long():
+    policy = RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=20)
+    
+    assert 7 <= policy.backoff(0, retry_after=7) <= 7.5
+    assert policy.backoff(0, retry_after=60) is None
+    assert all(0 <= policy.backoff(2) <= 2 for _ in range(100))
+
+
+def upstream(is_transient=lambda error: True) -> Upstream:
+    return Upstream(
+        "test", is_transient,
+        policy=RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=20),
+        breaker=CircuitBreaker("test", failure_threshold=5)
+    )
+
+
+def test_call_waits_for_retry_after_then_retries(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(resilience.time, "sleep", sleeps.append)
+    attempts = []
+    
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise TransientError({"retry-after": "3"})
+        return "ok"
+    
+    assert upstream().call(flaky) == "ok"
+    assert len(sleeps) == 1 and 3 <= sleeps[0] <= 3.5
+
+
+def test_call_fails_fast_when_asked_to_wait_too_long(monkeypatch):
+    monkeypatch.setattr(resilience.time, "sleep", lambda seconds: pytest.fail("should not sleep"))
+    
+    def limited():
+        raise TransientError({"retry-after": "120"})
+    
+    with pytest.raises(UpstreamUnavailable) as raised:
+        upstream().call(limited)
+    assert raised.value.retry_after == 120
+
+
+def test_non_transient_errors_are_raised_unchanged():
+    service = upstream(is_transient=lambda error: False)
+    
+    def bad_request():
+        raise ValueError("bad request")
+    
+    with pytest.raises(ValueError):
+        service.call(bad_request)
+    assert service.breaker.snapshot()["consecutive_failures"] == 0
@@ -0,0 +1,66 @@
+"""
+Tests for searching a vector index built with another embedding model
+(no OpenAI calls: query embeddings are stubbed).
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.search_service import SearchService
+from app.utils.vector_index import VectorIndex
+
+CHUNKS = [{"start": 0.0, "end": 60.0, "text": "Photosynthesis converts light energy."}]
+
+
+@pytest.fixture
+def index(tmp_path):
+    return VectorIndex(str(tmp_path / "index"))
+
+
+def search_service(index, monkeypatch, model, query_vector):
+    monkeypatch.setattr(SearchService, "index", property(lambda self: index))
+    service = SearchService(transcript_service=None, ai_service=SimpleNamespace(embedding_model=model))
+    
+    async def embed_query(query):
+        return query_vector
+    
+    service._embed_query = embed_query
+    return service
+
+
+def test_search_only_scores_videos_of_the_given_model(index):
+    index.add("oldoldold00", CHUNKS, [[1.0, 0.0, 0.0]], model="old-model")
+    index.add("newnewnew00", CHUNKS, [[0.0, 1.0, 0.0]], model="new-model")
+    
+    assert [hit["video_id"] for hit in index.search([1.0, 0.0, 0.0])] == ["oldoldold00", "newnewnew00"]
+    assert [hit["video_id"] for hit in index.search([1.0, 0.0, 0.0], model="new-model")] == ["newnewnew00"]
+
+
+def test_search_with_another_dimension_raises(index):
+    index.add("oldoldold00", CHUNKS, [[1.0, 0.0, 0.0]], model="old-model")
+    
+    with pytest.raises(ValueError):
+        index.search([1.0, 0.0], model="new-model")
+
+
+def test_dimension_change_is_reported_as_index_mismatch(index, monkeypatch):
+    index.add("oldoldold00", CHUNKS, [[1.0, 0.0, 0.0]], model="old-model")
+    service = search_service(index, monkeypatch, "new-model", [1.0, 0.0])
+    
+    success, result, error = asyncio.run(service.search_async("photosynthesis"))
+    
+    assert not success
+    assert error["error"] == "Search Index Mismatch"
+
+
+def test_related_videos_needs_the_current_model(index, monkeypatch):
+    index.add("oldoldold00", CHUNKS, [[1.0, 0.0, 0.0]], model="old-model")
+    service = search_service(index, monkeypatch, "new-model", [1.0, 0.0, 0.0])
+    
+    success, result, error = asyncio.run(service.related_videos_async("oldoldold00"))
+    
+    assert not success
+    assert error["error"] == "Video Not Indexed"
+    assert "old-model" in error["detail"]
@@ -0,0 +1,114 @@
+"""
+Tests for single-flight coalescing: shared results, errors and cancellation.
+"""
+
+import asyncio
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+
+def counting_work(release: asyncio.Event, calls: list, result="done"):
+    async def work():
+        calls.append(1)
+        await release.wait()
+        return result
+    return work
+
+
+def test_concurrent_callers_share_one_flight():
+    flights = SingleFlight()
+    calls = []
+    
+    async def run():
+        release = asyncio.Event()
+        work = counting_work(release, calls)
+        callers = [asyncio.create_task(flights.do("video", work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*callers)
+    
+    assert asyncio.run(run()) == ["done"] * 5
+    assert len(calls) == 1
+    stats = flights.stats()
+    assert (stats["flights"], stats["coalesced"], stats["max_waiters"], stats["in_flight"]) == (1, 4, 5, 0)
+
+
+def test_finished_flights_are_not_reused():
+    flights = SingleFlight()
+    calls = []
+    
+    async def run():
+        release = asyncio.Event()
+        release.set()
+        work = counting_work(release, calls)
+        await flights.do("video", work)
+        await flights.do("video", work)
+    
+    asyncio.run(run())
+    
+    assert len(calls) == 2
+
+
+def test_errors_reach_every_caller_and_release_the_key():
+    flights = SingleFlight()
+    
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("transcript unavailable")
+    
+    async def run():
+        callers = [asyncio.create_task(flights.do("video", failing)) for _ in range(3)]
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        return results, flights.stats()["in_flight"]
+    
+    results, in_flight = asyncio.run(run())
+    
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert in_flight == 0
+
+
+def test_cancelled_caller_does_not_cancel_the_flight():
+    flights = SingleFlight()
+    calls = []
+    
+    async def run():
+        release = asyncio.Event()
+        work = counting_work(release, calls)
+        leaving = asyncio.create_task(flights.do("video", work))
+        staying = asyncio.create_task(flights.do("video", work))
+        await asyncio.sleep(0)
+        
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        release.set()
+        return await staying
+    
+    assert asyncio.run(run()) == "done"
+    assert len(calls) == 1
+
+
+def test_flight_finishes_when_every_caller_is_gone():
+    flights = SingleFlight()
+    finished = []
+    
+    async def work():
+        await asyncio.sleep(0.01)
+        finished.append(1)
+        return "done"
+    
+    async def run():
+        caller = asyncio.create_task(flights.do("video", work))
+        await asyncio.sleep(0)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0.05)
+        return flights.stats()
+    
+    stats = asyncio.run(run())
+    
+    assert finished == [1]
+    assert stats["in_flight"] == 0 and stats["recent"][0]["waiters"] == 1
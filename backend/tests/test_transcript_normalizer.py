@@ -0,0 +1,69 @@
+"""
+Tests for caption normalization, mainly rolling-caption overlap removal.
+"""
+
+import pytest
+
+from app.utils.transcript_normalizer import MAX_SENTENCE_WORDS, TranscriptNormalizer, normalize_lines
+
+
+@pytest.mark.parametrize("lines, expected", [
+    # The whole previous caption repeated, in another case and punctuation
+    (["so today we're going to", "So today, we're going to talk about cells."],
+     "so today we're going to talk about cells."),
+    # Only the tail of the previous caption repeated
+    (["we will look at the mitochondria", "at the mitochondria and the ribosomes."],
+     "we will look at the mitochondria and the ribosomes."),
+    # Captions rolling over three lines
+    (["cells divide by", "cells divide by mitosis and", "by mitosis and meiosis."],
+     "cells divide by mitosis and meiosis."),
+])
+def test_rolling_caption_repeats_are_removed(lines, expected):
+    assert normalize_lines(lines)[0] == expected
+
+
+def test_short_overlaps_are_kept():
+    # Two repeated words are more likely real speech than a rolling caption
+    text, stats = normalize_lines(["look at the cell", "the cell divides."])
+    
+    assert text == "look at the cell the cell divides."
+    assert stats["repeated_words_removed"] == 0
+
+
+def test_overlap_is_counted():
+    text, stats = normalize_lines(["welcome back to class", "welcome back to class everyone."])
+    
+    assert text == "welcome back to class everyone."
+    assert stats["repeated_words_removed"] == 4
+
+
+def test_markers_and_fillers_are_removed():
+    text, stats = normalize_lines(["[Music] um so today >> we'll, uh, cover (applause) osmosis."])
+    
+    assert text == "so today we'll, cover osmosis."
+    assert (stats["markers_removed"], stats["fillers_removed"]) == (3, 2)
+
+
+def test_streaming_returns_sentences_as_they_complete():
+    normalizer = TranscriptNormalizer()
+    
+    assert normalizer.feed("[Music] um welcome back to class") == []
+    assert normalizer.feed("welcome back to class everyone. Today:") == ["welcome back to class everyone."]
+    assert normalizer.finish() == ["Today:"]
+
+
+def test_unpunctuated_captions_are_split():
+    text, stats = normalize_lines([" ".join(f"word{i}" for i in range(MAX_SENTENCE_WORDS + 5))])
+    
+    assert stats["sentences"] == 2
+    assert len(text.split()) == MAX_SENTENCE_WORDS + 5
+
+
+def test_low_information_and_repeated_sentences_are_dropped():
+    lines = ["Okay, so.", "Mitochondria produce energy for cells.", "All right.",
+             "Mitochondria produce energy for cells."]
+    
+    text, stats = normalize_lines(lines, drop_low_information=True)
+    
+    assert text == "Mitochondria produce energy for cells."
+    assert stats["sentences_dropped"] == 3
@@ -0,0 +1,67 @@
+"""
+Tests for timestamped transcript storage: lookups and slicing.
+"""
+
+import pytest
+
+from app.utils.transcript_segments import TranscriptSegments
+
+SEGMENTS = [
+    {"text": "Cells divide.", "start": 0.0, "duration": 2.0},
+    {"text": "DNA is copied first.", "start": 2.0, "duration": 3.0},
+    {"text": "Then chromosomes separate.", "start": 5.0, "duration": 4.0},
+    {"text": "Finally the cell splits.", "start": 9.0, "duration": 3.0},
+]
+
+
+@pytest.fixture
+def segments():
+    return TranscriptSegments.from_segments(SEGMENTS)
+
+
+def test_text_matches_the_joined_captions(segments):
+    assert segments.text == "\n".join(segment["text"] for segment in SEGMENTS)
+    assert (segments.start, segments.end) == (0.0, 12.0)
+
+
+@pytest.mark.parametrize("start, end, texts", [
+    (2.0, 9.0, ["DNA is copied first.", "Then chromosomes separate."]),
+    # Segments are kept by start time: one that started before `start` is left out
+    (3.0, None, ["Then chromosomes separate.", "Finally the cell splits."]),
+    (None, 2.0, ["Cells divide."]),
+    (20.0, None, []),
+])
+def test_slice_keeps_segments_starting_in_range(segments, start, end, texts):
+    view = segments.slice(start, end)
+    
+    assert [segment["text"] for segment in view] == texts
+    assert view.text == "\n".join(texts)
+
+
+def test_slices_of_slices_use_view_relative_positions(segments):
+    view = segments.slice(2.0).slice(None, 9.0)
+    
+    assert len(view) == 2
+    assert view.segment(1) == {"text": "Then chromosomes separate.", "start": 5.0, "duration": 4.0, "offset": 21}
+    assert view.offset_at(6.0) == 21
+    assert view.time_at(21) == 5.0
+    assert view.index_at(0.5) == 0
+    assert view.index_at(100.0) == 1
+
+
+def test_slice_round_trips_through_to_dict(segments):
+    view = segments.slice(2.0, 9.0)
+    
+    restored = TranscriptSegments.from_dict(view.to_dict())
+    
+    assert list(restored) == list(view)
+    assert restored.text == view.text
+
+
+def test_windows_cover_every_segment_in_order(segments):
+    windows = list(segments.windows(4.0))
+    
+    assert [[segment["start"] for segment in window] for window in windows] == [[0.0, 2.0], [5.0], [9.0]]
+    assert "\n".join(window.text for window in windows) == segments.text
+    with pytest.raises(ValueError):
+        list(segments.windows(0))
@@ -0,0 +1,38 @@
+"""
+Tests for TranscriptService's cache/archive lookups (no YouTube calls).
+"""
+
+import asyncio
+import threading
+
+from app.services.transcript_service import TranscriptService
+from app.utils.transcript_segments import TranscriptSegments
+
+SEGMENTS = TranscriptSegments.from_segments([
+    {"text": "Cells divide.", "start": 0.0, "duration": 2.0},
+    {"text": "DNA is copied first.", "start": 2.0, "duration": 3.0},
+])
+
+
+def test_async_lookup_of_stored_transcript_runs_off_the_event_loop(monkeypatch):
+    threads = []
+    
+    def stored_segments(video_id):
+        threads.append(threading.get_ident())
+        return SEGMENTS
+    
+    def fetch(video_id):
+        raise AssertionError("stored transcripts must not be fetched again")
+    
+    monkeypatch.setattr(TranscriptService, "stored_segments", staticmethod(stored_segments))
+    monkeypatch.setattr(TranscriptService, "_fetch_segments", staticmethod(fetch))
+    
+    async def extract():
+        result = await TranscriptService.extract_transcript_async("dQw4w9WgXcQ")
+        return result, threading.get_ident()
+    
+    (success, text, error), loop_thread = asyncio.run(extract())
+    
+    assert success, error
+    assert text == "Cells divide.\nDNA is copied first."
+    assert threads and threads[0] != loop_thread